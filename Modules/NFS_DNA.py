@@ -1,19 +1,92 @@
 import pandas as pd
+import numpy as np
 import os.path, datetime # 파일의 수정일을 얻기 위함
 import re
+import sys
+import uuid
+import types
+import Modules.NFS_Profiler as NFS_Profiler
+
+
+# 데이터베이스 운영지침 상 미세변이로 표기하지 않는 특수 케이스 (check_special_case, DICT_MICROVARIANT가 참조)
+SPECIAL_DECIMAL_PLACE = "2"     # 모든 좌위에서 특수 케이스인 소수 부분
+SPECIAL_DECIMAL_PLACES = {"Penta E": ("2", "3"), "Penta D": ("2", "3")}    # 좌위별 특수 케이스인 소수 부분
+SPECIAL_ALLELES = {"TH01": ("9.3",), "D2S441": ("9.1",), "D1S1656": ("17.3", "18.3")}  # 좌위별 특수 케이스인 좌위값
+
+
+def check_special_case(loci, allele):
+    """
+    해당 좌위의 좌위값(소수점 포함)이 데이터베이스 운영지침 상 특수 케이스(미세변이로 표기하지 않음)인지 여부를 반환
+
+    특수 케이스는 SPECIAL_DECIMAL_PLACE, SPECIAL_DECIMAL_PLACES, SPECIAL_ALLELES 테이블로만 정한다.
+    """
+
+    decimal_place = allele.split('.')[1]
+    return (decimal_place == SPECIAL_DECIMAL_PLACE or decimal_place in SPECIAL_DECIMAL_PLACES.get(loci, ())
+            or allele in SPECIAL_ALLELES.get(loci, ()))
+
+
+def format_microvariant(loci, allele):
+    """
+    소수점이 있는 좌위값을 감정서에 표기할 정수 좌위값으로 변환하여 반환한다. 특수 케이스면 None을 반환한다.
+
+    소수 부분이 1이면 버리고 그 외에는 올린다. (e.g. 15.1 => 15, 15.3 => 16)
+    """
+
+    if check_special_case(loci, allele):
+        return None
+    decimal_place = allele.split('.')[1]
+    if decimal_place == "1":
+        return str(int(float(allele)))
+    else:
+        return str(int(float(allele) + 1))
+
+
+def build_microvariant_table(dict_markers, max_repeat=100):
+    """
+    kit별 좌위와 0 ~ max_repeat-1.3 범위의 소수점 좌위값에 대해 format_microvariant 결과를 미리 계산한
+    (좌위, 좌위값)-표기값(특수 케이스면 None) 딕셔너리를 반환한다.
+
+    Parameters
+    ----------
+    dict_markers : dict
+        kit-좌위 리스트 (CombinedResult.dict_markers)
+    max_repeat : int, optional
+        미리 계산할 반복수의 범위
+    """
+
+    table = {}
+    for list_marker in dict_markers.values():
+        for loci in list_marker:
+            for repeat in range(max_repeat):
+                for decimal_place in ("1", "2", "3"):
+                    allele = f"{repeat}.{decimal_place}"
+                    table[(loci, allele)] = format_microvariant(loci, allele)
+    return table
+
 
 class STRProfile():
     """
     법의학 실험에서 생성된 STR 데이터를 저장하고 가공하는 클래스
 
+    프로파일 수만큼 객체가 만들어지므로 __slots__를 사용하고, 좌위값을 좌위명 tuple과 좌위값 tuple의 tuple로 나눠 저장한다.
+    생성할 때 pool(딕셔너리)을 주면 좌위명 tuple(kit의 좌위 순서)과 좌위값 tuple(e.g. ('14', '15'))은 같은 값이면
+    pool을 함께 쓰는 객체끼리 하나를 공유한다. pool은 CombinedResult가 파일을 읽을 때마다 새로 만드므로 계속 커지지 않는다.
+
     Attributes
     ----------
     id : str
         프로파일의 ID
-    profile : dict
-        좌위-좌위값을 키-값으로 가지는 딕셔너리
+    profile : MappingProxyType
+        좌위-좌위값 tuple을 키-값으로 가지는 읽기 전용 딕셔너리 (수정은 input_loci 등을 사용하거나 새 딕셔너리를 대입)
+    __markers : tuple
+        좌위명 tuple (같은 pool로 만든 같은 좌위 구성의 객체끼리 공유)
+    __alleles : tuple
+        __markers 순서의 좌위값 tuple의 tuple
     __TA_THRESHOLD : int
         혼합 프로파일 판정시 Triallelic을 몇 개까지 용인할 것인지를 정하는 내부변수
+    __cache : dict
+        transform_to_str 결과를 flag_homo_duplication별로 저장하는 내부변수. 좌위값을 입력/삭제하면 비운다.
 
     Methods
     --------
@@ -27,18 +100,68 @@ class STRProfile():
         해당 프로파일이 혼합형인지 여부를 반환
     union_profiles(query)
         입력받은 프로파일과 해당 프로파일의 혼합형 프로파일을 생성하여 반환
-    __check_special_case(self, loci, allele)
-        해당 좌위의 좌위값이 데이터베이스 운영지침 상 특수 케이스인지 여부를 반환하는 내부 함수
+    __format_allele(self, loci, allele)
+        소수점이 있는 좌위값의 감정서 표기값(특수 케이스면 None)을 미리 계산한 테이블에서 찾아 반환하는 내부 함수
     transform_to_str(flag_homo_duplication=True)
         profile 객체를 감정서에 들어갈 포멧으로 변환하여 반환.
         감정서 상 좌위테이블의 기타 란에 들어갈 문구가 있다면 함께 반환
     """
 
-    def __init__(self, id="", profile={}):
+    __slots__ = ('id', '__markers', '__alleles', '__TA_THRESHOLD', '__cache')
+
+    def __init__(self, id="", profile=None, pool=None):
+        """
+        Parameters
+        ----------
+        id : str, optional
+            프로파일의 ID
+        profile : dict, optional
+            좌위-좌위값 list(혹은 tuple) 딕셔너리
+        pool : dict, optional
+            같은 값의 좌위명/좌위값 tuple을 공유할 딕셔너리 (여러 객체를 만들 때 같은 딕셔너리를 줌)
+        """
+
         self.id = id
-        self.profile = profile
+        self.__set_profile(profile if profile is not None else {}, pool)
         self.__TA_THRESHOLD = 0
 
+    @property
+    def profile(self):
+        return types.MappingProxyType(dict(zip(self.__markers, self.__alleles)))
+
+    @profile.setter
+    def profile(self, new_profile):
+        self.__set_profile(new_profile)
+
+    def __set_profile(self, new_profile, pool=None):
+        """좌위-좌위값 딕셔너리를 좌위명 tuple과 좌위값 tuple의 tuple로 저장한다. 이미 tuple인 좌위값은 그대로 사용한다."""
+
+        pool = {} if pool is None else pool
+        markers = tuple(sys.intern(loci) for loci in new_profile.keys())
+        self.__markers = pool.setdefault(markers, markers)
+        self.__alleles = tuple(self.__share_alleles(alleles, pool) for alleles in new_profile.values())
+        self.__clear_cache()
+
+    def __share_alleles(self, alleles, pool):
+        if type(alleles) is not tuple:
+            alleles = tuple(sys.intern(allele) if type(allele) is str else allele for allele in alleles)
+        return pool.setdefault(alleles, alleles)
+
+    def __getstate__(self):
+        return (self.id, self.__markers, self.__alleles, self.__TA_THRESHOLD)
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):   # __slots__ 도입 전에 저장된(pickle) 객체는 __dict__를 state로 가짐
+            self.id = state.get('id', "")
+            self.__set_profile(state.get('profile', {}))
+            self.__TA_THRESHOLD = state.get('_STRProfile__TA_THRESHOLD', 0)
+        else:   # 같은 pickle 안의 공유된 tuple은 pickle이 하나로 복원함
+            self.id, self.__markers, self.__alleles, self.__TA_THRESHOLD = state
+            self.__clear_cache()
+
+    def __clear_cache(self):
+        self.__cache = {}
+
     def __find_common_locus(self, target_profile, query_profile):
         """
         두 STRProfile에 동일하게 포함된 좌위명을 반환
@@ -53,35 +176,47 @@ class STRProfile():
         print(f"ID CHANGED : {old_id} -> {new_id}")
 
     def input_loci(self, loci, alleles):
-        self.profile[loci] = alleles
+        profile = dict(self.profile)
+        profile[loci] = alleles
+        self.profile = profile
 
     def input_locus(self, new_profile):
         self.profile = {**self.profile, **new_profile}
 
     def delete_loci(self, loci):
-        del self.profile[loci]
+        profile = dict(self.profile)
+        del profile[loci]
+        self.profile = profile
 
     def delete_locus(self, locus):
+        profile = dict(self.profile)
         for loci in locus:
-            del self.profile[loci]
+            del profile[loci]
+        self.profile = profile
 
     def compare(self, query):
-        for loci in self.__find_common_locus(self.profile, query.profile):
-            if self.profile[loci] != query.profile[loci]:
+        """공통 좌위의 좌위값 리스트가 순서까지 모두 같은지 여부를 반환 (집합 비교는 ProfileMatrix.identity_matrix)"""
+
+        profile_target = self.profile
+        profile_query = query.profile
+        for loci in self.__find_common_locus(profile_target, profile_query):
+            if profile_target[loci] != profile_query[loci]:
                 return False
         return True
 
     def check_inclusion(self, query):
-        for loci in self.__find_common_locus(self.profile, query.profile):
-            alleles_target = set(self.profile[loci])
-            alleles_query = set(query.profile[loci])
+        profile_target = self.profile
+        profile_query = query.profile
+        for loci in self.__find_common_locus(profile_target, profile_query):
+            alleles_target = set(profile_target[loci])
+            alleles_query = set(profile_query[loci])
             if alleles_query.issubset(alleles_target) == False:
                 return False
         return True
 
     def check_MX(self):
         cnt_ta = 0
-        for allele in self.profile.values():
+        for allele in self.__alleles:
             if len(allele) > 2:
                 cnt_ta = cnt_ta + 1
         if cnt_ta > self.__TA_THRESHOLD:
@@ -92,30 +227,34 @@ class STRProfile():
     def union_profiles(self, query):
         union_profile = STRProfile()
         union_profile.rename(f"{self.id} + {query.id}")
-        for loci in self.__find_common_locus(self.profile, query.profile):
-            alleles_target = set(self.profile[loci])
-            alleles_query = set(query.profile[loci])
-            union_profile.profile[loci] = list(alleles_target.union(alleles_query))
+        profile_target = self.profile
+        profile_query = query.profile
+        for loci in self.__find_common_locus(profile_target, profile_query):
+            alleles_target = set(profile_target[loci])
+            alleles_query = set(profile_query[loci])
+            union_profile.input_loci(loci, list(alleles_target.union(alleles_query)))
         return union_profile
 
-    def __check_special_case(self, loci, allele):
-        decimal_place = allele.split('.')[1]
-        if decimal_place == "2":
-            return True
-        if loci == "TH01" and allele == "9.3":
-            return True
-        elif loci == "D2S441" and allele == "9.1":
-            return True
-        elif loci == "D1S1656" and (allele == "17.3" or allele == "18.3"):
-            return True
-        elif loci == "Penta E" and (decimal_place == "2" or decimal_place == "3"):
-            return True
-        elif loci == "Penta D" and (decimal_place == "2" or decimal_place == "3"):
-            return True
-        else:
-            return False
+    def __format_allele(self, loci, allele):
+        try:
+            return DICT_MICROVARIANT[(loci, allele)]
+        except KeyError:    # kit에 없는 좌위 혹은 범위 밖의 좌위값은 같은 특수 케이스 테이블로 계산
+            return format_microvariant(loci, allele)
 
     def transform_to_str(self, flag_homo_duplication=True):
+        """
+        profile 객체를 감정서에 들어갈 포멧으로 변환하여 (좌위-표기 문자열 dict, 기타사항)으로 반환한다.
+
+        결과는 flag_homo_duplication별로 저장해 두었다가 다시 호출하면 복사본을 반환한다.
+        """
+
+        cache = self.__cache
+        if flag_homo_duplication not in cache:
+            cache[flag_homo_duplication] = self.__transform_to_str(flag_homo_duplication)
+        string_profile, str_etc = cache[flag_homo_duplication]
+        return dict(string_profile), str_etc
+
+    def __transform_to_str(self, flag_homo_duplication=True):
         string_profile = {}
         flag_NC = False
         flag_ND = False
@@ -137,14 +276,10 @@ class STRProfile():
                         continue
                     modified_allele = allele
                     if allele.find('.')!=-1:
-                        if not self.__check_special_case(loci, allele):#특별 케이스가 아니면
+                        formatted_allele = self.__format_allele(loci, allele)
+                        if formatted_allele is not None:#특별 케이스가 아니면
                             cnt_microvariant = cnt_microvariant + 1
-                            decimal_place = allele.split('.')[1]
-                            if decimal_place == "1":
-                                modified_allele = str(int(float(allele)))
-                            else:
-                                modified_allele = str(int(float(allele)+1))
-                            modified_allele = modified_allele+"*"*cnt_microvariant
+                            modified_allele = formatted_allele+"*"*cnt_microvariant
                             str_etc_microvariant.append("*"*cnt_microvariant + " : 미세변이 (검출값 {0})".format(allele))
                     temp_alleles.append(modified_allele)
             temp_profile[loci]=temp_alleles
@@ -164,6 +299,158 @@ class STRProfile():
         return string_profile, '\r\n'.join(str_etc)
 
 
+class ProfileMatrix():
+    """
+    여러 STRProfile을 샘플 x 좌위 x 좌위값 slot 형태의 정수 코드 배열로 저장하고
+    전체 샘플 간 동일/포함 여부를 한 번의 행렬 연산으로 판정하는 클래스
+
+    좌위값 코드는 (좌위, 좌위값) 쌍마다 부여되며, 비어 있는 slot은 -1로 채운다.
+    좌위별 좌위값은 집합으로 취급한다. 포함 판정은 STRProfile.check_inclusion과 같지만, 동일 판정은 좌위값의 순서와
+    중복을 무시하므로(e.g. ('12', '13') == ('13', '12'), ('12', '12') == ('12',)) 좌위값 리스트를 그대로 비교하는
+    STRProfile.compare와 다를 수 있다.
+
+    Attributes
+    ----------
+    sample_names : list
+        행 순서대로 정렬된 샘플명
+    markers : list
+        열 순서대로 정렬된 좌위명
+    alleles : list
+        코드 순서대로 정렬된 (좌위, 좌위값) 쌍
+    codes : numpy.ndarray
+        (샘플 수, 좌위 수, slot 수) 크기의 좌위값 코드 배열
+    present : numpy.ndarray
+        (샘플 수, 좌위 수) 크기의 좌위 존재 여부 배열
+
+    Methods
+    --------
+    from_profiles(profiles, markers, ignore_alleles=())
+        사건번호-STRProfile 딕셔너리로부터 ProfileMatrix를 생성하여 반환
+    onehot(allele_index=None)
+        샘플 x (좌위, 좌위값) 크기의 0/1 배열을 반환
+    inclusion_matrix(other=None)
+        [i, j]가 i번째 샘플이 other의 j번째 샘플을 포함하는지 여부인 bool 행렬을 반환
+    identity_matrix(other=None)
+        [i, j]가 i번째 샘플과 other의 j번째 샘플의 동일 여부인 bool 행렬을 반환
+    """
+
+    def __init__(self, sample_names, markers, alleles, codes, present):
+        self.sample_names = sample_names
+        self.markers = markers
+        self.alleles = alleles
+        self.codes = codes
+        self.present = present
+
+    @classmethod
+    def from_profiles(cls, profiles, markers, ignore_alleles=()):
+        """
+        사건번호-STRProfile 딕셔너리로부터 ProfileMatrix를 생성하여 반환
+
+        Parameters
+        ----------
+        profiles : dict
+            사건번호-STRProfile을 키-값으로 가지는 딕셔너리
+        markers : list
+            배열의 열로 사용할 좌위명 리스트
+        ignore_alleles : iterable, optional
+            좌위값으로 취급하지 않을 문자열(e.g. '', 'ND'). 해당 값만 가진 좌위는 없는 좌위로 처리한다.
+        """
+
+        ignore_alleles = set(ignore_alleles)
+        sample_names = list(profiles.keys())
+        idx_marker = {marker: i for i, marker in enumerate(markers)}
+        allele_index = {}
+        rows = []   # (샘플, 좌위, slot, 코드)
+        max_slot = 1
+        for i, sample_name in enumerate(sample_names):
+            for loci, alleles in profiles[sample_name].profile.items():
+                j = idx_marker.get(loci)
+                if j is None:
+                    continue
+                alleles = [allele for allele in dict.fromkeys(alleles) if allele not in ignore_alleles]
+                if len(alleles) == 0:
+                    continue
+                max_slot = max(max_slot, len(alleles))
+                for k, allele in enumerate(alleles):
+                    code = allele_index.setdefault((loci, allele), len(allele_index))
+                    rows.append((i, j, k, code))
+        codes = np.full((len(sample_names), len(markers), max_slot), -1, dtype=np.int32)
+        if rows:
+            rows = np.array(rows, dtype=np.int64)
+            codes[rows[:, 0], rows[:, 1], rows[:, 2]] = rows[:, 3]
+        codes.sort(axis=2)  # slot 순서와 무관하게 비교하기 위해 정렬(-1은 앞쪽으로 모임)
+        present = (codes >= 0).any(axis=2)
+        return cls(sample_names, list(markers), list(allele_index.keys()), codes, present)
+
+    def onehot(self, allele_index=None):
+        """
+        샘플 x (좌위, 좌위값) 크기의 0/1 배열을 반환
+
+        Parameters
+        ----------
+        allele_index : dict, optional
+            다른 ProfileMatrix와 비교할 때 사용할 (좌위, 좌위값)-열번호 딕셔너리. 없으면 자신의 코드를 사용한다.
+        """
+
+        if allele_index is None:
+            num_cols = len(self.alleles)
+            remap = np.arange(num_cols, dtype=np.int64)
+        else:
+            num_cols = len(allele_index)
+            remap = np.array([allele_index[key] for key in self.alleles], dtype=np.int64)
+        matrix = np.zeros((len(self.sample_names), num_cols), dtype=np.float32)
+        idx_sample, _, _ = np.nonzero(self.codes >= 0)
+        matrix[idx_sample, remap[self.codes[self.codes >= 0]]] = 1
+        return matrix
+
+    def __aligned(self, other):
+        """두 ProfileMatrix를 같은 (좌위, 좌위값) 열과 같은 좌위 순서로 정렬한 one-hot, 좌위 존재 배열을 반환"""
+
+        if other is None or other is self:
+            return self.onehot(), self.present, self.onehot(), self.present, self.alleles
+        if self.markers != other.markers:
+            raise ValueError("ProfileMatrix objects must share the same marker order.")
+        allele_index = {key: i for i, key in enumerate(self.alleles)}
+        for key in other.alleles:
+            allele_index.setdefault(key, len(allele_index))
+        return (self.onehot(allele_index), self.present, other.onehot(allele_index), other.present,
+                list(allele_index.keys()))
+
+    def inclusion_matrix(self, other=None):
+        """
+        [i, j]가 i번째 샘플의 좌위값이 other의 j번째 샘플의 좌위값을 모두 포함하는지 여부인 bool 행렬을 반환
+
+        공통된 좌위만 비교하며 STRProfile.check_inclusion의 판정과 같다.
+
+        Parameters
+        ----------
+        other : ProfileMatrix, optional
+            비교할 ProfileMatrix. 없으면 자기 자신과 전체 비교한다.
+        """
+
+        target, present_target, query, present_query, alleles = self.__aligned(other)
+        idx_marker = {marker: i for i, marker in enumerate(self.markers)}
+        col_marker = np.array([idx_marker[loci] for loci, _ in alleles], dtype=np.int64)
+        # 타겟에 좌위가 존재하지만 해당 좌위값은 없는 칸 = 쿼리가 가지면 포함 관계가 깨지는 칸
+        missing = present_target[:, col_marker].astype(np.float32) - target
+        return (missing @ query.T) == 0
+
+    def identity_matrix(self, other=None):
+        """
+        [i, j]가 i번째 샘플과 other의 j번째 샘플의 공통 좌위 좌위값 집합이 모두 같은지(서로 포함하는지) 여부인 bool 행렬을 반환
+
+        Parameters
+        ----------
+        other : ProfileMatrix, optional
+            비교할 ProfileMatrix. 없으면 자기 자신과 전체 비교한다.
+        """
+
+        if other is None or other is self:
+            inclusion = self.inclusion_matrix()
+            return inclusion & inclusion.T
+        return self.inclusion_matrix(other) & other.inclusion_matrix(self).T
+
+
 class CombinedResult():
     """
     Tomato 엑셀파일의 Combined_result 혹은 Genemapper Result 파일의 데이터를 STRProfile 클래스에 파싱하여
@@ -179,6 +466,14 @@ class CombinedResult():
         읽어올 결과에 사용된 kit 종류
     list_marker_ordered : list
         표준감정서의 좌위테이블에 좌위가 들어가는 순서를 저장한 list
+    matrix : ProfileMatrix
+        profiles를 좌위값 코드 배열로 변환한 객체. load_tomato, load_genemapper 실행 시 생성
+    source_signature : tuple
+        load_tomato가 마지막으로 읽은 파일의 (경로, 수정시각, 크기). 같으면 파일을 다시 읽지 않는다. (읽기 전에는 None)
+    row_hashes : dict
+        load_tomato가 마지막으로 읽은 샘플명-행 해시. 다음에 읽을 때 바뀐 샘플을 찾는 데 사용한다.
+    revision : str
+        내용이 바뀔 때마다 새로 만드는 토큰. ProjectStore는 저장한 토큰과 같으면 객체를 직렬화하지 않고 건너뛴다.
 
     Methods
     --------
@@ -188,6 +483,16 @@ class CombinedResult():
     load_genemapper(self, filename):
         GeneMapper 결과 파일을 분석을 위한 형태로 가공하여 샘플명-STRProfile 객체를
         키-밸류 값으로 가지는 딕셔너리로 만들어 저장한다.
+    build_matrix()
+        profiles를 ProfileMatrix로 변환하여 matrix에 저장한다.
+    mark_modified()
+        revision을 새로 만들어 다음 저장 때 다시 쓰도록 표시한다.
+    subset(sample_names)
+        해당 샘플의 profiles, info만 가진 CombinedResult를 반환한다.
+    cross_check(other=None, method="identity")
+        저장된 프로파일 전체를 서로(혹은 other의 프로파일과) 비교한 bool 데이터프레임을 반환한다.
+    transform_all(flag_homo_duplication=True)
+        저장된 프로파일 전체를 감정서 포멧으로 변환한 샘플명-(좌위-표기 dict, 기타사항) 딕셔너리를 반환한다.
     """
 
     dict_markers = {"GF/PPF": ["AMEL", "D3S1358", "vWA", "D16S539", "CSF1PO", "TPOX",
@@ -205,17 +510,37 @@ class CombinedResult():
         self.info = pd.DataFrame()
         self.kit = kit
         self.list_marker_ordered = self.dict_markers[kit]
+        self.matrix = None
+        self.source_signature = None
+        self.row_hashes = {}
+        self.revision = uuid.uuid4().hex
 
+    @NFS_Profiler.instrument(rows=lambda self: len(self.df_profiles))
     def load_tomato(self, filename):
         """
             Tomato 엑셀 파일의 Cominbed_result 데이터를 분석을 위한 형태로 가공하여 샘플명-STRProfile 객체를
             키-밸류 값으로 가지는 딕셔너리로 만들어 저장한다.
 
+            파일의 수정시각과 크기가 직전에 읽은 파일과 같으면 다시 읽지 않는다.
+            파일이 바뀌었으면 샘플별 행의 해시를 비교해서 추가되거나 바뀐 샘플의 STRProfile만 새로 만든다.
+            profiles와 info는 바뀐 샘플과 무관하게 항상 파일의 모든 샘플을 가진다.
+
             Parameters
             ----------
             filename : str
-                읽어들일 GeneMapper 결과 파일
+                읽어들일 Tomato 엑셀 파일
+
+            Returns
+            -------
+            list
+                새로 추가되거나 내용이 바뀐 샘플명의 리스트
         """
+        NFS_Profiler.note_file(filename)
+        stat = os.stat(filename)
+        signature = (os.path.abspath(filename), stat.st_mtime, stat.st_size)
+        if getattr(self, 'source_signature', None) == signature:    # getattr : 속성 도입 전에 저장된(pickle) 객체
+            print(f"{filename} not modified.")
+            return []
         if self.kit=="GF/PPF":
             df_tomato = pd.read_excel(filename, sheet_name="CombinedResult", header=1)
             # cross-check된 결과(Sample Id가 공란)만 필터
@@ -225,27 +550,23 @@ class CombinedResult():
             cond1 = df_crosschecked['Sample Name'].apply(lambda x: True if p.match(x) else False)
             df_crosschecked = df_crosschecked[cond1]
             # Sample Name 중복 제거
-            df_crosschecked.drop_duplicates(['Sample Name'], keep='first', inplace=True)
+            df_crosschecked = df_crosschecked.drop_duplicates(['Sample Name'], keep='first')
             # 칼럼명 Amelogenin->AMEL 변경
-            df_crosschecked.rename({'Amelogenin': 'AMEL'}, axis='columns', inplace=True)
+            df_crosschecked = df_crosschecked.rename({'Amelogenin': 'AMEL'}, axis='columns')
             # 좌위 추출 및 편집
             df_locus = df_crosschecked.loc[:, ['Sample Name'] + self.list_marker_ordered]
-            df_locus.fillna("", inplace=True)
+            df_locus = df_locus.fillna("")
             # 데이터프레임 형태로 데이터를 저장
             self.df_profiles = df_locus.copy()
-            mtime = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
+            mtime = datetime.datetime.fromtimestamp(stat.st_mtime)
             self.df_profiles['Date'] = mtime.strftime('%Y%m%d')
-            # STR profile 객체의 딕셔너리로 데이터를 저장
-            df_locus.set_index('Sample Name', inplace=True)
-            df_locus = df_locus.applymap(lambda x: str(x).split('-'))
-            dict_temp = df_locus.to_dict(orient='index')
-            for sample_name in dict_temp.keys():
-                self.profiles[sample_name] = STRProfile(id=sample_name, profile=dict_temp[sample_name])
             # 기타 정보 저장
             df_info = df_crosschecked.loc[:, ['Sample Name', 'DB Type 1', 'DB Type 2', 'Matching Probability']]
             df_info.set_index('Sample Name', inplace=True)
             self.info = df_info
-            print(f"{filename} loaded.")
+            # 좌위와 기타 정보를 합친 행의 해시로 바뀐 샘플을 찾음
+            df_hash = df_crosschecked.loc[:, ['Sample Name'] + self.list_marker_ordered +
+                                          ['DB Type 1', 'DB Type 2', 'Matching Probability']]
         elif self.kit=="Y23":
             df_tomato = pd.read_excel(filename, sheet_name="CombinedResult", header=1)
             # Sample Name이 사건번호의 포멧에 일치하는 데이터만 남김
@@ -253,49 +574,182 @@ class CombinedResult():
             cond1 = df_tomato['Sample Name'].apply(lambda x: True if p.match(x) else False)
             df_tomato = df_tomato[cond1]
             # 좌위 추출 및 편집
-            print(set(df_tomato.columns))
-            print(set(self.list_marker_ordered))
-
             df_locus = df_tomato.loc[:, ['Sample Name'] + self.list_marker_ordered]
-            df_locus.fillna("", inplace=True)
-            df_locus.set_index('Sample Name', inplace=True)
-            df_locus = df_locus.applymap(lambda x: str(x).split('-'))
-            dict_temp = df_locus.to_dict(orient='index')
-            for sample_name in dict_temp.keys():
-                self.profiles[sample_name] = STRProfile(id=sample_name, profile=dict_temp[sample_name])
-            print(f"{filename} loaded.")
-
-    def load_genemapper(self, filename):
+            df_locus = df_locus.fillna("")
+            # 데이터프레임 형태로 데이터를 저장 (프로파일 데이터베이스에 누적하기 위함)
+            self.df_profiles = df_locus.drop_duplicates(['Sample Name'], keep='first').copy()
+            mtime = datetime.datetime.fromtimestamp(stat.st_mtime)
+            self.df_profiles['Date'] = mtime.strftime('%Y%m%d')
+            df_hash = df_locus
+        changed = self.__update_profiles(df_locus, df_hash)
+        self.source_signature = signature
+        self.build_matrix()
+        self.mark_modified()
+        print(f"{filename} loaded. ({len(changed)} samples changed)")
+        return changed
+
+    def __update_profiles(self, df_locus, df_hash):
+        """
+        샘플별 행의 해시를 직전에 읽은 값과 비교해서 추가되거나 바뀐 샘플의 STRProfile만 새로 만들고,
+        사라진 샘플은 profiles에서 제거한 후 바뀐 샘플명의 리스트를 반환한다.
+        """
+
+        row_hashes = {}
+        for sample_name, row_hash in zip(df_hash['Sample Name'].tolist(),
+                                         pd.util.hash_pandas_object(df_hash.fillna("").astype(str), index=False).tolist()):
+            row_hashes.setdefault(sample_name, row_hash)    # 중복 시 처음 행 사용
+        old_hashes = getattr(self, 'row_hashes', {})  # getattr : 속성 도입 전에 저장된(pickle) 객체
+        changed = [sample_name for sample_name, row_hash in row_hashes.items() if old_hashes.get(sample_name) != row_hash]
+        for sample_name in set(self.profiles.keys()) - set(row_hashes.keys()):
+            del self.profiles[sample_name]
+        # STR profile 객체의 딕셔너리로 바뀐 데이터만 저장
+        df_changed = df_locus[df_locus['Sample Name'].isin(changed)].drop_duplicates(['Sample Name'], keep='first')
+        df_changed = df_changed.set_index('Sample Name').astype(str)
+        dict_temp = {sample_name: {loci: value.split('-') for loci, value in row.items()}
+                     for sample_name, row in df_changed.to_dict(orient='index').items()}
+        pool = {}   # 이번에 읽은 샘플끼리 같은 좌위명/좌위값 tuple을 공유
+        for sample_name in dict_temp.keys():
+            self.profiles[sample_name] = STRProfile(id=sample_name, profile=dict_temp[sample_name], pool=pool)
+        self.row_hashes = row_hashes
+        return changed
+
+    @NFS_Profiler.instrument()
+    def load_genemapper(self, filename, chunksize=100000):
         """
             GeneMapper 결과 파일을 분석을 위한 형태로 가공하여 샘플명-STRProfile 객체를
             키-밸류 값으로 가지는 딕셔너리로 만들어 저장한다.
 
+            파일 전체를 한 번에 읽지 않고 chunksize 행씩 C 엔진으로 읽으면서 필요한 Marker와
+            사건번호 포멧의 Sample Name만 남기므로, 메모리는 남긴 샘플 수에만 비례한다.
+
             Parameters
             ----------
             filename : str
                 읽어들일 GeneMapper 결과 파일
+            chunksize : int, optional
+                한 번에 읽어들일 행 수
         """
-        df = pd.read_csv(filename, sep='\t', dtype=str, engine='python')
-        df = df.filter(regex=r'Sample Name|Marker|Allele', axis=1)  # 필요한 column만 추출
-        df = df[df['Marker'].isin(self.list_marker_ordered)]  # 필요한 Marker만 추출
-        df['ProcessedAllele'] = df.filter(regex=r'Allele', axis=1).apply(lambda x: x.dropna().values.tolist(),
-                                                                         axis=1)  # allele1, allele2... 식으로 되어있는 allele 값을 모아서 하나의 list로 만들어 저장
-        df = df[['Sample Name', 'Marker', 'ProcessedAllele']]
-        # Sample Name이 사건번호의 포멧에 일치하는 데이터만 남김
-        p = re.compile('\d+[-]\w[-]\d+')
-        cond1 = df['Sample Name'].apply(lambda x: True if p.match(x) else False)
-        df = df[cond1]
-        # Marker를 칼럼으로, Sample Name을 index로 pivot
-        df = df.pivot(index='Sample Name', columns='Marker', values='ProcessedAllele')
+        p = re.compile(r'Sample Name|Marker|Allele')
+        p_sample = re.compile(r'\d+[-]\w[-]\d+')
+        set_markers = set(self.list_marker_ordered)
+        dict_temp = {}  # 샘플명-{좌위:좌위값 list}
+        reader = pd.read_csv(filename, sep='\t', dtype=str, engine='c', chunksize=chunksize,
+                             usecols=lambda x: p.search(x) is not None)  # 필요한 column만 읽음
+        NFS_Profiler.note_file(filename)
+        for df in reader:
+            NFS_Profiler.note_rows(len(df))
+            # 필요한 Marker, 사건번호의 포멧에 일치하는 Sample Name만 남김
+            cond = df['Marker'].isin(set_markers) & df['Sample Name'].str.match(p_sample.pattern, na=False)
+            df = df[cond]
+            cols_allele = [col for col in df.columns if 'Allele' in col]
+            # allele1, allele2... 식으로 되어있는 allele 값을 모아서 하나의 list로 만들어 저장
+            for sample_name, marker, alleles in zip(df['Sample Name'].tolist(), df['Marker'].tolist(),
+                                                     df[cols_allele].to_numpy().tolist()):
+                profile = dict_temp.setdefault(sample_name, {})
+                if marker not in profile:   # 같은 샘플의 같은 Marker가 중복되면 처음 값을 사용
+                    profile[marker] = [allele for allele in alleles if isinstance(allele, str)]
         # 데이터프레임 형태로 데이터를 저장
-
-        self.df_profiles = df.copy()
-        self.df_profiles = self.df_profiles.applymap(lambda x: '-'.join(x))
+        self.df_profiles = pd.DataFrame.from_dict(
+            {sample_name: {marker: '-'.join(alleles) for marker, alleles in profile.items()}
+             for sample_name, profile in dict_temp.items()}, orient='index')
+        self.df_profiles = self.df_profiles.reindex(
+            columns=[marker for marker in self.list_marker_ordered if marker in self.df_profiles.columns]).fillna("")
+        self.df_profiles.index.name = 'Sample Name'
         self.df_profiles.reset_index(inplace=True)
         mtime = datetime.datetime.fromtimestamp(os.path.getmtime(filename))
         self.df_profiles['Date'] = mtime.strftime('%Y%m%d')
-        # STR profile 객체의 딕셔너리로 데이터를 저장
-        dict_temp = df.to_dict(orient='index')
+        # STR profile 객체의 딕셔너리로 데이터를 저장 (같은 좌위명/좌위값 tuple을 공유)
+        pool = {}
         for sample_name in dict_temp.keys():
-            self.profiles[sample_name] = STRProfile(id=sample_name, profile=dict_temp[sample_name])
-        print(f"{filename} loaded.")
\ No newline at end of file
+            self.profiles[sample_name] = STRProfile(id=sample_name, profile=dict_temp[sample_name], pool=pool)
+        self.build_matrix()
+        self.mark_modified()
+        print(f"{filename} loaded.")
+
+    def build_matrix(self):
+        """profiles를 ProfileMatrix로 변환하여 matrix에 저장한다."""
+
+        self.matrix = ProfileMatrix.from_profiles(self.profiles, self.list_marker_ordered)
+        return self.matrix
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'revision' not in state:     # revision 도입 전에 저장된(pickle) 객체
+            self.mark_modified()
+
+    def mark_modified(self):
+        """
+        revision을 새로 만들어 내용이 바뀌었음을 표시한다.
+
+        load_tomato, load_genemapper는 직접 호출한다. 밖에서 profiles나 info를 고쳤다면 저장하기 전에 호출해야 한다.
+        """
+
+        self.revision = uuid.uuid4().hex
+
+    def subset(self, sample_names):
+        """
+        해당 샘플의 profiles, info만 가진 CombinedResult를 반환한다. (df_profiles는 비우고 matrix는 만들지 않음)
+
+        감정서를 작성하는 작업 프로세스에 사건에 필요한 프로파일만 넘길 때 사용한다.
+
+        Parameters
+        ----------
+        sample_names : iterable
+            남길 샘플명
+        """
+
+        sample_names = set(sample_names)
+        combined_result = CombinedResult(kit=self.kit)
+        combined_result.profiles = {sample_name: profile for sample_name, profile in self.profiles.items()
+                                    if sample_name in sample_names}
+        combined_result.info = self.info[self.info.index.isin(sample_names)]
+        return combined_result
+
+    def cross_check(self, other=None, method="identity"):
+        """
+        저장된 프로파일 전체를 서로(혹은 other의 프로파일과) 한 번에 비교한 결과를 반환한다.
+
+        Parameters
+        ----------
+        other : CombinedResult, optional
+            비교할 CombinedResult. 없으면 자기 자신의 프로파일끼리 비교한다.
+        method : str
+            "identity"면 공통 좌위의 좌위값 집합이 같은지(좌위값의 순서, 중복은 무시하므로 STRProfile.compare와 다를 수 있음),
+            "inclusion"이면 STRProfile.check_inclusion과 같은 기준으로 비교
+
+        Returns
+        -------
+        DataFrame
+            index는 이 객체의 샘플명, columns는 other의 샘플명인 bool 데이터프레임
+        """
+
+        matrix = self.matrix if getattr(self, 'matrix', None) is not None else self.build_matrix()
+        if other is None:
+            matrix_other = matrix
+        else:
+            matrix_other = other.matrix if getattr(other, 'matrix', None) is not None else other.build_matrix()
+        if method == "identity":
+            result = matrix.identity_matrix(matrix_other)
+        elif method == "inclusion":
+            result = matrix.inclusion_matrix(matrix_other)
+        else:
+            raise ValueError(f"Unknown method : {method}")
+        return pd.DataFrame(result, index=matrix.sample_names, columns=matrix_other.sample_names)
+
+    def transform_all(self, flag_homo_duplication=True):
+        """
+        저장된 프로파일 전체를 감정서 포멧으로 변환하여 샘플명-(좌위-표기 dict, 기타사항)을 키-값으로 가지는 딕셔너리로 반환한다.
+
+        STRProfile.transform_to_str의 결과는 프로파일마다 저장되므로 다시 호출하면 변환 없이 딕셔너리만 만든다.
+
+        Parameters
+        ----------
+        flag_homo_duplication : bool
+            동형접합 좌위값을 두 번 표기할지 여부 (Y23은 False)
+        """
+
+        return {sample_name: profile.transform_to_str(flag_homo_duplication)
+                for sample_name, profile in self.profiles.items()}
+
+
+DICT_MICROVARIANT = build_microvariant_table(CombinedResult.dict_markers)  # (좌위, 좌위값)-감정서 표기값(특수 케이스면 None)
@@ -0,0 +1,751 @@
+import os
+import shutil
+import pandas as pd
+from openpyxl import load_workbook
+import Modules.NFS_ProfileDB as NFS_ProfileDB
+import Modules.NFS_ProjectStore as NFS_ProjectStore
+import Modules.NFS_Profiler as NFS_Profiler
+import Modules.NFS_Stats as NFS_Stats
+import Modules.NFS_Kinship as NFS_Kinship
+import Modules.NFS_Screening as NFS_Screening
+import Modules.NFS_YSTR as NFS_YSTR
+import Modules.NFS_RT as NFS_RT
+import Modules.NFS_Quant as NFS_Quant
+import Modules.NFS_Plate as NFS_Plate
+
+
+# 감정처리부 NFIS 파일에서 프로그램이 사용하는 칼럼
+LIST_NFIS_COLUMNS = ['접수번호', '감정물', '의뢰관서', '의뢰지역', '문서번호', '시행일자', '사건관련자', '접수일자', '담당자']
+# 감정물명에 키워드가 들어가 있으면 해당 분류를 할당 (없으면 LCN)
+DICT_CLASSIFICATION_KEYWORD = {'MF': ['F호', 'M호'],
+                               'REF': ['혈액', '늑연골', '구강키트', '심낭혈'],
+                               'Unassigned': ['소변', '슬라이드']}
+# 감정서에 Matching Probability를 쓰는 대조 시료의 DB Type 1
+LIST_MP_TYPES = ['V', 'S']
+# 빈도표가 없을 때 알려줄 빈도표의 위치와 형식
+TEXT_FREQUENCY_FORMAT = ("Matching Probability is calculated from Settings/allele_frequency.csv in the program folder.\n"
+                         "Columns : Allele, then one column per marker (D3S1358, vWA, ...). "
+                         "Rows : allele frequencies, plus an optional 'N' row with the number of people per marker.")
+# 감정서 데이터프레임에 추가하는 칼럼
+LIST_REPORT_COLUMNS = ['DB Type 1', 'DB Type 2', 'Y Type', 'DB_Hit', 'Matching Probability',
+                       'Saliva', 'Semen', 'Blood', 'Return', 'Comment']
+
+
+def idx_to_wellname(idx):
+    """
+    8x12 wells plate를 기준으로 입력된 index 번호에 해당하는 well의 명칭(e.g. 0->A1)을 반환
+
+    Parameters
+    ----------
+    idx: int
+        변환할 인덱스
+    """
+
+    col, row = divmod(idx, 8)
+    return 'ABCDEFGH'[row] + str(col + 1)
+
+
+def wellname_to_idx(wellname):
+    """
+    8x12 wells plate를 기준으로 입력된 wellname에 해당하는 index 번호(e.g. A1->0)을 반환
+
+    Parameters
+    ----------
+    wellname : str
+        변환할 wellname
+    """
+
+    alphabet = wellname[0]
+    number = int(wellname[1:])
+    return (number - 1) * 8 + ('ABCDEFGH'.find(alphabet) + 1) - 1  # 0부터 시작하니깐 -1
+
+
+def xls_to_dataframe(file_input="", column=True, usecols=None):
+    """
+    NFIS에서 받은 엑셀 파일을 Dataframe 객체로 전환해서 반환
+
+    openpyxl의 read_only 모드로 행을 순서대로 읽으므로 셀 객체 전체를 메모리에 만들지 않는다.
+    usecols가 주어지면 해당 칼럼의 값만 남긴다.
+
+    Parameters
+    -----------
+    file_input : str
+        openpyxl 라이브러리로 작업할 NFIS 파일의 경로
+    column : bool
+        column 헤더의 존재 여부
+    usecols : list, optional
+        읽어들일 칼럼명의 리스트. 파일에 없는 칼럼은 무시한다. (column이 True일 때만 사용)
+
+    Returns
+    --------
+    DataFrame
+        NFIS 파일의 내용을 DataFrame으로 변환한 객체
+    """
+
+    wb = load_workbook(file_input, data_only=True, read_only=True)
+    ws = wb.active
+    data = ws.iter_rows(values_only=True)
+    try:
+        if column is True:
+            cols = next(data)
+            if usecols is None:
+                return pd.DataFrame(data, columns=cols)
+            idx_cols = [idx for idx, col in enumerate(cols) if col in usecols]
+            return pd.DataFrame(([row[idx] if idx < len(row) else None for idx in idx_cols] for row in data),
+                                columns=[cols[idx] for idx in idx_cols])
+        else:
+            return pd.DataFrame(data)
+    finally:
+        wb.close()
+
+
+def sort_by_serial(df):
+    """
+    입력받은 증거물 데이터프레임을 증거물번호를 기준으로 natural sort한 데이터프레임을 반환한다.
+
+    증거물번호를 구성하는 숫자(e.g 2019-D-1234-5 => 2019, 1234, 5, 0)를 str.extract로 한 번에 정수 칼럼으로 추출하고
+    해당 칼럼들을 기준으로 정렬한다. 네번째 숫자가 없으면 0으로 취급한다.
+    숫자가 세 개 미만인 잘못된 증거물번호는 맨 뒤로 보내고 문자열 순서로 정렬한다.
+    정렬된 순서에 맞추어 새로 인덱스를 부여한다.
+
+    Parameters
+    ---------
+    df : DataFrame
+        정렬할 증거물 데이터프레임
+
+    Returns
+    -------
+    DataFrame
+        정렬된 증거물 데이터프레임
+    """
+
+    df_key = df['증거물번호'].astype(str).str.extract(r'(\d+)\D+(\d+)\D+(\d+)(?:\D+(\d+))?')
+    df_key.columns = ['key0', 'key1', 'key2', 'key3']
+    df_key['malformed'] = df_key['key0'].isna()
+    df_key = df_key.fillna('0')
+    df_key[['key0', 'key1', 'key2', 'key3']] = df_key[['key0', 'key1', 'key2', 'key3']].astype('int64')
+    df_key['serial'] = df['증거물번호'].astype(str)
+    order = df_key.sort_values(['malformed', 'key0', 'key1', 'key2', 'key3', 'serial'], kind='mergesort').index
+    return df.loc[order].reset_index(drop=True)
+
+
+class ProjectEngine():
+    """
+    한 텀(프로젝트 폴더)의 작업을 GUI 없이 수행하는 클래스
+
+    MainSuiteForm의 버튼 이벤트와 명령줄 배치(batch_suite.py)가 같은 로직을 쓰도록 파일 선택, 메시지 창 없이
+    경로를 인자로 받고 결과를 반환하거나 예외를 발생시킨다. PyQt, Excel 없이 동작한다.
+
+    Attributes
+    ----------
+    ddi : DataDNAIdentification
+        작업할 프로젝트의 객체
+    root : str
+        프로그램 폴더의 경로(Form 폴더의 서식 파일을 찾을 때 사용)
+    project_store : NFS_ProjectStore.ProjectStore
+        ddi를 저장할 ProjectStore
+    sessions : NFS_Session.SessionPool
+        xlrd가 없을 때 xls 결과 파일을 변환할 Excel 세션 풀 (없으면 NFS_RT가 필요할 때만 만듦)
+
+    Methods
+    --------
+    save()
+        ddi를 프로젝트 폴더의 ProjectStore에 저장
+    import_nfis(path, copy_needed=True)
+        NFIS 감정처리부 파일을 읽고 증거물, 감정서 데이터프레임을 초기화한다.
+    auto_classify()
+        감정물명의 키워드에 따라 분류를 자동으로 할당한다.
+    count_rt_targets()
+        RT 대상(LCN, MF) 증거물 수를 반환한다.
+    write_samplesheet(worksheet, df, filename, row_start, control=False, blank=False, ladder=False, macro=False, sheetname="")
+        서식 파일에 증거물 데이터프레임의 값을 입력한 후 Sheets 폴더에 저장한다.
+    generate_totalsheet()
+        분류가 할당된 증거물로 토탈샘플시트를 생성하고 경로를 반환한다.
+    generate_rt_sheet(path_samplingsheet=None, types=('LCN', 'MF'), plate_size=96, reserved=(), assay='Quantifiler Trio')
+        샘플시트의 TOTAL 시트에서 해당 분류의 증거물을 플레이트에 나누어 배치하고 플레이트마다 RT import 파일을 작성한다.
+    rt_plate_map_path(path_samplingsheet)
+        샘플링 시트로 만든 RT 플레이트 배치 파일의 경로를 반환한다.
+    read_rt_results(path_result, path_samplingsheet=None)
+        RT 결과 파일(여러 플레이트는 리스트)을 읽어 플레이트 배치와 합친 데이터프레임을 반환한다.
+    import_rt(path_result, path_samplingsheet=None)
+        RT 결과 파일(여러 플레이트는 리스트)의 정량값을 (플레이트, 웰)로 샘플링 시트의 행에 대응시켜 복사하고 읽은 RT 결과를 반환한다.
+    plan_amplification(path_result=None, path_samplingsheet=None, target_ng=1.0, max_volume=15.0, df_rt=None)
+        RT 결과(import_rt가 반환한 df_rt를 주면 파일을 다시 읽지 않음)로 웰별 분해 지수, 남성 비율, 저해 여부와 증폭에 넣을 DNA/TE 부피를 계산하여 결과 파일을 저장한다.
+    load_tomato()
+        Tomato 파일의 결과를 불러와 감정서 데이터프레임에 반영하고 바뀐 샘플명의 리스트를 반환한다.
+    fill_matching_probability(samples=None, theta=0.01)
+        Matching Probability가 비어있는 샘플의 값을 빈도표로 계산해서 채운다.
+    missing_matching_probability()
+        감정서에 Matching Probability를 쓰는 대조 시료 중 값이 없는 샘플명의 리스트를 반환한다.
+    screen_profiles(min_shared_loci=8)
+        불러온 프로파일 간, Control/Blank 웰, 배제용 프로파일과의 일치/포함 관계를 검사하고 결과 파일을 저장한다.
+    screen_kinship(types=('D',), max_inconsistent=2, mutation_rate=NFS_Kinship.MUTATION_RATE)
+        DB Type 1이 types인 프로파일(변사자 등)을 불러온 다른 프로파일 전체와 비교한 친자관계 후보를 결과 파일로 저장한다.
+    match_haplotypes(max_mismatch=1, min_shared_loci=10)
+        불러온 Y23 프로파일을 프로파일 데이터베이스에 누적된 Y23 하플로타입 전체와 비교하여 결과 파일을 저장한다.
+    search_profile_db(max_mismatch=0, min_shared_loci=8, mode="identity", limit=50)
+        불러온 프로파일을 프로파일 데이터베이스에 누적된 지난 텀의 프로파일과 비교하여 결과 파일을 저장한다.
+    store_profiles()
+        불러온 CombinedResult의 프로파일을 여러 텀의 프로파일 데이터베이스에 저장한다.
+    """
+
+    def __init__(self, ddi, root, project_store=None, sessions=None):
+        self.ddi = ddi
+        self.root = root
+        self.sessions = sessions
+        self.project_store = project_store or getattr(ddi, '_store', None) or NFS_ProjectStore.ProjectStore(ddi.location_save)
+
+    def save(self):
+        """ddi를 프로젝트 폴더의 ProjectStore에 저장. 마지막 저장 이후 바뀐 테이블만 다시 쓴다."""
+
+        return self.project_store.save(self.ddi)
+
+    @NFS_Profiler.instrument(rows=lambda self: len(self.ddi.df_evidence))
+    def import_nfis(self, path, copy_needed=True):
+        """
+        NFIS 감정처리부 파일을 읽고 증거물, 감정서 데이터프레임을 초기화한다.
+
+        증거물번호 칼럼을 만들고 natural sort한 후 모든 증거물의 분류를 Unassigned로 둔다.
+        감정서 데이터프레임은 증거물 데이터프레임에 감정서 작성용 칼럼을 추가해서 만든다.
+
+        Parameters
+        ----------
+        path : str
+            NFIS 감정처리부 엑셀 파일의 경로
+        copy_needed : bool, optional
+            해당 파일의 복사본을 프로젝트 폴더의 Downloaded 폴더에 복사 할 것인지 여부
+
+        Returns
+        -------
+        DataFrame
+            증거물 데이터프레임
+        """
+
+        NFS_Profiler.note_file(path)
+        if copy_needed is True:
+            path_copy = self.ddi.location_save + '/Downloaded/' + os.path.basename(path)
+            if os.path.abspath(path) != os.path.abspath(path_copy):
+                shutil.copyfile(path, path_copy)
+        df_evidence = xls_to_dataframe(path, usecols=LIST_NFIS_COLUMNS)
+        # 증거물 데이터 프레임 초기화. 작업에 필요한 행 추가.
+        df_evidence['분류'] = 'Unassigned'
+        df_evidence['증거물번호'] = df_evidence['접수번호'] + df_evidence['감정물'].apply(lambda x: '-' + x.split('증')[1].split('호')[0])
+        self.ddi.df_evidence = sort_by_serial(df_evidence)
+        self.ddi.nfis_loaded = True
+        # 감정서 DataFrame 생성
+        df_report = self.ddi.df_evidence.copy()
+        for column in LIST_REPORT_COLUMNS:
+            df_report[column] = ""
+        self.ddi.df_report = df_report
+        return self.ddi.df_evidence
+
+    @NFS_Profiler.instrument(rows=lambda self: len(self.ddi.df_evidence))
+    def auto_classify(self):
+        """감정물명에 키워드가 들어가 있으면 그 키워드에 해당하는 분류명을, 없으면 LCN을 할당한다."""
+
+        def search_keyword(evidence):
+            verdict = "LCN"
+            for type, keywords in DICT_CLASSIFICATION_KEYWORD.items():
+                for keyword in keywords:
+                    if keyword in evidence:
+                        verdict = type
+            return verdict
+
+        self.ddi.df_evidence['분류'] = self.ddi.df_evidence['감정물'].apply(search_keyword)
+
+    def count_rt_targets(self):
+        """RT 대상(LCN, MF) 증거물 수를 반환한다. 96개를 넘으면 generate_rt_sheet가 여러 장의 플레이트로 나눈다."""
+
+        return int(self.ddi.df_evidence['분류'].isin(['LCN', 'MF']).sum())
+
+    def write_samplesheet(self, worksheet, df, filename, row_start, control=False, blank=False, ladder=False, macro=False, sheetname=""):
+        """
+        해당 워크시트에 증거물 데이터프레임의 값을 입력한 후 지정된 파일 이름으로 Sheets 폴더에 저장하고 경로를 반환한다.
+
+        서식 파일은 한 번만 열고 저장하므로, 여러 분류를 한 시트에 쓸 때는 분류별로 호출하지 말고 합친 데이터프레임으로 한 번 호출한다.
+
+        Parameters
+        ----------
+        worksheet: str
+            데이터를 입력할 워크시트 파일의 경로
+        df: DataFrame
+            증거물 데이터프레임
+        filename: str
+            저장할 파일의 이름
+        row_start: int
+            샘플 시트 서식에서 값을 입력할 첫번째 행
+        control: bool, optional
+            CONTROL 행 추가 여부
+        blank: bool, optional
+            BLANK 행 추가 여부
+        ladder: bool, optional
+            LADDER 행 추가 여부
+        macro: bool, optional
+            매크로 포함 파일(.xlsm)로 저장할지 여부
+        sheetname: str, optional
+            데이터를 입력할 시트명 (없으면 활성화된 시트)
+        """
+
+        wb_form = load_workbook(worksheet, read_only=False, keep_vba=True)
+        ws_form = wb_form.active if sheetname == "" else wb_form[sheetname]
+        ws_form['C1'] = filename
+        ws_form['H1'] = self.ddi.date
+        ws_form['K1'] = self.ddi.analyst
+        if len(df) > 0:
+            # 칼럼 단위로 값을 뽑은 후 행 단위로 한 번에 입력
+            columns = [df['의뢰관서'].tolist(), df['증거물번호'].tolist(),
+                       df['감정물'].str.split(':').str[1].tolist(), df['분류'].tolist()]
+            for idx, values in enumerate(zip(*columns)):
+                for col, value in enumerate(values, start=2):
+                    ws_form.cell(row=row_start + idx, column=col, value=value)
+        idx = len(df)
+        if control == True:
+            ws_form.cell(row=row_start + idx, column=3).value = 'Control'
+            idx = idx + 1
+        if blank == True:
+            ws_form.cell(row=row_start + idx, column=3).value = 'Blank'
+            idx = idx + 1
+        if ladder == True:
+            ws_form.cell(row=row_start + idx, column=3).value = 'Ladder'
+            idx = idx + 1
+            ws_form.cell(row=row_start + idx, column=3).value = 'Ladder'
+        ext = ".xlsm" if macro == True else ".xlsx"
+        path_save = self.ddi.location_save + '/Sheets/' + filename + ext
+        wb_form.save(path_save)
+        return path_save
+
+    @NFS_Profiler.instrument(rows=lambda self: len(self.ddi.df_evidence))
+    def generate_totalsheet(self):
+        """
+        분류가 할당된(Unassigned가 아닌) 증거물로 토탈샘플시트를 생성하고 경로를 반환한다.
+
+        분류별로 모은 순서(분류 이름순, 분류 내에서는 기존 순서)로 정렬하여 서식 파일을 한 번만 열고 저장한다.
+        """
+
+        df_total = self.ddi.df_evidence[self.ddi.df_evidence['분류'] != 'Unassigned']  # 실험에 사용되지 않은 샘플을 제거한 데이터프레임 생성
+        df_total = df_total[df_total['분류'].notna()].sort_values('분류', kind='mergesort').reset_index(drop=True)
+        filename = self.ddi.date + '-' + self.ddi.analyst + '-' + 'TOTAL'
+        return self.write_samplesheet(self.root + '/Form/form_sampletotalsheet.xlsm', df_total, filename,
+                                      3, False, False, False, True, "TOTAL")
+
+    def rt_plate_map_path(self, path_samplingsheet):
+        """샘플링 시트로 만든 RT 플레이트 배치 파일(RT/<샘플링 시트명>_RT_plates.csv)의 경로를 반환한다."""
+
+        return self.ddi.location_save + '/RT/' + os.path.splitext(os.path.basename(path_samplingsheet))[0] + '_RT_plates.csv'
+
+    @NFS_Profiler.instrument()
+    def generate_rt_sheet(self, path_samplingsheet=None, types=('LCN', 'MF'), plate_size=96, reserved=(),
+                          assay=NFS_RT.DEFAULT_ASSAY):
+        """
+        샘플시트의 TOTAL 시트에서 분류가 types에 속하는 증거물을 플레이트에 배치하고 플레이트마다 RT import 파일을 작성한다.
+
+        대상과 예약 웰이 TOTAL 시트의 위치(3행이 A1, 열 우선) 그대로 한 플레이트에 들어가면 웰은 그 위치를 쓰고(이전 버전의 RT 파일과 같음)
+        <샘플링 시트명>_RT.txt로 저장한다. 들어가지 않으면 대상을 빈 웰 없이 여러 장으로 나눈다(<샘플링 시트명>_RT_P1.txt, _RT_P2.txt, ...).
+        예약 웰은 대상 뒤에 비워 두고 RT import 파일에는 쓰지 않는다.
+        각 증거물의 (플레이트, 웰)과 TOTAL 시트의 행은 RT/<샘플링 시트명>_RT_plates.csv에 저장하여 import_rt에서 사용한다.
+
+        Parameters
+        ----------
+        path_samplingsheet : str, optional
+            RT 시트를 생성할 샘플링 시트의 경로 (없으면 토탈샘플시트)
+        types : tuple, optional
+            RT 대상 분류 (재실험 시트는 ('RES',))
+        plate_size : int, optional
+            플레이트의 웰 수 (96, 384)
+        reserved : tuple, optional
+            플레이트마다 샘플 뒤에 예약할 웰의 라벨 (e.g. NFS_Plate.RESERVED_STR)
+        assay : str, optional
+            정량 키트 이름 (NFS_RT.DICT_ASSAYS 혹은 Settings/rt_assays.csv에 정의된 이름)
+
+        Returns
+        -------
+        list
+            플레이트 순서대로 작성한 RT import 파일 경로의 리스트
+
+        Raises
+        ------
+        FileNotFoundError
+            샘플링 시트가 없는 경우
+        """
+
+        path_samplingsheet = path_samplingsheet or self.ddi.path_totalsheet
+        if not os.path.exists(path_samplingsheet):
+            raise FileNotFoundError(path_samplingsheet)
+        NFS_Profiler.note_file(path_samplingsheet)
+        wb_form = load_workbook(path_samplingsheet, read_only=True)
+        # 샘플시트 상에서 3번째 열은 증거물번호, 5번째 열은 분류. 3번째 행부터 데이터
+        rows = [(idx_row, values[2], values[4]) for idx_row, values in
+                enumerate(wb_form['TOTAL'].iter_rows(min_row=3, max_col=5, values_only=True), start=3)]
+        wb_form.close()
+        df_targets = pd.DataFrame(rows, columns=['row', 'sample', 'type'])
+        df_targets = df_targets[df_targets['sample'].notna() & df_targets['type'].isin(types)]
+        df_layout = NFS_Plate.PlateLayout(plate_size, reserved).assign(df_targets, 'sample', positions=df_targets['row'] - 3)
+        NFS_Profiler.note_rows(len(df_targets))
+        base = self.ddi.location_save + '/RT/' + os.path.splitext(os.path.basename(path_samplingsheet))[0]
+        num_plates = int(df_layout['plate'].max()) if len(df_layout) != 0 else 1
+        df_layout.to_csv(self.rt_plate_map_path(path_samplingsheet), index=False, encoding='utf-8-sig')
+        path_assays = self.root + NFS_RT.PATH_ASSAYS
+        assays = NFS_RT.load_assays(path_assays) if os.path.isfile(path_assays) else None
+        writer = NFS_RT.RTSheetWriter(self.root + '/Form/form_RT.txt', assay=assay, assays=assays)
+        df_wells = df_layout[~df_layout['reserved'].astype(bool)]
+        if len(df_wells) == 0:
+            return [writer.write(base + '_RT.txt', df_wells)]
+        return [writer.write(base + ('_RT.txt' if num_plates == 1 else f'_RT_P{plate}.txt'), df_plate)
+                for plate, df_plate in df_wells.groupby('plate')]
+
+    def read_rt_results(self, path_result, path_samplingsheet=None):
+        """
+        RT 결과 파일(여러 플레이트는 리스트)을 읽어 하나의 데이터프레임으로 반환한다.
+
+        generate_rt_sheet가 저장한 플레이트 배치 파일이 있으면 결과 파일마다 (웰, 샘플명)이 가장 많이 일치하는 플레이트를 찾아
+        plate와 샘플링 시트의 행(row) 칼럼을 붙인다. 배치 파일이 없으면 결과 파일의 순서를 플레이트 번호로 사용한다.
+
+        Parameters
+        ----------
+        path_result : str or list
+            RT 결과 파일(xls, xlsx, 텍스트)의 경로 혹은 플레이트별 경로의 리스트
+        path_samplingsheet : str, optional
+            RT 시트를 생성한 샘플링 시트의 경로 (없으면 토탈샘플시트)
+        """
+
+        paths = [path_result] if isinstance(path_result, str) else list(path_result)
+        results = []
+        for path in paths:
+            NFS_Profiler.note_file(path)
+            results.append(NFS_RT.read_rt_result(path, self.sessions))
+        path_plate_map = self.rt_plate_map_path(path_samplingsheet or self.ddi.path_totalsheet)
+        if os.path.isfile(path_plate_map):
+            df_layout = pd.read_csv(path_plate_map, dtype={'sample': str, 'well': str})
+            return NFS_Plate.match_plates(results, df_layout[['plate', 'well', 'sample', 'row']])
+        for plate, df in enumerate(results, start=1):
+            df['plate'] = plate
+        return pd.concat(results, ignore_index=True)
+
+    @NFS_Profiler.instrument()
+    def import_rt(self, path_result, path_samplingsheet=None):
+        """
+        RT 결과 파일의 정량값(Large autosomal, Small autosomal, Y)을 샘플시트의 TOTAL 시트에 복사한다.
+
+        결과 파일은 NFS_RT.read_rt_result로 칼럼명 기준으로 읽으므로 장비에서 받은 xls 파일을 xlsx로 변환할 필요가 없다.
+        generate_rt_sheet로 만든 플레이트 배치가 있으면 (플레이트, 웰)로 TOTAL 시트의 행을 찾아 한 번에 기록한다.
+
+        Parameters
+        ----------
+        path_result : str or list
+            RT 결과 파일(xls, xlsx, 텍스트)의 경로 혹은 플레이트별 경로의 리스트
+        path_samplingsheet : str, optional
+            정량값을 복사할 샘플링 시트의 경로 (없으면 토탈샘플시트)
+
+        Returns
+        -------
+        tuple
+            (샘플링 시트의 경로, read_rt_results로 읽은 RT 결과 데이터프레임)
+            RT 결과는 plan_amplification(df_rt=...)에 넘겨 결과 파일을 다시 읽지(xls는 다시 변환하지) 않게 한다.
+
+        Raises
+        ------
+        FileNotFoundError
+            샘플링 시트가 없는 경우
+        """
+
+        path_samplingsheet = path_samplingsheet or self.ddi.path_totalsheet
+        if not os.path.exists(path_samplingsheet):
+            raise FileNotFoundError(path_samplingsheet)
+        df_rt = self.read_rt_results(path_result, path_samplingsheet)
+        count = NFS_RT.import_result(df_rt, path_samplingsheet)
+        NFS_Profiler.note_rows(count)
+        return path_samplingsheet, df_rt
+
+    @NFS_Profiler.instrument()
+    def plan_amplification(self, path_result=None, path_samplingsheet=None, target_ng=1.0, max_volume=15.0, df_rt=None):
+        """
+        RT 결과 파일로 웰별 분해 지수, 남성 DNA 비율, IPC 저해 여부와 STR 증폭에 넣을 희석 배수, DNA/TE 부피를 계산하여
+        ETC/amplification_plan.csv에 저장한다.
+
+        Parameters
+        ----------
+        path_result : str or list
+            RT 결과 파일(xls, xlsx, 텍스트)의 경로 혹은 플레이트별 경로의 리스트
+        path_samplingsheet : str, optional
+            RT 시트를 생성한 샘플링 시트의 경로 (없으면 토탈샘플시트)
+        target_ng : float, optional
+            증폭에 넣을 DNA 양 (ng)
+        max_volume : float, optional
+            증폭 반응에 넣을 수 있는 시료의 최대 부피 (µL)
+        df_rt : DataFrame, optional
+            import_rt가 반환한 RT 결과 (주면 path_result를 읽지 않음)
+
+        Returns
+        -------
+        tuple
+            (웰별 계산 결과 데이터프레임, 결과 파일의 경로)
+        """
+
+        if df_rt is None:
+            df_rt = self.read_rt_results(path_result, path_samplingsheet)
+        df_plan = NFS_Quant.plan_amplification(df_rt, target_ng=target_ng, max_volume=max_volume)
+        NFS_Profiler.note_rows(len(df_plan))
+        os.makedirs(self.ddi.location_save + '/ETC', exist_ok=True)
+        path_plan = self.ddi.location_save + '/ETC/amplification_plan.csv'
+        df_plan.to_csv(path_plan, index=False, encoding='utf-8-sig')
+        return df_plan, path_plan
+
+    @NFS_Profiler.instrument()
+    def load_tomato(self):
+        """
+        Tomato 엑셀 파일의 결과를 CombinedResult에 불러오고 모든 샘플의 정보(DB Type, Matching Probability)를 감정서 데이터프레임에 반영한다.
+        파싱은 CombinedResult가 바뀐 샘플만 하지만, 감정서 데이터프레임은 import_nfis 등으로 새로 만들어질 수 있으므로
+        반영은 바뀐 샘플과 무관하게 매번 info 전체를 한 번에 한다.
+        Y23 Tomato 파일이 있다면 해당 파일의 데이터도 불러온다. 바뀐 샘플이 있으면 프로파일 데이터베이스에 저장한다.
+
+        Returns
+        -------
+        tuple
+            (바뀐 샘플명의 리스트, Y23에서 바뀐 샘플명의 리스트)
+        """
+
+        changed = self.ddi.combined_result.load_tomato(self.ddi.path_tomato)
+        self.fill_matching_probability()
+        # 불러온 데이터 전체를 Report 테이블에 반영 (같은 증거물번호는 처음 행 사용)
+        cols_info = ['DB Type 1', 'DB Type 2', 'Matching Probability']
+        info = self.ddi.combined_result.info.reindex(columns=cols_info)
+        info = info[~info.index.duplicated(keep='first')]
+        df_report = self.ddi.df_report
+        mask = df_report['증거물번호'].isin(info.index)
+        if mask.any():
+            df_report[cols_info] = df_report[cols_info].astype(object)  # Tomato의 값(숫자, NaN 포함)을 그대로 받음
+            df_report.loc[mask, cols_info] = info.loc[df_report.loc[mask, '증거물번호'], cols_info].values
+        changed_y23 = []
+        if os.path.isfile(self.ddi.path_tomato_y23):
+            changed_y23 = self.ddi.combined_result_y23.load_tomato(self.ddi.path_tomato_y23)
+        if changed or changed_y23:
+            self.store_profiles()
+        return changed, changed_y23
+
+    def fill_matching_probability(self, samples=None, theta=0.01):
+        """
+        Tomato 매크로가 Matching Probability를 채우지 않은 샘플의 값을 빈도표(Settings/allele_frequency.csv)로 계산해서
+        CombinedResult의 info에 채우고 채운 샘플명의 리스트를 반환한다. 빈도표가 없으면 아무 것도 하지 않는다.
+
+        Parameters
+        ----------
+        samples : list, optional
+            대상 샘플명 (없으면 모든 샘플)
+        theta : float, optional
+            θ 보정 계수
+        """
+
+        path_frequency = self.root + NFS_Stats.PATH_FREQUENCY
+        combined_result = self.ddi.combined_result
+        info = combined_result.info
+        if not os.path.isfile(path_frequency) or 'Matching Probability' not in info.columns:
+            return []
+        missing = info['Matching Probability'].map(NFS_Stats.normalize_mp) == ""
+        if samples is not None:
+            missing &= info.index.isin(samples)
+        targets = [sample_name for sample_name in info.index[missing] if sample_name in combined_result.profiles]
+        if len(targets) == 0:
+            return []
+        table = NFS_Stats.load_frequency_table(path_frequency)
+        mp = table.matching_probability({sample_name: combined_result.profiles[sample_name] for sample_name in targets},
+                                        theta=theta)
+        mp = mp[mp != ""]
+        info['Matching Probability'] = info['Matching Probability'].astype(object)
+        info.loc[mp.index, 'Matching Probability'] = mp
+        combined_result.mark_modified()
+        return list(mp.index)
+
+    def missing_matching_probability(self):
+        """
+        감정서에 Matching Probability를 쓰는 대조 시료(DB Type 1이 LIST_MP_TYPES) 중 값이 없는 샘플명의 리스트를 반환한다.
+
+        Tomato가 계산하지 않았고 빈도표(Settings/allele_frequency.csv, 형식은 TEXT_FREQUENCY_FORMAT)도 없으면
+        해당 사건의 감정서는 작성할 수 없다.
+        """
+
+        info = self.ddi.combined_result.info
+        if 'Matching Probability' not in info.columns or 'DB Type 1' not in info.columns:
+            return []
+        targets = info[info['DB Type 1'].isin(LIST_MP_TYPES)]
+        return [sample_name for sample_name, mp in targets['Matching Probability'].items() if NFS_Stats.normalize_mp(mp) == ""]
+
+    @NFS_Profiler.instrument()
+    def screen_profiles(self, min_shared_loci=8):
+        """
+        load_tomato로 불러온 프로파일을 서로, 그리고 Tomato 파일의 Control/Blank 웰, 배제용 프로파일
+        (Settings/elimination_profiles.csv)과 비교하여 플래그된 쌍을 ETC/screening_report.csv에 저장한다.
+
+        Parameters
+        ----------
+        min_shared_loci : int, optional
+            플래그할 최소 공통 좌위 수
+
+        Returns
+        -------
+        tuple
+            (플래그된 쌍의 데이터프레임, 결과 파일의 경로)
+        """
+
+        combined_result = self.ddi.combined_result
+        markers = combined_result.list_marker_ordered
+        controls, blanks = {}, {}
+        if os.path.isfile(self.ddi.path_tomato):
+            controls, blanks = NFS_Screening.read_tomato_controls(self.ddi.path_tomato, markers)
+        elimination = {}
+        path_elimination = self.root + NFS_Screening.PATH_ELIMINATION
+        if os.path.isfile(path_elimination):
+            elimination = NFS_Screening.read_profiles(path_elimination, markers)
+        df_flagged = NFS_Screening.screen(combined_result.profiles, markers, controls=controls, blanks=blanks,
+                                         elimination=elimination, min_shared_loci=min_shared_loci)
+        NFS_Profiler.note_rows(len(combined_result.profiles))
+        os.makedirs(self.ddi.location_save + '/ETC', exist_ok=True)
+        path_report = self.ddi.location_save + '/ETC/' + NFS_Screening.FILENAME_REPORT
+        df_flagged.to_csv(path_report, index=False, encoding='utf-8-sig')
+        return df_flagged, path_report
+
+    @NFS_Profiler.instrument()
+    def screen_kinship(self, types=('D',), max_inconsistent=2, mutation_rate=NFS_Kinship.MUTATION_RATE):
+        """
+        DB Type 1이 types인 프로파일(변사자 등)마다 불러온 다른 단일 프로파일 전체와의 누적 친자관계지수(CPI)를 계산하여
+        불일치 좌위가 max_inconsistent개 이하인 후보를 CPI가 큰 순서로 ETC/kinship_screening.csv에 저장한다.
+
+        Parameters
+        ----------
+        types : tuple, optional
+            자녀(혹은 변사자)로 볼 DB Type 1 값
+        max_inconsistent : int, optional
+            후보로 남길 최대 불일치(돌연변이로 계산한) 좌위 수
+        mutation_rate : float or dict, optional
+            돌연변이율
+
+        Returns
+        -------
+        tuple
+            (후보의 데이터프레임, 결과 파일의 경로)
+
+        Raises
+        ------
+        FileNotFoundError
+            빈도표(Settings/allele_frequency.csv)가 없는 경우
+        """
+
+        path_frequency = self.root + NFS_Stats.PATH_FREQUENCY
+        if not os.path.isfile(path_frequency):
+            raise FileNotFoundError(f"{path_frequency}\n{TEXT_FREQUENCY_FORMAT}")
+        table = NFS_Stats.load_frequency_table(path_frequency)
+        combined_result = self.ddi.combined_result
+        info = combined_result.info
+        children = [] if 'DB Type 1' not in info.columns else \
+            [sample_name for sample_name in info.index[info['DB Type 1'].isin(types)] if sample_name in combined_result.profiles]
+        results = []
+        for sample_name in dict.fromkeys(children):
+            df = NFS_Kinship.screen(combined_result.profiles[sample_name], combined_result.profiles, table,
+                                    mutation_rate=mutation_rate, max_inconsistent=max_inconsistent)
+            df.insert(0, 'child', sample_name)
+            results.append(df)
+        columns = ['child', 'sample_name', 'cpi', 'log10_cpi', 'probability', 'loci', 'inconsistent']
+        df_candidates = pd.concat(results, ignore_index=True)[columns] if results else pd.DataFrame(columns=columns)
+        NFS_Profiler.note_rows(len(children))
+        os.makedirs(self.ddi.location_save + '/ETC', exist_ok=True)
+        path_report = self.ddi.location_save + '/ETC/kinship_screening.csv'
+        df_candidates.to_csv(path_report, index=False, encoding='utf-8-sig')
+        return df_candidates, path_report
+
+    @NFS_Profiler.instrument()
+    def match_haplotypes(self, max_mismatch=1, min_shared_loci=10):
+        """
+        불러온 Y23 프로파일을 지난 텀을 포함해 프로파일 데이터베이스에 누적된 Y23 하플로타입 전체, 그리고 이번 텀의
+        다른 Y23 프로파일과 비교하여 불일치 좌위가 max_mismatch개 이하인 쌍을 ETC/y23_matches.csv에 저장한다.
+
+        Parameters
+        ----------
+        max_mismatch : int, optional
+            허용할 불일치 좌위 수
+        min_shared_loci : int, optional
+            최소 공통 좌위 수
+
+        Returns
+        -------
+        tuple
+            (일치 쌍의 데이터프레임, 결과 파일의 경로)
+        """
+
+        combined_result = self.ddi.combined_result_y23
+        run_name = os.path.basename(self.ddi.location_save)
+        df_store = pd.DataFrame(columns=['run', 'sample_name', 'date'])
+        if os.path.isfile(self.ddi.path_profile_db):
+            profile_db = NFS_ProfileDB.ProfileDatabase(self.ddi.path_profile_db)
+            df_store = profile_db.load_profiles(kit=combined_result.kit)
+            profile_db.close()
+            df_store = df_store[df_store['run'] != run_name]  # 이번 텀은 불러온 데이터로 대체
+        df_present = combined_result.df_profiles.rename(columns={'Sample Name': 'sample_name', 'Date': 'date'})
+        df_present.insert(0, 'run', run_name)
+        index = NFS_YSTR.HaplotypeIndex.from_frame(pd.concat([df_store, df_present], ignore_index=True),
+                                                   combined_result.list_marker_ordered)
+        results = []
+        for sample_name, profile in combined_result.profiles.items():
+            df = index.search(profile, max_mismatch=max_mismatch, min_shared_loci=min_shared_loci, limit=None)
+            df = df[(df['run'] != run_name) | (df['sample_name'] != sample_name)]
+            df.insert(0, 'query', sample_name)
+            results.append(df)
+        columns = ['query', 'run', 'sample_name', 'date', 'shared', 'mismatched', 'mismatched_loci']
+        df_matches = pd.concat(results, ignore_index=True)[columns] if results else pd.DataFrame(columns=columns)
+        NFS_Profiler.note_rows(len(index))
+        os.makedirs(self.ddi.location_save + '/ETC', exist_ok=True)
+        path_report = self.ddi.location_save + '/ETC/y23_matches.csv'
+        df_matches.to_csv(path_report, index=False, encoding='utf-8-sig')
+        return df_matches, path_report
+
+    @NFS_Profiler.instrument()
+    def search_profile_db(self, max_mismatch=0, min_shared_loci=8, mode="identity", limit=50):
+        """
+        불러온 프로파일을 프로파일 데이터베이스에 누적된 지난 텀의 프로파일과 비교하여(ProfileDatabase.search)
+        일치(혹은 포함) 후보를 ETC/profile_db_matches.csv에 저장한다. 이번 텀의 프로파일끼리는 screen_profiles가 비교한다.
+
+        Parameters
+        ----------
+        max_mismatch : int, optional
+            허용할 불일치 좌위 수
+        min_shared_loci : int, optional
+            최소 공통 좌위 수
+        mode : str, optional
+            "identity" 혹은 "inclusion" (ProfileDatabase.search 참고)
+        limit : int, optional
+            프로파일마다 저장할 최대 후보 수
+
+        Returns
+        -------
+        tuple
+            (후보의 데이터프레임, 결과 파일의 경로)
+        """
+
+        combined_result = self.ddi.combined_result
+        run_name = os.path.basename(self.ddi.location_save)
+        columns = ['query', 'run', 'sample_name', 'date', 'shared', 'matched', 'mismatched']
+        results = []
+        if os.path.isfile(self.ddi.path_profile_db):
+            profile_db = NFS_ProfileDB.ProfileDatabase(self.ddi.path_profile_db)
+            for sample_name, profile in combined_result.profiles.items():
+                # 이번 텀의 행이 limit를 차지하지 않도록 limit보다 넉넉하게 찾은 후 제외
+                df = profile_db.search(profile, min_shared_loci=min_shared_loci, max_mismatch=max_mismatch,
+                                       kit=combined_result.kit, mode=mode, limit=limit + len(combined_result.profiles))
+                df = df[df['run'] != run_name].head(limit)
+                df.insert(0, 'query', sample_name)
+                results.append(df)
+            profile_db.close()
+        df_matches = pd.concat(results, ignore_index=True)[columns] if results else pd.DataFrame(columns=columns)
+        NFS_Profiler.note_rows(len(combined_result.profiles))
+        os.makedirs(self.ddi.location_save + '/ETC', exist_ok=True)
+        path_report = self.ddi.location_save + '/ETC/profile_db_matches.csv'
+        df_matches.to_csv(path_report, index=False, encoding='utf-8-sig')
+        return df_matches, path_report
+
+    def store_profiles(self):
+        """불러온 CombinedResult의 프로파일을 여러 텀의 프로파일을 모아두는 데이터베이스에 저장한다."""
+
+        profile_db = NFS_ProfileDB.ProfileDatabase(self.ddi.path_profile_db)
+        run_name = os.path.basename(self.ddi.location_save)
+        profile_db.ingest(self.ddi.combined_result, run_name)
+        if len(self.ddi.combined_result_y23.df_profiles) != 0:
+            profile_db.ingest(self.ddi.combined_result_y23, run_name)
+        profile_db.close()
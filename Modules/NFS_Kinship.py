@@ -0,0 +1,225 @@
+"""
+부모-자녀 관계(duo, 어머니 없이 관계자 한 명과 자녀)의 친자관계지수(PI)를 계산하는 모듈
+
+좌위별 PI = X / Y
+    X : 관계자가 부(모)일 때 자녀의 디엔에이형이 나올 확률 (관계자의 두 좌위값 중 하나를 1/2 확률로 물려받음)
+    Y : 무관한 사람이 부(모)일 때 자녀의 디엔에이형이 나올 확률 (동형접합 p², 이형접합 2pq)
+    e.g. 자녀 PQ, 관계자 PQ : (p+q)/4pq, 자녀 PP, 관계자 PQ : 1/2p
+관계자와 자녀가 공유하는 좌위값이 없는 좌위(불일치)는 돌연변이로 보고 PI = μ / PE 를 사용한다.
+    μ : 좌위의 돌연변이율, PE : 해당 좌위의 평균 배제 확률(duo) = Σ p_i²(1-p_i)² + Σ_{i<j} 2p_ip_j(1-p_i-p_j)²
+좌위별 PI의 곱이 누적 친자관계지수(CPI)이고, 사전확률 0.5의 친자확률은 CPI / (CPI + 1)이다.
+
+좌위값 빈도는 NFS_Stats.AlleleFrequencyTable을 사용한다.
+
+Functions
+---------
+exclusion_power(table, marker)
+    해당 좌위의 duo 평균 배제 확률(PE)을 반환한다.
+paternity_index(child, parents, table, mutation_rate=0.002, markers=None)
+    자녀 한 명과 여러 관계자의 좌위별 PI 데이터프레임을 반환한다.
+combined_index(child, parent, table, mutation_rate=0.002, markers=None)
+    자녀와 관계자 한 명의 누적 친자관계지수(CPI), 친자확률, 불일치 좌위 수를 반환한다.
+screen(child, references, table, mutation_rate=0.002, markers=None, max_inconsistent=2)
+    자녀 한 명을 여러 대조 프로파일과 비교해 CPI가 큰 순서로 정렬한 후보 목록을 반환한다.
+format_index(value)
+    PI/CPI를 감정서 표기(e.g. 1.2E+05)로 변환한다.
+"""
+
+import functools
+import numpy as np
+import pandas as pd
+
+MUTATION_RATE = 0.002   # 좌위별 돌연변이율을 따로 주지 않을 때 사용하는 값
+IGNORE_ALLELES = ('', 'ND', 'NC')
+EXCLUDE_MARKERS = ('AMEL',)
+
+
+@functools.lru_cache(maxsize=None)
+def _exclusion_power(table, marker):
+    p = table.frequencies[marker]
+    p = p / p.sum()
+    homo = np.sum(p ** 2 * (1 - p) ** 2)
+    pair = np.outer(p, p)
+    remain = 1 - p[:, None] - p[None, :]
+    hetero = np.sum(np.triu(2 * pair * remain ** 2, k=1))
+    return float(homo + hetero)
+
+
+def exclusion_power(table, marker):
+    """
+    해당 좌위에서 무관한 사람이 자녀와 좌위값을 하나도 공유하지 않을 평균 확률(duo PE)을 반환한다.
+
+    Parameters
+    ----------
+    table : NFS_Stats.AlleleFrequencyTable
+        좌위값 빈도표
+    marker : str
+        좌위명
+    """
+
+    return _exclusion_power(table, marker)
+
+
+def _typed_alleles(alleles):
+    """미검출 값과 OL을 뺀 좌위값 중 앞의 두 개를 (첫번째, 두번째)로 반환한다. 동형접합이면 같은 값을 두 번 반환한다."""
+
+    alleles = [allele for allele in alleles if allele not in IGNORE_ALLELES and allele.find("OL") == -1]
+    if len(alleles) == 0:
+        return None
+    return alleles[0], alleles[1] if len(alleles) > 1 else alleles[0]
+
+
+def _mutation_rate(mutation_rate, loci):
+    return mutation_rate.get(loci, MUTATION_RATE) if isinstance(mutation_rate, dict) else mutation_rate
+
+
+def _transmission(alleles, c1, c2, p_c1, p_c2):
+    """관계자가 alleles(배열)의 좌위값을 물려줬을 때 자녀(c1, c2)의 디엔에이형이 나올 확률 배열을 반환한다."""
+
+    return (alleles == c1) * p_c2 + ((alleles == c2) & (c1 != c2)) * p_c1
+
+
+def paternity_index(child, parents, table, mutation_rate=MUTATION_RATE, markers=None):
+    """
+    자녀 한 명과 여러 관계자의 좌위별 PI를 관계자 전체에 대해 좌위마다 한 번에 계산한다.
+
+    두 프로파일 중 한 쪽이라도 좌위값이 없거나, 빈도표에 없거나, 세 개 이상의 좌위값(혼합)을 가진 좌위는 NaN으로 둔다.
+
+    Parameters
+    ----------
+    child : NFS_DNA.STRProfile
+        자녀(혹은 변사자)의 프로파일
+    parents : dict
+        관계자명-STRProfile 딕셔너리
+    table : NFS_Stats.AlleleFrequencyTable
+        좌위값 빈도표
+    mutation_rate : float or dict, optional
+        돌연변이율 (좌위-돌연변이율 딕셔너리로 좌위마다 다르게 줄 수 있음)
+    markers : list, optional
+        계산할 좌위 (없으면 빈도표의 모든 좌위)
+
+    Returns
+    -------
+    DataFrame
+        index는 관계자명, columns는 좌위인 PI 데이터프레임
+    """
+
+    return _paternity_index(child, parents, table, mutation_rate, markers)[0]
+
+
+def _paternity_index(child, parents, table, mutation_rate, markers):
+    """paternity_index와 같은 PI 데이터프레임과 불일치(돌연변이 PI 사용) 좌위의 bool 데이터프레임을 반환한다."""
+
+    names = list(parents.keys())
+    profile_child = child.profile
+    profiles_parent = [parents[name].profile for name in names]
+    markers = [loci for loci in (markers if markers is not None else table.alleles.keys())
+               if loci in table.alleles and loci not in EXCLUDE_MARKERS]
+    result = {}
+    result_inconsistent = {}
+    for loci in markers:
+        column = np.full(len(names), np.nan)
+        result[loci] = column
+        result_inconsistent[loci] = np.zeros(len(names), dtype=bool)
+        alleles_child = profile_child.get(loci, ())
+        if len(alleles_child) > 2 or _typed_alleles(alleles_child) is None:
+            continue
+        c1, c2 = _typed_alleles(alleles_child)
+        rows, first, second = [], [], []
+        for i, profile in enumerate(profiles_parent):
+            alleles = profile.get(loci, ())
+            typed = _typed_alleles(alleles) if len(alleles) <= 2 else None
+            if typed is None:
+                continue
+            rows.append(i)
+            first.append(typed[0])
+            second.append(typed[1])
+        if len(rows) == 0:
+            continue
+        p_c1, p_c2 = table.lookup(loci, [c1, c2])
+        x = 0.5 * (_transmission(np.asarray(first, dtype=object), c1, c2, p_c1, p_c2)
+                   + _transmission(np.asarray(second, dtype=object), c1, c2, p_c1, p_c2))
+        y = p_c1 * p_c1 if c1 == c2 else 2 * p_c1 * p_c2
+        column[rows] = np.where(x > 0, x / y, _mutation_rate(mutation_rate, loci) / exclusion_power(table, loci))
+        result_inconsistent[loci][rows] = x == 0
+    return (pd.DataFrame(result, index=names, columns=markers),
+            pd.DataFrame(result_inconsistent, index=names, columns=markers))
+
+
+def combined_index(child, parent, table, mutation_rate=MUTATION_RATE, markers=None):
+    """
+    자녀와 관계자 한 명의 누적 친자관계지수(CPI), 사전확률 0.5의 친자확률, 불일치 좌위 수를 반환한다.
+
+    Parameters
+    ----------
+    child : NFS_DNA.STRProfile
+        자녀(혹은 변사자)의 프로파일
+    parent : NFS_DNA.STRProfile
+        관계자의 프로파일
+    table : NFS_Stats.AlleleFrequencyTable
+        좌위값 빈도표
+    mutation_rate : float or dict, optional
+        돌연변이율
+    markers : list, optional
+        계산할 좌위
+
+    Returns
+    -------
+    tuple
+        (CPI, 친자확률, 불일치 좌위 수)
+    """
+
+    df_pi, df_inconsistent = _paternity_index(child, {parent.id: parent}, table, mutation_rate, markers)
+    cpi = float(np.power(10.0, np.log10(df_pi.iloc[0].dropna()).sum()))
+    return cpi, cpi / (cpi + 1), int(df_inconsistent.iloc[0].sum())
+
+
+def screen(child, references, table, mutation_rate=MUTATION_RATE, markers=None, max_inconsistent=2):
+    """
+    자녀 한 명을 여러 대조 프로파일과 비교하여 CPI가 큰 순서로 정렬한 후보 목록을 반환한다.
+
+    Parameters
+    ----------
+    child : NFS_DNA.STRProfile
+        자녀(혹은 변사자)의 프로파일
+    references : dict or NFS_DNA.CombinedResult
+        샘플명-STRProfile 딕셔너리 혹은 CombinedResult (자녀 자신과 혼합형 프로파일은 제외)
+    table : NFS_Stats.AlleleFrequencyTable
+        좌위값 빈도표
+    mutation_rate : float or dict, optional
+        돌연변이율
+    markers : list, optional
+        계산할 좌위
+    max_inconsistent : int, optional
+        후보로 남길 최대 불일치 좌위 수
+
+    Returns
+    -------
+    DataFrame
+        sample_name, cpi, log10_cpi, probability, loci, inconsistent 칼럼을 가진 후보 목록
+    """
+
+    profiles = getattr(references, 'profiles', references)
+    parents = {name: profile for name, profile in profiles.items()
+               if profile is not child and name != child.id and not profile.check_MX()}
+    columns = ['sample_name', 'cpi', 'log10_cpi', 'probability', 'loci', 'inconsistent']
+    if len(parents) == 0:
+        return pd.DataFrame(columns=columns)
+    df_pi, df_inconsistent = _paternity_index(child, parents, table, mutation_rate, markers)
+    values = df_pi.to_numpy()
+    typed = ~np.isnan(values)
+    log10_cpi = np.log10(np.where(typed, values, 1)).sum(axis=1)
+    inconsistent = df_inconsistent.to_numpy().sum(axis=1)
+    cpi = np.power(10.0, log10_cpi)
+    df = pd.DataFrame({'sample_name': df_pi.index, 'cpi': cpi, 'log10_cpi': log10_cpi,
+                       'probability': cpi / (cpi + 1), 'loci': typed.sum(axis=1), 'inconsistent': inconsistent})
+    df = df[df['inconsistent'] <= max_inconsistent]
+    return df.sort_values(['inconsistent', 'log10_cpi'], ascending=[True, False], kind='mergesort').reset_index(drop=True)
+
+
+def format_index(value):
+    """PI/CPI를 감정서 표기(e.g. 1.2E+05)로 변환한다. 값이 없으면 빈 문자열을 반환한다."""
+
+    if value is None or not np.isfinite(value):
+        return ""
+    return f"{value:.1E}"
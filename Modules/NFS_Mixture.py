@@ -0,0 +1,199 @@
+"""
+혼합 프로파일의 기여자 수를 추정하고 좌위별로 가능한 기여자 디엔에이형 조합을 구하는 모듈
+
+기여자 한 명은 한 좌위에 최대 두 개의 좌위값을 가지므로 최소 기여자 수는 가장 많은 좌위값 수의 절반(올림)이다.
+디엔에이형 조합은 좌위값을 비트로 표현한 마스크의 OR가 검출된 좌위값 전체와 같은 조합으로 구한다.
+좌위값 수가 같은 좌위끼리는 조합의 모양이 같으므로 (좌위값 수, 기여자 수)별로 한 번만 계산하고 좌위값 이름만 바꿔 끼운다.
+
+Classes
+-------
+MixtureAnalysis
+    STRProfile 하나의 좌위별 좌위값 수, 최소 기여자 수, 기여자 디엔에이형 조합을 계산하는 클래스
+
+Functions
+---------
+genotype_table(num_alleles)
+    좌위값 num_alleles개로 만들 수 있는 디엔에이형(좌위값 index 쌍)과 비트마스크를 반환한다.
+combination_table(num_alleles, num_contributors)
+    기여자 num_contributors명의 디엔에이형으로 좌위값 num_alleles개를 모두 설명하는 조합을 반환한다.
+"""
+
+import functools
+import math
+import numpy as np
+import pandas as pd
+
+MAX_COMBINATIONS = 5000000   # 한 좌위에서 검사할 (디엔에이형 수)^(기여자 수)의 상한
+
+
+@functools.lru_cache(maxsize=None)
+def genotype_table(num_alleles):
+    """
+    좌위값 num_alleles개로 만들 수 있는 디엔에이형(동형접합 포함)을 반환한다.
+
+    Parameters
+    ----------
+    num_alleles : int
+        좌위값 수
+
+    Returns
+    -------
+    tuple
+        (디엔에이형별 좌위값 index 쌍 배열(디엔에이형 수 x 2), 디엔에이형별 비트마스크 배열)
+    """
+
+    first, second = np.triu_indices(num_alleles)
+    pairs = np.stack([first, second], axis=1)
+    masks = (np.left_shift(1, first) | np.left_shift(1, second)).astype(np.int64)
+    return pairs, masks
+
+
+@functools.lru_cache(maxsize=None)
+def combination_table(num_alleles, num_contributors):
+    """
+    기여자 num_contributors명의 디엔에이형으로 좌위값 num_alleles개를 빠짐없이 설명하는 조합을 반환한다.
+
+    기여자는 서로 구별하므로(기여자 1, 기여자 2 ...) 디엔에이형의 순서가 다른 조합은 다른 조합이다.
+
+    Parameters
+    ----------
+    num_alleles : int
+        좌위값 수
+    num_contributors : int
+        기여자 수
+
+    Returns
+    -------
+    ndarray
+        조합 수 x 기여자 수 크기의 디엔에이형 index(genotype_table의 행 번호) 배열
+
+    Raises
+    ------
+    ValueError
+        검사할 조합 수가 MAX_COMBINATIONS를 넘는 경우
+    """
+
+    pairs, masks = genotype_table(num_alleles)
+    num_genotypes = len(masks)
+    if num_genotypes ** num_contributors > MAX_COMBINATIONS:
+        raise ValueError(f"Too many combinations : {num_genotypes}^{num_contributors}")
+    full_mask = (1 << num_alleles) - 1
+    # 기여자마다 디엔에이형을 하나씩 고르는 모든 경우의 비트마스크 OR를 한 번에 계산
+    combinations = np.indices((num_genotypes,) * num_contributors).reshape(num_contributors, -1).T
+    union = np.bitwise_or.reduce(masks[combinations], axis=1)
+    return combinations[union == full_mask]
+
+
+class MixtureAnalysis():
+    """
+    STRProfile 하나의 좌위별 좌위값 수, 최소 기여자 수, 좌위별 기여자 디엔에이형 조합을 계산하는 클래스
+
+    Attributes
+    ----------
+    id : str
+        프로파일의 ID
+    alleles : dict
+        좌위-좌위값 tuple (미검출 값, OL, 제외 좌위는 뺀 값)
+    allele_counts : Series
+        좌위별 좌위값 수
+    max_alleles : int
+        좌위값 수의 최댓값
+    min_contributors : int
+        최소 기여자 수 (좌위값이 없으면 0)
+
+    Methods
+    --------
+    num_combinations(num_contributors=None)
+        좌위별 가능한 디엔에이형 조합 수를 반환한다.
+    genotype_combinations(num_contributors=None, markers=None)
+        좌위-가능한 기여자 디엔에이형 조합 데이터프레임의 딕셔너리를 반환한다.
+    """
+
+    IGNORE_ALLELES = ('', 'ND', 'NC')
+    EXCLUDE_MARKERS = ('AMEL',)
+
+    def __init__(self, profile, markers=None, ignore_alleles=IGNORE_ALLELES, exclude_markers=EXCLUDE_MARKERS):
+        """
+        Parameters
+        ----------
+        profile : NFS_DNA.STRProfile
+            분석할 프로파일
+        markers : list, optional
+            분석할 좌위 (없으면 프로파일의 모든 좌위)
+        ignore_alleles : iterable, optional
+            좌위값으로 취급하지 않을 문자열
+        exclude_markers : iterable, optional
+            기여자 수 추정에서 제외할 좌위 (성별 좌위 등)
+        """
+
+        self.id = profile.id
+        dict_profile = profile.profile
+        markers = list(dict_profile.keys()) if markers is None else [loci for loci in markers if loci in dict_profile]
+        ignore_alleles = set(ignore_alleles)
+        exclude_markers = set(exclude_markers)
+        self.alleles = {}
+        for loci in markers:
+            if loci in exclude_markers:
+                continue
+            alleles = tuple(allele for allele in dict.fromkeys(dict_profile[loci])
+                            if allele not in ignore_alleles and allele.find("OL") == -1)
+            if len(alleles) != 0:
+                self.alleles[loci] = alleles
+        self.allele_counts = pd.Series({loci: len(alleles) for loci, alleles in self.alleles.items()}, dtype=int)
+        self.max_alleles = int(self.allele_counts.max()) if len(self.allele_counts) != 0 else 0
+        self.min_contributors = math.ceil(self.max_alleles / 2)
+
+    def __num_contributors(self, num_contributors):
+        if num_contributors is None:
+            return max(self.min_contributors, 1)
+        if num_contributors < self.min_contributors:
+            raise ValueError(f"{self.id} needs at least {self.min_contributors} contributors")
+        return num_contributors
+
+    def num_combinations(self, num_contributors=None):
+        """
+        좌위별 가능한 디엔에이형 조합 수를 반환한다.
+
+        Parameters
+        ----------
+        num_contributors : int, optional
+            기여자 수 (없으면 최소 기여자 수)
+        """
+
+        num_contributors = self.__num_contributors(num_contributors)
+        counts = {num_alleles: len(combination_table(num_alleles, num_contributors))
+                  for num_alleles in self.allele_counts.unique()}
+        return self.allele_counts.map(counts)
+
+    def genotype_combinations(self, num_contributors=None, markers=None):
+        """
+        좌위별로 가능한 기여자 디엔에이형 조합을 반환한다.
+
+        Parameters
+        ----------
+        num_contributors : int, optional
+            기여자 수 (없으면 최소 기여자 수)
+        markers : list, optional
+            조합을 구할 좌위 (없으면 분석한 모든 좌위)
+
+        Returns
+        -------
+        dict
+            좌위-데이터프레임(행은 조합, 열은 기여자 1 ~ n, 값은 '좌위값-좌위값' 형태의 디엔에이형)
+        """
+
+        num_contributors = self.__num_contributors(num_contributors)
+        markers = list(self.alleles.keys()) if markers is None else [loci for loci in markers if loci in self.alleles]
+        columns = [f"Contributor {i + 1}" for i in range(num_contributors)]
+        result = {}
+        # 좌위값 수가 같은 좌위끼리 묶어서 조합표와 디엔에이형 index를 한 번만 계산
+        for num_alleles, group in self.allele_counts[markers].groupby(self.allele_counts[markers]):
+            pairs, _ = genotype_table(num_alleles)
+            combinations = combination_table(num_alleles, num_contributors)
+            genotype_pairs = pairs[combinations]    # 조합 수 x 기여자 수 x 2 의 좌위값 index
+            for loci in group.index:
+                alleles = np.array(self.alleles[loci], dtype=object)
+                names = alleles[genotype_pairs]
+                genotypes = names[..., 0] + '-' + names[..., 1]
+                result[loci] = pd.DataFrame(genotypes, columns=columns)
+        return {loci: result[loci] for loci in markers}
@@ -0,0 +1,201 @@
+"""
+샘플을 96 혹은 384 웰 플레이트 여러 장에 배치하고 (플레이트, 웰)로 결과를 다시 합치는 모듈
+
+웰은 열 우선 순서(A1, B1, ..., H1, A2, ...)로 채운다. 플레이트마다 샘플 뒤에 reserved 라벨(e.g. Control, Blank, Ladder)의
+웰을 샘플시트(ProjectEngine.write_samplesheet)와 같은 순서로 예약하므로 한 플레이트의 샘플 수는 (웰 수 - 예약 웰 수)이다.
+샘플마다 정해진 위치(e.g. 샘플시트의 행 순서)가 있고 예약 웰까지 한 플레이트에 들어가면 순서대로 채우지 않고 그 위치를 그대로 쓴다.
+
+Classes
+-------
+PlateLayout
+    플레이트 크기와 예약 웰을 가지고 샘플 목록을 플레이트, 웰에 배치하는 클래스
+
+Functions
+---------
+match_plates(results, df_layout)
+    플레이트별 결과 데이터프레임을 (웰, 샘플명)이 가장 많이 일치하는 플레이트에 대응시켜 합친다.
+"""
+
+import numpy as np
+import pandas as pd
+
+PLATE_SHAPES = {96: (8, 12), 384: (16, 24)}    # 웰 수-(행 수, 열 수)
+RESERVED_STR = ('Control', 'Blank', 'Ladder', 'Ladder')   # 샘플시트에서 샘플 뒤에 추가하는 웰
+ALPHABET = 'ABCDEFGHIJKLMNOP'
+
+
+class PlateLayout():
+    """
+    플레이트 크기와 예약 웰을 가지고 샘플 목록을 여러 장의 플레이트, 웰에 배치하는 클래스
+
+    Attributes
+    ----------
+    size : int
+        플레이트의 웰 수 (96, 384)
+    num_rows, num_columns : int
+        플레이트의 행, 열 수
+    reserved : tuple
+        플레이트마다 샘플 뒤에 예약할 웰의 라벨
+    capacity : int
+        플레이트 한 장에 들어가는 샘플 수
+
+    Methods
+    --------
+    well_names(positions)
+        열 우선 위치(0부터) 배열을 웰 이름 배열로 변환한다.
+    positions(wells)
+        웰 이름 배열을 열 우선 위치 배열로 변환한다.
+    num_plates(num_samples)
+        샘플 수에 필요한 플레이트 수를 반환한다.
+    fits(positions)
+        위치 배열이 예약 웰까지 한 플레이트에 들어가는지 여부를 반환한다.
+    assign(df, column='sample', positions=None)
+        샘플 데이터프레임의 각 행에 plate, position, well을 할당하고 예약 웰의 행을 추가하여 반환한다.
+    """
+
+    def __init__(self, size=96, reserved=()):
+        """
+        Parameters
+        ----------
+        size : int, optional
+            플레이트의 웰 수 (96, 384)
+        reserved : tuple, optional
+            플레이트마다 샘플 뒤에 예약할 웰의 라벨 (샘플시트와 같게 하려면 RESERVED_STR)
+
+        Raises
+        ------
+        ValueError
+            지원하지 않는 플레이트 크기이거나 예약 웰이 플레이트를 모두 차지하는 경우
+        """
+
+        if size not in PLATE_SHAPES:
+            raise ValueError(f"Unsupported plate size : {size}")
+        self.size = size
+        self.num_rows, self.num_columns = PLATE_SHAPES[size]
+        self.reserved = tuple(reserved)
+        self.capacity = size - len(self.reserved)
+        if self.capacity <= 0:
+            raise ValueError("Reserved wells fill the whole plate.")
+
+    def well_names(self, positions):
+        """
+        열 우선 위치(0부터, e.g. 96웰에서 0->A1, 1->B1, 8->A2) 배열을 웰 이름 배열로 변환한다.
+
+        Parameters
+        ----------
+        positions : array-like
+            플레이트 안의 위치
+        """
+
+        column, row = np.divmod(np.asarray(positions, dtype=np.int64), self.num_rows)
+        return np.char.add(np.array(list(ALPHABET[:self.num_rows]))[row], (column + 1).astype(str)).astype(object)
+
+    def positions(self, wells):
+        """
+        웰 이름(e.g. A1) 배열을 열 우선 위치 배열로 변환한다. 플레이트에 없는 웰은 -1이다.
+
+        Parameters
+        ----------
+        wells : array-like
+            웰 이름
+        """
+
+        wells = pd.Series(wells, dtype=object).astype(str).str.strip().str.upper()
+        rows = wells.str[0].map({alphabet: i for i, alphabet in enumerate(ALPHABET[:self.num_rows])})
+        columns = pd.to_numeric(wells.str[1:], errors='coerce')
+        valid = rows.notna() & columns.between(1, self.num_columns)
+        return np.where(valid, (columns - 1) * self.num_rows + rows, -1).astype(np.int64)
+
+    def num_plates(self, num_samples):
+        """샘플 수에 필요한 플레이트 수를 반환한다. (샘플이 없으면 0)"""
+
+        return -(-num_samples // self.capacity)
+
+    def fits(self, positions):
+        """위치(0부터) 배열이 중복 없이 예약 웰까지 한 플레이트에 들어가는지 여부를 반환한다."""
+
+        positions = np.asarray(positions, dtype=np.int64)
+        return len(positions) == 0 or (positions.min() >= 0 and len(np.unique(positions)) == len(positions)
+                                       and positions.max() + 1 + len(self.reserved) <= self.size)
+
+    def assign(self, df, column='sample', positions=None):
+        """
+        샘플 데이터프레임의 각 행을 플레이트, 웰에 배치하고 플레이트마다 예약 웰의 행을 추가한다.
+
+        positions가 있고 예약 웰까지 한 플레이트에 들어가면(fits) 각 행을 해당 위치에 두고 예약 웰은 가장 뒤 위치 다음에 둔다.
+        그렇지 않으면 행 순서대로 빈 웰 없이 여러 장의 플레이트에 채운다.
+
+        Parameters
+        ----------
+        df : DataFrame
+            샘플 데이터프레임 (행 순서대로 배치)
+        column : str, optional
+            샘플명 칼럼. 예약 웰의 행은 이 칼럼에 라벨을 넣는다.
+        positions : array-like, optional
+            행별 플레이트 안의 위치(열 우선, 0부터). e.g. 샘플시트의 행 - 3
+
+        Returns
+        -------
+        DataFrame
+            plate(1부터), position, well, reserved 칼럼을 추가하고 (plate, position) 순서로 정렬한 데이터프레임
+        """
+
+        df = df.reset_index(drop=True).copy()
+        df['reserved'] = False
+        if positions is not None and len(df) != 0 and self.fits(positions):
+            df['plate'] = 1
+            df['position'] = np.asarray(positions, dtype=np.int64)
+            num_plates = 1
+            counts = np.array([df['position'].max() + 1])   # 플레이트별 예약 웰의 시작 위치
+        else:
+            order = np.arange(len(df))
+            df['plate'] = order // self.capacity + 1
+            df['position'] = order % self.capacity
+            num_plates = self.num_plates(len(df))
+            counts = np.bincount(df['plate'], minlength=num_plates + 1)[1:]    # 플레이트별 샘플 수 = 예약 웰의 시작 위치
+        if self.reserved and num_plates > 0:
+            plates = np.repeat(np.arange(1, num_plates + 1), len(self.reserved))
+            df_reserved = pd.DataFrame({column: np.tile(self.reserved, num_plates), 'plate': plates,
+                                        'position': np.repeat(counts, len(self.reserved)) +
+                                                    np.tile(np.arange(len(self.reserved)), num_plates),
+                                        'reserved': True})
+            df = pd.concat([df, df_reserved], ignore_index=True)
+        df['well'] = self.well_names(df['position'])
+        return df.sort_values(['plate', 'position'], kind='mergesort').reset_index(drop=True)
+
+
+def match_plates(results, df_layout, column='sample'):
+    """
+    플레이트별 결과 데이터프레임을 (웰, 샘플명)이 가장 많이 일치하는 플레이트에 대응시키고
+    (plate, well)로 배치 데이터프레임과 합친 하나의 데이터프레임으로 반환한다.
+
+    결과 파일의 순서나 파일명과 무관하게 내용으로 플레이트를 찾으며, 일치하는 웰이 없으면 결과의 순서(1부터)를 플레이트 번호로 사용한다.
+
+    Parameters
+    ----------
+    results : list
+        well, sample 칼럼을 가진 결과 데이터프레임의 리스트 (e.g. NFS_RT.read_rt_result의 반환값)
+    df_layout : DataFrame
+        PlateLayout.assign의 반환값 (plate, well, column 칼럼)
+    column : str, optional
+        df_layout의 샘플명 칼럼
+
+    Returns
+    -------
+    DataFrame
+        결과의 칼럼에 plate와 df_layout의 나머지 칼럼을 붙인 데이터프레임 (배치에 없는 (plate, well)의 행은 제외)
+    """
+
+    keys = pd.MultiIndex.from_arrays([df_layout['plate'], df_layout['well'], df_layout[column].astype(str)])
+    merged = []
+    for order, df in enumerate(results, start=1):
+        df = df.copy()
+        counts = {plate: int(pd.MultiIndex.from_arrays([np.full(len(df), plate), df['well'], df['sample']]).isin(keys).sum())
+                  for plate in df_layout['plate'].unique()}
+        best = max(counts, key=counts.get) if counts and max(counts.values()) > 0 else order
+        df['plate'] = best
+        merged.append(df)
+    if len(merged) == 0:
+        return pd.DataFrame()
+    df_layout = df_layout.drop(columns=[column]).rename(columns={'position': 'plate_position'})
+    return pd.concat(merged, ignore_index=True).merge(df_layout, on=['plate', 'well'], how='inner')
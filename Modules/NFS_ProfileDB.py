@@ -0,0 +1,272 @@
+import time
+import sqlite3
+import functools
+from collections import Counter
+import pandas as pd
+
+TIMEOUT = 60.0      # 다른 프로세스가 쓰는 동안 잠금을 기다릴 시간(초). sqlite3 기본값 5초는 batch_suite의 동시 저장에 부족
+RETRIES = 3         # 그래도 "database is locked"가 나면 다시 시도할 횟수
+RETRY_DELAY = 1.0   # 다시 시도하기 전 대기 시간(초). 시도할 때마다 늘림
+
+
+def _retry_locked(function):
+    """sqlite3.OperationalError("database is locked")가 나면 잠시 기다린 후 RETRIES번까지 다시 실행한다."""
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        for attempt in range(RETRIES + 1):
+            try:
+                return function(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if "database is locked" not in str(e) or attempt == RETRIES:
+                    raise
+                time.sleep(RETRY_DELAY * (attempt + 1))
+    return wrapper
+
+
+class ProfileDatabase():
+    """
+    여러 텀의 CombinedResult.df_profiles를 하나의 SQLite 파일에 누적 저장하고
+    (좌위, 좌위값) 역색인으로 후보 프로파일을 빠르게 검색하는 클래스
+
+    같은 상위 폴더의 프로젝트들이 한 파일을 공유하므로 여러 프로세스가 동시에 쓸 수 있다.
+    잠금은 TIMEOUT초까지 기다리고, 그래도 잠겨 있으면 스키마 생성과 ingest를 RETRIES번까지 다시 시도한다.
+
+    Attributes
+    ----------
+    path : str
+        SQLite 데이터베이스 파일의 경로
+    connection : sqlite3.Connection
+        데이터베이스 연결 객체
+
+    Methods
+    --------
+    ingest(combined_result, run_name)
+        CombinedResult.df_profiles의 내용을 run_name으로 저장한다. 같은 run_name이 있으면 교체한다.
+    search(query, min_shared_loci=8, max_mismatch=0, kit="GF/PPF", mode="identity", limit=50)
+        입력받은 STRProfile과 일치(혹은 포함)되는 저장 프로파일을 순위대로 반환한다.
+    load_profiles(kit="GF/PPF")
+        해당 kit의 저장 프로파일 전체를 run, sample_name, date와 좌위별 칼럼의 데이터프레임으로 반환한다.
+    count()
+        저장된 프로파일 수를 반환한다.
+    close()
+        데이터베이스 연결을 닫는다.
+    """
+
+    UNTYPED = ('', 'ND', 'NC', 'nan')  # 검색 시 좌위값으로 취급하지 않는 값
+
+    def __init__(self, path, timeout=TIMEOUT):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite 데이터베이스 파일의 경로
+        timeout : float, optional
+            다른 연결의 잠금을 기다릴 시간(초)
+        """
+
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.__create_tables()
+
+    @_retry_locked
+    def __create_tables(self):
+        """WAL 모드를 켜고 테이블과 색인이 없으면 만든다."""
+
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY, name TEXT, kit TEXT, UNIQUE(name, kit));
+            CREATE TABLE IF NOT EXISTS profiles (
+                profile_id INTEGER PRIMARY KEY, run_id INTEGER, sample_name TEXT, date TEXT);
+            CREATE TABLE IF NOT EXISTS loci (
+                profile_id INTEGER, marker TEXT, genotype TEXT, n_alleles INTEGER);
+            CREATE TABLE IF NOT EXISTS postings (
+                marker TEXT, allele TEXT, profile_id INTEGER);
+            CREATE INDEX IF NOT EXISTS idx_profiles_run ON profiles(run_id);
+            CREATE INDEX IF NOT EXISTS idx_loci_profile ON loci(profile_id);
+            CREATE INDEX IF NOT EXISTS idx_loci_genotype ON loci(marker, genotype);
+            CREATE INDEX IF NOT EXISTS idx_postings_allele ON postings(marker, allele);
+            CREATE INDEX IF NOT EXISTS idx_postings_profile ON postings(profile_id);
+        """)
+
+    def close(self):
+        """데이터베이스 연결을 닫는다."""
+
+        self.connection.close()
+
+    def count(self):
+        """저장된 프로파일 수를 반환한다."""
+
+        return self.connection.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    @classmethod
+    def normalize(cls, alleles):
+        """좌위값 리스트에서 미검출 값을 제거하고 정렬된 tuple로 반환한다."""
+
+        return tuple(sorted({str(allele).strip() for allele in alleles} - set(cls.UNTYPED)))
+
+    @_retry_locked
+    def ingest(self, combined_result, run_name):
+        """
+        CombinedResult.df_profiles의 내용을 run_name으로 저장한다. 같은 run_name과 kit의 데이터가 있으면 교체한다.
+        한 트랜잭션으로 저장하므로 잠금 오류로 다시 시도해도 일부만 저장되지 않는다.
+
+        Parameters
+        ----------
+        combined_result : NFS_DNA.CombinedResult
+            저장할 데이터를 불러온 CombinedResult 객체
+        run_name : str
+            저장할 텀의 이름 (e.g. 프로젝트 폴더명)
+
+        Returns
+        -------
+        int
+            저장된 프로파일 수
+        """
+
+        df = combined_result.df_profiles
+        if len(df) == 0:
+            return 0
+        kit = combined_result.kit
+        markers = [marker for marker in combined_result.list_marker_ordered if marker in df.columns]
+        df_long = df.melt(id_vars=['Sample Name'], value_vars=markers, var_name='marker', value_name='genotype')
+        df_long['alleles'] = df_long['genotype'].astype(str).str.split('-').apply(self.normalize)
+        df_long = df_long[df_long['alleles'].str.len() > 0]
+        df_long['genotype'] = df_long['alleles'].str.join('-')
+        dates = df.set_index('Sample Name')['Date'] if 'Date' in df.columns else pd.Series(dtype=str)
+
+        with self.connection:
+            cur = self.connection.cursor()
+            row = cur.execute("SELECT run_id FROM runs WHERE name=? AND kit=?", (run_name, kit)).fetchone()
+            if row is not None:    # 같은 텀을 다시 읽으면 기존 데이터를 교체
+                run_id = row[0]
+                cur.execute("DELETE FROM postings WHERE profile_id IN (SELECT profile_id FROM profiles WHERE run_id=?)", (run_id,))
+                cur.execute("DELETE FROM loci WHERE profile_id IN (SELECT profile_id FROM profiles WHERE run_id=?)", (run_id,))
+                cur.execute("DELETE FROM profiles WHERE run_id=?", (run_id,))
+            else:
+                run_id = cur.execute("INSERT INTO runs(name, kit) VALUES (?, ?)", (run_name, kit)).lastrowid
+            profile_ids = {}
+            for sample_name in df['Sample Name'].unique():
+                profile_ids[sample_name] = cur.execute(
+                    "INSERT INTO profiles(run_id, sample_name, date) VALUES (?, ?, ?)",
+                    (run_id, sample_name, str(dates.get(sample_name, "")))).lastrowid
+            df_long['profile_id'] = df_long['Sample Name'].map(profile_ids)
+            cur.executemany("INSERT INTO loci(profile_id, marker, genotype, n_alleles) VALUES (?, ?, ?, ?)",
+                            zip(df_long['profile_id'].tolist(), df_long['marker'].tolist(),
+                                df_long['genotype'].tolist(), df_long['alleles'].str.len().tolist()))
+            df_postings = df_long[['profile_id', 'marker', 'alleles']].explode('alleles')
+            cur.executemany("INSERT INTO postings(marker, allele, profile_id) VALUES (?, ?, ?)",
+                            zip(df_postings['marker'].tolist(), df_postings['alleles'].tolist(),
+                                df_postings['profile_id'].tolist()))
+        return len(profile_ids)
+
+    def load_profiles(self, kit="GF/PPF"):
+        """
+        해당 kit의 저장 프로파일 전체를 한 번에 읽어 프로파일당 한 행의 데이터프레임으로 반환한다.
+
+        Parameters
+        ----------
+        kit : str
+            읽을 kit 종류
+
+        Returns
+        -------
+        DataFrame
+            run, sample_name, date 칼럼과 좌위별 칼럼(좌위값은 '-'로 연결, 없으면 빈 문자열)
+        """
+
+        df = pd.read_sql_query("""
+            SELECT p.profile_id, r.name AS run, p.sample_name, p.date, l.marker, l.genotype FROM runs r
+            JOIN profiles p ON p.run_id = r.run_id
+            LEFT JOIN loci l ON l.profile_id = p.profile_id
+            WHERE r.kit = ?""", self.connection, params=(kit,))
+        df_info = df.drop_duplicates('profile_id').set_index('profile_id')[['run', 'sample_name', 'date']]
+        df_loci = df.dropna(subset=['marker']).pivot(index='profile_id', columns='marker', values='genotype')
+        return df_info.join(df_loci).fillna("").reset_index(drop=True)
+
+    def search(self, query, min_shared_loci=8, max_mismatch=0, kit="GF/PPF", mode="identity", limit=50):
+        """
+        입력받은 STRProfile과 일치(혹은 포함)되는 저장 프로파일을 순위대로 반환한다.
+
+        역색인으로 일치 좌위가 (min_shared_loci - max_mismatch)개 이상일 수 있는 후보만 추린 후 후보의 좌위만 비교한다.
+
+        Parameters
+        ----------
+        query : NFS_DNA.STRProfile
+            검색할 프로파일
+        min_shared_loci : int
+            양쪽 모두 좌위값이 있는 좌위의 최소 개수
+        max_mismatch : int
+            허용할 불일치 좌위의 최대 개수
+        kit : str
+            검색할 kit 종류
+        mode : str
+            "identity"면 좌위값이 같은 좌위를, "inclusion"이면 저장 프로파일이 쿼리의 좌위값을 모두 포함하는 좌위를 일치로 본다.
+        limit : int
+            반환할 최대 후보 수
+
+        Returns
+        -------
+        DataFrame
+            run, sample_name, date, shared, matched, mismatched 칼럼을 가진 후보 목록
+        """
+
+        columns = ['run', 'sample_name', 'date', 'shared', 'matched', 'mismatched']
+        query_loci = {loci: self.normalize(alleles) for loci, alleles in query.profile.items()}
+        query_loci = {loci: alleles for loci, alleles in query_loci.items() if len(alleles) > 0}
+        if len(query_loci) < min_shared_loci:
+            return pd.DataFrame(columns=columns)
+        threshold = max(1, min_shared_loci - max_mismatch)
+        cur = self.connection.cursor()
+        # 좌위별 역색인 목록을 구한다. identity는 (좌위, 디엔에이형), inclusion은 해당 좌위에서 가장 드문 (좌위, 좌위값)의 목록
+        postings = {}
+        for loci, alleles in query_loci.items():
+            if mode == "identity":
+                postings[loci] = ("SELECT profile_id FROM loci WHERE marker=? AND genotype=?", (loci, '-'.join(alleles)),
+                                  cur.execute("SELECT COUNT(*) FROM loci WHERE marker=? AND genotype=?",
+                                              (loci, '-'.join(alleles))).fetchone()[0])
+            elif mode == "inclusion":
+                counts = [(cur.execute("SELECT COUNT(*) FROM postings WHERE marker=? AND allele=?",
+                                       (loci, allele)).fetchone()[0], allele) for allele in alleles]
+                count, allele = min(counts)
+                postings[loci] = ("SELECT profile_id FROM postings WHERE marker=? AND allele=?", (loci, allele), count)
+            else:
+                raise ValueError(f"Unknown mode : {mode}")
+        # threshold개 이상 일치하려면 가장 드문 (좌위 수 - threshold + 1 + r)개 좌위 중 (r + 1)개 이상은 반드시 일치해야 한다.
+        extra = min(3, threshold - 1)
+        rarest = sorted(postings.values(), key=lambda x: x[2])[:len(postings) - threshold + 1 + extra]
+        hits = Counter()
+        for sql, params, _ in rarest:
+            hits.update(row[0] for row in cur.execute(sql, params))
+        candidates = [profile_id for profile_id, count in hits.items() if count > extra]
+        if len(candidates) == 0:
+            return pd.DataFrame(columns=columns)
+
+        # 후보 프로파일의 좌위를 읽어 공통 좌위, 일치, 불일치 좌위 수를 계산(CROSS JOIN으로 후보 테이블부터 읽도록 고정)
+        cur.execute("DROP TABLE IF EXISTS temp.candidates")
+        cur.execute("CREATE TEMP TABLE candidates (profile_id INTEGER PRIMARY KEY)")
+        cur.executemany("INSERT INTO temp.candidates VALUES (?)", ((i,) for i in candidates))
+        df = pd.read_sql_query("""
+            SELECT l.profile_id, l.marker, l.genotype FROM temp.candidates c
+            CROSS JOIN profiles p ON p.profile_id = c.profile_id
+            CROSS JOIN runs r ON r.run_id = p.run_id AND r.kit = ?
+            CROSS JOIN loci l ON l.profile_id = c.profile_id""", self.connection, params=(kit,))
+        df = df[df['marker'].isin(query_loci.keys())]
+        if mode == "identity":
+            df['matched'] = df['genotype'] == df['marker'].map({k: '-'.join(v) for k, v in query_loci.items()})
+        else:
+            df['matched'] = [set(query_loci[marker]).issubset(genotype.split('-'))
+                             for marker, genotype in zip(df['marker'], df['genotype'])]
+        df_result = df.groupby('profile_id').agg(shared=('marker', 'size'), matched=('matched', 'sum'))
+        df_result['mismatched'] = df_result['shared'] - df_result['matched']
+        df_result = df_result[(df_result['shared'] >= min_shared_loci) & (df_result['mismatched'] <= max_mismatch)]
+        df_result = df_result.sort_values(['mismatched', 'matched'], ascending=[True, False]).head(limit)
+
+        df_info = pd.read_sql_query("""
+            SELECT p.profile_id, r.name AS run, p.sample_name, p.date FROM temp.candidates c
+            JOIN profiles p ON p.profile_id = c.profile_id
+            JOIN runs r ON r.run_id = p.run_id""", self.connection).set_index('profile_id')
+        df_result = df_info.join(df_result, how='inner').loc[df_result.index]
+        return df_result[columns].reset_index(drop=True)
@@ -0,0 +1,166 @@
+"""
+버튼 이벤트와 데이터 로더의 실행 시간, 처리한 행 수, 읽은 파일의 크기를 기록하는 모듈
+
+configure로 로그 폴더(프로젝트 폴더의 ETC)를 지정하면 instrument로 감싼 함수가 끝날 때마다 timing.log에 한 줄씩 기록한다.
+timing.log는 일정 크기를 넘으면 timing.log.1, timing.log.2 ... 로 넘어가며 오래된 파일은 지운다.
+profile 모드를 켜면 가장 바깥쪽 작업마다 cProfile 결과를 profile 폴더에 작업명_시각.prof 파일로 저장한다.
+(python -m pstats 혹은 snakeviz 등으로 열어볼 수 있다)
+
+Functions
+---------
+configure(log_dir, profile=False, max_bytes=1048576, backup_count=5)
+    기록할 로그 폴더와 cProfile 사용 여부를 지정한다.
+instrument(name=None, rows=None)
+    함수의 실행 시간, 처리한 행 수, 읽은 파일을 기록하는 데코레이터
+note_file(path)
+    실행 중인 작업에 읽은 파일을 기록한다.
+note_rows(count)
+    실행 중인 작업에 처리한 행 수를 더한다.
+"""
+
+import os
+import time
+import datetime
+import functools
+import inspect
+import cProfile
+import logging
+from logging.handlers import RotatingFileHandler
+
+FILENAME_LOG = 'timing.log'
+DIRNAME_PROFILE = 'profile'
+
+_settings = {'log_dir': None, 'profile': False}
+_logger = logging.getLogger('NFS_Profiler')
+_logger.setLevel(logging.INFO)
+_logger.propagate = False
+_active = []   # 실행 중인 작업의 기록 (버튼 이벤트 안에서 로더를 부르는 경우처럼 중첩될 수 있음)
+
+
+def configure(log_dir, profile=False, max_bytes=1048576, backup_count=5):
+    """
+    기록할 로그 폴더와 cProfile 사용 여부를 지정한다. 다시 호출하면 이전 설정을 교체한다.
+
+    Parameters
+    ----------
+    log_dir : str
+        timing.log와 profile 폴더를 만들 폴더 (e.g. 프로젝트 폴더/ETC)
+    profile : bool, optional
+        작업마다 cProfile 결과를 저장할지 여부
+    max_bytes : int, optional
+        timing.log 하나의 최대 크기
+    backup_count : int, optional
+        남겨둘 이전 로그 파일 수
+    """
+
+    for handler in list(_logger.handlers):
+        _logger.removeHandler(handler)
+        handler.close()
+    os.makedirs(log_dir, exist_ok=True)
+    handler = RotatingFileHandler(os.path.join(log_dir, FILENAME_LOG), maxBytes=max_bytes,
+                                  backupCount=backup_count, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s\t%(message)s'))
+    _logger.addHandler(handler)
+    _settings['log_dir'] = log_dir
+    _settings['profile'] = profile
+
+
+def note_file(path):
+    """
+    실행 중인 작업에 읽은 파일을 기록한다. 실행 중인 작업이 없거나 파일이 없으면 무시한다.
+
+    Parameters
+    ----------
+    path : str
+        읽은 파일의 경로
+    """
+
+    if not _active or not path or not os.path.isfile(path):
+        return
+    for record in _active:
+        record['files'].append((os.path.basename(path), os.path.getsize(path)))
+
+
+def note_rows(count):
+    """
+    실행 중인 작업에 처리한 행 수를 더한다.
+
+    Parameters
+    ----------
+    count : int
+        처리한 행 수
+    """
+
+    for record in _active:
+        record['rows'] += count
+
+
+def instrument(name=None, rows=None):
+    """
+    함수의 실행 시간, 처리한 행 수, 읽은 파일을 기록하는 데코레이터
+
+    PyQt 시그널이 슬롯에 넘기는 인자(e.g. clicked의 checked)는 원래 함수가 받는 개수만큼만 넘긴다.
+
+    Parameters
+    ----------
+    name : str, optional
+        로그에 남길 작업명 (없으면 함수의 이름)
+    rows : callable, optional
+        함수가 끝난 후 첫번째 인자(self)를 받아 처리한 행 수를 반환하는 함수 (e.g. lambda self: len(self.df_profiles))
+    """
+
+    def decorator(func):
+        action = name or func.__name__
+        parameters = inspect.signature(func).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in parameters):
+            max_args = None
+        else:
+            max_args = len([p for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)])
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            record = {'rows': 0, 'files': []}
+            profiler = None
+            if _settings['profile'] and not _active:   # cProfile은 가장 바깥쪽 작업에서만 사용
+                profiler = cProfile.Profile()
+            _active.append(record)
+            status = 'ok'
+            start = time.perf_counter()
+            try:
+                if profiler is not None:
+                    return profiler.runcall(func, *args, **kwargs)
+                return func(*args, **kwargs)
+            except Exception as e:
+                status = type(e).__name__
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                _active.pop()
+                if rows is not None and args and status == 'ok':
+                    try:
+                        count = rows(args[0])
+                    except Exception:
+                        count = 0
+                    record['rows'] += count
+                    note_rows(count)    # 바깥쪽 작업에도 반영
+                _write(action, elapsed, record, status, profiler)
+
+        return wrapper
+
+    return decorator
+
+
+def _write(action, elapsed, record, status, profiler):
+    """작업 하나의 기록을 timing.log에 쓰고, cProfile 결과가 있으면 파일로 저장한다."""
+
+    if _settings['log_dir'] is None:
+        return
+    files = ', '.join(f"{filename}({size}B)" for filename, size in record['files'])
+    _logger.info(f"{action}\t{elapsed:.3f}s\trows={record['rows']}\tfiles={files}\tstatus={status}")
+    if profiler is not None:
+        dir_profile = os.path.join(_settings['log_dir'], DIRNAME_PROFILE)
+        os.makedirs(dir_profile, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        profiler.dump_stats(os.path.join(dir_profile, f"{action}_{stamp}.prof"))
@@ -0,0 +1,217 @@
+import os
+import shutil
+import pickle
+import pandas as pd
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_ProjectStore as NFS_ProjectStore
+
+LIST_SUBFOLDERS = ['Downloaded',    # Import한 파일들을 복사해서 저장할 위치
+                   'Sheets',        # 샘플시트들을 저장할 위치
+                   'RT',            # RT 관련 파일들을 저장할 위치
+                   'DATA',          # 리딩 후 생성된 데이터를 보관할 위치
+                   'DB',            # DB 관련된 데이터를 보관할 위치
+                   'ETC',           # 기타 생성된 시트 및 데이터를 보관할 위치
+                   'Reports',
+                   '감정물사진']     # 하위 폴더가 추가로 필요할 경우 이곳에 추가
+PATH_FORM_TOMATO = '/Form/form_Tomato_Tools_18.10_customized.xlsm'
+
+
+class DataDNAIdentification:
+    """
+    채취 한 텀에서 얻은 데이터와 해당 데이터의 저장 정보를 보관하는 클래스
+
+    Attributes
+    ----------
+    location_save : str
+        해당 텀의 데이터를 보관하는 폴더의 위치
+    analyst : str
+        해당 텀에 담당자
+    date : str
+        채취 일자
+    df_evidence : pandas.DataFrame
+        NFIS 상에서 다운로드한 감정처리부 데이터와 감정처리부를 가공한 데이터, 실험 여부 등을 감정물 별로 저장하는 데이터프레임
+    nfis_loaded : bool
+        NFIS 파일을 df_evidence에 입력했는지 여부
+    list_tag : list
+        감정물의 기본 분류 (e.g REF, LCN)
+    path_tomato : string
+        해당 프로젝트의 tomato 파일 경로
+    path_totalsheet : string
+        해당 프로젝트의 total_sheet 파일 경로
+    path_resamplesheet : string
+        해당 프로젝트의 RESAMPLING 파일 경로
+    path_picture : string
+        해당 프로젝트의 감정물 사진이 보관된 폴더 경로
+    path_profile_db : string
+        여러 텀의 프로파일을 누적 저장하는 데이터베이스 파일 경로(프로젝트 폴더들의 상위 폴더에 위치)
+    combined_result : NFS_DNA.CombinedResult
+        Tomato 파일에서 CombinedResult 탭의 정보를 parsing한
+    Methods
+    -------
+    change_path(path)
+        EntryForm에서 ddi를 불러들일 때 ddi가 위치했던 경로로 각종 파일의 경로를 변경(폴더가 생성 위치에서 옮겨졌을 때 대비)
+    get_defaultname()
+        파일 이름에 쓰일 기본 이름(날짜+담당자(+ 특이사항))을 반환한다.
+    __getattr__(name)
+        ProjectStore에서 불러온 객체의 아직 읽지 않은 테이블(e.g. combined_result)을 처음 접근할 때 읽어온다.
+    """
+
+    def __init__(self, location_save, analyst, date):
+        """
+        Parameters
+        ----------
+        location_save : str
+             해당 텀의 데이터를 보관하는 폴더의 위치
+        analyst : str
+            해당 텀에 담당자
+        date : str
+            채취 일자
+        """
+
+        self.location_save = location_save
+        self.analyst = analyst
+        self.date = date
+        self.df_evidence = pd.DataFrame()   # NFIS감정처리부 파일을 DataFrame으로 저장
+        self.df_report = pd.DataFrame() # 감정서 작성용 DataFrame
+        self.nfis_loaded = False
+        self.list_tag = ['LCN', 'MF', 'REF'] # 기본분류
+        self.path_tomato = location_save + '/' + date + '-' + analyst + '-Tomato-TOTAL.xlsm'
+        self.path_tomato_y23 = location_save + '/' + date + '-' + analyst + '-Tomato-Y23.xlsm'
+        self.path_totalsheet = location_save + '/Sheets/' + date + '-' + analyst + '-' + 'TOTAL.xlsm'
+        self.path_resamplesheet = location_save + '/Sheets/' + date + '-' + analyst + '-' + 'RESAMPLING.xlsm'
+        self.path_picture = location_save + '/감정물사진/'
+        self.path_profile_db = os.path.dirname(location_save) + '/ProfileDB.sqlite'
+        self.combined_result = NFS_DNA.CombinedResult(kit="GF/PPF")
+        self.combined_result_y23 = NFS_DNA.CombinedResult(kit="Y23")
+
+    def __getattr__(self, name):
+        """
+        ProjectStore에서 불러온 객체의 아직 읽지 않은 테이블을 처음 접근할 때 읽어온다.
+
+        Parameter
+        ---------
+        name : str
+            접근한 속성명
+        """
+
+        store = self.__dict__.get('_store')
+        if store is not None and name in store.TABLES:
+            value = store.load_table(name)
+            setattr(self, name, value)
+            return value
+        raise AttributeError(name)
+
+    def change_path(self, path):
+        """
+        EntryForm에서 ddi를 불러들일 때 ddi가 위치했던 경로로 각종 파일의 경로를 변경(폴더가 생성 위치에서 옮겨졌을 때 대비)
+
+        Parameter
+        ---------
+        path : str
+            변경할 폴더 위치
+        """
+        self.location_save = path
+        self.path_tomato = path + '/' + self.date + '-' + self.analyst + '-Tomato-TOTAL.xlsm'
+        self.path_totalsheet = path + '/Sheets/' + self.date + '-' + self.analyst + '-' + 'TOTAL.xlsm'
+        self.path_resamplesheet = path + '/Sheets/' + self.date + '-' + self.analyst + '-' + 'RESAMPLING.xlsm'
+        self.path_picture = path + '/감정물사진/'
+        self.path_profile_db = os.path.dirname(path) + '/ProfileDB.sqlite'
+
+    def get_defaultname(self):
+        """
+        파일 이름에 쓰일 기본 이름(날짜+담당자)을 반환한다.
+
+        Returns
+        -------
+        str
+            기본 파일명(채취날짜_담당자))
+        """
+        defaultname = '%s-%s' % (self.date, self.analyst)
+        return defaultname
+
+
+class ProjectUnpickler(pickle.Unpickler):
+    """
+    이전 버전의 DataDNAIdentification.pickle을 읽는 Unpickler
+
+    main_suite.py를 직접 실행해서 저장한 pickle은 클래스 위치가 __main__으로 기록되어 있으므로
+    어느 모듈에서 읽더라도 이 모듈의 DataDNAIdentification으로 연결한다.
+    """
+
+    def find_class(self, module, name):
+        if name == 'DataDNAIdentification':
+            return DataDNAIdentification
+        return super().find_class(module, name)
+
+
+def load_project(location):
+    """
+    프로젝트 폴더의 DataDNAIdentification 객체를 읽어서 반환한다.
+
+    폴더에 ProjectStore가 있으면 메타데이터만 읽고 테이블은 처음 사용할 때 읽는다.
+    ProjectStore가 없는 이전 버전의 폴더는 DataDNAIdentification.pickle 파일을 unpickle한다.
+    폴더가 옮겨졌을 경우에 대비해 각종 파일의 경로를 해당 폴더 기준으로 바꾼다.
+
+    Parameters
+    ----------
+    location : str
+        프로젝트 폴더의 경로
+
+    Returns
+    -------
+    DataDNAIdentification
+        불러온 객체
+
+    Raises
+    ------
+    UnpicklingError
+        pickling된 DataDNAIdentification 객체를 unpickle하는 작업이 실패할 경우
+    IOError
+        잘못된 폴더 또는 파일명(e.g. pickle파일이 없는 폴더)을 처리할 경우
+    """
+
+    project_store = NFS_ProjectStore.ProjectStore(location)
+    if project_store.exists():
+        ddi = project_store.load(DataDNAIdentification)
+    else:
+        with open('%s/%s' % (location, 'DataDNAIdentification.pickle'), 'rb') as f:
+            ddi = ProjectUnpickler(f).load()
+    ddi.change_path(location)
+    return ddi
+
+
+def create_project(location_save, analyst, date, root):
+    """
+    '채취날짜_감정인'을 이름으로 가지는 프로젝트 폴더와 하위 폴더, Tomato 파일(TOTAL, Y23)을 만들고
+    DataDNAIdentification 객체를 생성해서 반환한다. (EntryForm의 새 폴더 생성, batch_suite --new)
+
+    Parameters
+    ----------
+    location_save : str
+        프로젝트 폴더를 만들 상위 폴더의 경로
+    analyst : str
+        해당 텀에 담당자
+    date : str
+        채취 일자 (yyyyMMdd)
+    root : str
+        프로그램 폴더의 경로(Form 폴더의 Tomato 서식 파일을 찾을 때 사용)
+
+    Returns
+    -------
+    DataDNAIdentification
+        생성한 객체
+
+    Raises
+    ------
+    FileExistsError
+        같은 이름의 폴더가 있는 경우
+    """
+
+    location = os.path.realpath('%s/%s_%s' % (location_save, date, analyst)).replace('\\', '/')
+    os.mkdir(location)
+    for folder in LIST_SUBFOLDERS:
+        os.mkdir(location + '/' + folder)
+    ddi = DataDNAIdentification(location_save=location, analyst=analyst, date=date)
+    shutil.copyfile(root + PATH_FORM_TOMATO, ddi.path_tomato)
+    shutil.copyfile(root + PATH_FORM_TOMATO, ddi.path_tomato_y23)
+    return ddi
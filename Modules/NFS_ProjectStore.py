@@ -0,0 +1,145 @@
+import os
+import json
+import pickle
+import hashlib
+import pandas as pd
+
+
+class ProjectStore():
+    """
+    DataDNAIdentification 객체를 통째로 pickle하는 대신 테이블별 파일과 작은 메타데이터 파일로 나눠 저장하는 클래스
+
+    테이블은 마지막으로 저장(혹은 로드)한 내용의 digest와 비교해서 바뀐 것만 다시 쓴다.
+    DataFrame은 행 해시로, revision을 가진 객체(CombinedResult)는 revision으로 digest를 구하므로 직렬화하지 않고 비교한다.
+    모든 파일은 임시 파일에 쓴 뒤 os.replace로 교체하므로 저장 중 프로그램이 종료되어도 이전 파일이 남는다.
+    메타데이터 파일은 테이블을 모두 쓴 다음 마지막에 교체한다.
+
+    Attributes
+    ----------
+    location : str
+        저장 폴더(프로젝트 폴더/ProjectStore)의 경로
+    digests : dict
+        테이블명-마지막으로 저장 혹은 로드한 내용의 digest
+
+    Methods
+    --------
+    exists()
+        저장 폴더에 메타데이터 파일이 있는지 여부를 반환
+    save(ddi)
+        ddi의 속성과 바뀐 테이블을 저장하고 저장한 테이블명의 리스트를 반환
+    load(ddi_class)
+        메타데이터만 읽어서 ddi_class 객체를 생성하여 반환. 테이블은 처음 접근할 때 load_table로 읽는다.
+    load_table(name)
+        해당 테이블 파일을 읽어서 반환
+    """
+
+    DIRNAME = 'ProjectStore'
+    FILENAME_META = 'project.json'
+    TABLES = ['df_evidence', 'df_report', 'combined_result', 'combined_result_y23']   # 따로 저장할 속성
+
+    def __init__(self, location_save):
+        self.location = os.path.join(location_save, self.DIRNAME)
+        self.digests = {}
+
+    def exists(self):
+        """저장 폴더에 메타데이터 파일이 있는지 여부를 반환"""
+
+        return os.path.isfile(os.path.join(self.location, self.FILENAME_META))
+
+    def __write_atomic(self, filename, data):
+        """임시 파일에 data를 쓴 후 filename으로 교체한다."""
+
+        path = os.path.join(self.location, filename)
+        path_temp = path + '.tmp'
+        with open(path_temp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path_temp, path)
+
+    def __digest(self, value):
+        """
+        테이블의 digest와 (이미 직렬화했다면) 직렬화된 데이터를 반환
+
+        DataFrame은 pandas의 행 해시로, revision 속성을 가진 객체는 revision으로 digest를 구하므로 바뀌지 않은 테이블은 직렬화하지 않는다.
+        revision이 없는 객체(이전 버전의 CombinedResult 등)는 직렬화한 데이터의 md5를 사용한다.
+        """
+
+        revision = getattr(value, 'revision', None)
+        if revision is not None:
+            return 'revision:' + revision, None
+        if isinstance(value, pd.DataFrame):
+            try:
+                hashes = pd.util.hash_pandas_object(value, index=True).values
+                md5 = hashlib.md5(hashes.tobytes())
+                md5.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode('utf-8'))
+                return md5.hexdigest(), None
+            except TypeError:   # list 등 해시할 수 없는 값이 있는 경우
+                pass
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return hashlib.md5(data).hexdigest(), data
+
+    def save(self, ddi):
+        """
+        ddi의 속성과 바뀐 테이블을 저장하고 저장한 테이블명의 리스트를 반환
+
+        아직 읽지 않은 테이블(ddi.__dict__에 없는 테이블)은 바뀌지 않았으므로 건너뛴다.
+
+        Parameters
+        ----------
+        ddi : DataDNAIdentification
+            저장할 객체
+        """
+
+        os.makedirs(self.location, exist_ok=True)
+        written = []
+        for name in self.TABLES:
+            if name not in ddi.__dict__:
+                continue
+            value = ddi.__dict__[name]
+            digest, data = self.__digest(value)
+            if self.digests.get(name) == digest:
+                continue
+            if data is None:
+                data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            self.__write_atomic(name + '.pickle', data)
+            self.digests[name] = digest
+            written.append(name)
+        attributes = {key: value for key, value in ddi.__dict__.items()
+                      if key not in self.TABLES and not key.startswith('_')}
+        meta = {'version': 1, 'attributes': attributes, 'tables': self.digests}
+        self.__write_atomic(self.FILENAME_META, json.dumps(meta, ensure_ascii=False, indent=1).encode('utf-8'))
+        return written
+
+    def load(self, ddi_class):
+        """
+        메타데이터만 읽어서 ddi_class 객체를 생성하여 반환한다.
+
+        테이블은 객체에 넣지 않고, 객체가 처음 접근할 때 load_table로 읽도록 _store에 자신을 넣어둔다.
+
+        Parameters
+        ----------
+        ddi_class : type
+            생성할 객체의 클래스(DataDNAIdentification)
+        """
+
+        with open(os.path.join(self.location, self.FILENAME_META), 'rb') as f:
+            meta = json.loads(f.read().decode('utf-8'))
+        ddi = ddi_class.__new__(ddi_class)
+        ddi.__dict__.update(meta['attributes'])
+        ddi._store = self
+        self.digests = dict(meta['tables'])
+        return ddi
+
+    def load_table(self, name):
+        """
+        해당 테이블 파일을 읽어서 반환
+
+        Parameters
+        ----------
+        name : str
+            읽을 테이블명 (TABLES 중 하나)
+        """
+
+        with open(os.path.join(self.location, name + '.pickle'), 'rb') as f:
+            return pickle.load(f)
@@ -0,0 +1,118 @@
+"""
+RT(정량) 결과로 웰별 분해 지수, 남성 DNA 비율, 증폭 저해 여부와 STR 증폭에 넣을 DNA/TE 부피를 계산하는 모듈
+
+NFS_RT.read_rt_result의 결과(웰-정량 대상별 한 행)를 웰별 한 행으로 펼친 후 플레이트 전체를 배열 연산으로 한 번에 계산한다.
+여러 플레이트의 결과(plate 칼럼이 있는 경우)는 (플레이트, 웰)별 한 행으로 펼친다.
+    degradation_index : Small Autosomal / Large Autosomal (클수록 분해가 심함)
+    male_ratio : Y / Small Autosomal
+    inhibited : IPC의 Ct가 플레이트 기준값(중앙값)보다 ipc_shift 이상 늦거나, DNA가 적은데 IPC가 검출되지 않은 경우
+증폭 부피는 Small Autosomal 정량값(ng/µL)으로 target_ng을 넣는 DNA 부피를 구하고,
+DNA 부피가 최소 분주량보다 작으면 DILUTION_FACTORS 중 가장 작은 희석 배수로 희석해서 계산한다.
+DNA 부피가 최대 부피를 넘거나 정량값이 없으면 최대 부피만큼 원액을 넣는다.
+
+Functions
+---------
+quant_table(df_rt)
+    RT 결과를 well, sample, small, large, y, ipc_ct 칼럼의 웰별 데이터프레임으로 반환한다.
+plan_amplification(df_rt, target_ng=1.0, max_volume=15.0, min_volume=1.0, ipc_shift=1.0, ipc_reference=None, degraded_index=10.0)
+    웰별 분해 지수, 남성 비율, 저해 여부, 희석 배수, DNA/TE 부피를 계산한 데이터프레임을 반환한다.
+"""
+
+import numpy as np
+
+DILUTION_FACTORS = (1, 10, 100, 1000)
+TARGETS = {'small': 'small', 'sa': 'small', 'large': 'large', 'la': 'large', 'y': 'y', 'ipc': 'ipc'}
+COLUMNS_PLAN = ['well', 'sample', 'small', 'large', 'y', 'ipc_ct', 'degradation_index', 'male_ratio',
+                'inhibited', 'degraded', 'dilution_factor', 'volume_dna', 'volume_te']
+
+
+def _target_key(target):
+    """정량 대상명(e.g. T.Small Autosomal, T.IPC)을 small, large, y, ipc 중 하나로 바꾼다. 해당하지 않으면 None."""
+
+    name = target.strip().lower().split('.')[-1].strip()
+    return TARGETS.get(name.split(' ')[0])
+
+
+def quant_table(df_rt):
+    """
+    RT 결과를 웰별 한 행의 데이터프레임으로 펼친다. 샘플명이 없는 웰은 제외한다.
+
+    Parameters
+    ----------
+    df_rt : DataFrame
+        NFS_RT.read_rt_result의 반환값 (plate 칼럼이 있으면 플레이트별로 구분)
+
+    Returns
+    -------
+    DataFrame
+        (plate,) well, sample, small, large, y(ng/µL, 미검출은 NaN), ipc_ct 칼럼의 데이터프레임 (웰 순서 유지)
+    """
+
+    keys = ['plate', 'well'] if 'plate' in df_rt.columns else ['well']
+    df = df_rt[df_rt['sample'] != ""].copy()
+    df['key'] = df['target'].map(_target_key)
+    df = df.dropna(subset=['key'])
+    wells = df.drop_duplicates(keys)[keys + ['sample']].set_index(keys)
+    quantity = df[df['key'] != 'ipc'].pivot_table(index=keys, columns='key', values='quantity', aggfunc='first')
+    ipc = df[df['key'] == 'ipc'].groupby(keys)['ct'].first().rename('ipc_ct')
+    df_quant = wells.join(quantity.reindex(columns=['small', 'large', 'y'])).join(ipc)
+    return df_quant.reindex(columns=['sample', 'small', 'large', 'y', 'ipc_ct']).reset_index()
+
+
+def plan_amplification(df_rt, target_ng=1.0, max_volume=15.0, min_volume=1.0, ipc_shift=1.0,
+                       ipc_reference=None, degraded_index=10.0):
+    """
+    웰별 분해 지수, 남성 DNA 비율, 증폭 저해 여부와 STR 증폭에 넣을 희석 배수, DNA 부피, TE 부피를 계산한다.
+
+    Parameters
+    ----------
+    df_rt : DataFrame
+        NFS_RT.read_rt_result의 반환값
+    target_ng : float, optional
+        증폭에 넣을 DNA 양 (ng)
+    max_volume : float, optional
+        증폭 반응에 넣을 수 있는 시료의 최대 부피 (µL, DNA + TE)
+    min_volume : float, optional
+        정확하게 분주할 수 있는 최소 부피 (µL). DNA 부피가 이보다 작으면 희석한다.
+    ipc_shift : float, optional
+        IPC의 Ct가 기준값보다 이만큼 이상 늦으면 저해로 판단
+    ipc_reference : float, optional
+        IPC Ct의 기준값. 없으면 플레이트 전체 IPC Ct의 중앙값
+    degraded_index : float, optional
+        분해로 판단할 분해 지수
+
+    Returns
+    -------
+    DataFrame
+        COLUMNS_PLAN 칼럼의 웰별 데이터프레임
+    """
+
+    df = quant_table(df_rt)
+    small = df['small'].to_numpy(dtype=float)
+    large = df['large'].to_numpy(dtype=float)
+    y = df['y'].to_numpy(dtype=float)
+    ipc_ct = df['ipc_ct'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['degradation_index'] = np.where(large > 0, small / large, np.nan)
+        df['male_ratio'] = np.where(small > 0, y / small, np.nan)
+    if ipc_reference is None:
+        ipc_reference = np.nanmedian(ipc_ct) if np.isfinite(ipc_ct).any() else np.nan
+    # DNA 양이 많으면 IPC가 경쟁으로 검출되지 않을 수 있으므로 DNA가 적을 때만 IPC 미검출을 저해로 봄
+    low_dna = ~(small > target_ng / max_volume)
+    df['inhibited'] = (ipc_ct - ipc_reference > ipc_shift) | (np.isnan(ipc_ct) & low_dna & np.isfinite(ipc_reference))
+    df['degraded'] = df['degradation_index'] > degraded_index
+
+    # 희석 배수별로 필요한 DNA 부피를 한 번에 계산하고, 최소 분주량 이상이 되는 가장 작은 배수를 고른다.
+    factors = np.array(DILUTION_FACTORS, dtype=float)
+    concentration = np.where(small > 0, small, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volumes = target_ng / (concentration[:, None] / factors[None, :])
+    usable = volumes >= min_volume
+    idx_factor = np.where(usable.any(axis=1), usable.argmax(axis=1), len(factors) - 1)
+    volume_dna = volumes[np.arange(len(df)), idx_factor]
+    dilution_factor = factors[idx_factor]
+    undiluted = ~np.isfinite(volume_dna) | (volume_dna > max_volume)
+    df['dilution_factor'] = np.where(undiluted, 1, dilution_factor).astype(int)
+    df['volume_dna'] = np.round(np.where(undiluted, max_volume, volume_dna), 2)
+    df['volume_te'] = np.round(max_volume - df['volume_dna'], 2)
+    return df[(['plate'] if 'plate' in df.columns else []) + COLUMNS_PLAN]
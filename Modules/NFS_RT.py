@@ -0,0 +1,374 @@
+"""
+sds7500 RT-PCR(정량)의 import 파일을 작성하고, 결과 파일을 Excel 없이 읽어서 샘플시트에 정량값을 반영하는 모듈
+
+import 파일은 키트(assay)별 정량 대상의 정의(대상명, 색, reporter, quencher)로 웰마다 대상 수만큼의 줄을 쓴다.
+키트는 DICT_ASSAYS에 있고, 프로그램 폴더의 Settings/rt_assays.csv(assay, target, target_color, reporter, quencher 칼럼)로
+추가하거나 바꿀 수 있다.
+
+결과 파일은 장비에서 내보낸 xls(바이너리), xlsx, 혹은 텍스트(탭 구분) 형식을 모두 읽는다.
+형식은 확장자가 아니라 파일의 앞부분으로 판단한다. (장비가 텍스트 파일을 .xls로 저장하는 경우가 있음)
+xls는 xlrd(pip install xlrd)로 읽고, xlrd가 없으면 Windows에서는 Excel 세션(NFS_Session)으로 xlsx로 변환해서 읽는다.
+    * Block Type = 96alum       <- '*'로 시작하는 실험 정보
+    [Results]                   <- 텍스트 형식은 섹션 구분이 있음
+    Well  Sample Name  Target Name  Task  ...  CT  Ct Mean  Ct SD  Quantity  Quantity Mean ...
+    A1    2020-D-1234-1  IPC  ...
+    A1    2020-D-1234-1  Large Autosomal  ...
+Well 칼럼으로 시작하는 헤더 행을 찾아 칼럼명으로 값을 읽으므로 행의 위치(웰당 4줄, 빈 웰은 1줄)에 의존하지 않는다.
+
+Classes
+-------
+RTSheetWriter
+    키트 정의로 정량 대상별 줄 서식을 미리 만들어 두고 웰 데이터프레임 전체를 한 번에 import 파일로 쓰는 클래스
+
+Functions
+---------
+load_assays(path)
+    키트 정의 csv 파일을 읽어 DICT_ASSAYS에 더한 딕셔너리를 반환한다.
+read_rt_result(path, sessions=None)
+    RT 결과 파일을 well, sample, target, ct, quantity 칼럼의 데이터프레임으로 반환한다.
+well_index(wells)
+    웰 이름(e.g. A1)을 열 우선 순서의 index(A1->0, B1->1, ...)로 변환한다.
+write_quantities(worksheet, df_rt, row_start=3)
+    샘플시트 TOTAL 시트에 웰별 정량값을 기록한다.
+import_result(df_rt, path_samplingsheet, sheet_name="TOTAL")
+    RT 결과를 샘플시트에 기록하고 저장한다.
+"""
+
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+import Modules.NFS_Session as NFS_Session
+
+COLUMN_ALIASES = {'well': ('Well Position', 'Well'),
+                  'sample': ('Sample Name',),
+                  'target': ('Target Name', 'Detector Name', 'Detector', 'Target'),
+                  'ct': ('CT', 'Ct', 'Cт', 'C T'),
+                  'quantity': ('Quantity Mean', 'Qty Mean', 'Quantity', 'Qty')}    # 앞쪽 칼럼명을 우선 사용
+COLUMNS_TARGET = {'large': 8, 'small': 6, 'y': 7}   # 정량 대상-샘플시트 TOTAL 시트의 열 번호
+ROWS_PLATE = 'ABCDEFGH'
+NUM_COLUMNS_PLATE = 12
+PATH_ASSAYS = '/Settings/rt_assays.csv'     # 프로그램 폴더 기준 추가 키트 정의 파일
+DEFAULT_ASSAY = 'Quantifiler Trio'
+SAMPLE_COLOR = '"RGB(255,153,204)"'
+# 키트-정량 대상별 (대상명, 대상 색, reporter, quencher). 파일에 쓰는 순서대로
+DICT_ASSAYS = {'Quantifiler Trio': (('T.IPC', '"RGB(255,0,0)"', 'JUN', 'QSY7'),
+                                    ('T.Large Autosomal', '"RGB(0,0,0)"', 'ABY', 'QSY7'),
+                                    ('T.Small Autosomal', '"RGB(0,128,0)"', 'VIC', 'NFQ-MGB'),
+                                    ('T.Y', '"RGB(0,0,255)"', 'FAM', 'NFQ-MGB'))}
+
+
+def load_assays(path):
+    """
+    키트 정의 csv 파일(assay, target, target_color, reporter, quencher 칼럼, 파일의 행 순서가 쓰는 순서)을 읽어
+    DICT_ASSAYS에 더한 키트-정량 대상 정의 딕셔너리를 반환한다. 같은 이름의 키트는 파일의 정의로 바꾼다.
+
+    Parameters
+    ----------
+    path : str
+        키트 정의 csv 파일의 경로
+    """
+
+    assays = dict(DICT_ASSAYS)
+    df = pd.read_csv(path, dtype=str).fillna("")
+    for assay, group in df.groupby('assay', sort=False):
+        assays[assay] = tuple(group[['target', 'target_color', 'reporter', 'quencher']].itertuples(index=False, name=None))
+    return assays
+
+
+class RTSheetWriter():
+    """
+    키트 정의로 정량 대상별 줄 서식을 한 번만 만들어 두고, 웰 데이터프레임 전체를 한 번에 RT import 파일로 쓰는 클래스
+
+    Attributes
+    ----------
+    assay : str
+        키트 이름
+    targets : tuple
+        (대상명, 대상 색, reporter, quencher)의 tuple
+    header : str
+        서식 파일(form_RT.txt)의 내용
+
+    Methods
+    --------
+    render(df)
+        웰 데이터프레임을 import 파일의 본문 문자열로 변환한다.
+    write(filename, df)
+        서식 파일의 내용과 본문을 한 번에 파일로 쓴다.
+    """
+
+    def __init__(self, path_form, assay=DEFAULT_ASSAY, assays=None, task='UNKNOWN', sample_color=SAMPLE_COLOR):
+        """
+        Parameters
+        ----------
+        path_form : str
+            RT import 파일의 서식 파일(실험 정보와 [Sample Setup] 헤더)의 경로
+        assay : str, optional
+            키트 이름
+        assays : dict, optional
+            키트-정량 대상 정의 딕셔너리 (없으면 DICT_ASSAYS)
+        task : str, optional
+            웰의 Task
+        sample_color : str, optional
+            샘플 색
+
+        Raises
+        ------
+        ValueError
+            정의되지 않은 키트인 경우
+        """
+
+        assays = DICT_ASSAYS if assays is None else assays
+        if assay not in assays:
+            raise ValueError(f"Unknown RT assay : {assay}")
+        self.assay = assay
+        self.targets = tuple(assays[assay])
+        with open(path_form, mode='r') as f:
+            self.header = f.read()
+        # 웰, 샘플명 뒤에 붙는 대상별 줄의 나머지 부분
+        self.__suffixes = ['\t' + '\t'.join([sample_color, target, target_color, task, reporter, quencher])
+                           for target, target_color, reporter, quencher in self.targets]
+
+    def render(self, df):
+        """
+        웰 데이터프레임을 웰마다 정량 대상 수만큼의 줄로 변환한 본문 문자열로 반환한다.
+
+        Parameters
+        ----------
+        df : DataFrame
+            well, sample 칼럼을 가진 데이터프레임 (행 순서대로 씀)
+        """
+
+        if len(df) == 0:
+            return ""
+        prefix = df['well'].astype(str) + '\t' + df['sample'].astype(str)
+        lines = np.column_stack([(prefix + suffix).to_numpy() for suffix in self.__suffixes])   # 웰 x 대상
+        return '\n'.join(lines.ravel()) + '\n'
+
+    def write(self, filename, df):
+        """
+        서식 파일의 내용 뒤에 웰 데이터프레임의 본문을 붙여 한 번에 파일로 쓰고 경로를 반환한다.
+
+        Parameters
+        ----------
+        filename : str
+            저장할 RT import 파일의 경로
+        df : DataFrame
+            well, sample 칼럼을 가진 데이터프레임
+        """
+
+        with open(filename, mode='w') as f:
+            f.write(self.header + self.render(df))
+        return filename
+
+
+def _read_excel_grid(path, engine):
+    sheets = pd.read_excel(path, sheet_name=None, header=None, dtype=object, engine=engine)
+    return sheets.get('Results', next(iter(sheets.values())))
+
+
+def _read_xls_grid(path, sessions=None):
+    """xls(바이너리) 결과 파일을 읽는다. xlrd가 없으면 Excel 세션으로 xlsx로 변환해서 읽는다."""
+
+    try:
+        import xlrd     # noqa: F401 (pandas의 xls 엔진)
+    except ImportError:
+        if sessions is None and NFS_Session.DEFAULT_BACKEND != 'com':
+            raise ImportError(f"Reading the xls file {path} needs xlrd (pip install xlrd) or Excel. "
+                              f"Export the RT result as text or xlsx instead.") from None
+    else:
+        return _read_excel_grid(path, 'xlrd')
+    pool = sessions or NFS_Session.SessionPool(max_uses=None)
+    location_temp = tempfile.mkdtemp()
+    try:
+        with pool.session('excel') as excel:
+            path_xlsx = excel.convert(os.path.realpath(path), os.path.join(location_temp, 'result.xlsx'))
+        return _read_excel_grid(path_xlsx, 'openpyxl')
+    finally:
+        if sessions is None:
+            pool.shutdown()
+        shutil.rmtree(location_temp, ignore_errors=True)
+
+
+def _read_grid(path, sessions=None):
+    """결과 파일을 헤더 없는 문자열 격자(데이터프레임)로 읽는다. 텍스트 형식은 [Results] 섹션만 읽는다."""
+
+    with open(path, 'rb') as f:
+        magic = f.read(8)
+    if magic.startswith(b'\xd0\xcf\x11\xe0'):  # xls(OLE2)
+        return _read_xls_grid(path, sessions)
+    if magic.startswith(b'PK'):  # xlsx(zip)
+        return _read_excel_grid(path, 'openpyxl')
+    with open(path, encoding='utf-8', errors='replace') as f:
+        lines = f.read().splitlines()
+    sections = [i for i, line in enumerate(lines) if line.strip().lower() == '[results]']
+    if sections:
+        lines = lines[sections[0] + 1:]
+        end = [i for i, line in enumerate(lines) if line.startswith('[')]
+        lines = lines[:end[0]] if end else lines
+    return pd.DataFrame([line.split('\t') for line in lines if line.strip() != ""], dtype=object)
+
+
+def _well_name(well):
+    """웰 번호(1~96, 행 우선)를 웰 이름으로 바꾼다. 이미 웰 이름이면 그대로 반환한다."""
+
+    well = str(well).strip()
+    if well.isdigit():
+        number = int(well) - 1
+        return f"{ROWS_PLATE[number // NUM_COLUMNS_PLATE]}{number % NUM_COLUMNS_PLATE + 1}"
+    return well.upper()
+
+
+def read_rt_result(path, sessions=None):
+    """
+    RT 결과 파일(xls, xlsx, 텍스트)을 읽어 웰-정량 대상별 한 행의 데이터프레임으로 반환한다.
+
+    Parameters
+    ----------
+    path : str
+        RT 결과 파일의 경로
+    sessions : NFS_Session.SessionPool, optional
+        xlrd가 없을 때 xls 파일을 xlsx로 변환할 Excel 세션 풀 (없으면 Windows에서만 임시로 만들어 사용)
+
+    Returns
+    -------
+    DataFrame
+        well(e.g. A1), sample, target, ct(Undetermined는 NaN), quantity(없으면 NaN) 칼럼의 데이터프레임
+
+    Raises
+    ------
+    ValueError
+        Well 칼럼으로 시작하는 헤더 행이나 필요한 칼럼이 없는 경우
+    ImportError
+        xls 파일인데 xlrd와 Excel이 모두 없는 경우
+    """
+
+    grid = _read_grid(path, sessions)
+    first = grid.iloc[:, 0].astype(str).str.strip()
+    header = np.nonzero((first == 'Well').to_numpy())[0]
+    if len(header) == 0:
+        raise ValueError(f"No result header in {path}")
+    names = grid.iloc[header[0]].astype(str).str.strip().tolist()
+    data = grid.iloc[header[0] + 1:].reset_index(drop=True)
+    columns = {}
+    for key, aliases in COLUMN_ALIASES.items():
+        found = [names.index(alias) for alias in aliases if alias in names]
+        if found:
+            columns[key] = data.iloc[:, found[0]]
+    if 'well' not in columns or 'target' not in columns:
+        raise ValueError(f"Well or Target column not found in {path}")
+    empty = pd.Series(np.nan, index=data.index, dtype=object)
+    df = pd.DataFrame({'well': columns['well'],
+                       'sample': columns.get('sample', empty),
+                       'target': columns['target'],
+                       'ct': pd.to_numeric(columns.get('ct', empty), errors='coerce'),
+                       'quantity': pd.to_numeric(columns.get('quantity', empty), errors='coerce')})
+    df = df[df['well'].notna() & (df['well'].astype(str).str.strip() != "")]
+    df['well'] = df['well'].map(_well_name)
+    df['sample'] = df['sample'].fillna("").astype(str).str.strip()
+    df['target'] = df['target'].fillna("").astype(str).str.strip()
+    return df.reset_index(drop=True)
+
+
+def well_index(wells):
+    """
+    웰 이름(e.g. A1)을 8x12 플레이트의 열 우선 index(A1->0, B1->1, ..., H12->95)로 변환한다.
+
+    Parameters
+    ----------
+    wells : Series
+        웰 이름
+    """
+
+    wells = wells.astype(str).str.strip().str.upper()
+    rows = wells.str[0].map({alphabet: i for i, alphabet in enumerate(ROWS_PLATE)})
+    numbers = pd.to_numeric(wells.str[1:], errors='coerce')
+    return (numbers - 1) * len(ROWS_PLATE) + rows
+
+
+def _target_column(target):
+    """정량 대상명(e.g. T.Large Autosomal, T.Small Autosomal, T.Y)에 해당하는 TOTAL 시트의 열 번호를 반환한다. IPC 등은 None."""
+
+    target = target.strip().lower().split('.')[-1].strip()   # RT import 파일의 'T.' 접두어 제거
+    if target.find('large') != -1 or target == 'la':
+        return COLUMNS_TARGET['large']
+    if target.find('small') != -1 or target == 'sa':
+        return COLUMNS_TARGET['small']
+    if target == 'y' or target.startswith('y ') or target.find('male') != -1:
+        return COLUMNS_TARGET['y']
+    return None
+
+
+def write_quantities(worksheet, df_rt, row_start=3):
+    """
+    샘플시트 TOTAL 시트의 웰 순서(A1, B1, ... 열 우선) 행에 정량값(Large autosomal, Small autosomal, Y)을 기록한다.
+    df_rt에 row 칼럼(NFS_Plate.match_plates로 붙인 TOTAL 시트의 행)이 있으면 웰 순서 대신 해당 행에 기록한다.
+
+    row 칼럼이 없으면 웰이 TOTAL 시트의 위치와 같다고 보므로(한 플레이트에 TOTAL 시트의 위치대로 배치한 경우),
+    여러 플레이트의 결과이거나 웰 위치의 TOTAL 시트 샘플명(3번째 열)이 결과의 샘플명과 다르면(빈 웰 없이 채운 배치) 기록하지 않는다.
+    샘플명이 없는 웰은 건너뛰고, 정량값이 없는 경우 0을 기록한다.
+
+    Parameters
+    ----------
+    worksheet : openpyxl.worksheet.worksheet.Worksheet
+        샘플시트의 TOTAL 시트
+    df_rt : DataFrame
+        read_rt_result의 반환값
+    row_start : int, optional
+        A1 웰에 해당하는 행 번호
+
+    Returns
+    -------
+    int
+        정량값을 기록한 웰 수
+
+    Raises
+    ------
+    ValueError
+        row 칼럼 없이 웰 위치로 TOTAL 시트의 행을 정할 수 없는 경우 (플레이트 배치 파일이 없는 경우)
+    """
+
+    df = df_rt[df_rt['sample'] != ""].copy()
+    df['column'] = df['target'].map(_target_column)
+    if 'row' not in df.columns:
+        if 'plate' in df.columns and df['plate'].nunique() > 1:
+            raise ValueError("RT results of several plates need the plate map (RT/<sheet>_RT_plates.csv).")
+        df['row'] = well_index(df['well']) + row_start
+        df_check = df.dropna(subset=['row']).drop_duplicates(['row'])
+        names = [str(worksheet.cell(row=row, column=3).value or "").strip() for row in df_check['row'].astype(int).tolist()]
+        mismatched = df_check[df_check['sample'].to_numpy() != np.array(names, dtype=object)]
+        if len(mismatched) != 0:
+            raise ValueError(f"Well {mismatched['well'].iloc[0]} ({mismatched['sample'].iloc[0]}) does not match the "
+                             f"sampling sheet row. The plate map (RT/<sheet>_RT_plates.csv) is missing.")
+    df = df.dropna(subset=['column', 'row']).drop_duplicates(['row', 'column'], keep='first')
+    values = df['quantity'].fillna(0).tolist()
+    for row, column, value in zip(df['row'].astype(int).tolist(), df['column'].astype(int).tolist(), values):
+        worksheet.cell(row=row, column=column).value = value
+    return df['row'].nunique()
+
+
+def import_result(df_rt, path_samplingsheet, sheet_name="TOTAL"):
+    """
+    RT 결과의 정량값을 샘플시트의 TOTAL 시트에 기록하고 저장한다.
+
+    Parameters
+    ----------
+    df_rt : DataFrame
+        read_rt_result의 반환값 (여러 플레이트는 NFS_Plate.match_plates로 합친 값)
+    path_samplingsheet : str
+        정량값을 기록할 샘플시트(xlsm)의 경로
+    sheet_name : str, optional
+        정량값을 기록할 시트명
+
+    Returns
+    -------
+    int
+        정량값을 기록한 웰 수
+    """
+
+    wb_total = load_workbook(path_samplingsheet, read_only=False, keep_vba=True)
+    count = write_quantities(wb_total[sheet_name], df_rt)
+    wb_total.save(path_samplingsheet)
+    return count
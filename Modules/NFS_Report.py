@@ -0,0 +1,965 @@
+"""
+감정서 hwp 파일을 생성하는 모듈
+
+감정서 작성 로직은 문서 백엔드(HwpBackend, TextTemplateBackend)의 메소드만 호출하므로 GUI 없이 사용할 수 있다.
+백엔드는 좌위 테이블과 누름틀 값을 모아 두었다가 한 번에 채운다. 서식의 누름틀 이름은 column_field_names의 규칙을 따른다.
+(e.g. 좌위 테이블 1번 칼럼의 칼럼명 : locus_1_name, D8S1179 좌위 : locus_1_D8S1179, Y23 테이블이면 ylocus_1_DYS576)
+한/글 서식에 이 이름이 없으면 HwpBackend가 좌위 테이블의 셀에 같은 이름의 셀 필드를 붙여서 사용한다.
+generate_reports는 여러 사건의 감정서를 프로세스 풀에서 나눠 작성한다. 작업 프로세스마다 백엔드를 하나씩 만들어 재사용하고,
+작업 프로세스에는 프로젝트 객체 전체 대신 사건마다 해당 사건의 감정서 행과 프로파일만 넘긴다.
+
+Classes
+-------
+HwpBackend
+    한/글 COM 객체(HWPFrame.HwpObject)로 감정서를 작성하는 백엔드
+TextTemplateBackend
+    텍스트 서식(string.Template)으로 감정서를 작성하는 백엔드 (한/글 없이 사용 가능)
+
+Functions
+---------
+column_field_names(num_slot, list_marker, y23=False)
+    좌위 테이블의 num_slot번째 칼럼의 칼럼명과 좌위별 누름틀 이름을 반환한다.
+infer_report_type(df_case)
+    사건의 DB Type 1 구성으로 감정서 종류를 추정한다.
+list_case_pictures(ddi, num_case, names=None)
+    감정물사진 폴더에서 해당 사건번호를 파일이름에 포함하는 사진의 (경로, 증거물 표기)를 반환한다.
+write_mp(backend, info)
+    Matching Probability를 소수 부분과 지수 부분 누름틀에 입력한다. 값이 없으면 ValueError를 발생시킨다.
+generate_report(ddi, num_case, type_report, backend, root, pictures=())
+    해당 사건의 감정서를 감정서 종류에 맞춰 생성하고 경로를 반환한다.
+generate_reports(ddi, root, cases=None, max_workers=None, progress=None, backend_factory=HwpBackend, pictures=True)
+    여러 사건의 감정서를 프로세스 풀에서 생성하고 사건별 결과를 반환한다.
+"""
+
+import os
+import re
+import shutil
+import string
+import types
+import tempfile
+import traceback
+from time import sleep
+from multiprocessing import util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import Modules.NFS_Mixture as NFS_Mixture
+import Modules.NFS_Kinship as NFS_Kinship
+import Modules.NFS_Stats as NFS_Stats
+
+# 감정서 종류별 서식 파일 (프로그램 폴더 기준)
+PATH_FORM_REPORT = {'ND': '/Form/form_report_ND.hwp',
+                    '부검': '/Form/form_report_D.hwp',
+                    '피해자 일치': '/Form/form_report_V-match.hwp',
+                    'ND w/ 피해자 일치': '/Form/form_report_V-match+ND.hwp',
+                    'ND w/ 피해자 불일치': '/Form/form_report_V-nonmatch+ND.hwp',
+                    'Complicate': '/Form/form_report_Complicate.hwp',
+                    '혼합형': '/Form/form_report_MX.hwp',
+                    '피의자 일치': '/Form/form_report_S-match.hwp',
+                    '피의자 불일치': '/Form/form_report_S-nonmatch.hwp',
+                    '친자관계 일치': '/Form/form_report_Parent-Child.hwp',
+                    '친자관계 일치(부검)': '/Form/form_report_Parent-Child_D.hwp',
+                    'C 검출(검색결과 X)': '/Form/form_report_C.hwp',
+                    'C 검출 w/ ND(검색결과 X)': '/Form/form_report_C+ND.hwp',
+                    'C 검출 w/ 피해자 불일치(검색결과 X)': '/Form/form_report_C+V-nonmatch.hwp',
+                    'C 검출 w/ 피해자 불일치, ND(검색결과 X)': '/Form/form_report_C+ND+V-nonmatch.hwp',
+                    'C 검출 w/ 피해자 일치(검색결과 X)': '/Form/form_report_C+V-match.hwp',
+                    'C 검출 w/ 피해자 일치, ND(검색결과 X)': '/Form/form_report_C+ND+V-match.hwp'
+                    }
+# Y23 좌위 테이블이 있는 서식 (사진 테이블이 한 페이지 뒤에 있음)
+SET_FORM_Y23 = {'혼합형', '피의자 일치', '피의자 불일치', '친자관계 일치', '친자관계 일치(부검)', 'Complicate'}
+# 사건의 DB Type 1 값(빈칸 제외)의 조합-감정서 종류. 조합이 없으면 Complicate
+DICT_REPORT_TYPE = {frozenset(['ND']): 'ND',
+                    frozenset(['D']): '부검',
+                    frozenset(['V', 'v']): '피해자 일치',
+                    frozenset(['V', 'v', 'ND']): 'ND w/ 피해자 일치',
+                    frozenset(['V', 'ND']): 'ND w/ 피해자 불일치',
+                    frozenset(['MX']): '혼합형',
+                    frozenset(['S', 's']): '피의자 일치',
+                    frozenset(['S']): '피의자 불일치',
+                    frozenset(['R']): '친자관계 일치',
+                    frozenset(['D', 'R']): '친자관계 일치(부검)',
+                    frozenset(['C']): 'C 검출(검색결과 X)',
+                    frozenset(['C', 'ND']): 'C 검출 w/ ND(검색결과 X)',
+                    frozenset(['C', 'V']): 'C 검출 w/ 피해자 불일치(검색결과 X)',
+                    frozenset(['C', 'V', 'ND']): 'C 검출 w/ 피해자 불일치, ND(검색결과 X)',
+                    frozenset(['C', 'V', 'v']): 'C 검출 w/ 피해자 일치(검색결과 X)',
+                    frozenset(['C', 'V', 'v', 'ND']): 'C 검출 w/ 피해자 일치, ND(검색결과 X)'}
+
+
+class HwpBackend():
+    """
+    한/글 COM 객체(HWPFrame.HwpObject)로 감정서를 작성하는 백엔드
+
+    좌위 테이블과 누름틀 값은 save할 때 PutFieldText 한 번으로 채우고, 사진은 그 뒤에 삽입한다.
+    서식에 좌위 테이블의 누름틀이 없으면(현재 배포된 서식) 해당 칼럼의 셀에 캐럿을 이동하며 셀 필드 이름을 붙이고,
+    값을 채우기 전의 문서를 dir_prepared에 서식의 복사본으로 저장해 둔다. 같은 서식의 다음 감정서부터는 이 복사본을 열어서
+    캐럿 이동 없이 PutFieldText로 채운다. (원본 서식이 바뀌면 수정시각, 크기가 달라지므로 복사본을 새로 만든다.)
+
+    Attributes
+    ----------
+    dir_prepared : str
+        셀 필드 이름을 붙인 서식의 복사본을 저장할 폴더 (없으면 임시 폴더의 NFS_Report_forms)
+
+    Methods
+    --------
+    prepare()
+        한/글 COM 래퍼(gencache)를 미리 만든다. 여러 프로세스에서 백엔드를 만들기 전에 부모 프로세스에서 한 번 호출한다.
+    open(path_form, filename)
+        서식 파일을 filename으로 복사하고 연다.
+    insert_pictures(pictures, y23=False)
+        사진 테이블에 사진과 증거물 표기를 두 장씩 한 줄로 삽입한다. (save할 때 삽입)
+    write_column(num_slot, name_col, alleles, y23=False)
+        좌위 테이블의 num_slot번째 칼럼에 칼럼명과 좌위값(dict, 좌위-값)을 입력한다.
+    put_field(name, text)
+        해당 이름의 첫번째 누름틀에 text를 입력한다.
+    save()
+        모아 둔 누름틀 값을 채우고 사진을 삽입한 후 문서를 저장하고 경로를 반환한다.
+    close()
+        저장한 문서를 닫는다.
+    quit()
+        한/글을 종료한다.
+    """
+
+    def __init__(self, dir_prepared=None):
+        import win32com.client as win32   # Windows에서만 사용 가능
+        self.hwp = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
+        self.hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")  # 보안 모듈 적용(파일 열고 닫을 때 팝업이 안나타나게)
+        self.dir_prepared = dir_prepared or os.path.join(tempfile.gettempdir(), 'NFS_Report_forms')
+        self.filename = None
+        self.path_prepared = None
+        self.set_field = set()
+        self.dict_field = {}
+        self.pictures = None
+        self.__named = False    # 이 문서에서 셀 필드 이름을 새로 붙였는지 여부
+
+    @staticmethod
+    def prepare():
+        import win32com.client as win32
+        # 작업 프로세스들이 동시에 EnsureDispatch로 gencache 폴더에 래퍼를 쓰지 않도록 미리 만들어 둔다.
+        hwp = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
+        hwp.Quit()
+
+    def __insert_text(self, text):
+        self.hwp.HAction.GetDefault("InsertText", self.hwp.HParameterSet.HInsertText.HSet)
+        self.hwp.HParameterSet.HInsertText.Text = text
+        self.hwp.HAction.Execute("InsertText", self.hwp.HParameterSet.HInsertText.HSet)
+
+    def __prepared_path(self, path_form):
+        """셀 필드 이름을 붙인 서식 복사본의 경로 (원본 서식의 수정시각, 크기별)"""
+
+        stat = os.stat(path_form)
+        name = os.path.splitext(os.path.basename(path_form))[0]
+        return os.path.join(self.dir_prepared, f"{name}_{stat.st_mtime_ns}_{stat.st_size}.hwp")
+
+    def open(self, path_form, filename):
+        self.path_prepared = self.__prepared_path(path_form)
+        shutil.copyfile(self.path_prepared if os.path.isfile(self.path_prepared) else path_form, filename)
+        self.hwp.Open(filename, "HWP", None)
+        self.filename = filename
+        self.set_field = set(self.hwp.GetFieldList(0, 0).split("\x02"))   # 0 : 번호 없이 누름틀, 셀 필드 이름
+        self.dict_field = {}
+        self.pictures = None
+        self.__named = False
+
+    def insert_pictures(self, pictures, y23=False):
+        # 셀 필드 이름을 붙인 서식을 사진 없이 저장할 수 있도록 save에서 삽입
+        self.pictures = (list(pictures), y23)
+
+    def __insert_pictures(self, pictures, y23=False):
+        # 그림 테이블로 이동
+        self.hwp.Run("MoveDocBegin")
+        self.hwp.Run('MovePageDown')
+        self.hwp.Run('MovePageDown')
+        if y23 == True:
+            self.hwp.Run('MovePageDown')
+        self.hwp.Run("MoveDown")
+        # 사진을 사진 테이블로 복사
+        for i, (filepath, label) in enumerate(pictures):
+            self.hwp.InsertPicture(filepath, Embedded=True, sizeoption=3)
+            sleep(0.1)
+            if i % 2 == 0:
+                self.hwp.Run("TableAppendRow")
+            else:
+                self.hwp.Run("MoveDown")
+            self.__insert_text(label)
+            self.hwp.Run("TableRightCellAppend")
+            if i % 2 == 0:
+                self.hwp.Run("MoveUp")
+        self.hwp.Run("MoveDocBegin")
+
+    def write_column(self, num_slot, name_col, alleles, y23=False):
+        name_fields = column_field_names(num_slot, alleles, y23=y23)
+        if not all(name_field in self.set_field for name_field in name_fields):
+            self.__name_cells(num_slot, name_fields, y23=y23)
+        self.dict_field.update(zip(name_fields, [name_col] + list(alleles.values())))
+
+    def __name_cells(self, num_slot, name_fields, y23=False):
+        """좌위 테이블의 num_slot번째 칼럼의 칼럼명, 좌위 셀에 차례로 셀 필드 이름을 붙인다."""
+
+        # 누름틀이 없는 서식 : Locus 테이블의 좌위 입력 부위로 이동
+        self.hwp.Run("MoveDocBegin")
+        self.hwp.MovePos(2)  # 캐럿을 문서 처음으로 이동
+        self.hwp.Run('MovePageDown')
+        if y23 == True:
+            self.hwp.Run('MovePageDown')
+        self.hwp.Run("MoveDown")
+        self.hwp.Run("MoveDown")
+        self.hwp.Run("MoveRight")
+        self.hwp.Run("MoveDown")
+        for i in range(num_slot):
+            self.hwp.MovePos(101)  # 캐럿을 오른쪽 셀로 이동
+        for name_field in name_fields:
+            self.hwp.SetCurFieldName(name_field, 1, "", "")   # 1 : 현재 셀의 셀 필드 이름
+            self.hwp.MovePos(103)  # 캐럿을 아래쪽 셀로 이동
+        self.hwp.Run("MoveDocBegin")
+        self.set_field.update(name_fields)
+        self.__named = True
+
+    def put_field(self, name, text):
+        self.dict_field[name] = text
+
+    def save(self):
+        if self.__named:    # 값을 채우기 전에 셀 필드 이름을 붙인 서식을 저장해 두고 다음 감정서부터 사용
+            self.hwp.Save()
+            os.makedirs(self.dir_prepared, exist_ok=True)
+            path_temp = f"{self.path_prepared}.{os.getpid()}"   # 다른 작업 프로세스가 읽는 중일 수 있으므로 교체는 한 번에
+            shutil.copyfile(self.filename, path_temp)
+            os.replace(path_temp, self.path_prepared)
+            self.__named = False
+        if len(self.dict_field) != 0:   # 모든 누름틀을 한 번에 채움 (이름과 값을 각각 \x02로 연결)
+            self.hwp.PutFieldText("\x02".join(name + "{{0}}" for name in self.dict_field),
+                                  "\x02".join(self.dict_field.values()))
+            self.dict_field = {}
+        if self.pictures is not None:
+            self.__insert_pictures(*self.pictures)
+            self.pictures = None
+        self.hwp.Run("MoveDocBegin")
+        self.hwp.Save()
+        return self.filename
+
+    def close(self):
+        self.hwp.Clear(1)   # 1 : 저장 여부를 묻지 않고 닫음(이미 저장한 문서)
+
+    def quit(self):
+        self.hwp.Quit()
+
+
+class TextTemplateBackend():
+    """
+    텍스트 서식(string.Template)으로 감정서를 작성하는 백엔드
+
+    한/글 서식(form_report_ND.hwp)과 같은 이름의 txt 파일(form_report_ND.txt)을 서식으로 사용하고 감정서도 txt로 저장한다.
+    서식의 $누름틀이름 자리에 값을 넣고, $pictures 자리에는 사진을 한 줄에 하나씩(경로\t증거물 표기) 넣는다.
+    txt 서식이 없으면 누름틀 이름과 값을 한 줄에 하나씩 기록한다. 한/글이 없는 환경에서 감정서 내용을 확인하는 데 사용한다.
+
+    Attributes
+    ----------
+    dir_form : str
+        txt 서식을 찾을 폴더. 없으면 한/글 서식과 같은 폴더
+
+    Methods
+    --------
+    open(path_form, filename)
+        서식을 읽고 저장할 파일 이름을 정한다.
+    insert_pictures(pictures, y23=False)
+        사진의 (경로, 증거물 표기)를 기록한다.
+    write_column(num_slot, name_col, alleles, y23=False)
+        좌위 테이블의 num_slot번째 칼럼의 칼럼명과 좌위값(dict, 좌위-값)을 기록한다.
+    put_field(name, text)
+        누름틀 값을 기록한다.
+    save()
+        서식에 값을 채워 한 번에 저장하고 경로를 반환한다.
+    close()
+        작성 중인 내용을 비운다.
+    quit()
+        아무 것도 하지 않는다.
+    """
+
+    def __init__(self, dir_form=None):
+        self.dir_form = dir_form
+        self.template = None
+        self.filename = None
+        self.dict_field = {}
+
+    def open(self, path_form, filename):
+        path_template = os.path.splitext(path_form)[0] + '.txt'
+        if self.dir_form is not None:
+            path_template = os.path.join(self.dir_form, os.path.basename(path_template))
+        self.template = None
+        if os.path.isfile(path_template):
+            with open(path_template, encoding='utf-8') as f:
+                self.template = string.Template(f.read())
+        self.filename = os.path.splitext(filename)[0] + '.txt'
+        self.dict_field = {}
+
+    def insert_pictures(self, pictures, y23=False):
+        self.dict_field['pictures'] = '\n'.join(f"{filepath}\t{label}" for filepath, label in pictures)
+
+    def write_column(self, num_slot, name_col, alleles, y23=False):
+        self.dict_field.update(zip(column_field_names(num_slot, alleles, y23=y23), [name_col] + list(alleles.values())))
+
+    def put_field(self, name, text):
+        self.dict_field[name] = text
+
+    def save(self):
+        if self.template is not None:
+            text = self.template.safe_substitute(self.dict_field)
+        else:
+            text = '\n'.join(f"{name}\t{value}" for name, value in self.dict_field.items()) + '\n'
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write(text.replace('\r', '\n'))
+        return self.filename
+
+    def close(self):
+        self.template = None
+        self.dict_field = {}
+
+    def quit(self):
+        pass
+
+
+def column_field_names(num_slot, list_marker, y23=False):
+    """
+    좌위 테이블의 num_slot번째 칼럼의 칼럼명과 좌위별 누름틀 이름을 리스트로 반환한다.
+
+    좌위명의 영문, 숫자 이외의 문자는 '_'로 바꾼다. (e.g. DYS385a/b => DYS385a_b)
+
+    Parameters
+    ----------
+    num_slot : int
+        좌위 테이블의 칼럼 번호
+    list_marker : iterable
+        좌위 리스트
+    y23 : bool, optional
+        Y23 좌위 테이블 여부
+    """
+
+    prefix = f"{'ylocus' if y23 == True else 'locus'}_{num_slot}_"
+    return [prefix + 'name'] + [prefix + re.sub(r'\W', '_', loci, flags=re.ASCII) for loci in list_marker]
+
+
+def infer_report_type(df_case):
+    """
+    사건의 DB Type 1 값(빈칸 제외)의 조합으로 감정서 종류를 추정한다. 해당하는 종류가 없으면 Complicate를 반환한다.
+
+    Parameters
+    ----------
+    df_case : DataFrame
+        해당 사건의 감정서 데이터프레임
+    """
+
+    types = frozenset(str(x) for x in df_case['DB Type 1'] if pd.notna(x) and str(x) != "")
+    return DICT_REPORT_TYPE.get(types, 'Complicate')
+
+
+def list_case_pictures(ddi, num_case, names=None):
+    """
+    감정물사진 폴더에서 해당 사건번호를 파일이름에 포함하는 사진의 (경로, 증거물 표기)의 리스트를 반환한다.
+
+    증거물 표기는 파일이름의 4번째 '-' 이후 부분으로 만든다. (e.g. 2020-D-1234-1-3+5 => 증1호~증3호, 증5호)
+
+    Parameters
+    ----------
+    ddi : DataDNAIdentification
+        프로젝트 객체
+    num_case : str
+        사건번호
+    names : list, optional
+        사용할 사진의 이름(확장자 제외). 없으면 해당 사건의 모든 사진
+    """
+
+    if names is None:
+        if not os.path.isdir(ddi.path_picture):
+            return []
+        names = [filename.split('.')[0] for filename in os.listdir(ddi.path_picture) if num_case in filename]
+    pictures = []
+    for filename_img in names:
+        num_extracted = '-'.join(filename_img.split('-')[3:])
+        num_extracted = num_extracted.split('+')
+        num_extracted = [re.sub(r'\d+', r'증\g<0>호', x).replace('-', '~') for x in num_extracted]
+        pictures.append((rf"{ddi.path_picture}{filename_img}.jpg", ', '.join(num_extracted)))
+    return pictures
+
+
+def link_num_evidence(df_target):
+    """증거물 번호의 리스트를 감정서에 넣을 포멧(연속된 번호는 증1호~증3호)으로 변환하여 반환한다."""
+
+    p = re.compile('증(.+)호')
+    list_serial = df_target['감정물'].apply(lambda x: str(p.search(x).group(1))).tolist()
+    list_idx = list(df_target.index)
+    stack_serial = []
+    stack_idx = []
+    list_result = []
+    if len(list_serial) == 1:
+        list_result.append('증{0}호'.format(list_serial[0]))
+    elif len(list_serial) == 2:
+        list_result.append('증{0}호 및 증{1}호'.format(list_serial[0], list_serial[1]))
+    else:
+        stack_serial.append(list_serial[0])
+        stack_idx.append(list_idx[0])
+        for idx, target in enumerate(list_serial[1:]):
+            if (stack_idx[-1] + 1) == list_idx[(idx + 1)]:
+                stack_idx.append(list_idx[(idx + 1)])
+                stack_serial.append(target)
+            else:
+                if len(stack_serial) == 1:
+                    list_result.append('증{0}호'.format(stack_serial[0]))
+                    stack_serial.clear()
+                    stack_idx.clear()
+                    stack_serial.append(target)
+                    stack_idx.append(list_idx[(idx + 1)])
+
+                elif len(stack_serial) == 2:
+                    list_result.append('증{0}호'.format(stack_serial[0]))
+                    list_result.append('증{0}호'.format(stack_serial[1]))
+                    stack_serial.clear()
+                    stack_idx.clear()
+                    stack_serial.append(target)
+                    stack_idx.append(list_idx[(idx + 1)])
+                else:
+                    list_result.append('증{0}호~증{1}호'.format(stack_serial[0], stack_serial[-1]))
+                    stack_serial.clear()
+                    stack_idx.clear()
+                    stack_serial.append(target)
+                    stack_idx.append(list_idx[(idx + 1)])
+        if len(stack_serial) != 0:
+            if len(stack_serial) == 1:
+                list_result.append('증{0}호'.format(stack_serial[0]))
+                stack_idx.clear()
+                stack_serial.clear()
+            elif len(stack_serial) == 2:
+                list_result.append('증{0}호'.format(stack_serial[0]))
+                list_result.append('증{0}호'.format(stack_serial[1]))
+                stack_idx.clear()
+                stack_serial.clear()
+            else:
+                list_result.append('증{0}호~증{1}호'.format(stack_serial[0], stack_serial[-1]))
+                stack_idx.clear()
+                stack_serial.clear()
+    return ', '.join(list_result)
+
+
+def gender_to_text(profile):
+    """profile의 Amelogenin 값에 따라 여성 혹은 남성 text를 반환한다."""
+
+    if profile['AMEL'] == 'XX':
+        return '여성'
+    else:
+        return '남성'
+
+
+def load_profile(combined_result, df_profile, is_y=False):
+    """
+    입력받은 df의 첫 증거물번호에 해당하는 프로파일과 프로파일의 기타사항을 반환
+
+    Raises
+    ------
+    KeyError
+        해당 증거물의 프로파일 데이터가 없는 경우
+    """
+
+    num_evidence = df_profile.reset_index().loc[0, '증거물번호'] if len(df_profile) != 0 else None
+    if num_evidence not in combined_result.profiles:
+        raise KeyError(f"No Profile Data. ({num_evidence})")
+    if is_y == False:
+        profile, str_etc = combined_result.profiles[num_evidence].transform_to_str(True)
+        profile['AMEL'] = profile['AMEL'].replace('-', '')
+    else:
+        profile, str_etc = combined_result.profiles[num_evidence].transform_to_str(False)
+    return profile, str_etc
+
+
+def process_info(ddi, df_case=pd.DataFrame({}), type="", is_REF=False, REF_type=None, is_y=False):
+    """
+    사건에서 해당 type의 증거물 번호 표기, 프로파일, 기타사항, Matching Probability를 dict로 반환한다.
+
+    Parameters
+    ----------
+    ddi : DataDNAIdentification
+        프로젝트 객체
+    df_case : DataFrame
+        해당 사건의 감정서 데이터프레임
+    type : str
+        DB Type 1(is_y이면 Y Type) 값
+    is_REF : bool
+        해당 type이 대조 시료(프로파일을 직접 가진 시료)인지 여부
+    REF_type : str
+        is_REF가 False일 때 프로파일을 가져올 대조 시료의 type
+    is_y : bool
+        Y23 데이터 여부
+    """
+
+    combined_result = ddi.combined_result if is_y == False else ddi.combined_result_y23
+    info_combined_result = combined_result.info
+    list_marker = combined_result.list_marker_ordered
+    type_colname = 'DB Type 1' if is_y == False else 'Y Type'
+
+    info = {}
+    profile = {}
+    str_etc = ""
+    mp = None
+    num_evidence = None
+
+    df_target = df_case[df_case[type_colname] == type]
+    if type == 'ND':
+        for loci in list_marker:
+            profile[loci] = "ND"
+    elif is_REF == True:
+        profile, str_etc = load_profile(combined_result, df_target, is_y=is_y)
+        num_evidence = df_target.reset_index().loc[0, '증거물번호']
+        mp = NFS_Stats.normalize_mp(info_combined_result.loc[num_evidence, 'Matching Probability']) if is_y == False else ""
+    elif is_REF == False:
+        df_ref = df_case[df_case[type_colname] == REF_type]
+        profile, str_etc = load_profile(combined_result, df_ref, is_y=is_y)
+
+    info['link_num_evidence'] = link_num_evidence(df_target)
+    info['profile'] = profile
+    info['str_etc'] = str_etc
+    info['mp'] = mp
+    info['num_evidence'] = num_evidence
+    return info
+
+
+def write_mp(backend, info):
+    """
+    info의 Matching Probability(e.g. 1.2E+20)를 소수 부분(float_mp_report)과 지수 부분(exp_mp_report) 누름틀에 입력한다.
+
+    Raises
+    ------
+    ValueError
+        Matching Probability가 없는 경우 (Tomato에서 계산되지 않았고 빈도표도 없음)
+    """
+
+    if not info['mp']:
+        raise ValueError(f"No Matching Probability for {info['num_evidence']}. Fill it in Tomato or add an allele "
+                         f"frequency table ({NFS_Stats.PATH_FREQUENCY.lstrip('/')}, see NFS_Stats).")
+    mantissa, exponent = info['mp'].split('E')
+    backend.put_field("float_mp_report", mantissa)
+    backend.put_field("exp_mp_report", str(int(exponent)))
+
+
+def write_alleles(backend, info, num_slot, list_marker, nickname="", y23=False):
+    """좌위 테이블의 num_slot번째 칼럼에 info의 증거물 번호 표기(와 별칭)와 프로파일을 입력한다."""
+
+    name_col = '{0}\r({1})'.format(info['link_num_evidence'].replace(" 및 ", ", "), nickname) if nickname != "" else '{0}'.format(info['link_num_evidence'].replace(" 및 ", ", "))
+    profile = info['profile']
+    backend.write_column(num_slot, name_col, {loci: profile[loci] for loci in list_marker}, y23=y23)
+
+
+def generate_report(ddi, num_case, type_report, backend, root, pictures=()):
+    """
+    해당 사건의 감정서를 감정서 종류에 맞춰 Reports 폴더에 생성하고 경로를 반환한다.
+
+    Parameters
+    ----------
+    ddi : DataDNAIdentification
+        프로젝트 객체
+    num_case: str
+        사건번호
+    type_report: str
+        감정서 종류 (PATH_FORM_REPORT의 key)
+    backend : HwpBackend
+        문서 백엔드
+    root : str
+        프로그램 폴더의 경로(서식 파일 위치)
+    pictures : list, optional
+        사진 테이블에 넣을 (경로, 증거물 표기)의 리스트
+
+    Raises
+    ------
+    KeyError
+        감정서 종류가 없거나 필요한 프로파일 데이터가 없는 경우
+    ValueError
+        Matching Probability가 필요한 감정서인데 대조 시료의 값이 없거나, 친자관계 감정서인데 빈도표가 없는 경우
+    """
+
+    df_case = ddi.df_report[ddi.df_report['접수번호'] == num_case].reset_index(drop=True)
+    filename_new = ddi.location_save + '/Reports/' + num_case + ".hwp"
+    backend.open(root + PATH_FORM_REPORT[type_report], filename_new)
+    backend.insert_pictures(pictures, y23=type_report in SET_FORM_Y23)
+    if type_report=='ND':
+        info_ND = process_info(ddi, df_case, type='ND')
+        backend.put_field("num_evidence_result", info_ND['link_num_evidence'])
+        backend.put_field("num_evidence_locus", info_ND['link_num_evidence'].replace(" 및 ", ", "))
+    elif type_report=='부검':
+        info_D = process_info(ddi, df_case,
+                              type='D', is_REF=True)
+        write_alleles(backend, info=info_D, num_slot=1,
+                      list_marker= ddi.combined_result.list_marker_ordered,
+                      nickname="변사자",
+                      y23=False)
+        backend.put_field("num_evidence_result", info_D['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_D['profile']))
+        backend.put_field("text_etc_locus", info_D['str_etc'])
+    elif type_report=='피해자 일치':
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)    # 피해자 대조
+        info_v = process_info(ddi, df_case,
+                              type='v', is_REF=False, REF_type='V') #피해자 일치
+        write_alleles(backend, info=info_v, num_slot=1,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3]) #부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+        write_alleles(backend, info=info_V, num_slot=2,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_result", info_v['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_V['profile']))
+        write_mp(backend, info_V)  # Matching Probability의 소수 부분, 지수 부분
+        backend.put_field("text_etc_locus", info_V['str_etc'])
+    elif type_report == 'ND w/ 피해자 일치':
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)    # 피해자 대조
+        info_v = process_info(ddi, df_case,
+                              type='v', is_REF=False, REF_type='V') #피해자 일치
+        info_ND = process_info(ddi, df_case, type='ND')
+        write_alleles(backend, info=info_v, num_slot=1,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3]) #부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+        write_alleles(backend, info=info_ND, num_slot=2,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_V, num_slot=3,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_v_result", info_v['link_num_evidence'])
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_V['profile']))
+        write_mp(backend, info_V)  # Matching Probability의 소수 부분, 지수 부분
+        backend.put_field("text_etc_locus", 'ND : 디엔에이형이 검출되지 않음.\r' + info_V['str_etc'])
+    elif type_report == 'ND w/ 피해자 불일치':
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)  # 피해자 대조
+        info_ND = process_info(ddi, df_case, type='ND')
+        write_alleles(backend, info=info_ND, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_V, num_slot=2,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("text_etc_locus", 'ND : 디엔에이형이 검출되지 않음.\r' + info_V['str_etc'])
+    elif type_report=='혼합형':
+        info_MX = process_info(ddi, df_case,
+                               type='MX', is_REF=True)
+        write_alleles(backend, info=info_MX, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+        df_Y = df_case[df_case['Y Type'] == 'MX']
+        if (len(df_Y) != 0):
+            info_Y = process_info(ddi, df_case, type='MX', is_REF=True, is_y=True)
+            write_alleles(backend, info=info_Y, num_slot=1,
+                          list_marker=ddi.combined_result_y23.list_marker_ordered,
+                          y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+            backend.put_field("text_etc_locus_y23", info_Y['str_etc'])
+        num_evidence_MX = df_case[df_case['DB Type 1'] == 'MX'].reset_index().loc[0, '증거물번호']
+        mixture = NFS_Mixture.MixtureAnalysis(ddi.combined_result.profiles[num_evidence_MX],
+                                              markers=ddi.combined_result.list_marker_ordered)
+        # 최소 기여자 수는 서식에 따로 칸이 없으므로 좌위 테이블의 기타 사항 뒤에 붙임
+        text_contributors = "최소 기여자 수 : {0}명 (한 좌위의 최대 좌위값 {1}개)".format(mixture.min_contributors, mixture.max_alleles)
+        backend.put_field("text_etc_locus", '\r\n'.join(text for text in [info_MX['str_etc'], text_contributors] if text != ""))
+    elif type_report=='피의자 일치' or type_report=='피의자 불일치':
+        info_S = process_info(ddi, df_case, type='S', is_REF=True)
+        write_alleles(backend, info=info_S, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피의자')
+        df_Y = df_case[df_case['Y Type'] == 'S']
+        if (len(df_Y) != 0):
+            info_Y = process_info(ddi, df_case, type='S', is_REF=True, is_y=True)
+            write_alleles(backend, info=info_Y, num_slot=1,
+                          list_marker=ddi.combined_result_y23.list_marker_ordered,
+                          nickname='피의자',
+                          y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+            backend.put_field("text_etc_locus_y23", info_Y['str_etc'])
+        if type_report=='피의자 일치':
+            write_mp(backend, info_S)  # Matching Probability의 소수 부분, 지수 부분
+        backend.put_field("text_etc_locus", info_S['str_etc'])
+    elif type_report=='친자관계 일치':
+        info_R = process_info(ddi, df_case, type='R', is_REF=True)
+        write_alleles(backend, info=info_R, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered,
+                      nickname='관계자')
+        df_Y = df_case[df_case['Y Type'] == 'R']
+        if (len(df_Y) != 0):
+            info_Y = process_info(ddi, df_case, type='R', is_REF=True, is_y=True)
+            write_alleles(backend, info=info_Y, num_slot=1,
+                          list_marker=ddi.combined_result_y23.list_marker_ordered,
+                          nickname='관계자',
+                          y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+            backend.put_field("text_etc_locus_y23", info_Y['str_etc'])
+        backend.put_field("text_etc_locus", info_R['str_etc'])
+    elif type_report=='친자관계 일치(부검)':
+        info_D = process_info(ddi, df_case, type='D', is_REF=True)
+        info_R = process_info(ddi, df_case, type='R', is_REF=True)
+        str_etc = info_D['str_etc']+'\r'+info_R['str_etc']
+        write_alleles(backend, info=info_R, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered,
+                      nickname='관계자')
+        write_alleles(backend, info=info_D, num_slot=2,
+                      list_marker=ddi.combined_result.list_marker_ordered,
+                      nickname='변사자')
+        df_Y = df_case[df_case['Y Type'] == 'R']
+        if (len(df_Y) != 0):
+            info_Y = process_info(ddi, df_case, type='R', is_REF=True, is_y=True)
+            write_alleles(backend, info=info_Y, num_slot=1,
+                          list_marker=ddi.combined_result_y23.list_marker_ordered,
+                          nickname='관계자',
+                          y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+            backend.put_field("text_etc_locus_y23", info_Y['str_etc'])
+        backend.put_field("num_evidence_result", info_D['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_D['profile']))
+        backend.put_field("text_etc_locus", str_etc)
+        path_frequency = root + NFS_Stats.PATH_FREQUENCY
+        if os.path.isfile(path_frequency):  # 빈도표가 있으면 변사자-관계자의 누적 친자관계지수와 친자확률
+            num_evidence_D = df_case[df_case['DB Type 1'] == 'D'].reset_index().loc[0, '증거물번호']
+            num_evidence_R = df_case[df_case['DB Type 1'] == 'R'].reset_index().loc[0, '증거물번호']
+            cpi, probability, _ = NFS_Kinship.combined_index(ddi.combined_result.profiles[num_evidence_D],
+                                                             ddi.combined_result.profiles[num_evidence_R],
+                                                             NFS_Stats.load_frequency_table(path_frequency))
+            backend.put_field("cpi_report", NFS_Kinship.format_index(cpi))
+            backend.put_field("probability_report", f"{probability * 100:.4f}")
+        else:
+            raise ValueError(f"No allele frequency table for the paternity index of {num_case}. Add "
+                             f"{NFS_Stats.PATH_FREQUENCY.lstrip('/')} (see NFS_Stats).")
+    elif type_report=='C 검출(검색결과 X)':
+        info_C = process_info(ddi, df_case, type='C', is_REF=True)
+        write_alleles(backend, info=info_C, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        backend.put_field("num_evidence_result", info_C['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_C['profile']))
+        backend.put_field("text_etc_locus", info_C['str_etc'])
+    elif type_report == 'C 검출 w/ ND(검색결과 X)':
+        info_C = process_info(ddi, df_case, type='C', is_REF=True)
+        info_ND = process_info(ddi, df_case, type='ND')
+        write_alleles(backend, info=info_C, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_ND, num_slot=2,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        backend.put_field("num_evidence_result", info_C['link_num_evidence'])
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_C['profile']))
+        backend.put_field("text_etc_locus", info_C['str_etc'])
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("text_etc_locus", 'ND : 디엔에이형이 검출되지 않음.\r' + info_C['str_etc'])
+    elif type_report=='C 검출 w/ 피해자 불일치(검색결과 X)':
+        info_C = process_info(ddi, df_case, type='C', is_REF=True)
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)  # 피해자 대조
+        write_alleles(backend, info=info_C, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_V, num_slot=2,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_result", info_C['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_C['profile']))
+        backend.put_field("text_etc_locus", info_C['str_etc'] + info_V['str_etc'])
+    elif type_report == 'C 검출 w/ 피해자 불일치, ND(검색결과 X)':
+        info_C = process_info(ddi, df_case, type='C', is_REF=True)
+        info_ND = process_info(ddi, df_case, type='ND')
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)  # 피해자 대조
+        write_alleles(backend, info=info_C, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_ND, num_slot=2,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_V, num_slot=3,
+                      list_marker= ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_result", info_C['link_num_evidence'])
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_C['profile']))
+        backend.put_field("text_etc_locus", info_C['str_etc'])
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("text_etc_locus", 'ND : 디엔에이형이 검출되지 않음.\r' + info_C['str_etc'] + info_V['str_etc'])
+    elif type_report == 'C 검출 w/ 피해자 일치(검색결과 X)':
+        info_C = process_info(ddi, df_case, type='C', is_REF=True)
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)  # 피해자 대조
+        info_v = process_info(ddi, df_case,
+                              type='v', is_REF=False, REF_type='V')  # 피해자 일치
+
+        write_alleles(backend, info=info_C, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_v, num_slot=2,
+                      list_marker=ddi.combined_result.list_marker_ordered[
+                                  :-3])  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+        write_alleles(backend, info=info_V, num_slot=3,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_result", info_C['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_C['profile']))
+        backend.put_field("num_evidence_v_result", info_v['link_num_evidence'])
+        write_mp(backend, info_V)  # Matching Probability의 소수 부분, 지수 부분
+        backend.put_field("text_etc_locus", info_C['str_etc'] + info_V['str_etc'])
+    elif type_report == 'C 검출 w/ 피해자 일치, ND(검색결과 X)':
+        info_C = process_info(ddi, df_case, type='C', is_REF=True)
+        info_V = process_info(ddi, df_case,
+                              type='V', is_REF=True)  # 피해자 대조
+        info_v = process_info(ddi, df_case,
+                              type='v', is_REF=False, REF_type='V')  # 피해자 일치
+        info_ND = process_info(ddi, df_case, type='ND')
+        write_alleles(backend, info=info_C, num_slot=1,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_v, num_slot=2,
+                      list_marker=ddi.combined_result.list_marker_ordered[
+                                  :-3])  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
+        write_alleles(backend, info=info_ND, num_slot=3,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3])
+        write_alleles(backend, info=info_V, num_slot=4,
+                      list_marker=ddi.combined_result.list_marker_ordered[:-3],
+                      nickname='피해자')
+        backend.put_field("num_evidence_result", info_C['link_num_evidence'])
+        backend.put_field("gender_result", gender_to_text(info_C['profile']))
+        backend.put_field("num_evidence_v_result", info_v['link_num_evidence'])
+        write_mp(backend, info_V)  # Matching Probability의 소수 부분, 지수 부분
+        backend.put_field("num_evidence_ND_result", info_ND['link_num_evidence'])
+        backend.put_field("text_etc_locus", 'ND : 디엔에이형이 검출되지 않음.\r' + info_C['str_etc'] + info_V['str_etc'])
+    elif type_report == 'Complicate':
+        str_etc = ""
+        str_etc_y23 = ""
+        cnt_slot = 1
+        list_types = list(set(df_case['DB Type 1'].values))
+
+        for type in list_types:
+            if type=='ND':
+                info_target = process_info(ddi, df_case, type='ND')
+                write_alleles(backend, info=info_target, num_slot=cnt_slot,
+                              list_marker=ddi.combined_result.list_marker_ordered[:-3])
+            elif type.isupper():  # type이 대문자 = REF 샘플
+                info_target = process_info(ddi, df_case, type=type, is_REF=True)
+                write_alleles(backend, info=info_target, num_slot=cnt_slot,
+                              list_marker=ddi.combined_result.list_marker_ordered[:-3])
+            else:   # type이 소문자 = REF 일치건
+                info_target = process_info(ddi, df_case, type=type, is_REF=False, REF_type=type.upper())
+                write_alleles(backend, info=info_target, num_slot=cnt_slot,
+                              list_marker=ddi.combined_result.list_marker_ordered[:-3])
+            cnt_slot+=1
+            str_etc = str_etc + info_target['str_etc']
+
+        list_types_Y = list(set(df_case['Y Type'].values))
+        cnt_slot=1
+        if '' in list_types_Y: list_types_Y.remove('')
+        if (list_types_Y):  # 입력할 Y23 Data가 있으면...
+            for type in list_types_Y:
+                if type == 'ND':
+                    info_ND = process_info(ddi, df_case, type='ND', is_y=True)
+                    write_alleles(backend, info=info_ND, num_slot=cnt_slot,
+                                  list_marker=ddi.combined_result.list_marker_ordered[:-3], y23=True)
+                elif type.isupper():  # type이 대문자 = REF 샘플
+                    info_target = process_info(ddi, df_case, type=type, is_REF=True, is_y=True)
+                    write_alleles(backend, info=info_target, num_slot=cnt_slot,
+                                  list_marker=ddi.combined_result_y23.list_marker_ordered, y23=True)
+                else:  # type이 소문자 = REF 일치건
+                    info_target = process_info(ddi, df_case, type=type, is_REF=False, is_y=True, REF_type=type.upper())
+                    write_alleles(backend, info=info_target, num_slot=cnt_slot,
+                                  list_marker=ddi.combined_result_y23.list_marker_ordered, y23=True)
+                cnt_slot += 1
+                str_etc_y23 = str_etc_y23 + info_target['str_etc']
+            backend.put_field("text_etc_locus_y23", str_etc_y23)
+        # backend.put_field("text_etc_result", '1) 개인식별지수란 감정물의 디엔에이가 동일인으로부터 '
+        #                                                  '유래되어서 디엔에이형이 일치할 확률 대 다른 사람으로부터'
+        #                                                  ' 유래되었으나 우연히 디엔에이형이 일치할 확률의 비임.\r'
+        #                                                  '2)「디엔에이신원확인정보의 이용 및 보호에 관한 법률」에 따라, '
+        #                                                  '신원이 확인된 본 건 관련 범죄현장 증거물의 디엔에이형은'
+        #                                                  ' 데이터베이스에서 삭제하겠음.\r'
+        #                                                  '3) Y-STR 디엔에이형이 일치할 경우, 동일부계 남성이 배제되지 않음.\r'
+        #                                                  '4) 감정물은 실험에 전량 소모하였음.')
+        backend.put_field("text_etc_locus", str_etc)
+    return backend.save()
+
+
+_worker = {}  # 작업 프로세스마다 하나씩 가지는 백엔드
+
+
+def _init_worker(root, backend_factory):
+    """작업 프로세스의 초기화 함수"""
+
+    _worker.update(root=root, backend_factory=backend_factory, backend=None)
+
+
+def _case_data(ddi, num_case):
+    """
+    generate_report가 한 사건을 작성하는 데 필요한 것만 가진 객체를 반환한다.
+
+    해당 사건의 감정서 행과, 그 증거물번호의 프로파일과 info만 가진 CombinedResult(Y23 포함)를 작업 프로세스에 넘긴다.
+    """
+
+    df_case = ddi.df_report[ddi.df_report['접수번호'] == num_case]
+    samples = df_case['증거물번호'].tolist()
+    return types.SimpleNamespace(location_save=ddi.location_save, path_picture=ddi.path_picture, df_report=df_case,
+                                 combined_result=ddi.combined_result.subset(samples),
+                                 combined_result_y23=ddi.combined_result_y23.subset(samples))
+
+
+def _generate_case(data, num_case, type_report, pictures):
+    """작업 프로세스에서 한 사건의 감정서를 생성한다. 실패해도 예외 대신 오류 내용을 반환한다."""
+
+    result = {'case': num_case, 'type': type_report, 'path': None, 'error': None}
+    try:
+        if _worker['backend'] is None:   # 프로세스의 첫 사건에서 백엔드를 만들고 프로세스가 끝날 때 종료
+            _worker['backend'] = _worker['backend_factory']()
+            util.Finalize(None, _worker['backend'].quit, exitpriority=10)
+        backend = _worker['backend']
+        result['path'] = generate_report(data, num_case, type_report, backend, _worker['root'], pictures)
+        backend.close()
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+        if _worker['backend'] is not None:
+            try:
+                _worker['backend'].close()
+            except Exception:
+                _worker['backend'] = None   # 백엔드가 망가졌으면 다음 사건에서 새로 만든다
+    return result
+
+
+def generate_reports(ddi, root, cases=None, max_workers=None, progress=None, backend_factory=HwpBackend, pictures=True):
+    """
+    여러 사건의 감정서를 프로세스 풀에서 생성하고 사건별 결과를 반환한다.
+
+    감정서 종류는 사건마다 infer_report_type으로 정한다. 한 사건이 실패해도 나머지 사건은 계속 생성한다.
+    backend_factory가 prepare 메소드를 가지면(HwpBackend) 작업 프로세스를 시작하기 전에 한 번 호출한다.
+
+    Parameters
+    ----------
+    ddi : DataDNAIdentification
+        프로젝트 객체
+    root : str
+        프로그램 폴더의 경로(서식 파일 위치)
+    cases : list, optional
+        생성할 사건번호. 없으면 감정서 데이터프레임의 모든 사건
+    max_workers : int, optional
+        작업 프로세스 수
+    progress : callable, optional
+        사건 하나가 끝날 때마다 (끝난 수, 전체 수, 결과 dict)를 인자로 호출할 함수
+    backend_factory : callable, optional
+        작업 프로세스에서 백엔드를 생성할 함수(혹은 클래스)
+    pictures : bool, optional
+        사건번호를 파일이름에 포함하는 사진을 모두 삽입할지 여부
+
+    Returns
+    -------
+    list
+        사건별 결과 dict(case, type, path, error)의 리스트. 성공하면 error가 None
+    """
+
+    df_report = ddi.df_report
+    if cases is None:
+        cases = list(df_report['접수번호'].unique())
+    tasks = []
+    for num_case in cases:
+        type_report = infer_report_type(df_report[df_report['접수번호'] == num_case])
+        tasks.append((_case_data(ddi, num_case), num_case, type_report,
+                      list_case_pictures(ddi, num_case) if pictures else []))
+
+    prepare = getattr(backend_factory, 'prepare', None)
+    if prepare is not None and len(tasks) != 0:
+        prepare()
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(root, backend_factory)) as executor:
+        futures = {executor.submit(_generate_case, *task): task for task in tasks}
+        for future in as_completed(futures):
+            _, num_case, type_report, _ = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # 작업 프로세스 자체가 죽은 경우
+                result = {'case': num_case, 'type': type_report, 'path': None, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            if progress is not None:
+                progress(len(results), len(tasks), result)
+    order = {num_case: idx for idx, num_case in enumerate(cases)}
+    return sorted(results, key=lambda result: order[result['case']])
@@ -0,0 +1,168 @@
+"""
+한 텀에서 불러온 프로파일의 오염 여부를 검사하는 모듈
+
+다음 경우를 찾아 플래그한다. 비교는 ProfileMatrix의 행렬 연산으로 한 번에 한다. (STRProfile.compare를 반복 호출하지 않음)
+    cross-case : 서로 다른 사건의 증거물끼리 일치하거나 한 쪽이 다른 쪽을 포함
+    control : 증거물과 Control 웰의 프로파일이 일치하거나 포함 관계
+    blank : Blank 웰에서 프로파일이 검출됨
+    elimination : 증거물과 실험자 등 배제용 프로파일이 일치하거나 포함 관계
+공통 좌위 수가 min_shared_loci보다 적은 쌍은 플래그하지 않는다. (좌위가 적은 프로파일은 어디에나 포함되므로)
+
+Control, Blank 웰은 CombinedResult가 사건번호 포멧이 아니라서 버리므로 Tomato 파일에서 따로 읽는다.
+배제용 프로파일은 Sample Name과 좌위별 칼럼(좌위값은 '-'로 연결)으로 된 csv 혹은 xlsx 파일을 사용한다.
+
+Functions
+---------
+read_tomato_controls(filename, markers)
+    Tomato 파일의 CombinedResult에서 Control, Blank 웰의 프로파일을 읽어 반환한다.
+read_profiles(path, markers)
+    배제용 프로파일 파일을 읽어 샘플명-STRProfile 딕셔너리로 반환한다.
+screen(profiles, markers, controls=None, blanks=None, elimination=None, min_shared_loci=8)
+    플래그된 쌍의 데이터프레임을 반환한다.
+"""
+
+import os
+import re
+import numpy as np
+import pandas as pd
+import Modules.NFS_DNA as NFS_DNA
+
+PATH_ELIMINATION = '/Settings/elimination_profiles.csv'  # 프로그램 폴더 기준 배제용 프로파일 파일
+FILENAME_REPORT = 'screening_report.csv'   # 프로젝트 폴더의 ETC에 저장
+IGNORE_ALLELES = ('', 'ND', 'NC', 'OL')
+EXCLUDE_MARKERS = ('AMEL',)    # 성별 좌위는 거의 모든 샘플이 공유하므로 비교에서 제외
+PATTERN_CONTROL = re.compile(r'control|positive|\bpc\b|9947|^007\b', re.IGNORECASE)     # 007은 샘플명 맨 앞에 올 때만
+PATTERN_BLANK = re.compile(r'blank|negative|\bnc\b|ntc', re.IGNORECASE)
+COLUMNS_REPORT = ['category', 'relation', 'sample_1', 'sample_2', 'shared_loci']
+
+
+def _to_profiles(df, markers):
+    """Sample Name과 좌위별 칼럼을 가진 데이터프레임을 샘플명-STRProfile 딕셔너리로 변환한다."""
+
+    df = df.drop_duplicates(['Sample Name'], keep='first').set_index('Sample Name')
+    df = df.reindex(columns=markers).fillna("").astype(str)
+    pool = {}
+    return {str(sample_name): NFS_DNA.STRProfile(id=str(sample_name),
+                                                 profile={loci: value.split('-') for loci, value in row.items() if value != ""},
+                                                 pool=pool)
+            for sample_name, row in df.to_dict(orient='index').items()}
+
+
+def read_tomato_controls(filename, markers):
+    """
+    Tomato 파일의 CombinedResult 시트에서 Control, Blank 웰의 프로파일을 읽어 반환한다.
+
+    Parameters
+    ----------
+    filename : str
+        Tomato 엑셀 파일
+    markers : list
+        읽을 좌위
+
+    Returns
+    -------
+    tuple
+        (Control 샘플명-STRProfile 딕셔너리, Blank 샘플명-STRProfile 딕셔너리)
+    """
+
+    df = pd.read_excel(filename, sheet_name="CombinedResult", header=1)
+    df = df.rename({'Amelogenin': 'AMEL'}, axis='columns')
+    df = df[df['Sample Name'].notna()]
+    df['Sample Name'] = df['Sample Name'].astype(str)
+    df = df[~df['Sample Name'].str.match(r'\d+[-]\w[-]\d+')]    # 사건번호 포멧(증거물)은 제외
+    is_blank = df['Sample Name'].str.contains(PATTERN_BLANK)
+    is_control = df['Sample Name'].str.contains(PATTERN_CONTROL) & ~is_blank
+    return _to_profiles(df[is_control], markers), _to_profiles(df[is_blank], markers)
+
+
+def read_profiles(path, markers):
+    """
+    Sample Name과 좌위별 칼럼으로 된 csv 혹은 xlsx 파일을 읽어 샘플명-STRProfile 딕셔너리로 반환한다.
+
+    Parameters
+    ----------
+    path : str
+        프로파일 파일
+    markers : list
+        읽을 좌위
+    """
+
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xls'):
+        df = pd.read_excel(path, dtype=str)
+    else:
+        df = pd.read_csv(path, dtype=str)
+    return _to_profiles(df, markers)
+
+
+def _case_number(sample_name):
+    """샘플명(e.g. 2020-D-1234-1)에서 사건번호(2020-D-1234)를 반환한다."""
+
+    return '-'.join(sample_name.split('-')[:3])
+
+
+def _pairs(category, matrix, matrix_other, min_shared_loci, same=False, case_filter=False):
+    """두 ProfileMatrix의 동일, 포함 관계를 행렬 연산으로 구해 공통 좌위 수 기준을 넘는 쌍의 리스트를 반환한다."""
+
+    shared = matrix.present.astype(np.int32) @ matrix_other.present.T.astype(np.int32)
+    if same:
+        identity = matrix.identity_matrix()
+        inclusion = matrix.inclusion_matrix()
+    else:
+        identity = matrix.identity_matrix(matrix_other)
+        inclusion = matrix.inclusion_matrix(matrix_other)
+        inclusion_reverse = matrix_other.inclusion_matrix(matrix).T
+    rows = []
+    names, names_other = matrix.sample_names, matrix_other.sample_names
+    for relation, flags in [('identity', identity), ('inclusion', inclusion),
+                            ('included', None if same else inclusion_reverse)]:
+        if flags is None:
+            continue
+        flags = flags & (shared >= min_shared_loci)
+        if relation != 'identity':
+            flags = flags & ~identity
+        if same:
+            np.fill_diagonal(flags, False)
+            if relation == 'identity':
+                flags = np.triu(flags)  # 같은 쌍을 한 번만
+        for i, j in zip(*np.nonzero(flags)):
+            if case_filter and _case_number(names[i]) == _case_number(names_other[j]):
+                continue
+            rows.append((category, relation, names[i], names_other[j], int(shared[i, j])))
+    return rows
+
+
+def screen(profiles, markers, controls=None, blanks=None, elimination=None, min_shared_loci=8):
+    """
+    불러온 프로파일 전체를 서로, 그리고 Control, Blank, 배제용 프로파일과 비교하여 플래그된 쌍을 반환한다.
+
+    Parameters
+    ----------
+    profiles : dict
+        샘플명-STRProfile 딕셔너리 (e.g. CombinedResult.profiles)
+    markers : list
+        비교할 좌위 (AMEL은 제외)
+    controls, blanks, elimination : dict, optional
+        Control 웰, Blank 웰, 배제용 샘플명-STRProfile 딕셔너리
+    min_shared_loci : int, optional
+        플래그할 최소 공통 좌위 수
+
+    Returns
+    -------
+    DataFrame
+        category, relation, sample_1, sample_2, shared_loci 칼럼의 데이터프레임.
+        relation은 identity(동일), inclusion(sample_1이 sample_2를 포함), included(sample_2가 sample_1을 포함), detected(Blank에서 검출)
+    """
+
+    markers = [loci for loci in markers if loci not in EXCLUDE_MARKERS]
+    matrix = NFS_DNA.ProfileMatrix.from_profiles(profiles, markers, ignore_alleles=IGNORE_ALLELES)
+    rows = _pairs('cross-case', matrix, matrix, min_shared_loci, same=True, case_filter=True)
+    for category, others in [('control', controls), ('elimination', elimination)]:
+        if others:
+            matrix_other = NFS_DNA.ProfileMatrix.from_profiles(others, markers, ignore_alleles=IGNORE_ALLELES)
+            rows.extend(_pairs(category, matrix, matrix_other, min_shared_loci))
+    if blanks:
+        matrix_blank = NFS_DNA.ProfileMatrix.from_profiles(blanks, markers, ignore_alleles=IGNORE_ALLELES)
+        for name, num_loci in zip(matrix_blank.sample_names, matrix_blank.present.sum(axis=1)):
+            if num_loci > 0:
+                rows.append(('blank', 'detected', name, "", int(num_loci)))
+    return pd.DataFrame(rows, columns=COLUMNS_REPORT)
@@ -0,0 +1,209 @@
+"""
+Excel, 한/글 자동화(COM) 세션을 처음 사용할 때 시작하고 여러 작업에서 재사용하는 모듈
+
+SessionPool은 앱 이름('excel', 'hwp')별로 세션을 하나씩 가지고 있다가 session(name)으로 빌려준다.
+    시작 : 처음 빌려줄 때 백엔드의 생성 함수로 시작 (프로그램 시작 시 Excel을 띄우지 않음)
+    재시작 : max_uses번 사용하면, 혹은 사용 중 예외가 발생하면 세션을 종료하고 다음 사용 때 새로 시작
+    종료 : shutdown()으로 모든 세션을 종료 (MainSuiteForm.closeEvent)
+백엔드는 'com'(Windows, win32com 필요)과 'dummy'(COM 없이 풀의 동작을 확인하기 위한 대체 세션)가 있다.
+세션은 quit() 메소드를 가져야 한다. 한/글 세션(NFS_Report의 백엔드)은 처음 만들 때 NFS_Report를 불러오므로
+이 모듈을 불러오는 것만으로는 감정서 모듈을 불러오지 않는다.
+
+Classes
+-------
+SessionPool
+    앱 이름별 세션을 지연 시작하고 재사용, 재시작, 종료하는 클래스
+ExcelSession
+    Excel.Application COM 객체로 엑셀 파일을 열거나 변환하는 세션
+DummyExcelSession
+    Excel 없이 ExcelSession 대신 사용하는 세션 (호출을 기록)
+"""
+
+import os
+import shutil
+import warnings
+import contextlib
+
+FILEFORMAT_XLSX = 51    # Excel SaveAs의 xlsx 파일 형식
+
+
+class ExcelSession():
+    """
+    Excel.Application COM 객체로 엑셀 파일을 열거나 변환하는 세션
+
+    Attributes
+    ----------
+    app : Excel.Application
+        Excel COM 객체
+
+    Methods
+    --------
+    open(filename, visible=True)
+        엑셀 파일을 Excel 창에서 연다.
+    convert(filename, filename_new, file_format=FILEFORMAT_XLSX)
+        엑셀 파일을 다른 형식으로 저장한다.
+    quit()
+        열린 통합 문서가 없으면 Excel을 종료한다.
+    """
+
+    def __init__(self):
+        import win32com.client as win32   # Windows에서만 사용 가능
+        self.app = win32.Dispatch('Excel.Application')
+
+    def open(self, filename, visible=True):
+        self.app.Visible = visible
+        return self.app.Workbooks.Open(filename)
+
+    def convert(self, filename, filename_new, file_format=FILEFORMAT_XLSX):
+        wb = self.app.Workbooks.Open(filename)
+        try:
+            wb.SaveAs(os.path.realpath(filename_new), FileFormat=file_format)
+        finally:
+            wb.Close()
+        return filename_new
+
+    def quit(self):
+        # 사용자가 보고 있는 통합 문서가 있으면 Excel 창은 그대로 두고 세션만 놓는다.
+        if self.app.Workbooks.Count == 0:
+            self.app.Quit()
+
+
+class DummyExcelSession():
+    """
+    Excel 없이 ExcelSession 대신 사용하는 세션. 호출을 calls에 기록하고 convert는 파일을 복사한다.
+
+    Attributes
+    ----------
+    calls : list
+        (메소드 이름, 인자...)의 리스트
+    closed : bool
+        quit 호출 여부
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.closed = False
+
+    def open(self, filename, visible=True):
+        self.calls.append(('open', filename))
+        return filename
+
+    def convert(self, filename, filename_new, file_format=FILEFORMAT_XLSX):
+        self.calls.append(('convert', filename, filename_new))
+        shutil.copyfile(filename, filename_new)
+        return filename_new
+
+    def quit(self):
+        self.calls.append(('quit',))
+        self.closed = True
+
+
+def hwp_session():
+    """한/글 COM 객체로 감정서를 작성하는 NFS_Report.HwpBackend를 만든다."""
+
+    import Modules.NFS_Report as NFS_Report
+    return NFS_Report.HwpBackend()
+
+
+def text_session():
+    """한/글 대신 텍스트 서식으로 감정서를 작성하는 NFS_Report.TextTemplateBackend를 만든다."""
+
+    import Modules.NFS_Report as NFS_Report
+    return NFS_Report.TextTemplateBackend()
+
+
+# 백엔드별 앱 이름-세션 생성 함수
+BACKENDS = {'com': {'excel': ExcelSession, 'hwp': hwp_session},
+            'dummy': {'excel': DummyExcelSession, 'hwp': text_session}}
+DEFAULT_BACKEND = 'com' if os.name == 'nt' else 'dummy'
+
+
+class SessionPool():
+    """
+    앱 이름별 자동화 세션을 처음 사용할 때 시작하고 재사용하며, max_uses번 사용 후 혹은 오류 시 재시작하는 클래스
+
+    Attributes
+    ----------
+    factories : dict
+        앱 이름-세션 생성 함수
+    max_uses : int
+        세션을 재시작하기 전까지 사용할 횟수 (None이면 재시작하지 않음)
+    starts : dict
+        앱 이름-세션을 시작한 횟수
+
+    Methods
+    --------
+    session(name)
+        앱의 세션을 빌려주는 context manager. 사용 횟수를 세고 예외가 발생하면 세션을 재시작한다.
+    get(name)
+        앱의 세션을 반환한다. 시작하지 않았으면 시작한다.
+    is_running(name)
+        앱의 세션이 시작되어 있는지 여부를 반환한다.
+    recycle(name)
+        앱의 세션을 종료한다. 다음 사용 때 새로 시작한다.
+    shutdown()
+        모든 세션을 종료한다.
+    """
+
+    def __init__(self, backend=None, max_uses=20, factories=None):
+        """
+        Parameters
+        ----------
+        backend : str, optional
+            'com' 혹은 'dummy' (없으면 Windows에서 'com', 그 외 'dummy')
+        max_uses : int, optional
+            세션을 재시작하기 전까지 사용할 횟수 (None이면 재시작하지 않음)
+        factories : dict, optional
+            앱 이름-세션 생성 함수. 주면 backend 대신 사용
+
+        Raises
+        ------
+        ValueError
+            지원하지 않는 백엔드인 경우
+        """
+
+        if factories is None:
+            backend = backend or DEFAULT_BACKEND
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown session backend : {backend}")
+            factories = BACKENDS[backend]
+        self.factories = dict(factories)
+        self.max_uses = max_uses
+        self.starts = {name: 0 for name in self.factories}
+        self.__sessions = {}    # 앱 이름-[세션, 사용 횟수]
+
+    def get(self, name):
+        if name not in self.__sessions:
+            self.__sessions[name] = [self.factories[name](), 0]
+            self.starts[name] += 1
+        return self.__sessions[name][0]
+
+    def is_running(self, name):
+        return name in self.__sessions
+
+    @contextlib.contextmanager
+    def session(self, name):
+        session = self.get(name)
+        try:
+            yield session
+        except Exception:
+            self.recycle(name)  # 오류 후의 세션 상태는 믿을 수 없으므로 새로 시작
+            raise
+        entry = self.__sessions.get(name)
+        if entry is not None and entry[0] is session:
+            entry[1] += 1
+            if self.max_uses is not None and entry[1] >= self.max_uses:
+                self.recycle(name)
+
+    def recycle(self, name):
+        entry = self.__sessions.pop(name, None)
+        if entry is None:
+            return
+        try:
+            entry[0].quit()
+        except Exception as e:  # 이미 죽은 세션은 버리기만 함
+            warnings.warn(f"Failed to quit {name} session : {type(e).__name__}: {e}", RuntimeWarning)
+
+    def shutdown(self):
+        for name in list(self.__sessions):
+            self.recycle(name)
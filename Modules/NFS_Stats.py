@@ -0,0 +1,293 @@
+"""
+집단 좌위값 빈도표로 단일 프로파일의 무작위 일치 확률(RMP)과 Matching Probability(1/RMP)를 계산하는 모듈
+
+빈도표는 Allele 열과 좌위별 열로 된 csv 파일(좌위명은 CombinedResult.dict_markers와 같게)을 사용한다.
+Allele 열의 값이 N인 행이 있으면 좌위별 조사 인원으로 보고 빈도표에 없는 좌위값의 최소 빈도(5/2N)를 정한다.
+
+    Allele,D3S1358,vWA,...
+    N,1000,1000,...
+    14,0.052,0.071,...
+
+디엔에이형 빈도는 NRC II 권고안의 4.10 식(θ 보정)으로 계산한다.
+    동형접합 AA : [2θ + (1-θ)p][3θ + (1-θ)p] / [(1+θ)(1+2θ)]
+    이형접합 AB : 2[θ + (1-θ)p][θ + (1-θ)q] / [(1+θ)(1+2θ)]
+
+Classes
+-------
+AlleleFrequencyTable
+    좌위별 좌위값-빈도를 NumPy 배열로 가지고 CombinedResult 전체의 RMP를 한 번에 계산하는 클래스
+
+Functions
+---------
+load_frequency_table(path)
+    빈도표 csv 파일을 읽어 AlleleFrequencyTable로 반환한다. 같은 파일(경로, 수정시각)은 다시 읽지 않는다.
+genotype_probability(p, q, homozygous, theta=0.01)
+    좌위값 빈도 배열 p, q로 디엔에이형 빈도 배열을 계산한다.
+format_mp(rmp)
+    RMP를 Tomato와 같은 Matching Probability 표기(e.g. 1.2E+20)로 변환한다.
+normalize_mp(value)
+    Tomato 파일에서 읽은 Matching Probability 값(문자열 혹은 숫자)을 format_mp와 같은 표기로 변환한다.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+PATH_FREQUENCY = '/Settings/allele_frequency.csv'   # 프로그램 폴더 기준 기본 빈도표 경로
+EXCLUDE_MARKERS = ('AMEL',)
+IGNORE_ALLELES = ('', 'ND', 'NC')
+
+_tables = {}   # 경로-(수정시각, AlleleFrequencyTable)
+
+
+def load_frequency_table(path):
+    """
+    빈도표 csv 파일을 읽어 AlleleFrequencyTable로 반환한다. 경로와 수정시각이 같으면 이전에 읽은 객체를 반환한다.
+
+    Parameters
+    ----------
+    path : str
+        빈도표 csv 파일의 경로
+    """
+
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    if path not in _tables or _tables[path][0] != mtime:
+        _tables[path] = (mtime, AlleleFrequencyTable.from_csv(path))
+    return _tables[path][1]
+
+
+def genotype_probability(p, q, homozygous, theta=0.01):
+    """
+    좌위값 빈도 배열 p, q로 NRC II 4.10 식(θ 보정)의 디엔에이형 빈도 배열을 계산한다.
+
+    Parameters
+    ----------
+    p, q : ndarray
+        두 좌위값의 빈도 (동형접합이면 q는 사용하지 않음)
+    homozygous : ndarray
+        동형접합 여부(bool) 배열
+    theta : float, optional
+        집단 내 근친 보정 계수 θ (F_ST)
+
+    Returns
+    -------
+    ndarray
+        디엔에이형 빈도
+    """
+
+    p = np.asarray(p, dtype=float)
+    q = np.asarray(q, dtype=float)
+    denominator = (1 + theta) * (1 + 2 * theta)
+    homo = (2 * theta + (1 - theta) * p) * (3 * theta + (1 - theta) * p) / denominator
+    hetero = 2 * (theta + (1 - theta) * p) * (theta + (1 - theta) * q) / denominator
+    return np.where(homozygous, homo, hetero)
+
+
+def format_mp(rmp):
+    """
+    RMP를 Tomato와 같은 Matching Probability 표기(1/RMP, e.g. 1.2E+20)로 변환한다. RMP가 없으면 빈 문자열을 반환한다.
+
+    Parameters
+    ----------
+    rmp : float
+        무작위 일치 확률
+    """
+
+    if rmp is None or not np.isfinite(rmp) or rmp <= 0:
+        return ""
+    return f"{1 / rmp:.1E}"
+
+
+def normalize_mp(value):
+    """
+    Tomato 파일에서 읽은 Matching Probability 값을 format_mp와 같은 표기(e.g. 1.2E+20)로 변환한다.
+    pandas는 '1.2E+20' 같은 셀을 숫자로 읽으므로 문자열과 숫자를 모두 받는다. 값이 없거나 숫자가 아니면 빈 문자열을 반환한다.
+
+    Parameters
+    ----------
+    value : str or float
+        Matching Probability 값
+    """
+
+    try:
+        mp = float(str(value).strip())
+    except ValueError:
+        return ""
+    if not np.isfinite(mp) or mp <= 0:
+        return ""
+    return f"{mp:.1E}"
+
+
+class AlleleFrequencyTable():
+    """
+    좌위별 좌위값-빈도를 가지고 프로파일의 무작위 일치 확률(RMP)을 계산하는 클래스
+
+    계산한 RMP는 프로파일의 좌위값 구성과 θ별로 저장해 두고 같은 프로파일은 다시 계산하지 않는다.
+
+    Attributes
+    ----------
+    alleles : dict
+        좌위-좌위값 배열
+    frequencies : dict
+        좌위-빈도 배열 (alleles와 같은 순서)
+    min_frequencies : dict
+        좌위-빈도표에 없는 좌위값에 사용할 최소 빈도
+
+    Methods
+    --------
+    from_csv(path, min_frequency=None)
+        빈도표 csv 파일을 읽어 객체를 생성한다.
+    lookup(marker, alleles)
+        해당 좌위의 좌위값 배열에 대한 빈도 배열을 반환한다.
+    random_match_probability(profiles, theta=0.01, markers=None)
+        샘플명-STRProfile 딕셔너리 전체의 RMP를 한 번에 계산하여 Series로 반환한다.
+    matching_probability(profiles, theta=0.01, markers=None)
+        random_match_probability의 결과를 Matching Probability 표기로 변환하여 반환한다.
+    """
+
+    def __init__(self, frequencies, sample_sizes=None, min_frequency=None):
+        """
+        Parameters
+        ----------
+        frequencies : DataFrame
+            index는 좌위값(str), columns는 좌위명인 빈도 데이터프레임 (없는 값은 NaN)
+        sample_sizes : dict, optional
+            좌위-조사 인원. 있으면 최소 빈도를 5/2N으로 정함
+        min_frequency : float, optional
+            모든 좌위에 사용할 최소 빈도. 없으면 5/2N 혹은 해당 좌위의 가장 작은 빈도
+        """
+
+        sample_sizes = sample_sizes or {}
+        self.alleles = {}
+        self.frequencies = {}
+        self.min_frequencies = {}
+        for marker in frequencies.columns:
+            column = frequencies[marker].dropna()
+            column = column[column > 0]
+            self.alleles[marker] = column.index.to_numpy(dtype=object)
+            self.frequencies[marker] = column.to_numpy(dtype=float)
+            if min_frequency is not None:
+                self.min_frequencies[marker] = min_frequency
+            elif sample_sizes.get(marker):
+                self.min_frequencies[marker] = 5 / (2 * sample_sizes[marker])
+            else:
+                self.min_frequencies[marker] = float(column.min()) if len(column) != 0 else 1.0
+        self.__series = {marker: pd.Series(self.frequencies[marker], index=self.alleles[marker])
+                         for marker in self.alleles}
+        self.__cache = {}
+
+    @classmethod
+    def from_csv(cls, path, min_frequency=None):
+        """
+        빈도표 csv 파일을 읽어 객체를 생성한다.
+
+        Parameters
+        ----------
+        path : str
+            Allele 열과 좌위별 열로 된 빈도표 csv 파일
+        min_frequency : float, optional
+            빈도표에 없는 좌위값에 사용할 최소 빈도
+        """
+
+        df = pd.read_csv(path, dtype={'Allele': str})
+        df['Allele'] = df['Allele'].str.strip()
+        df = df.set_index('Allele')
+        sample_sizes = {}
+        if 'N' in df.index:
+            sample_sizes = pd.to_numeric(df.loc['N'], errors='coerce').dropna().to_dict()
+            df = df.drop(index='N')
+        df = df.apply(pd.to_numeric, errors='coerce')
+        return cls(df, sample_sizes=sample_sizes, min_frequency=min_frequency)
+
+    def lookup(self, marker, alleles):
+        """
+        해당 좌위의 좌위값 배열에 대한 빈도 배열을 반환한다. 빈도표에 없는 좌위값은 최소 빈도를 사용한다.
+
+        Parameters
+        ----------
+        marker : str
+            좌위명
+        alleles : array-like
+            좌위값(str) 배열
+        """
+
+        series = self.__series[marker]
+        return series.reindex(alleles).fillna(self.min_frequencies[marker]).to_numpy(dtype=float)
+
+    def __profile_key(self, profile, markers):
+        return tuple((loci, tuple(alleles)) for loci, alleles in profile.profile.items() if loci in markers)
+
+    def random_match_probability(self, profiles, theta=0.01, markers=None):
+        """
+        샘플명-STRProfile 딕셔너리 전체의 RMP를 좌위별로 한 번에 계산하여 반환한다.
+
+        좌위값이 없거나(ND, NC) 빈도표에 없는 좌위는 계산에서 제외하고, 혼합형(check_MX) 프로파일은 NaN으로 둔다.
+
+        Parameters
+        ----------
+        profiles : dict
+            샘플명-STRProfile 딕셔너리 (e.g. CombinedResult.profiles)
+        theta : float, optional
+            θ 보정 계수
+        markers : list, optional
+            계산에 사용할 좌위 (없으면 빈도표의 모든 좌위)
+
+        Returns
+        -------
+        Series
+            샘플명-RMP
+        """
+
+        markers = [loci for loci in (markers if markers is not None else self.alleles.keys())
+                   if loci in self.alleles and loci not in EXCLUDE_MARKERS]
+        set_markers = set(markers)
+        result = {}
+        pending = {}    # 캐시에 없는 프로파일의 키-샘플명 리스트
+        for sample_name, profile in profiles.items():
+            if profile.check_MX():
+                result[sample_name] = np.nan
+                continue
+            key = (theta, self.__profile_key(profile, set_markers))
+            if key in self.__cache:
+                result[sample_name] = self.__cache[key]
+            else:
+                pending.setdefault(key, []).append(sample_name)
+        if pending:
+            keys = list(pending.keys())
+            profile_dicts = [dict(profile_key) for _, profile_key in keys]
+            log_rmp = np.zeros(len(keys))
+            for loci in markers:
+                rows, first, second = [], [], []
+                for i, profile_dict in enumerate(profile_dicts):
+                    alleles = profile_dict.get(loci)
+                    if alleles is None:
+                        continue
+                    alleles = [allele for allele in alleles if allele not in IGNORE_ALLELES and allele.find("OL") == -1]
+                    if len(alleles) == 0:
+                        continue
+                    rows.append(i)
+                    first.append(alleles[0])
+                    second.append(alleles[-1])
+                if len(rows) == 0:
+                    continue
+                homozygous = np.asarray(first, dtype=object) == np.asarray(second, dtype=object)
+                probability = genotype_probability(self.lookup(loci, first), self.lookup(loci, second), homozygous, theta)
+                np.add.at(log_rmp, np.asarray(rows), np.log10(probability))
+            for key, value in zip(keys, np.power(10.0, log_rmp)):
+                self.__cache[key] = value
+                for sample_name in pending[key]:
+                    result[sample_name] = value
+        return pd.Series(result, index=list(profiles.keys()), dtype=float)
+
+    def matching_probability(self, profiles, theta=0.01, markers=None):
+        """
+        random_match_probability의 결과를 Matching Probability 표기(1/RMP, e.g. 1.2E+20)로 변환하여 반환한다.
+
+        Returns
+        -------
+        Series
+            샘플명-Matching Probability 문자열 (계산할 수 없으면 빈 문자열)
+        """
+
+        return self.random_match_probability(profiles, theta=theta, markers=markers).map(format_mp)
@@ -0,0 +1,268 @@
+"""
+Y23 kit의 Y-STR 하플로타입을 정규화하고 일치/유사 하플로타입을 검색하는 모듈
+
+좌위값 표기는 다음과 같이 정규화한다.
+    DYS385 등 다중 복제 좌위 : 좌위값을 숫자 순서로 정렬하고 중복을 제거 (e.g. '14-11' => '11-14', '9-11'은 문자열 정렬과 달리 그대로)
+    DYS389 I/II 등 단일 좌위 : 숫자 표기를 통일 (e.g. '13.0' => '13', ' 29 ' => '29')
+    구분자 ',', '/', ' '는 '-'와 같이 취급하고, 미검출 값(ND, NC, OL 등)은 제외
+정규화한 좌위값을 좌위 순서대로 묶은 tuple을 하플로타입 키로 사용하여 해시 테이블로 완전 일치를 찾는다.
+유사 일치는 좌위마다 (좌위값 코드 정렬 배열, 행 번호) 색인을 만들어 쿼리와 같은 좌위값을 가진 행만 세고,
+불일치 허용 수 안에 들 수 있는 후보의 행만 좌위 배열과 비교한다.
+
+Classes
+-------
+HaplotypeIndex
+    여러 하플로타입을 좌위값 코드 배열과 좌위별 색인으로 저장하고 완전/유사 일치를 검색하는 클래스
+
+Functions
+---------
+normalize_alleles(alleles)
+    좌위값 리스트를 정규화한 표기('-'로 연결)로 반환한다.
+haplotype_key(profile, markers)
+    STRProfile을 좌위 순서대로 정규화한 하플로타입 키(tuple)로 반환한다.
+"""
+
+import re
+import functools
+import numpy as np
+import pandas as pd
+
+MARKERS = ['DYS576', 'DYS389 I', 'DYS448', 'DYS389 II', 'DYS19', 'DYS391',
+           'DYS481', 'DYS533', 'DYS438', 'DYS437', 'DYS570',
+           'DYS635', 'DYS390', 'DYS439', 'DYS392', 'DYS393',
+           'DYS458', 'DYS385', 'DYS456', 'Y GATA H4']   # CombinedResult.dict_markers["Y23"]와 같은 순서
+UNTYPED = ('', 'ND', 'NC', 'NAN')
+PATTERN_SEPARATOR = re.compile(r'[-,/\s]+')
+
+
+def _allele_order(allele):
+    """좌위값을 숫자 순서로 정렬하기 위한 키. 숫자가 아닌 값은 뒤로 보낸다."""
+
+    try:
+        return (0, float(allele), allele)
+    except ValueError:
+        return (1, 0.0, allele)
+
+
+def _format_allele(allele):
+    """숫자 좌위값의 표기를 통일한다. (e.g. '13.0' => '13', '13.20' => '13.2')"""
+
+    try:
+        return f"{float(allele):g}"
+    except ValueError:
+        return allele
+
+
+def normalize_alleles(alleles):
+    """
+    좌위값 리스트를 정규화한 표기로 반환한다. 좌위값이 없으면 빈 문자열을 반환한다.
+
+    Parameters
+    ----------
+    alleles : list or str
+        좌위값 리스트 혹은 구분자로 연결된 문자열
+
+    Returns
+    -------
+    str
+        숫자 순서로 정렬하고 '-'로 연결한 좌위값 (e.g. '11-14')
+    """
+
+    if isinstance(alleles, str):
+        alleles = [alleles]
+    return _normalize(tuple(alleles))
+
+
+@functools.lru_cache(maxsize=None)
+def _normalize(alleles):
+    """normalize_alleles의 계산. 좌위값 종류가 적으므로 같은 입력은 다시 계산하지 않는다."""
+
+    values = []
+    for value in alleles:
+        for allele in PATTERN_SEPARATOR.split(str(value).strip()):
+            if allele.upper() in UNTYPED or allele.upper().find("OL") != -1:
+                continue
+            values.append(_format_allele(allele))
+    return '-'.join(sorted(dict.fromkeys(values), key=_allele_order))
+
+
+def haplotype_key(profile, markers=MARKERS):
+    """
+    STRProfile을 좌위 순서대로 정규화한 하플로타입 키로 반환한다. 좌위값이 없는 좌위는 빈 문자열이다.
+
+    Parameters
+    ----------
+    profile : NFS_DNA.STRProfile
+        Y23 프로파일
+    markers : list, optional
+        키에 사용할 좌위 순서
+    """
+
+    dict_profile = profile.profile
+    return tuple(normalize_alleles(dict_profile.get(loci, ())) for loci in markers)
+
+
+class HaplotypeIndex():
+    """
+    여러 하플로타입을 좌위값 코드 배열과 좌위별 색인으로 저장하고 완전/유사 일치를 검색하는 클래스
+
+    Attributes
+    ----------
+    markers : list
+        좌위 순서
+    info : DataFrame
+        행별 정보 (sample_name 칼럼과 run, date 등 생성 시 준 칼럼)
+    codes : ndarray
+        행 x 좌위 크기의 좌위값 코드 배열 (좌위값이 없으면 -1)
+    present : ndarray
+        행 x 좌위 크기의 좌위값 존재 여부 bool 배열
+    values : list
+        좌위별 정규화된 좌위값-코드 딕셔너리의 리스트
+
+    Methods
+    --------
+    from_profiles(profiles, markers=MARKERS)
+        샘플명-STRProfile 딕셔너리로 객체를 생성한다.
+    from_frame(df, markers=MARKERS)
+        sample_name과 좌위별 칼럼을 가진 데이터프레임(e.g. ProfileDatabase.load_profiles)으로 객체를 생성한다.
+    exact(profile)
+        정규화한 하플로타입이 완전히 같은 행의 정보를 반환한다.
+    search(profile, max_mismatch=1, min_shared_loci=10, limit=50)
+        공통 좌위 중 불일치 좌위가 max_mismatch개 이하인 행을 불일치 수 순서로 반환한다.
+    """
+
+    def __init__(self, info, haplotypes, markers=MARKERS):
+        """
+        Parameters
+        ----------
+        info : DataFrame
+            행별 정보 (sample_name 칼럼 필수)
+        haplotypes : list
+            행별 하플로타입 키(haplotype_key의 반환값)의 리스트
+        markers : list, optional
+            하플로타입 키의 좌위 순서
+        """
+
+        self.markers = list(markers)
+        self.info = info.reset_index(drop=True)
+        self.values = [{} for _ in self.markers]
+        self.codes = np.full((len(haplotypes), len(self.markers)), -1, dtype=np.int32)
+        self.__keys = {}    # 하플로타입 키-행 번호 리스트
+        for i, key in enumerate(haplotypes):
+            self.__keys.setdefault(key, []).append(i)
+            for j, value in enumerate(key):
+                if value != "":
+                    self.codes[i, j] = self.values[j].setdefault(value, len(self.values[j]))
+        self.present = self.codes >= 0
+        # 좌위별 색인 : 코드로 정렬한 행 번호와 정렬된 코드 (같은 코드의 행은 searchsorted로 구간을 찾음)
+        self.__order = np.argsort(self.codes, axis=0, kind='stable')
+        self.__sorted = np.take_along_axis(self.codes, self.__order, axis=0)
+
+    @classmethod
+    def from_profiles(cls, profiles, markers=MARKERS):
+        """
+        샘플명-STRProfile 딕셔너리로 객체를 생성한다.
+
+        Parameters
+        ----------
+        profiles : dict
+            샘플명-STRProfile 딕셔너리 (e.g. CombinedResult.profiles)
+        markers : list, optional
+            좌위 순서
+        """
+
+        sample_names = list(profiles.keys())
+        haplotypes = [haplotype_key(profiles[sample_name], markers) for sample_name in sample_names]
+        return cls(pd.DataFrame({'sample_name': sample_names}), haplotypes, markers)
+
+    @classmethod
+    def from_frame(cls, df, markers=MARKERS):
+        """
+        sample_name과 좌위별 칼럼(좌위값은 '-'로 연결)을 가진 데이터프레임으로 객체를 생성한다.
+
+        Parameters
+        ----------
+        df : DataFrame
+            sample_name 칼럼과 좌위 칼럼을 가진 데이터프레임. 나머지 칼럼은 info에 저장
+        markers : list, optional
+            좌위 순서
+        """
+
+        df_markers = df.reindex(columns=markers).fillna("").astype(str)
+        haplotypes = [tuple(normalize_alleles(value) for value in row)
+                      for row in df_markers.itertuples(index=False, name=None)]
+        info = df[[column for column in df.columns if column not in markers]]
+        return cls(info, haplotypes, markers)
+
+    def __len__(self):
+        return len(self.info)
+
+    def __query_codes(self, profile):
+        """쿼리의 좌위별 코드 배열을 반환한다. 좌위값이 없으면 -1, 색인에 없는 좌위값이면 -2."""
+
+        key = haplotype_key(profile, self.markers)
+        return np.array([-1 if value == "" else self.values[j].get(value, -2) for j, value in enumerate(key)],
+                        dtype=np.int32)
+
+    def exact(self, profile):
+        """
+        정규화한 하플로타입이 완전히 같은(좌위값이 없는 좌위도 같은) 행의 정보를 반환한다.
+
+        Parameters
+        ----------
+        profile : NFS_DNA.STRProfile
+            검색할 Y23 프로파일
+        """
+
+        rows = self.__keys.get(haplotype_key(profile, self.markers), [])
+        return self.info.iloc[rows].reset_index(drop=True)
+
+    def search(self, profile, max_mismatch=1, min_shared_loci=10, limit=50):
+        """
+        쿼리와 양쪽 모두 좌위값이 있는 좌위가 min_shared_loci개 이상이고 그 중 불일치 좌위가 max_mismatch개 이하인 행을 반환한다.
+
+        좌위별 색인으로 쿼리와 좌위값이 같은 좌위 수를 세고, (min_shared_loci - max_mismatch)개 이상 일치하는 후보만 비교한다.
+
+        Parameters
+        ----------
+        profile : NFS_DNA.STRProfile
+            검색할 Y23 프로파일
+        max_mismatch : int, optional
+            허용할 불일치 좌위 수
+        min_shared_loci : int, optional
+            최소 공통 좌위 수
+        limit : int, optional
+            반환할 최대 행 수
+
+        Returns
+        -------
+        DataFrame
+            info의 칼럼과 shared, mismatched, mismatched_loci 칼럼을 가진 후보 목록 (불일치 수, 공통 좌위 수 순서)
+        """
+
+        columns = list(self.info.columns) + ['shared', 'mismatched', 'mismatched_loci']
+        query = self.__query_codes(profile)
+        typed = np.nonzero(query != -1)[0]
+        if len(typed) < min_shared_loci or len(self) == 0:
+            return pd.DataFrame(columns=columns)
+        matched = np.zeros(len(self), dtype=np.int32)
+        for j in typed:
+            if query[j] < 0:
+                continue
+            lo, hi = np.searchsorted(self.__sorted[:, j], [query[j], query[j] + 1])
+            matched[self.__order[lo:hi, j]] += 1
+        candidates = np.nonzero(matched >= max(1, min_shared_loci - max_mismatch))[0]
+        codes = self.codes[np.ix_(candidates, typed)]
+        shared_mask = codes >= 0
+        mismatch_mask = shared_mask & (codes != query[typed])
+        shared = shared_mask.sum(axis=1)
+        mismatched = mismatch_mask.sum(axis=1)
+        keep = (shared >= min_shared_loci) & (mismatched <= max_mismatch)
+        order = np.lexsort((-shared[keep], mismatched[keep]))[:limit]
+        rows = candidates[keep][order]
+        df = self.info.iloc[rows].reset_index(drop=True)
+        df['shared'] = shared[keep][order]
+        df['mismatched'] = mismatched[keep][order]
+        markers = np.array(self.markers, dtype=object)[typed]
+        df['mismatched_loci'] = [', '.join(markers[mask]) for mask in mismatch_mask[keep][order]]
+        return df[columns]
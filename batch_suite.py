@@ -0,0 +1,176 @@
+"""
+GUI 없이 여러 프로젝트 폴더의 작업을 한 번에 처리하는 명령줄 프로그램
+
+각 프로젝트 폴더마다 지정한 단계를 순서대로 수행하고 ProjectStore에 저장한다. 폴더들은 여러 프로세스에서 동시에 처리한다.
+--new를 주면 주어진 폴더를 상위 폴더로 보고 '채취일자_담당자' 프로젝트 폴더를 새로 만든 후 단계를 수행한다.
+PyQt, Excel 없이 동작한다. RT 결과는 장비에서 받은 xls(바이너리는 xlrd 필요), xlsx, 텍스트 파일을 그대로 넘긴다.
+
+사용 예
+-------
+python batch_suite.py D:/2020/20200102_MKH D:/2020/20200109_MKH --steps tomato screen --jobs 4
+python batch_suite.py D:/2020/20200102_MKH --nfis Downloaded/NFIS.xlsx --steps nfis classify totalsheet rtsheet
+python batch_suite.py D:/2020 --new --analyst MKH --date 20200102 --nfis D:/NFIS.xlsx --steps nfis classify totalsheet rtsheet
+python batch_suite.py D:/2020/20200102_MKH --steps rtsheet --rt-assay "Quantifiler Trio"
+python batch_suite.py D:/2020/20200102_MKH --rt-result RT/result_P1.xls RT/result_P2.xls --steps rtimport
+
+단계
+----
+nfis : NFIS 감정처리부 파일(--nfis)을 읽고 증거물, 감정서 데이터프레임을 초기화
+classify : 감정물명의 키워드로 분류를 자동 할당
+totalsheet : 토탈샘플시트 생성
+rtsheet : 토탈샘플시트로 RT import 파일 생성 (96 웰을 넘으면 플레이트마다 파일 생성, 키트는 --rt-assay)
+rtimport : RT 결과 파일(--rt-result)의 정량값을 토탈샘플시트에 복사하고 ETC/amplification_plan.csv에 증폭 부피 계산
+tomato : Tomato 파일의 결과를 불러와 감정서 데이터프레임과 프로파일 데이터베이스에 반영 (Matching Probability가 없으면 Settings/allele_frequency.csv로 계산)
+screen : 불러온 프로파일의 오염 여부(사건 간, Control/Blank, 배제용 프로파일)를 검사하여 ETC/screening_report.csv에 저장
+kinship : 변사자(DB Type 1이 D) 프로파일과 불러온 프로파일 전체의 친자관계지수를 계산하여 ETC/kinship_screening.csv에 저장 (빈도표 필요)
+ystr : 불러온 Y23 프로파일을 프로파일 데이터베이스의 Y23 하플로타입 전체와 비교하여 ETC/y23_matches.csv에 저장
+profiledb : 불러온 프로파일을 프로파일 데이터베이스에 누적된 지난 텀의 프로파일과 비교하여 ETC/profile_db_matches.csv에 저장
+"""
+
+import os
+import sys
+import argparse
+import time
+import traceback
+from multiprocessing import Pool
+import Modules.NFS_Project as NFS_Project
+import Modules.NFS_Engine as NFS_Engine
+import Modules.NFS_RT as NFS_RT
+import Modules.NFS_Plate as NFS_Plate
+import Modules.NFS_Profiler as NFS_Profiler
+
+STEPS = ['nfis', 'classify', 'totalsheet', 'rtsheet', 'rtimport', 'tomato', 'screen', 'kinship', 'ystr', 'profiledb']
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def resolve(location, path):
+    """프로젝트 폴더 기준의 상대 경로면 프로젝트 폴더와 합친 경로를, 절대 경로면 그대로 반환한다."""
+
+    return path if os.path.isabs(path) else os.path.join(location, path)
+
+
+def run_project(location, steps, nfis=None, rt_result=None, profile=False, rt_assay=None, new=None):
+    """
+    한 프로젝트 폴더에서 steps의 단계를 순서대로 수행하고 저장한다.
+
+    Parameters
+    ----------
+    location : str
+        프로젝트 폴더의 경로
+    steps : list
+        수행할 단계 (STEPS 중에서)
+    nfis : str, optional
+        NFIS 감정처리부 파일의 경로(프로젝트 폴더 기준 상대 경로 가능)
+    rt_result : list, optional
+        플레이트별 RT 결과 파일(xls, xlsx, 텍스트)의 경로 리스트(프로젝트 폴더 기준 상대 경로 가능)
+    profile : bool, optional
+        단계마다 cProfile 결과를 ETC/profile에 저장할지 여부
+    rt_assay : str, optional
+        RT import 파일의 정량 키트 이름 (없으면 NFS_RT.DEFAULT_ASSAY)
+    new : tuple, optional
+        (담당자, 채취 일자). 주면 location을 상위 폴더로 보고 '채취일자_담당자' 프로젝트 폴더를 새로 만든다.
+
+    Returns
+    -------
+    tuple
+        (프로젝트 폴더, 성공 여부, 수행 결과 메시지)
+    """
+
+    messages = []
+    engine = None
+    try:
+        location = os.path.realpath(location).replace('\\', '/')
+        if new is None:
+            ddi = NFS_Project.load_project(location)
+        else:
+            ddi = NFS_Project.create_project(location, *new, ROOT)
+            location = ddi.location_save
+        NFS_Profiler.configure(location + '/ETC', profile=profile)
+        engine = NFS_Engine.ProjectEngine(ddi, ROOT)
+        for step in [step for step in STEPS if step in steps]:
+            if step == 'nfis':
+                if nfis is None:
+                    raise ValueError("--nfis is required for the nfis step")
+                df_evidence = engine.import_nfis(resolve(location, nfis))
+                messages.append(f"nfis: {len(df_evidence)} evidences")
+            elif step == 'classify':
+                engine.auto_classify()
+                messages.append("classify: " + ', '.join(f"{tag}={count}" for tag, count in
+                                                         ddi.df_evidence['분류'].value_counts().items()))
+            elif step == 'totalsheet':
+                messages.append("totalsheet: " + engine.generate_totalsheet())
+            elif step == 'rtsheet':
+                messages.append("rtsheet: " + ', '.join(engine.generate_rt_sheet(
+                    reserved=NFS_Plate.RESERVED_STR, assay=rt_assay or NFS_RT.DEFAULT_ASSAY)))
+            elif step == 'rtimport':
+                if rt_result is None:
+                    raise ValueError("--rt-result is required for the rtimport step")
+                paths_result = [resolve(location, path) for path in rt_result]
+                path_samplingsheet, df_rt = engine.import_rt(paths_result)
+                messages.append("rtimport: " + path_samplingsheet)
+                df_plan, path_plan = engine.plan_amplification(df_rt=df_rt)
+                messages.append(f"rtimport: {int(df_plan['inhibited'].sum())} inhibited wells ({path_plan})")
+            elif step == 'tomato':
+                changed, changed_y23 = engine.load_tomato()
+                messages.append(f"tomato: {len(changed)} changed, Y23 {len(changed_y23)} changed")
+                list_missing_mp = engine.missing_matching_probability()
+                if len(list_missing_mp) != 0:
+                    messages.append(f"tomato: no Matching Probability for {', '.join(list_missing_mp)}. "
+                                    + NFS_Engine.TEXT_FREQUENCY_FORMAT.replace('\n', ' '))
+            elif step == 'screen':
+                df_flagged, path_report = engine.screen_profiles()
+                messages.append(f"screen: {len(df_flagged)} flagged pairs ({path_report})")
+            elif step == 'kinship':
+                df_candidates, path_report = engine.screen_kinship()
+                messages.append(f"kinship: {len(df_candidates)} candidates ({path_report})")
+            elif step == 'ystr':
+                df_matches, path_report = engine.match_haplotypes()
+                messages.append(f"ystr: {len(df_matches)} matched pairs ({path_report})")
+            elif step == 'profiledb':
+                df_matches, path_report = engine.search_profile_db()
+                messages.append(f"profiledb: {len(df_matches)} matches in previous runs ({path_report})")
+        engine.save()
+    except Exception as e:
+        messages.append(f"{type(e).__name__}: {e}")
+        messages.append(traceback.format_exc())
+        if engine is not None:  # 실패하기 전까지 완료된 단계의 결과는 저장
+            engine.save()
+        return location, False, messages
+    return location, True, messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="프로젝트 폴더들의 작업을 GUI 없이 처리한다.")
+    parser.add_argument('projects', nargs='+', help="프로젝트 폴더의 경로")
+    parser.add_argument('--steps', nargs='+', choices=STEPS, default=['tomato', 'screen'], help="수행할 단계 (순서는 고정)")
+    parser.add_argument('--new', action='store_true', help="projects를 상위 폴더로 보고 '채취일자_담당자' 프로젝트 폴더를 새로 만듦")
+    parser.add_argument('--analyst', help="새 프로젝트의 담당자 (--new)")
+    parser.add_argument('--date', default=time.strftime('%Y%m%d'), help="새 프로젝트의 채취 일자 yyyyMMdd (--new, 기본값은 오늘)")
+    parser.add_argument('--nfis', help="NFIS 감정처리부 파일 (프로젝트 폴더 기준 상대 경로 가능)")
+    parser.add_argument('--rt-result', nargs='+', help="RT 결과 파일 (xls, xlsx, 텍스트. 프로젝트 폴더 기준 상대 경로 가능)")
+    parser.add_argument('--rt-assay', help="RT import 파일의 정량 키트 (Settings/rt_assays.csv로 추가 가능)")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help="동시에 처리할 프로세스 수")
+    parser.add_argument('--profile', action='store_true', help="단계마다 cProfile 결과를 ETC/profile에 저장")
+    args = parser.parse_args(argv)
+    if args.new and not args.analyst:
+        parser.error("--analyst is required with --new")
+
+    new = (args.analyst, args.date) if args.new else None
+    tasks = [(location, args.steps, args.nfis, args.rt_result, args.profile, args.rt_assay, new) for location in args.projects]
+    if args.jobs > 1 and len(tasks) > 1:
+        with Pool(min(args.jobs, len(tasks))) as pool:
+            results = pool.starmap(run_project, tasks)
+    else:
+        results = [run_project(*task) for task in tasks]
+
+    failed = 0
+    for location, success, messages in results:
+        print(f"[{'OK' if success else 'FAILED'}] {location}")
+        for message in messages:
+            print('    ' + message.rstrip('\n').replace('\n', '\n    '))
+        failed += 0 if success else 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
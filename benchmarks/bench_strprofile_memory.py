@@ -0,0 +1,83 @@
+"""
+STRProfile 객체의 프로파일당 메모리 사용량을 측정하는 벤치마크
+
+Tomato 결과와 비슷한 임의의 Globalfiler 프로파일을 만들어, 좌위-좌위값 list 딕셔너리(이전 STRProfile의 저장 방식)와
+STRProfile(__slots__, 공유 좌위명/좌위값 tuple)로 각각 저장할 때 tracemalloc으로 측정한 메모리를 비교한다.
+
+사용 예
+-------
+python benchmarks/bench_strprofile_memory.py --samples 20000
+"""
+
+import os
+import sys
+import gc
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import Modules.NFS_DNA as NFS_DNA
+
+
+class DictProfile():
+    """이전 STRProfile과 같은 방식(__dict__, 좌위-좌위값 list 딕셔너리)으로 저장하는 비교용 클래스"""
+
+    def __init__(self, id="", profile={}):
+        self.id = id
+        self.profile = profile
+        self.__TA_THRESHOLD = 0
+
+
+def make_rows(num_samples, seed=0):
+    """Tomato 파일을 읽을 때처럼 샘플마다 좌위값 문자열을 새로 split한 (샘플명, 좌위-좌위값 list 딕셔너리)를 반환한다."""
+
+    rng = random.Random(seed)
+    markers = NFS_DNA.CombinedResult.dict_markers["GF/PPF"]
+    rows = []
+    for i in range(num_samples):
+        profile = {}
+        for loci in markers:
+            if loci == "AMEL":
+                value = rng.choice(["X-X", "X-Y"])
+            else:
+                value = '-'.join(sorted({str(rng.randint(8, 20)) for _ in range(2)}))
+            profile[''.join(loci)] = value.split('-')  # 파일에서 읽은 것처럼 좌위명도 샘플마다 별도의 문자열
+        rows.append((f"2020-D-{i:05d}-1", profile))
+    return rows
+
+
+def measure(cls, num_samples):
+    """파일을 읽어 cls로 프로파일 객체를 만든 후 객체가 계속 붙잡고 있는 메모리(byte)를 반환한다."""
+
+    tracemalloc.start()
+    rows = make_rows(num_samples)
+    pool = {} if cls is NFS_DNA.STRProfile else None
+    profiles = {sample_name: cls(id=sample_name, profile=profile) if pool is None else cls(id=sample_name, profile=profile, pool=pool)
+                for sample_name, profile in rows}
+    del pool
+    del rows    # 원본 행은 버리고 객체가 참조하는 것만 남김
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del profiles
+    return size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="STRProfile의 프로파일당 메모리 사용량을 측정한다.")
+    parser.add_argument('--samples', type=int, default=10000, help="만들 프로파일 수")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, cls in [("dict (legacy)", DictProfile), ("STRProfile", NFS_DNA.STRProfile)]:
+        results[name] = measure(cls, args.samples)
+    print(f"samples : {args.samples}")
+    for name, size in results.items():
+        print(f"{name:15s}\t{size / 1024 / 1024:8.2f} MB\t{size / args.samples:8.0f} B/profile")
+    print(f"ratio : {results['STRProfile'] / results['dict (legacy)']:.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
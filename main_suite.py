@@ -2,7 +2,7 @@ from PyQt5.QtWidgets import *
 from PyQt5 import uic
 from PyQt5 import QtCore
 from PyQt5.QtGui import *
-from openpyxl import Workbook, load_workbook
+from openpyxl import load_workbook
 from openpyxl.styles import Alignment
 import os, sys
 import numpy as np
@@ -10,12 +10,16 @@ import pandas as pd
 import pickle
 import subprocess
 import sys
-import win32com.client as win32
 import time
-import re
 import shutil # 파일 복사용 모듈
-import Modules.NFS_DNA as NFS_DNA
-from time import sleep
+import Modules.NFS_ProjectStore as NFS_ProjectStore
+import Modules.NFS_Profiler as NFS_Profiler
+import Modules.NFS_Project as NFS_Project
+import Modules.NFS_Engine as NFS_Engine
+import Modules.NFS_Plate as NFS_Plate
+import Modules.NFS_Report as NFS_Report
+import Modules.NFS_Session as NFS_Session
+from Modules.NFS_Project import DataDNAIdentification   # 이전 버전의 pickle과 기존 코드에서 main_suite.DataDNAIdentification으로 참조
 
 
 # QtDesigner로 만든 UI 파일을 로딩
@@ -23,97 +27,6 @@ form_entry = uic.loadUiType("GUI/EntryForm.ui")[0]
 form_main_suite = uic.loadUiType('GUI/MainSuiteForm.ui')[0]
 
 
-class DataDNAIdentification:
-    """
-    채취 한 텀에서 얻은 데이터와 해당 데이터의 저장 정보를 보관하는 클래스
-
-    Attributes
-    ----------
-    location_save : str
-        해당 텀의 데이터를 보관하는 폴더의 위치
-    analyst : str
-        해당 텀에 담당자
-    date : str
-        채취 일자
-    df_evidence : pandas.DataFrame
-        NFIS 상에서 다운로드한 감정처리부 데이터와 감정처리부를 가공한 데이터, 실험 여부 등을 감정물 별로 저장하는 데이터프레임
-    nfis_loaded : bool
-        NFIS 파일을 df_evidence에 입력했는지 여부
-    list_tag : list
-        감정물의 기본 분류 (e.g REF, LCN)
-    path_tomato : string
-        해당 프로젝트의 tomato 파일 경로
-    path_totalsheet : string
-        해당 프로젝트의 total_sheet 파일 경로
-    path_resamplesheet : string
-        해당 프로젝트의 RESAMPLING 파일 경로
-    path_picture : string
-        해당 프로젝트의 감정물 사진이 보관된 폴더 경로
-    combined_result : NFS_DNA.CombinedResult
-        Tomato 파일에서 CombinedResult 탭의 정보를 parsing한
-    Methods
-    -------
-    change_path(path)
-        EntryForm에서 ddi를 불러들일 때 ddi가 위치했던 경로로 각종 파일의 경로를 변경(폴더가 생성 위치에서 옮겨졌을 때 대비)
-    get_defaultname()
-        파일 이름에 쓰일 기본 이름(날짜+담당자(+ 특이사항))을 반환한다.
-    """
-
-    def __init__(self, location_save, analyst, date):
-        """
-        Parameters
-        ----------
-        location_save : str
-             해당 텀의 데이터를 보관하는 폴더의 위치
-        analyst : str
-            해당 텀에 담당자
-        date : str
-            채취 일자
-        """
-
-        self.location_save = location_save
-        self.analyst = analyst
-        self.date = date
-        self.df_evidence = pd.DataFrame()   # NFIS감정처리부 파일을 DataFrame으로 저장
-        self.df_report = pd.DataFrame() # 감정서 작성용 DataFrame
-        self.nfis_loaded = False
-        self.list_tag = ['LCN', 'MF', 'REF'] # 기본분류
-        self.path_tomato = location_save + '/' + date + '-' + analyst + '-Tomato-TOTAL.xlsm'
-        self.path_tomato_y23 = location_save + '/' + date + '-' + analyst + '-Tomato-Y23.xlsm'
-        self.path_totalsheet = location_save + '/Sheets/' + date + '-' + analyst + '-' + 'TOTAL.xlsm'
-        self.path_resamplesheet = location_save + '/Sheets/' + date + '-' + analyst + '-' + 'RESAMPLING.xlsm'
-        self.path_picture = location_save + '/감정물사진/'
-        self.combined_result = NFS_DNA.CombinedResult(kit="GF/PPF")
-        self.combined_result_y23 = NFS_DNA.CombinedResult(kit="Y23")
-
-    def change_path(self, path):
-        """
-        EntryForm에서 ddi를 불러들일 때 ddi가 위치했던 경로로 각종 파일의 경로를 변경(폴더가 생성 위치에서 옮겨졌을 때 대비)
-
-        Parameter
-        ---------
-        path : str
-            변경할 폴더 위치
-        """
-        self.location_save = path
-        self.path_tomato = path + '/' + self.date + '-' + self.analyst + '-Tomato-TOTAL.xlsm'
-        self.path_totalsheet = path + '/Sheets/' + self.date + '-' + self.analyst + '-' + 'TOTAL.xlsm'
-        self.path_resamplesheet = path + '/Sheets/' + self.date + '-' + self.analyst + '-' + 'RESAMPLING.xlsm'
-        self.path_picture = path + '/감정물사진/'
-
-    def get_defaultname(self):
-        """
-        파일 이름에 쓰일 기본 이름(날짜+담당자)을 반환한다.
-
-        Returns
-        -------
-        str
-            기본 파일명(채취날짜_담당자))
-        """
-        defaultname = '%s-%s' % (self.date, self.analyst)
-        return defaultname
-
-
 class EntryForm(QDialog, form_entry):
     """
     프로그램 시작 시 새로 프로젝트 폴더를 생성하거나 기존 폴더의 데이터를 불러올 도입부의 GUI 구현하는 클래스
@@ -145,7 +58,7 @@ class EntryForm(QDialog, form_entry):
     click_btn_ok()
         QPushButton 객체인 btn_ok의 클릭 이벤트. 입력 받은 값을 토대로 폴더와 DataDNAIdentification 객체를 생성하고 GUI_main_suite에 인자로 넘긴 후 메인 GUI를 활성화한다.
     click_btn_load()
-        QPushButton 객체인 btn_load의 클릭 이벤트. 지정한 폴더 내 DataDNAIdentification 객체 pickle 데이터를 읽고 GUI_main_suite에 인자로 넘긴 후 메인 GUI를 활성화한다.
+        QPushButton 객체인 btn_load의 클릭 이벤트. 지정한 폴더 내 DataDNAIdentification 객체 데이터를 읽고 GUI_main_suite에 인자로 넘긴 후 메인 GUI를 활성화한다.
     click_btn_exit()
         QPushButton 객체인 btn_exit의 클릭 이벤트. 프로그램을 종료한다.
     """
@@ -215,42 +128,23 @@ class EntryForm(QDialog, form_entry):
 
         """
 
-        new_dir = '%s/%s_%s' % (self.line_savelocation.text(),
-                                self.line_date.date().toString('yyyyMMdd'),
-                                self.line_analyst.text())
-        os.chdir(self.line_savelocation.text())
-        if not os.path.exists(new_dir):
-            os.mkdir(new_dir)
-            os.chdir(new_dir)
-            os.mkdir('Downloaded')  # Import한 파일들을 복사해서 저장할 위치
-            os.mkdir('Sheets') # 샘플시트들을 저장할 위치
-            os.mkdir('RT') # RT 관련 파일들을 저장할 위치
-            os.mkdir('DATA') # 리딩 후 생성된 데이터를 보관할 위치
-            os.mkdir('DB')  # DB 관련된 데이터를 보관할 위치
-            os.mkdir('ETC') # 기타 생성된 시트 및 데이터를 보관할 위치
-            os.mkdir('Reports')
-            os.mkdir('감정물사진')
-            # 하위 폴더가 추가로 필요할 경우 이곳에 추가
-            shutil.copyfile(self.root + '/Form/form_Tomato_Tools_18.10_customized.xlsm', new_dir + '/' + self.line_date.date().toString('yyyyMMdd') + "-" + self.line_analyst.text() + "-Tomato-TOTAL.xlsm")
-            shutil.copyfile(self.root + '/Form/form_Tomato_Tools_18.10_customized.xlsm',
-                            new_dir + '/' + self.line_date.date().toString(
-                                'yyyyMMdd') + "-" + self.line_analyst.text() + "-Tomato-Y23.xlsm")
-        else:
+        try:
+            ddi_new = NFS_Project.create_project(self.line_savelocation.text(), self.line_analyst.text(),
+                                                 self.line_date.date().toString('yyyyMMdd'), self.root)
+        except FileExistsError:
             QMessageBox.information(self, 'Error', 'Same folder exists')
             return
-        os.chdir(self.root) #current working directory를 실행파일이 존재하는 디렉토리로 변경
-        ddi_new = DataDNAIdentification(location_save=os.path.realpath(new_dir), analyst=self.line_analyst.text(),
-                                        date=self.line_date.date().toString('yyyyMMdd'))
         self.GUI_main_suite = MainSuiteForm(ddi_new)
         self.GUI_main_suite.show()
         self.close()
 
     def click_btn_load(self):
         """
-        QPushButton 객체인 btn_load의 클릭 이벤트. 지정한 폴더 내 DataDNAIdentification 객체 pickle 데이터를 읽고 GUI_main_suite에 인자로 넘긴 후 메인 GUI를 활성화한다.
+        QPushButton 객체인 btn_load의 클릭 이벤트. 지정한 폴더 내 DataDNAIdentification 객체 데이터를 읽고 GUI_main_suite에 인자로 넘긴 후 메인 GUI를 활성화한다.
 
-        pickling된 DataDNAIdentifiacitoin 객체를 불러오기 위해 pickle 라이브러리를 사용.
-        unpickle한 DataDNAIdentifiacitoin 객체를 GUI_main_suite에 인자로 넘겨준 후 메인 GUI를 활성화하고 현재 GUI 객체를 닫는다.
+        폴더에 ProjectStore가 있으면 메타데이터만 읽고 테이블은 처음 사용할 때 읽는다.
+        ProjectStore가 없는 이전 버전의 폴더는 DataDNAIdentification.pickle 파일을 unpickle한다.
+        불러온 DataDNAIdentifiacitoin 객체를 GUI_main_suite에 인자로 넘겨준 후 메인 GUI를 활성화하고 현재 GUI 객체를 닫는다.
 
         Raises
         ------
@@ -262,14 +156,12 @@ class EntryForm(QDialog, form_entry):
 
         location_load = QFileDialog.getExistingDirectory(self, 'Open folder', self.line_savelocation.text())
         try:
-            with open('%s/%s' % (location_load, 'DataDNAIdentification.pickle'), 'rb') as f:
-                ddi_load = pickle.load(f)
+            ddi_load = NFS_Project.load_project(location_load)
         except pickle.UnpicklingError:
             QMessageBox.information(self, 'Unpickling Error', 'Inappropriate .pickle file')
-        except IOError:
+        except (IOError, ValueError):
             QMessageBox.information(self, 'I/O Error', 'Inappropriate folder selected')
         else:
-            ddi_load.change_path(location_load)
             self.GUI_main_suite = MainSuiteForm(ddi_load)
             self.GUI_main_suite.show()
             self.close()
@@ -281,10 +173,133 @@ class EntryForm(QDialog, form_entry):
         sys.exit()
     
 
+class DataFrameModel(QtCore.QAbstractTableModel):
+    """
+    DataFrame의 일부 행, 칼럼을 QTableView에 보여주는 모델
+
+    QTableWidget처럼 모든 셀에 아이템을 만들지 않고, 화면에 보이는 셀만 DataFrame에서 직접 읽는다.
+    편집한 값은 해당 행 label과 칼럼으로 DataFrame에 바로 반영한다.
+
+    Attributes
+    ----------
+    df : DataFrame
+        보여줄 데이터프레임
+    rows : Index
+        보여줄 행의 label
+    columns : list
+        보여줄 칼럼명
+    headers : list
+        칼럼 헤더에 표시할 이름
+    show_index : bool
+        첫 칼럼에 행 label을 표시할지 여부
+    editable : bool
+        셀 편집 허용 여부 (행 label 칼럼은 편집 불가)
+
+    Methods
+    --------
+    set_dataframe(df, rows=None)
+        보여줄 데이터프레임과 행을 바꾸고 뷰를 갱신한다.
+    find(keyword)
+        keyword를 포함하는 첫 셀의 QModelIndex를 반환한다. 없으면 None을 반환한다.
+    """
+
+    def __init__(self, columns, headers=None, show_index=False, editable=False, parent=None):
+        super().__init__(parent)
+        self.df = pd.DataFrame(columns=columns)
+        self.rows = self.df.index
+        self.columns = list(columns)
+        self.headers = list(headers) if headers is not None else list(columns)
+        self.show_index = show_index
+        self.editable = editable
+        self.__offset = 1 if show_index else 0
+        self.__pos_rows = np.array([], dtype=int)
+        self.__pos_columns = []
+
+    def set_dataframe(self, df, rows=None):
+        """
+        보여줄 데이터프레임과 행을 바꾸고 뷰를 갱신한다.
+
+        Parameters
+        ----------
+        df : DataFrame
+            보여줄 데이터프레임
+        rows : Index or list, optional
+            보여줄 행의 label. 없으면 모든 행을 보여준다.
+        """
+
+        self.beginResetModel()
+        self.df = df
+        self.rows = df.index if rows is None else pd.Index(rows)
+        self.__pos_rows = df.index.get_indexer(self.rows)
+        self.__pos_columns = [df.columns.get_loc(column) for column in self.columns]
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns) + self.__offset
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role not in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return None
+        if index.column() < self.__offset:
+            return str(self.rows[index.row()])
+        return str(self.df.iat[self.__pos_rows[index.row()], self.__pos_columns[index.column() - self.__offset]])
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return 'Index' if section < self.__offset else self.headers[section - self.__offset]
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if self.editable and index.column() >= self.__offset:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or not index.isValid() or index.column() < self.__offset:
+            return False
+        column = self.columns[index.column() - self.__offset]
+        if self.df[column].dtype != object:    # 숫자 칼럼(e.g. 모두 빈 값인 칼럼)에도 입력한 문자열을 넣을 수 있도록
+            self.df[column] = self.df[column].astype(object)
+        self.df.at[self.rows[index.row()], column] = value
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def find(self, keyword):
+        """
+        keyword를 포함하는 첫 셀(행 우선 순서)의 QModelIndex를 반환한다. 없으면 None을 반환한다.
+
+        Parameters
+        ----------
+        keyword : str
+            검색할 키워드
+        """
+
+        if len(self.rows) == 0:
+            return None
+        df_view = self.df.iloc[self.__pos_rows, self.__pos_columns].astype(str)
+        if self.show_index:
+            df_view.insert(0, 'Index', self.rows.astype(str))
+        found = np.column_stack([df_view[column].str.contains(keyword, regex=False).values
+                                 for column in df_view.columns])
+        if not found.any():
+            return None
+        row, col = divmod(int(found.argmax()), found.shape[1])
+        return self.index(row, col)
+
+
 class MainSuiteForm(QMainWindow, form_main_suite):
     """
     프로그램의 주요 기능 및 인터페이스 구현
 
+    파일 선택, 메시지 창 등 GUI를 제외한 작업 로직은 NFS_Engine.ProjectEngine(self.engine)에 있고, 이벤트는 해당 메소드를 호출한다.
+    click_btn_* 이벤트는 모두 NFS_Profiler.instrument로 감싸서 실행 시간, 처리한 행 수, 읽은 파일을 ETC/timing.log에 기록한다.
+
     @ Info. tab
         기본 정보, 진행 상황, 기타 수치를 나타내고, 업무와 관련된 외부 프로그램을 바로 실행할 수 있는 기능 탑재
     @ Sheets tab
@@ -317,12 +332,12 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         run_external_app(app)
             인자로 받은 이름에 해당하는 외부 프로그램을 실행
         save()
-            ddi_present 객체를 pickle하여 DataDNAIdentification.pickle 파일에 저장
+            ddi_present 객체를 프로젝트 폴더의 ProjectStore에 저장
         sort_by_serial(df)
-            입력받은 dataframe을 증거물 번호를 기준으로 natural sort
+            입력받은 dataframe을 증거물 번호를 기준으로 natural sort한 dataframe을 반환
         import_file(extension="", copy_needed=True)
             pyqt 파일 다이얼로그 상에서 파일을 선택하고 해당 파일의 경로를 반환환
-        xls_to_dataframe(file_input = "", column = True)
+        xls_to_dataframe(file_input = "", column = True, usecols = None)
             NFIS에서 받은 엑셀 파일을 Dataframe 객체로 전환해서 반환
         update_df_sample(df, target_list, tag)
             샘플시트 작성 시 target_list에 배정된 감정물에 입력된 분류명을 df에 기록
@@ -340,7 +355,7 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         set_line_texts(location_save="", analyst="", date=QtCore.QDate.currentDate().toString('yyyyMMdd'))
             현재 작업의 저장위치, 담당자, 채취날짜를 인자로 받아 각각 해당하는 QLineEdit, QDateEdit 객체의 Text 속성에 할당한다.
         search_table(keyword, table)
-            해당 QTableWidget에서 keyword를 가진 아이템을 찾아 커서를 움직인다.
+            해당 QTableView에서 keyword를 가진 셀을 찾아 커서를 움직인다.
         click_btn_search_info()
             btn_search_info의 클릭 이벤트, line_search_info의 키워드를 table_info에서 찾아 커서를 움직인다.
         click_btn_NFIS_login():
@@ -383,6 +398,10 @@ class MainSuiteForm(QMainWindow, form_main_suite):
             btn_generate_RT_sheet_from_total 버튼의 클릭 이벤트. totalsheet 엑셀 파일의 TOTAL 시트에서 TYPE이 LCN, REF인 것만 추출하여 RT import 파일을 작성한다.
         click_btn_import_RT()
             btn_Import_RT 버튼의 클릭 이벤트. RT 실험 결과 파일의 경로를 입력받는다. 그리고 해당 파일의 RT 실험 결과를 증거물 토탈샘플시트 파일에 복사한다.
+        import_rt_results()
+            플레이트별 RT 결과 파일의 경로 리스트를 입력받는다.
+        notice_amplification_plan(df_plan, path_plan)
+            RT 결과로 계산한 증폭 부피 파일의 경로와 저해, 분해로 판단된 웰 수를 알린다.
     @ Report tab
         load_reportsheets(self)
             감정서 데이터프레임 내의 접수번호를 리스트로 만들고 combo_report_cases에 반영한다
@@ -393,9 +412,7 @@ class MainSuiteForm(QMainWindow, form_main_suite):
          click_btn_load_tomato(self)
             Tomato 엑셀 파일의 combined_result 탭에서 DNA profile 데이터를 NFS_DNA 클래스 상에 불러온다. Y23 Tomamto 파일이 있다면 해당 파일의 데이터도 불러온다.
          update_table_report(self, number_case)
-            table_report에 ddi_present의 df_report값을 입력한다.\
-         cellchange_table_report(self, row, col)
-            증거물 테이블의 내용이 변경되면 변경된 내용을 감정서 데이터프레임에 반영한다
+            table_report에 ddi_present의 df_report 중 해당 사건번호의 행을 보여준다. 편집한 내용은 df_report에 바로 반영된다.
          load_image(self, path)
             입력받은 경로의 이미지를 label 객체에 띄운다
          load_list_images(self, case_number)
@@ -406,6 +423,8 @@ class MainSuiteForm(QMainWindow, form_main_suite):
             생성할 감정서 종류와 선택된 사건번호의 데이터를 토대로 해당 감정서를 작성한다.
          generate_report(self, num_case, type_report)
             선택된 사건번호를 생성할 감정서 종류에 맞춰 감정서 hwp 파일을 생성한다.
+         click_btn_generate_all_reports(self)
+            감정서 데이터프레임의 모든 사건의 감정서를 여러 프로세스에서 한 번에 생성한다.
          click_btn_export_barcode(self)
             ddi_present의 df_evidence의 데이터를 form_barcode.xls에 복사한다
          click_btn_onsite_request(self)
@@ -415,6 +434,9 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         click_btn_onsite_request(): 업무분장 NFIS 파일을 입력받아 소내의뢰 시트와 증거물에 붙힐 라벨을 생성한다
     """
 
+    # 감정처리부 NFIS 파일에서 프로그램이 사용하는 칼럼
+    list_nfis_columns = NFS_Engine.LIST_NFIS_COLUMNS
+
     def __init__(self, ddi):
         """
         MainSuiteForm의 생성자. DataDNAIdentification 객체를 인자로 받고 프로그램에 쓰이는 기본 설정을 처리한다.
@@ -428,7 +450,21 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         super().__init__()
         self.setupUi(self)
         self.ddi_present = ddi
+        # 증거물, 감정서 테이블은 DataFrame을 직접 읽는 모델로 보여준다
+        self.model_info = DataFrameModel(['의뢰관서', '증거물번호', '감정물', '분류'],
+                                         headers=['의뢰관서', '증거물 번호', '감정물', '분류'], show_index=True)
+        self.table_info.setModel(self.model_info)
+        self.model_report = DataFrameModel(['증거물번호', '감정물', 'DB Type 1', 'DB Type 2', 'Y Type', 'Matching Probability',
+                                            'Saliva', 'Semen', 'Blood', 'DB_Hit', 'Return', 'Comment'], editable=True)
+        self.table_report.setModel(self.model_report)
+        self.project_store = getattr(ddi, '_store', None) or NFS_ProjectStore.ProjectStore(ddi.location_save)
         self.root = os.path.dirname(os.path.abspath(__file__))
+        self.sessions = NFS_Session.SessionPool()   # Excel, 한/글은 처음 사용할 때 시작하고 재사용
+        self.engine = NFS_Engine.ProjectEngine(ddi, self.root, self.project_store, self.sessions)   # GUI와 무관한 작업 로직
+        # 버튼 이벤트의 실행 시간 기록. Settings.ini에 profile=True 줄이 있으면 cProfile 결과도 저장
+        with open(self.root + '/Settings/Settings.ini', mode='r') as readfile_setting:
+            settings = dict(line.rstrip('\n').split('=', 1) for line in readfile_setting if '=' in line)
+        NFS_Profiler.configure(self.ddi_present.location_save + '/ETC', profile=settings.get('profile', '') == 'True')
         self.set_line_texts(location_save=self.ddi_present.location_save, analyst=self.ddi_present.analyst, date=self.ddi_present.date)
         if ddi.nfis_loaded == True: #기존에 읽어드린 NFIS 파일이 있다면 해당 DataFrame의 내용을 GUI에 반영하고, 아니면 해당 탭을 비활성화
             self.load_samplesheets()
@@ -446,30 +482,12 @@ class MainSuiteForm(QMainWindow, form_main_suite):
                 line_sep = lines.split('=')
                 self.exapp[line_sep[0]] = line_sep[1]
         self.update_info_table()
-        self.dispatch_excel = win32.Dispatch('Excel.Application')  # 엑셀을 다루기 위해 사용할 핸들러
-        self.path_form_report = {'ND' : '/Form/form_report_ND.hwp',
-                                 '부검' : '/Form/form_report_D.hwp',
-                                 '피해자 일치' : '/Form/form_report_V-match.hwp',
-                                 'ND w/ 피해자 일치' : '/Form/form_report_V-match+ND.hwp',
-                                 'ND w/ 피해자 불일치' : '/Form/form_report_V-nonmatch+ND.hwp',
-                                 'Complicate' : '/Form/form_report_Complicate.hwp',
-                                 '혼합형' : '/Form/form_report_MX.hwp',
-                                 '피의자 일치' : '/Form/form_report_S-match.hwp',
-                                 '피의자 불일치' : '/Form/form_report_S-nonmatch.hwp',
-                                 '친자관계 일치' : '/Form/form_report_Parent-Child.hwp',
-                                 '친자관계 일치(부검)' : '/Form/form_report_Parent-Child_D.hwp',
-                                 'C 검출(검색결과 X)' : '/Form/form_report_C.hwp',
-                                 'C 검출 w/ ND(검색결과 X)' : '/Form/form_report_C+ND.hwp',
-                                 'C 검출 w/ 피해자 불일치(검색결과 X)' : '/Form/form_report_C+V-nonmatch.hwp',
-                                 'C 검출 w/ 피해자 불일치, ND(검색결과 X)' : '/Form/form_report_C+ND+V-nonmatch.hwp',
-                                 'C 검출 w/ 피해자 일치(검색결과 X)': '/Form/form_report_C+V-match.hwp',
-                                 'C 검출 w/ 피해자 일치, ND(검색결과 X)': '/Form/form_report_C+ND+V-match.hwp'
-                                 }
+        self.path_form_report = NFS_Report.PATH_FORM_REPORT
         self.save()
 
-    def closeEvent(self, event):    # 엑셀을 다루기 사용했던 Win32com.client를 닫아주고 df_evidence를 자동저장하기 위해 QWidget의 closeEvent를 오버라이드.
+    def closeEvent(self, event):    # 사용했던 Excel, 한/글 세션을 닫아주고 df_evidence를 자동저장하기 위해 QWidget의 closeEvent를 오버라이드.
         self.save()
-        self.dispatch_excel.Quit()
+        self.sessions.shutdown()
         event.accept()
 
     # internal function
@@ -490,39 +508,17 @@ class MainSuiteForm(QMainWindow, form_main_suite):
 
     def save(self):
         """
-        ddi_present 객체를 pickle하여 DataDNAIdentification.pickle 파일에 저장
-        """
-
-        with open(self.ddi_present.location_save + '/DataDNAIdentification.pickle', 'wb') as f:
-            pickle.dump(self.ddi_present, f, pickle.HIGHEST_PROTOCOL)
+        ddi_present 객체를 프로젝트 폴더의 ProjectStore에 저장
 
-    def sort_by_serial(self, df):
+        마지막 저장 이후 바뀐 테이블만 다시 쓴다.
         """
-        입력받은 증거물 데이터프레임을 증거물번호를 기준으로 natural sort한다.
 
-        우선 증거물 데이터 프레임을 증거물번호를 기준으로 일반적인 방식을 사용해 정렬한다.
-        정렬된 증거물번호를 리스트로 만들고 해당 리스트를 증거물 번호를 구성하는 세 종류의 숫자(e.g 2019-D-1234-5 => 2019, 1234, 5)를 첫번째, 두번째, 세번째 기준으로 삼아 정렬한다.
-        해당 리스트를 enumerate 객체로 만들어 인덱스를 부여하고 인덱스-증거물번호로 이뤄진 딕셔너리 rank를 생성한다.
-        rank를 데이터프레임에 병합한 후 rank를 기준으로 데이터프레임을 정렬한다.
-        사용된 rank 데이터를 제거하고 정렬된 순서에 맞추어 새로 인덱스를 부여한다.
+        self.engine.save()
 
-        Parameters
-        ---------
-        df : DataFrame
-            정렬할 증거물 데이터프레임
-        """
+    def sort_by_serial(self, df):
+        """입력받은 증거물 데이터프레임을 증거물번호를 기준으로 natural sort한 데이터프레임을 반환한다. (NFS_Engine.sort_by_serial)"""
 
-        df.sort_values('증거물번호', inplace=True)
-        list_serial = list(df['증거물번호'])
-        p = re.compile('\d+')
-        sorted_serial = sorted(list_serial, key = lambda x: (int(p.findall(x)[0]), int(p.findall(x)[1]), int(p.findall(x)[2]), int(p.findall(x)[3])) if len(p.findall(x))>3 else (int(p.findall(x)[0]), int(p.findall(x)[1]),int(p.findall(x)[2]), 0))
-        # 2019-D-1234-5 => 2019, 1234, 5
-        sorted_serial = enumerate(sorted_serial)    # rank로 쓰일 인덱스 부여를 위해 enumerate 객체로 전환
-        rank = {k:v for v,k in sorted_serial}
-        df['new_index'] = df['증거물번호'].apply(lambda x:rank[x])
-        df.sort_values('new_index', inplace=True)
-        df.drop('new_index', axis=1, inplace=True)
-        df.reset_index(inplace=True)
+        return NFS_Engine.sort_by_serial(df)
 
     def import_file(self, extension="", copy_needed=True, title = "Open File"):
         """
@@ -547,36 +543,16 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         if filename_import[0] is "":
             QMessageBox.information(self, "Error", "File name required.")
             return
+        NFS_Profiler.note_file(filename_import[0])
         if copy_needed is True:
             shutil.copyfile(filename_import[0], self.ddi_present.location_save + '/Downloaded/'
                             + filename_import[0].split('/')[-1])
         return filename_import[0]
 
-    def xls_to_dataframe(self, file_input = "", column = True):
-        """
-        NFIS에서 받은 엑셀 파일을 Dataframe 객체로 전환해서 반환
+    def xls_to_dataframe(self, file_input = "", column = True, usecols = None):
+        """NFIS에서 받은 엑셀 파일을 Dataframe 객체로 전환해서 반환 (NFS_Engine.xls_to_dataframe)"""
 
-        Parameters
-        -----------
-        file_input : str
-            openpyxl 라이브러리로 작업할 NFIS 파일의 경로
-        column : bool
-            column 헤더의 존재 여부
-
-        Returns
-        --------
-        DataFrame
-            NFIS 파일의 내용을 DataFrame으로 변환한 객체
-        """
-
-        wb = load_workbook(file_input, data_only=True, read_only=False)
-        ws = wb.active
-        data = ws.values
-        if column is True:
-            cols = next(data)
-            return pd.DataFrame(data, columns=cols)
-        else:
-            return pd.DataFrame(data)
+        return NFS_Engine.xls_to_dataframe(file_input, column=column, usecols=usecols)
 
     def update_df_sample(self, df, target_list, tag):
         """
@@ -633,32 +609,14 @@ class MainSuiteForm(QMainWindow, form_main_suite):
             from_list.takeItem(from_list.row(item))
 
     def idx_to_wellname(self, idx):
-        """
-        8x12 wells plate를 기준으로 입력된 index 번호에 해당하는 well의 명칭(e.g. 0->A1)을 반환
-
-        Parameters
-        ----------
-        idx: int
-            변환할 인덱스
-        """
+        """8x12 wells plate를 기준으로 입력된 index 번호에 해당하는 well의 명칭(e.g. 0->A1)을 반환 (NFS_Engine.idx_to_wellname)"""
 
-        col, row = divmod(idx,8)
-        wellname = 'ABCDEFGH'[row] + str(col+1)
-        return wellname # 1줄로 : return str(idx//8+1)+'HABCDEFG'[idx%8]
+        return NFS_Engine.idx_to_wellname(idx)
 
     def wellname_to_idx(self, wellname):
-        """
-        8x12 wells plate를 기준으로 입력된 wellname에 해당하는 index 번호(e.g. A1->0)을 반환
+        """8x12 wells plate를 기준으로 입력된 wellname에 해당하는 index 번호(e.g. A1->0)을 반환 (NFS_Engine.wellname_to_idx)"""
 
-        Parameters
-        ----------
-        wellname : str
-            변환할 wellname
-        """
-
-        alphabet = wellname[0]
-        number = int(wellname[1:])
-        return (number-1) * 8 + ('ABCDEFGH'.find(alphabet)+1) - 1 # 0부터 시작하니깐 -1
+        return NFS_Engine.wellname_to_idx(wellname)
 
     def click_tab_resize(self, num_tab):
         """
@@ -694,8 +652,8 @@ class MainSuiteForm(QMainWindow, form_main_suite):
     def open_xls_file(self, filepath):
         if os.path.exists(filepath):
             self.showMinimized()
-            self.dispatch_excel.Visible = True
-            self.dispatch_excel.Workbooks.Open(filepath)
+            with self.sessions.session('excel') as excel:
+                excel.open(filepath)
         else:
             QMessageBox.information(self, "Error", "File does not exist.")
     # info tab
@@ -722,33 +680,24 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         info_table에 ddi_present의 증거물 데이터프레임 값을 입력한다.
         """
         self.label_number_samples.setText('Number of samples : %d' % len(self.ddi_present.df_evidence))
-        self.table_info.setColumnCount(10)
-        self.table_info.setRowCount(len(self.ddi_present.df_evidence.index))
-        self.table_info.setHorizontalHeaderLabels(['Index', '의뢰관서', '증거물 번호', '감정물', '분류'])
-        idx_table = 0
-        for (index, row) in self.ddi_present.df_evidence.iterrows():
-            self.table_info.setItem(idx_table, 0, QTableWidgetItem(str(index)))
-            self.table_info.setItem(idx_table, 1, QTableWidgetItem(str(row['의뢰관서'])))
-            self.table_info.setItem(idx_table, 2, QTableWidgetItem(str(row['증거물번호'])))
-            self.table_info.setItem(idx_table, 3, QTableWidgetItem(str(row['감정물'])))
-            self.table_info.setItem(idx_table, 4, QTableWidgetItem(str(row['분류'])))
-            idx_table = idx_table + 1
+        self.model_info.set_dataframe(self.ddi_present.df_evidence)
 
     def search_table(self, keyword, table):
         """
-        해당 QTableWidget에서 keyword를 가진 아이템을 찾아 커서를 움직인다.
+        해당 QTableView에서 keyword를 가진 셀을 찾아 커서를 움직인다.
 
         Parameters
         ----------
         keyword : str
             검색할 키워드
-        table : QTableWidget
-             검색할 테이블 객체
+        table : QTableView
+             검색할 테이블 객체 (모델은 DataFrameModel)
         """
 
-        result = table.findItems(keyword, QtCore.Qt.MatchContains)
-        if result:
-            table.setCurrentCell(result[0].row(), result[0].column())
+        result = table.model().find(keyword)
+        if result is not None:
+            table.setCurrentIndex(result)
+            table.scrollTo(result)
         else:
             QMessageBox.information(self, "Notice", "No result.")
 
@@ -768,15 +717,15 @@ class MainSuiteForm(QMainWindow, form_main_suite):
     def click_btn_NFIS_tomato(self):
         """ btn_NFIS_tomato의 클릭 이벤트. 해당 프로젝트의 Tomato 엑셀 파일을 연다."""
         self.showMinimized()
-        self.dispatch_excel.Visible = True
-        self.dispatch_excel.Workbooks.Open(self.ddi_present.path_tomato)
+        with self.sessions.session('excel') as excel:
+            excel.open(self.ddi_present.path_tomato)
 
     def click_btn_total_sheet(self):
         """btn_total_sheet의 클릭 이벤트. 해당 프로젝트의 total_sheet 엑셀 파일을 연다."""
 
         if os.path.exists(self.ddi_present.path_totalsheet):
-            self.dispatch_excel.Visible = True
-            self.dispatch_excel.Workbooks.Open(self.ddi_present.path_totalsheet)
+            with self.sessions.session('excel') as excel:
+                excel.open(self.ddi_present.path_totalsheet)
         else:
             QMessageBox.information(self, "Error", "File does not exist.")
 
@@ -797,51 +746,12 @@ class MainSuiteForm(QMainWindow, form_main_suite):
 
     def generate_samplesheets(self, worksheet, df, filename, row_start, control = False, blank = False, ladder = False, macro=False, sheetname = ""):
         """
-        해당 워크시트에 증거물 데이터프레임의 값을 입력한 후 지정된 파일 이름으로 저장한다.
+        해당 워크시트에 증거물 데이터프레임의 값을 입력한 후 지정된 파일 이름으로 저장한다. (ProjectEngine.write_samplesheet)
 
-        Parameters
-        ----------
-        worksheet: str
-            데이터를 입력할 워크시트 파일의 경로
-        df: DataFrame
-            증거물 데이터프레임
-        filename: str
-            저장할 파일의 이름
-        row_start: int
-            샘플 시트 서식에서 값을 입력할 첫번째 행
-        control: bool, optional
-            CONTROL 행 추가 여부
-        blank: bool, optional
-            BLANK 행 추가 여부
-        ladder: bool, optional
-            LADDER 행 추가 여부
-        """
-
-        wb_form = load_workbook(worksheet, read_only=False, keep_vba=True)
-        ws_form = wb_form.active if sheetname == "" else wb_form[sheetname]
-        ws_form['C1'] = filename
-        ws_form['H1'] = self.ddi_present.date
-        ws_form['K1'] = self.ddi_present.analyst
-        idx = 0
-        for idx, line in df.iterrows():
-            ws_form.cell(row=row_start + idx, column=2).value = line['의뢰관서']
-            ws_form.cell(row=row_start + idx, column=3).value = line['증거물번호']
-            ws_form.cell(row=row_start + idx, column=4).value = line['감정물'].split(':')[1]
-            ws_form.cell(row=row_start + idx, column=5).value = line['분류']
-        idx = idx + 1
-        if control == True :
-            ws_form.cell(row=row_start + idx, column=3).value = 'Control'
-            idx = idx + 1
-        if blank == True :
-            ws_form.cell(row=row_start + idx, column=3).value = 'Blank'
-            idx = idx + 1
-        if ladder == True :
-            ws_form.cell(row=row_start + idx, column=3).value = 'Ladder'
-            idx = idx + 1
-            ws_form.cell(row=row_start + idx, column=3).value = 'Ladder'
-        ext = ".xlsm" if macro == True else ".xlsx"
-        wb_form.save(
-            self.ddi_present.location_save + '/Sheets/' + filename + ext)
+        서식 파일은 한 번만 열고 저장하므로, 여러 분류를 한 시트에 쓸 때는 분류별로 호출하지 말고 합친 데이터프레임으로 한 번 호출한다.
+        """
+
+        return self.engine.write_samplesheet(worksheet, df, filename, row_start, control, blank, ladder, macro, sheetname)
 
     def update_list_count(self, target_qlistwidget, count_qlable):
         """
@@ -878,6 +788,7 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         self.update_list_count(self.list_sample_all, self.label_count_sample_all)
         self.update_list_count(self.list_sample_partial, self.label_count_sample_partial)
 
+    @NFS_Profiler.instrument()
     def click_btn_import_modified_sample(self):
         """
         btn_import_modified_sample의 클릭 이벤트. 채취 후 수정한 NFIS파일을 읽고 ddi_present 객체에 저장한다. 그 후 증거물 목록을 list_sample_all에 반영한다.
@@ -885,19 +796,15 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         수정된 NFIS 파일의 경로를 입력받고 불러온 후 데이터프레임으로 전환하여 ddi_present 객체에 저장한다.
         증거물 데이터프레임을 초기화하고 첫번째 분류 값을 입력받는다.
         list_sample_all에 데이터프레임의 모든 열을 지정된 형식으로 추가한다.
-        변경사항을 DataDNAIdentification.pickle 파일에 저장한다.
+        변경사항을 프로젝트 폴더의 ProjectStore에 저장한다.
         """
         self.list_sample_all.clear()
         self.list_sample_partial.clear()
         self.combo_category.clear()
 
         self.line_import_raw_sample.setText(self.import_file(extension='xlsx(*.xlsx)', copy_needed=True))
-        self.ddi_present.df_evidence = self.xls_to_dataframe(self.line_import_raw_sample.text())
-        # 증거물 데이터 프레임 초기화. 작업에 필요한 행 추가.
-        self.ddi_present.df_evidence['분류'] = 'Unassigned'
-        self.ddi_present.df_evidence['증거물번호'] = self.ddi_present.df_evidence['접수번호'] + self.ddi_present.df_evidence['감정물'].apply(lambda x: '-'+x.split('증')[1].split('호')[0])
-        self.sort_by_serial(self.ddi_present.df_evidence)
-        self.ddi_present.nfis_loaded = True
+        # 증거물, 감정서 데이터프레임 초기화
+        self.engine.import_nfis(self.line_import_raw_sample.text(), copy_needed=False)
         self.tabWidget.setTabEnabled(2, True)  # Resample tab 활성화
         self.tabWidget.setTabEnabled(3, True)   # Report tab 활성화
         self.tabWidget.setTabEnabled(4, True)   # Data tab 활성화
@@ -906,18 +813,6 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         self.combo_category.addItems(['LCN', 'MF', 'REF'])    # 기본 분류 설정
         for (index, row) in self.ddi_present.df_evidence.iterrows():
             self.list_sample_all.addItem("{index:<10}{case:<15}{evidence}".format(index=index+1, case=row['접수번호'], evidence=row['감정물']))
-        # 감정서 DataFrame 생성
-        self.ddi_present.df_report = self.ddi_present.df_evidence.copy()
-        self.ddi_present.df_report['DB Type 1'] = ""
-        self.ddi_present.df_report['DB Type 2'] = ""
-        self.ddi_present.df_report['Y Type'] = ""
-        self.ddi_present.df_report['DB_Hit'] = ""
-        self.ddi_present.df_report['Matching Probability'] = ""
-        self.ddi_present.df_report['Saliva'] = ""
-        self.ddi_present.df_report['Semen'] = ""
-        self.ddi_present.df_report['Blood'] = ""
-        self.ddi_present.df_report['Return'] = ""
-        self.ddi_present.df_report['Comment'] = ""
         self.load_resamplesheets()
         self.load_reportsheets()
         # 추가적으로 필요한 데이터는 이 칸에 추가
@@ -1036,132 +931,57 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         btn_generate_totalsheet의 클릭 이벤트. ddit_present의 증거물 데이터프레임에 저장된 데이터로 하나의 샘플시트를 생성한다
         """
 
-        df_total = self.ddi_present.df_evidence[self.ddi_present.df_evidence['분류'] != 'Unassigned'] # 실험에 사용되지 않은 샘플을 제거한 데이터프레임 생성
-        start_row = 3
-        filename = self.ddi_present.date + '-' + self.ddi_present.analyst + '-' + 'TOTAL'
-        self.generate_samplesheets(self.root + '/Form/form_sampletotalsheet.xlsm', pd.DataFrame({}), filename,
-                                   start_row, False, False, False, True, "TOTAL")  # 우선 빈 시트를 생성
-
-        groupby_tag = df_total.groupby('분류')
-        for tag, group in groupby_tag:
-            group = group.reset_index(drop=True)
-            self.generate_samplesheets(self.ddi_present.location_save + '/Sheets/' + filename + ".xlsm", group, filename, start_row, False, False, False, True)
-            start_row = start_row + len(group)
+        path_totalsheet = self.engine.generate_totalsheet()
         self.save()
-        self.open_xls_file(self.ddi_present.location_save + '/Sheets/' + filename + ".xlsm")
+        self.open_xls_file(path_totalsheet)
         QMessageBox.information(self, "Notice", "Work complete.")
 
     def click_btn_generate_RT_sheet_from_total(self):
         """
         btn_generate_RT_sheet_from_total 버튼의 클릭 이벤트. totalsheet 엑셀 파일의 TOTAL 시트에서 TYPE이 LCN, MF인 것만 추출하여 RT import 파일을 작성한다.
-        """
 
-        # RT 대상이 96개가 안되면 디폴트로 설정된 샘플링시트로 RT 시트를 생성. 넘으면 RT 시트를 생성할 샘플링 시트 경로를 입력 받음.
-        count_LCN = self.ddi_present.df_evidence[self.ddi_present.df_evidence['분류'] == 'LCN'].shape[0] + self.ddi_present.df_evidence[self.ddi_present.df_evidence['분류'] == 'MF'].shape[0]
-        if count_LCN < 96:
-            path_samplingsheet = self.ddi_present.path_totalsheet
-        else:
-            path_samplingsheet = self.import_file(extension='xlsm(*.xlsm)', copy_needed=False, title="Choose a Sampling Sheet for RT")
+        RT 대상이 한 플레이트(96 웰)를 넘으면 플레이트마다 RT import 파일을 나누어 작성한다.
+        """
 
+        path_samplingsheet = self.ddi_present.path_totalsheet
         if not os.path.exists(path_samplingsheet):
             QMessageBox.information(self, "Error", "File does not exist.")
             return -1
+        list_RTsheet = self.engine.generate_rt_sheet(path_samplingsheet, reserved=NFS_Plate.RESERVED_STR)
+        QMessageBox.information(self, "Notice", f"Work complete. ({len(list_RTsheet)} plates)")
 
-        filename_RTsheet = self.ddi_present.location_save+'/RT/'+ path_samplingsheet.split('/')[-1].rstrip('.xlsm')+'_RT.txt'
-        shutil.copyfile(self.root + '/Form/form_RT.txt', filename_RTsheet)
-        with open(filename_RTsheet, mode='a') as f:
-            wb_form = load_workbook(path_samplingsheet)
-            ws_form = wb_form['TOTAL']
-            for idx in range(96):
-                wellname = self.idx_to_wellname(idx)    #idx는 0부터 시작
-                str_serial = ws_form.cell(row=idx+3, column=3).value    # 샘플시트 상에서 3번째 열은 데이터의 시작열. 3번째 행은 증거물번호의 행
-                str_type = ws_form.cell(row=idx+3, column=5).value
-                if str_serial == None or str_type not in ['LCN', 'MF']: continue # 증거물 번호가 빈칸이면 다음 루프로 넘어감
-                f.write(
-                    '\t'.join(
-                        [wellname, str_serial, '"RGB(255,153,204)"', 'T.IPC', '"RGB(255,0,0)"',
-                         'UNKNOWN', 'JUN', 'QSY7']) + '\n')
-                f.write(
-                    '\t'.join([wellname, str_serial, '"RGB(255,153,204)"', 'T.Large Autosomal',
-                               '"RGB(0,0,0)"',
-                               'UNKNOWN', 'ABY', 'QSY7']) + '\n')
-                f.write(
-                    '\t'.join([wellname, str_serial, '"RGB(255,153,204)"', 'T.Small Autosomal',
-                               '"RGB(0,128,0)"',
-                               'UNKNOWN', 'VIC', 'NFQ-MGB']) + '\n')
-                f.write(
-                    '\t'.join(
-                        [wellname, str_serial, '"RGB(255,153,204)"', 'T.Y', '"RGB(0,0,255)"',
-                         'UNKNOWN', 'FAM', 'NFQ-MGB']) + '\n')
-        QMessageBox.information(self, "Notice", "Work complete.")
-
+    @NFS_Profiler.instrument()
     def click_btn_import_RT(self):
         """
         btn_Import_RT 버튼의 클릭 이벤트. RT 실험 결과 파일의 경로를 입력받는다. 그리고 해당 파일의 RT 실험 결과를 증거물 토탈샘플시트 파일에 복사한다.
 
-        RT 결과 .xls 파일의 경로를 입력받고 해당 파일을 .xlsx파일로 전환한다. (openpyxl 라이브러리가 xlsx 파일만 지원)
-        새로 생성된 xlsx파일의 경로를 line_import_RT에 반영한다.
-        지정된 경로의 RT결과 엑셀 파일을 연다.
-        샘플시트를 불러오고 RT 결과를 순차대로 입력한다.
+        RT 결과 파일(xls, xlsx, 텍스트)은 Excel로 변환하지 않고 NFS_RT로 바로 읽어서 웰별 정량값을 샘플시트에 입력한다.
+        플레이트가 여러 장이면 플레이트별 결과 파일을 한 번에 선택하고, 각 파일의 플레이트는 내용으로 찾는다.
         """
 
-        # RT 대상이 96개가 안되면 디폴트로 설정된 샘플링시트로 RT 데이터를 복사. 넘으면 RT 데이터를 복사할 샘플링 시트 경로를 입력 받음.
-        count_LCN = self.ddi_present.df_evidence[self.ddi_present.df_evidence['분류'] == 'LCN'].shape[0] + self.ddi_present.df_evidence[self.ddi_present.df_evidence['분류'] == 'MF'].shape[0]
-        if count_LCN < 96:
-            path_samplingsheet = self.ddi_present.path_totalsheet
-        else:
-            path_samplingsheet = self.import_file(extension='xlsm(*.xlsm)', copy_needed=False, title="Choose a Sampling Sheet for Import")
-
+        path_samplingsheet = self.ddi_present.path_totalsheet
         if not os.path.exists(path_samplingsheet):
             QMessageBox.information(self, "Error", "File does not exist.")
             return -1
 
-        filename = self.import_file(extension='xls(*.xls)', copy_needed=False, title="Choose a RT result file")
-        if filename == None:
-            QMessageBox.information(self, "Error", "Invalid file selection")
+        filenames = self.import_rt_results()
+        if not filenames:
+            return -1
+        # RT 결과값을 토탈샘플시트에 복사하고 증폭 부피를 계산
+        try:
+            _, df_rt = self.engine.import_rt(filenames, path_samplingsheet)
+        except ValueError as e:    # 플레이트 배치 없이 웰 위치로 대응시킬 수 없는 경우
+            QMessageBox.warning(self, "Error", str(e))
             return -1
-        # xls 파일을 xlsx로 전환(for openpyxl)
-        wb = self.dispatch_excel.Workbooks.Open(filename)
-        wb.SaveAs(os.path.realpath(filename+'x'), FileFormat = 51) # 51 : xlsx 확장자
-        wb.Close()
-        # RT 결과값을 토탈샘플시트에 복사
-        wb_data = load_workbook(os.path.realpath(filename+'x'))
-        ws_data = wb_data.active
-        blank = 0   # RT 결과에서 샘플명이 비어있는 칸을 세기 위한 카운터
-        wb_total = load_workbook(path_samplingsheet, read_only=False, keep_vba=True)
-        ws_total = wb_total["TOTAL"]
-        for idx in range(96):
-            idx_data = idx * 4 + 9 - 3 * blank
-            serial = ws_data.cell(row=idx_data, column=2).value   # 샘플명, 1개의 샘플당 4개의 측정값이 존재. 9번째 줄부터 측정값 데이터가 시작됨. 샘플명이 없는 경우 공백 한 줄만 기록됨.
-            wellname = ws_data.cell(row=idx_data, column=1).value
-            if serial == "" or serial is None:    # 샘플명이 없는 경우 샘플명을 얻을 때 건너뛰어야 하는 열의 숫자를 증가하고 다음 샘플로 넘어간다.
-                blank = blank + 1
-            else:
-                # idx + 3 : 3번째 열부터 데이터가 시작된다. idx는 0부터 카운팅\
-                if wellname is not None:
-                    idx_transformed = self.wellname_to_idx(wellname) + 3
-                    ws_total.cell(row=idx_transformed, column=8).value = ws_data.cell(row=idx_data + 1, column=11).value if ws_data.cell(row=idx_data + 1, column=11).value !='' else 0  # Large autosomal
-                    ws_total.cell(row=idx_transformed, column=6).value = ws_data.cell(row=idx_data + 2, column=11).value if ws_data.cell(row=idx_data + 2, column=11).value!='' else 0  # small autosomal
-                    ws_total.cell(row=idx_transformed, column=7).value = ws_data.cell(row=idx_data + 3, column=11).value if ws_data.cell(row=idx_data + 3, column=11).value!='' else 0  # Y chromosome
-        wb_total.save(path_samplingsheet)
+        df_plan, path_plan = self.engine.plan_amplification(df_rt=df_rt)
         self.open_xls_file(path_samplingsheet)
-        QMessageBox.information(self, "Notice", "Work complete.")
+        self.notice_amplification_plan(df_plan, path_plan)
 
     def click_btn_auto_classification(self):
         """
         btn_btn_auto_classification의 클릭 이벤트. 키워드가 감정물명에 들어가 있으면 그 키워드에 해당하는 분류명을 자동으로 할당
         """
-        dict_keyword = {'MF': ['F호', 'M호'],
-                        'REF': ['혈액', '늑연골', '구강키트', '심낭혈'],
-                        'Unassigned': ['소변', '슬라이드']}
-        def search_keyword(evidence, dict_keyword):
-            verdict = "LCN"
-            for type, keywords in dict_keyword.items():
-                for keyword in keywords:
-                    if keyword in evidence:
-                        verdict = type
-            return verdict
-        self.ddi_present.df_evidence['분류'] = self.ddi_present.df_evidence['감정물'].apply(lambda x:search_keyword(x,dict_keyword))
+        self.engine.auto_classify()
         self.load_samplesheets()
         self.save()
 
@@ -1237,73 +1057,50 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         if not os.path.exists(self.ddi_present.path_resamplesheet):
             QMessageBox.information(self, "Error", "File does not exist.")
             return -1
-        filename_RTsheet = self.ddi_present.location_save+'/RT/'+ self.ddi_present.path_resamplesheet.split('/')[-1].rstrip('.xlsm')+'_RT.txt'
-        shutil.copyfile(self.root + '/Form/form_RT.txt', filename_RTsheet)
-        with open(filename_RTsheet, mode='a') as f:
-            wb_form = load_workbook(self.ddi_present.path_resamplesheet)
-            ws_form = wb_form['TOTAL']
-            for idx in range(96):
-                wellname = self.idx_to_wellname(idx)    #idx는 0부터 시작
-                str_serial = ws_form.cell(row=idx+3, column=3).value    # 샘플시트 상에서 3번째 열은 데이터의 시작열. 3번째 행은 증거물번호의 행
-                str_type = ws_form.cell(row=idx+3, column=5).value
-                if str_serial == None or str_type not in ['RES']: continue # 증거물 번호가 빈칸이면 다음 루프로 넘어감
-                f.write(
-                    '\t'.join(
-                        [wellname, str_serial, '"RGB(255,153,204)"', 'T.IPC', '"RGB(255,0,0)"',
-                         'UNKNOWN', 'JUN', 'QSY7']) + '\n')
-                f.write(
-                    '\t'.join([wellname, str_serial, '"RGB(255,153,204)"', 'T.Large Autosomal',
-                               '"RGB(0,0,0)"',
-                               'UNKNOWN', 'ABY', 'QSY7']) + '\n')
-                f.write(
-                    '\t'.join([wellname, str_serial, '"RGB(255,153,204)"', 'T.Small Autosomal',
-                               '"RGB(0,128,0)"',
-                               'UNKNOWN', 'VIC', 'NFQ-MGB']) + '\n')
-                f.write(
-                    '\t'.join(
-                        [wellname, str_serial, '"RGB(255,153,204)"', 'T.Y', '"RGB(0,0,255)"',
-                         'UNKNOWN', 'FAM', 'NFQ-MGB']) + '\n')
+        self.engine.generate_rt_sheet(self.ddi_present.path_resamplesheet, types=('RES',),
+                                      reserved=NFS_Plate.RESERVED_STR)
         QMessageBox.information(self, "Notice", "Work complete.")
 
+    @NFS_Profiler.instrument()
     def click_btn_import_RT_resample(self):
         """
         click_btn_import_RT_resample 버튼의 클릭 이벤트. RT 실험 결과 파일의 경로를 입력받는다. 그리고 해당 파일의 RT 실험 결과를 증거물 토탈샘플시트 파일에 복사한다.
 
-        RT 결과 .xls 파일의 경로를 입력받고 해당 파일을 .xlsx파일로 전환한다. (openpyxl 라이브러리가 xlsx 파일만 지원)
-        새로 생성된 xlsx파일의 경로를 line_import_RT에 반영한다.
-        지정된 경로의 RT결과 엑셀 파일을 연다.
-        샘플시트를 불러오고 RT 결과를 순차대로 입력한다.
+        RT 결과 파일(xls, xlsx, 텍스트)은 Excel로 변환하지 않고 NFS_RT로 바로 읽어서 웰별 정량값을 재실험시트에 입력한다.
         """
 
-        filename = self.import_file(copy_needed=False)
-        if filename == None:
+        if not os.path.exists(self.ddi_present.path_resamplesheet):
+            QMessageBox.information(self, "Error", "File does not exist.")
+            return -1
+
+        filenames = self.import_rt_results()
+        if not filenames:
+            return -1
+        # RT 결과값을 재실험시트에 복사하고 증폭 부피를 계산
+        try:
+            _, df_rt = self.engine.import_rt(filenames, self.ddi_present.path_resamplesheet)
+        except ValueError as e:    # 플레이트 배치 없이 웰 위치로 대응시킬 수 없는 경우
+            QMessageBox.warning(self, "Error", str(e))
+            return -1
+        df_plan, path_plan = self.engine.plan_amplification(df_rt=df_rt)
+        self.notice_amplification_plan(df_plan, path_plan)
+
+    def import_rt_results(self):
+        """RT 결과 파일(플레이트별로 여러 개 선택 가능)의 경로 리스트를 입력받는다. 선택하지 않으면 빈 리스트를 반환한다."""
+
+        filenames, _ = QFileDialog.getOpenFileNames(self, "Choose RT result files", self.ddi_present.location_save,
+                                                    'RT result(*.xls *.xlsx *.txt *.csv)')
+        if len(filenames) == 0:
             QMessageBox.information(self, "Error", "Invalid file selection")
-            return
-        # xls 파일을 xlsx로 전환(for openpyxl)
-        wb = self.dispatch_excel.Workbooks.Open(filename)
-        wb.SaveAs(os.path.realpath(filename+'x'), FileFormat = 51) # 51 : xlsx 확장자
-        wb.Close()
-        # RT 결과값을 토탈샘플시트에 복사
-        wb_data = load_workbook(os.path.realpath(filename+'x'))
-        ws_data = wb_data.active
-        blank = 0   # RT 결과에서 샘플명이 비어있는 칸을 세기 위한 카운터
-        wb_total = load_workbook(self.ddi_present.path_resamplesheet, read_only=False, keep_vba=True)
-        ws_total = wb_total["TOTAL"]
-        for idx in range(96):
-            idx_data = idx * 4 + 9 - 3 * blank
-            serial = ws_data.cell(row=idx_data, column=2).value   # 샘플명, 1개의 샘플당 4개의 측정값이 존재. 9번째 줄부터 측정값 데이터가 시작됨. 샘플명이 없는 경우 공백 한 줄만 기록됨.
-            wellname = ws_data.cell(row=idx_data, column=1).value
-            if serial == "" or serial is None:    # 샘플명이 없는 경우 샘플명을 얻을 때 건너뛰어야 하는 열의 숫자를 증가하고 다음 샘플로 넘어간다.
-                blank = blank + 1
-            else:
-                # idx + 3 : 3번째 열부터 데이터가 시작된다. idx는 0부터 카운팅
-                if wellname is not None:
-                    idx_transformed = self.wellname_to_idx(wellname) + 3
-                    ws_total.cell(row=idx_transformed, column=8).value = ws_data.cell(row=idx_data + 1, column=11).value if ws_data.cell(row=idx_data + 1, column=11).value !='' else 0  # Large autosomal
-                    ws_total.cell(row=idx_transformed, column=6).value = ws_data.cell(row=idx_data + 2, column=11).value if ws_data.cell(row=idx_data + 2, column=11).value!='' else 0  # small autosomal
-                    ws_total.cell(row=idx_transformed, column=7).value = ws_data.cell(row=idx_data + 3, column=11).value if ws_data.cell(row=idx_data + 3, column=11).value!='' else 0  # Y chromosome
-        wb_total.save(self.ddi_present.path_resamplesheet)
-        QMessageBox.information(self, "Notice", "Work complete.")
+        for filename in filenames:
+            NFS_Profiler.note_file(filename)
+        return filenames
+
+    def notice_amplification_plan(self, df_plan, path_plan):
+        """증폭 부피 계산 결과 파일의 경로와 저해, 분해로 판단된 웰 수를 알린다."""
+
+        QMessageBox.information(self, "Notice", f"Work complete.\nInhibited : {int(df_plan['inhibited'].sum())}, "
+                                                f"Degraded : {int(df_plan['degraded'].sum())}\n{path_plan}")
 
     # Report tab
     def load_reportsheets(self):
@@ -1323,7 +1120,6 @@ class MainSuiteForm(QMainWindow, form_main_suite):
             해당 콤보박스에서 선택된 item의 text
         """
 
-        self.table_report.clear()
         self.update_table_report(item)
         self.label_picture.clear
         self.load_list_images(item)
@@ -1335,58 +1131,41 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         self.combo_report_cases.setCurrentIndex(next_row)
         self.change_combo_report_cases(self.combo_report_cases.currentText())
 
+    @NFS_Profiler.instrument()
     def click_btn_load_tomato(self):
-        """Tomato 엑셀 파일의 combined_result 탭에서 DNA profile 데이터를 NFS_DNA 클래스 상에 불러온다. Y23 Tomamto 파일이 있다면 해당 파일의 데이터도 불러온다."""
-        self.ddi_present.combined_result = NFS_DNA.CombinedResult()
-        self.ddi_present.combined_result.load_tomato(self.ddi_present.path_tomato)
-        for sample_name in self.ddi_present.combined_result.info.index: # 불러온 데이터를 Report 테이블에 반영
-            print(sample_name)
-            idx_match = self.ddi_present.df_report[self.ddi_present.df_report['증거물번호'] == sample_name].index
-            if len(idx_match)==0:
-                continue
-            else:
-                idx_match = idx_match[0]
-            print(idx_match)
-            self.ddi_present.df_report.loc[idx_match, 'DB Type 1'] = self.ddi_present.combined_result.info.loc[sample_name, 'DB Type 1']
-            self.ddi_present.df_report.loc[idx_match, 'DB Type 2'] = self.ddi_present.combined_result.info.loc[sample_name, 'DB Type 2']
-            self.ddi_present.df_report.loc[idx_match, 'Matching Probability'] = self.ddi_present.combined_result.info.loc[sample_name, 'Matching Probability']
+        """
+        Tomato 엑셀 파일의 combined_result 탭에서 DNA profile 데이터를 NFS_DNA 클래스 상에 불러온다. Y23 Tomamto 파일이 있다면 해당 파일의 데이터도 불러온다.
+
+        CombinedResult.load_tomato가 반환한 바뀐 샘플의 정보만 감정서 데이터프레임에 한 번에 반영한다.
+        Matching Probability가 없는 대조 시료가 있으면 빈도표의 위치와 형식을 알린다.
+        불러온 후 프로파일 간, Control/Blank 웰, 배제용 프로파일과의 오염 여부를 검사하고 플래그된 쌍이 있으면 알린다.
+        Y23 프로파일이 있으면 프로파일 데이터베이스의 Y23 하플로타입과 비교하고 일치 쌍이 있으면 알린다.
+        """
+
+        self.engine.load_tomato()
         self.change_combo_report_cases(self.combo_report_cases.currentText())
-        if os.path.isfile(self.ddi_present.path_tomato_y23):
-            self.ddi_present.combined_result_y23.load_tomato(self.ddi_present.path_tomato_y23)
+        list_missing_mp = self.engine.missing_matching_probability()
+        if len(list_missing_mp) != 0:   # 감정서를 작성하기 전에 빈도표의 위치와 형식을 알림
+            QMessageBox.warning(self, "Matching Probability", f"No Matching Probability : {', '.join(list_missing_mp)}\n\n"
+                                                              f"{NFS_Engine.TEXT_FREQUENCY_FORMAT}")
+        df_flagged, path_report = self.engine.screen_profiles()
+        if len(df_flagged) != 0:
+            summary = ', '.join(f"{category} {count}" for category, count in df_flagged['category'].value_counts().items())
+            QMessageBox.warning(self, "Screening", f"Flagged pairs : {summary}\n{path_report}")
+        if len(self.ddi_present.combined_result_y23.df_profiles) != 0:
+            df_matches, path_report = self.engine.match_haplotypes()
+            if len(df_matches) != 0:
+                QMessageBox.warning(self, "Y23", f"Matched haplotypes : {len(df_matches)}\n{path_report}")
         QMessageBox.information(self, "Notice", "Work complete.")
 
     def update_table_report(self, number_case):
-        """table_report에 ddi_present의 df_report값을 입력한다."""
-
-        df_case = self.ddi_present.df_report[self.ddi_present.df_report['접수번호'] == number_case]
-        self.table_report.setColumnCount(13)
-        self.table_report.setRowCount(len(df_case))
-        self.table_report.setHorizontalHeaderLabels(['index','증거물번호', '감정물', 'DB Type 1' , 'DB Type 2', 'Y Type', 'Matching Probability', 'Saliva', 'Semen', 'Blood', 'DB_Hit', 'Return', 'Comment'])
-        idx_table = 0
-        for (index, row) in df_case.iterrows():
-            self.table_report.setItem(idx_table, 0, QTableWidgetItem(str(index)))
-            self.table_report.setItem(idx_table, 1, QTableWidgetItem(str(row['증거물번호'])))
-            self.table_report.setItem(idx_table, 2, QTableWidgetItem(str(row['감정물'])))
-            self.table_report.setItem(idx_table, 3, QTableWidgetItem(str(row['DB Type 1'])))
-            self.table_report.setItem(idx_table, 4, QTableWidgetItem(str(row['DB Type 2'])))
-            self.table_report.setItem(idx_table, 5, QTableWidgetItem(str(row['Y Type'])))
-            self.table_report.setItem(idx_table, 6, QTableWidgetItem(str(row['Matching Probability'])))
-            self.table_report.setItem(idx_table, 7, QTableWidgetItem(str(row['Saliva'])))
-            self.table_report.setItem(idx_table, 8, QTableWidgetItem(str(row['Semen'])))
-            self.table_report.setItem(idx_table, 9, QTableWidgetItem(str(row['Blood'])))
-            self.table_report.setItem(idx_table, 10, QTableWidgetItem(str(row['DB_Hit'])))
-            self.table_report.setItem(idx_table, 11, QTableWidgetItem(str(row['Return'])))
-            self.table_report.setItem(idx_table, 12, QTableWidgetItem(str(row['Comment'])))
-            idx_table = idx_table + 1
-        self.table_report.setColumnHidden(0, True)
-
-    def cellchange_table_report(self, row, col):
-        """증거물 테이블의 내용이 변경되면 변경된 내용을 감정서 데이터프레임에 반영한다 """
-
-        idx = int(self.table_report.item(row ,0).text())    # dataframe의 index
-        col_name = self.table_report.horizontalHeaderItem(col).text()
-        text = self.table_report.item(row, col).text()
-        self.ddi_present.df_report.loc[idx, col_name] = text
+        """
+        table_report에 ddi_present의 df_report 중 해당 사건번호의 행을 보여준다.
+        편집한 내용은 모델이 df_report에 바로 반영한다.
+        """
+
+        df_report = self.ddi_present.df_report
+        self.model_report.set_dataframe(df_report, df_report.index[(df_report['접수번호'] == number_case).values])
 
     def load_image(self, path):
         """입력받은 경로의 이미지를 label 객체에 띄운다"""
@@ -1413,6 +1192,7 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         """list_images에서 클릭된 아이템을 파일이름으로 가지는 이미지를 label 객체에 띄운다"""
         self.load_image(self.ddi_present.path_picture + '\\' + item.text())
 
+    @NFS_Profiler.instrument()
     def click_btn_generate_report(self):
         """
         생성할 감정서 종류와 선택된 사건번호의 데이터를 토대로 해당 감정서를 작성한다.
@@ -1420,12 +1200,14 @@ class MainSuiteForm(QMainWindow, form_main_suite):
 
         number_case = self.combo_report_cases.currentText()
         type_report = self.combo_report_type.currentText()
-        self.generate_report(number_case, type_report)
-        QMessageBox.information(self, "보고서 생성", "생성 완료")
+        if self.generate_report(number_case, type_report):
+            QMessageBox.information(self, "보고서 생성", "생성 완료")
 
     def generate_report(self, num_case, type_report):
         """
-        선택된 사건번호를 생성할 감정서 종류에 맞춰 감정서 hwp 파일을 생성한다.
+        선택된 사건번호를 생성할 감정서 종류에 맞춰 감정서 hwp 파일을 생성한다. list_picture에서 체크된 사진을 사진 테이블에 넣는다.
+
+        감정서 작성은 NFS_Report.generate_report가 하고, 한/글은 self.sessions의 세션을 재사용한다.
 
         Parameters
         ----------
@@ -1434,518 +1216,61 @@ class MainSuiteForm(QMainWindow, form_main_suite):
         type_report: str
             감정서 종류
 
-        Nested Functions
-        ----------------
-        generate_file(hwp_control, path_form, filename, y23=False):
-            선택된 감정서 종류의 폼을 입력받은 이름의 파일로 생성하고 list_images에서 선택된 image를 삽입.
-        load_profile(df_profile):
-            입력받은  df의 증거물번호에 해당하는 프로파일과 프로파일의 기타사항을 반환
-        load_profile_y23(df_profile):
-            입력받은  df의 증거물번호에 해당하는 y23 프로파일과 프로파일의 기타사항을 반환
-        write_alleles(hwp_control, num_slot, name_col, profile, list_marker, y23=False)
-            좌위 테이블의 지정된 slot에 프로파일을 입력한다.
-        link_num_evidence(df_target):
-            입력받은 df의 증거물 번호를 추출해서 감정서에서 쓸 형태로 변환한다.
-        gender_to_text(profile):
-            profile의 Amelogenin 값에 따라 여성 혹은 남성 text를 반환한다.
-        """
-
-        def generate_file(hwp_control, path_form, filename, y23=False):
-            shutil.copyfile(path_form, filename)
-            hwp_control.Open(filename, "HWP", None)
-            list_img_checked = []
-            for row_number in range(self.list_picture.count()):
-                if self.list_picture.item(row_number).checkState() == QtCore.Qt.Checked:
-                    list_img_checked.append(self.list_picture.item(row_number).text())
-            # 그림 테이블로 이동
-            hwp_control.Run("MoveDocBegin")
-            hwp_control.Run('MovePageDown')
-            hwp_control.Run('MovePageDown')
-            if y23==True:
-                hwp_control.Run('MovePageDown')
-            hwp_control.Run("MoveDown")
-            # 체크된 사진을 사진 테이블로 복사
-            for i, filename_img in enumerate(list_img_checked):
-                filepath = rf"{self.ddi_present.path_picture}{filename_img}.jpg"
-                hwp_control.InsertPicture(filepath, Embedded=True, sizeoption=3)
-                # hwp.Run('TableRightCellAppend')
-                sleep(0.1)
-                if i % 2 == 0:
-                    hwp_control.Run("TableAppendRow")
-                else:
-                    hwp_control.Run("MoveDown")
-                num_extracted = '-'.join(filename_img.split('-')[3:])
-                num_extracted = num_extracted.split('+')
-                num_extracted = [re.sub('\d+', '증\g<0>호', x).replace('-', '~') for x in num_extracted]
-                num_extracted = ', '.join(num_extracted)
-                hwp_control.HAction.GetDefault("InsertText", hwp_control.HParameterSet.HInsertText.HSet)
-                hwp_control.HParameterSet.HInsertText.Text = num_extracted
-                hwp_control.HAction.Execute("InsertText", hwp_control.HParameterSet.HInsertText.HSet)
-                hwp_control.Run("TableRightCellAppend")
-                if i % 2 == 0:
-                    hwp_control.Run("MoveUp")
-                else:
-                    pass
-            hwp_control.Run("MoveDocBegin")
-
-        # def load_profile_y23(df_profile):
-        #     try:
-        #         num_evidence =  df_profile.reset_index().loc[0, '증거물번호']
-        #         profile_ref, str_etc_y23 = self.ddi_present.combined_result_y23.profiles[
-        #             num_evidence].transform_to_str(False)
-        #         return profile_ref, str_etc_y23
-        #     except KeyError:
-        #         QMessageBox.information(self, "Error", "No Profile Data.")
-        #         hwp_control.Quit()
-        #         raise KeyError
-
-        def write_alleles(info, hwp_control, num_slot, list_marker, nickname="", y23=False):
-            name_col = '{0}\r({1})'.format(info['link_num_evidence'].replace(" 및 ", ", "), nickname) if nickname!="" else '{0}'.format(info['link_num_evidence'].replace(" 및 ", ", "))
-            profile = info['profile']
-
-            # 페이지 쪽으로 나누고 PageDown으로 다음다음 넘어가면서..
-            # Locus 테이블의 좌위 입력 부위로 이동
-            hwp_control.Run("MoveDocBegin")
-            hwp_control.MovePos(2) #캐럿을 문서 처음으로 이동
-            hwp_control.Run('MovePageDown')
-            if y23==True:
-                hwp_control.Run('MovePageDown')
-            hwp_control.Run("MoveDown")
-            hwp_control.Run("MoveDown")
-            hwp_control.Run("MoveRight")
-            hwp_control.Run("MoveDown")
-            for i in range(num_slot):
-                hwp_control.MovePos(101) #캐럿을 오른쪽 셀로 이동
-            hwp_control.HAction.GetDefault("InsertText", hwp_control.HParameterSet.HInsertText.HSet)
-            hwp_control.HParameterSet.HInsertText.Text = name_col
-            hwp_control.HAction.Execute("InsertText", hwp_control.HParameterSet.HInsertText.HSet)
-            hwp_control.MovePos(103)  #캐럿을 아래쪽 셀로 이동
-            for loci in list_marker:
-                hwp_control.HAction.GetDefault("InsertText", hwp_control.HParameterSet.HInsertText.HSet)
-                hwp_control.HParameterSet.HInsertText.Text = profile[loci]
-                hwp_control.HAction.Execute("InsertText", hwp_control.HParameterSet.HInsertText.HSet)
-                hwp_control.MovePos(103)  #캐럿을 아래쪽 셀로 이동
-            hwp_control.Run("MoveDocBegin")
-
-        def gender_to_text(profile):
-            if profile['AMEL'] == 'XX':
-                return '여성'
-            else:
-                return '남성'
-
-        def process_info(df_case = pd.DataFrame({}),
-                         type="", is_REF=False, REF_type=None, is_y =False):
-
-            combined_result =  self.ddi_present.combined_result if is_y==False else self.ddi_present.combined_result_y23
-            info_combined_result = combined_result.info
-            list_marker = combined_result.list_marker_ordered
-            type_colname = 'DB Type 1' if is_y==False else 'Y Type'
-
-            def link_num_evidence(df_target):
-                """증거물 번호의 리스트를 감정서에 넣을 포멧으로 변환하여 반환한다."""
-
-                p = re.compile('증(.+)호')
-                list_serial = df_target['감정물'].apply(lambda x: str(p.search(x).group(1))).tolist()
-                list_idx = list(df_target.index)
-                stack_serial = []
-                stack_idx = []
-                list_result = []
-                if len(list_serial) == 1:
-                    list_result.append('증{0}호'.format(list_serial[0]))
-                elif len(list_serial) == 2:
-                    list_result.append('증{0}호 및 증{1}호'.format(list_serial[0], list_serial[1]))
-                else:
-                    stack_serial.append(list_serial[0])
-                    stack_idx.append(list_idx[0])
-                    for idx, target in enumerate(list_serial[1:]):
-                        if (stack_idx[-1] + 1) == list_idx[(idx + 1)]:
-                            stack_idx.append(list_idx[(idx + 1)])
-                            stack_serial.append(target)
-                        else:
-                            if len(stack_serial) == 1:
-                                list_result.append('증{0}호'.format(stack_serial[0]))
-                                stack_serial.clear()
-                                stack_idx.clear()
-                                stack_serial.append(target)
-                                stack_idx.append(list_idx[(idx + 1)])
-
-                            elif len(stack_serial) == 2:
-                                list_result.append('증{0}호'.format(stack_serial[0]))
-                                list_result.append('증{0}호'.format(stack_serial[1]))
-                                stack_serial.clear()
-                                stack_idx.clear()
-                                stack_serial.append(target)
-                                stack_idx.append(list_idx[(idx + 1)])
-                            else:
-                                list_result.append('증{0}호~증{1}호'.format(stack_serial[0], stack_serial[-1]))
-                                stack_serial.clear()
-                                stack_idx.clear()
-                                stack_serial.append(target)
-                                stack_idx.append(list_idx[(idx + 1)])
-                    if len(stack_serial) != 0:
-                        if len(stack_serial) == 1:
-                            list_result.append('증{0}호'.format(stack_serial[0]))
-                            stack_idx.clear()
-                            stack_serial.clear()
-                        elif len(stack_serial) == 2:
-                            list_result.append('증{0}호'.format(stack_serial[0]))
-                            list_result.append('증{0}호'.format(stack_serial[1]))
-                            stack_idx.clear()
-                            stack_serial.clear()
-                        else:
-                            list_result.append('증{0}호~증{1}호'.format(stack_serial[0], stack_serial[-1]))
-                            stack_idx.clear()
-                            stack_serial.clear()
-                return ', '.join(list_result)
-
-            def load_profile(df_profile, is_y = False):
-                try:
-                    num_evidence = df_profile.reset_index().loc[0, '증거물번호']
-                    if is_y == False:
-                        profile, str_etc = combined_result.profiles[num_evidence].transform_to_str(True)
-                        profile['AMEL'] = profile['AMEL'].replace('-', '')
-                    else:
-                        profile, str_etc = combined_result.profiles[num_evidence].transform_to_str(False)
-                    return profile, str_etc
-                except KeyError:
-                    QMessageBox.information(self, "Error", "No Profile Data.")
-                    raise KeyError
-
-            info = {}
-            profile = {}
-            str_etc = ""
-            mp = None
-
-            df_target = df_case[df_case[type_colname]==type]
-            link_num_evidence = link_num_evidence(df_target)
-            if type == 'ND':
-                for loci in list_marker:
-                    profile[loci] = "ND"
-            elif is_REF==True:
-                profile, str_etc = load_profile(df_target, is_y=is_y)
-                num_evidence = df_target.reset_index().loc[0, '증거물번호']
-                mp = str(info_combined_result.loc[num_evidence, 'Matching Probability']) if is_y==False else ""
-            elif is_REF==False:
-                df_ref = df_case[df_case[type_colname]==REF_type]
-                profile, str_etc = load_profile(df_ref, is_y=is_y)
-
-            info['link_num_evidence'] = link_num_evidence
-            info['profile'] = profile
-            info['str_etc'] = str_etc
-            info['mp'] = mp
-            return info
-
-        df_case = self.ddi_present.df_report[self.ddi_present.df_report['접수번호'] == num_case].reset_index(drop=True)
-        hwp_control = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
-        hwp_control.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")  # 보안 모듈 적용(파일 열고 닫을 때 팝업이 안나타나게)
-        filename_new = self.ddi_present.location_save + '/Reports/' + num_case + ".hwp"
-        if type_report=='ND':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_ND = process_info(df_case, type='ND')
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("num_evidence_locus{{0}}", info_ND['link_num_evidence'].replace(" 및 ", ", "))
-        elif type_report=='부검':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_D = process_info(df_case,
-                                  type='D', is_REF=True)
-            write_alleles(info=info_D, hwp_control=hwp_control, num_slot=1,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered,
-                          nickname="변사자",
-                          y23=False)
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_D['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_D['profile']))
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_D['str_etc'])
-        elif type_report=='피해자 일치':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)    # 피해자 대조
-            info_v = process_info(df_case,
-                                  type='v', is_REF=False, REF_type='V') #피해자 일치
-            write_alleles(info=info_v, hwp_control=hwp_control, num_slot=1,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3]) #부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=2,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_v['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_V['profile']))
-            hwp_control.PutFieldText("float_mp_report{{0}}", info_V['mp'][:3]) # Matching Probalbility의 소수 부분
-            hwp_control.PutFieldText("exp_mp_report{{0}}", info_V['mp'].split('+')[1]) #Matching Probability의 지수 부분
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_V['str_etc'])
-        elif type_report == 'ND w/ 피해자 일치':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)    # 피해자 대조
-            info_v = process_info(df_case,
-                                  type='v', is_REF=False, REF_type='V') #피해자 일치
-            info_ND = process_info(df_case, type='ND')
-            write_alleles(info=info_v, hwp_control=hwp_control, num_slot=1,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3]) #부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-            write_alleles(info=info_ND, hwp_control=hwp_control, num_slot=2,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=3,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_v_result{{0}}", info_v['link_num_evidence'])
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_V['profile']))
-            hwp_control.PutFieldText("float_mp_report{{0}}", info_V['mp'][:3])  # Matching Probalbility의 소수 부분
-            hwp_control.PutFieldText("exp_mp_report{{0}}", info_V['mp'].split('+')[1])  # Matching Probability의 지수 부분
-            hwp_control.PutFieldText("text_etc_locus{{0}}", 'ND : 디엔에이형이 검출되지 않음.\r' + info_V['str_etc'])
-        elif type_report == 'ND w/ 피해자 불일치':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)  # 피해자 대조
-            info_ND = process_info(df_case, type='ND')
-            write_alleles(info=info_ND, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=2,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("text_etc_locus{{0}}", 'ND : 디엔에이형이 검출되지 않음.\r' + info_V['str_etc'])
-        elif type_report=='혼합형':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=True)
-            info_MX = process_info(df_case,
-                                   type='MX', is_REF=True)
-            write_alleles(info=info_MX, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-            df_Y = df_case[df_case['Y Type'] == 'MX']
-            if (len(df_Y) != 0):
-                info_Y = process_info(df_case, type='MX', is_REF=True, is_y=True)
-                write_alleles(info=info_Y, hwp_control=hwp_control, num_slot=1,
-                              list_marker=self.ddi_present.combined_result_y23.list_marker_ordered,
-                              y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-                hwp_control.PutFieldText("text_etc_locus_y23{{0}}", info_Y['str_etc'])
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_MX['str_etc'])
-        elif type_report=='피의자 일치' or type_report=='피의자 불일치':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=True)
-            info_S = process_info(df_case, type='S', is_REF=True)
-            write_alleles(info=info_S, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피의자')
-            df_Y = df_case[df_case['Y Type'] == 'S']
-            if (len(df_Y) != 0):
-                info_Y = process_info(df_case, type='S', is_REF=True, is_y=True)
-                write_alleles(info=info_Y, hwp_control=hwp_control, num_slot=1,
-                              list_marker=self.ddi_present.combined_result_y23.list_marker_ordered,
-                              nickname='피의자',
-                              y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-                hwp_control.PutFieldText("text_etc_locus_y23{{0}}", info_Y['str_etc'])
-            if type_report=='피의자 일치':
-                hwp_control.PutFieldText("float_mp_report{{0}}", info_S['mp'][:3])  # Matching Probalbility의 소수 부분
-                hwp_control.PutFieldText("exp_mp_report{{0}}", info_S['mp'].split('+')[1])  # Matching Probability의 지수 부분
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_S['str_etc'])
-        elif type_report=='친자관계 일치':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=True)
-            info_R = process_info(df_case, type='R', is_REF=True)
-            write_alleles(info=info_R, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered,
-                          nickname='관계자')
-            df_Y = df_case[df_case['Y Type'] == 'R']
-            if (len(df_Y) != 0):
-                info_Y = process_info(df_case, type='R', is_REF=True, is_y=True)
-                write_alleles(info=info_Y, hwp_control=hwp_control, num_slot=1,
-                              list_marker=self.ddi_present.combined_result_y23.list_marker_ordered,
-                              nickname='관계자',
-                              y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-                hwp_control.PutFieldText("text_etc_locus_y23{{0}}", info_Y['str_etc'])
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_R['str_etc'])
-        elif type_report=='친자관계 일치(부검)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=True)
-            info_D = process_info(df_case, type='D', is_REF=True)
-            info_R = process_info(df_case, type='R', is_REF=True)
-            str_etc = info_D['str_etc']+'\r'+info_R['str_etc']
-            write_alleles(info=info_R, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered,
-                          nickname='관계자')
-            write_alleles(info=info_D, hwp_control=hwp_control, num_slot=2,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered,
-                          nickname='변사자')
-            df_Y = df_case[df_case['Y Type'] == 'R']
-            if (len(df_Y) != 0):
-                info_Y = process_info(df_case, type='R', is_REF=True, is_y=True)
-                write_alleles(info=info_Y, hwp_control=hwp_control, num_slot=1,
-                              list_marker=self.ddi_present.combined_result_y23.list_marker_ordered,
-                              nickname='관계자',
-                              y23=True)  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-                hwp_control.PutFieldText("text_etc_locus_y23{{0}}", info_Y['str_etc'])
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_D['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_D['profile']))
-            hwp_control.PutFieldText("text_etc_locus{{0}}", str_etc)
-        elif type_report=='C 검출(검색결과 X)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_C = process_info(df_case, type='C', is_REF=True)
-            write_alleles(info=info_C, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_C['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_C['profile']))
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_C['str_etc'])
-        elif type_report == 'C 검출 w/ ND(검색결과 X)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_C = process_info(df_case, type='C', is_REF=True)
-            info_ND = process_info(df_case, type='ND')
-            write_alleles(info=info_C, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_ND, hwp_control=hwp_control, num_slot=2,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_C['link_num_evidence'])
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_C['profile']))
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_C['str_etc'])
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("text_etc_locus{{0}}", 'ND : 디엔에이형이 검출되지 않음.\r' + info_C['str_etc'])
-        elif type_report=='C 검출 w/ 피해자 불일치(검색결과 X)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_C = process_info(df_case, type='C', is_REF=True)
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)  # 피해자 대조
-            write_alleles(info=info_C, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=2,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_C['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_C['profile']))
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_C['str_etc'] + info_V['str_etc'])
-        elif type_report == 'C 검출 w/ 피해자 불일치, ND(검색결과 X)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_C = process_info(df_case, type='C', is_REF=True)
-            info_ND = process_info(df_case, type='ND')
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)  # 피해자 대조
-            write_alleles(info=info_C, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_ND, hwp_control=hwp_control, num_slot=2,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=3,
-                          list_marker= self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_C['link_num_evidence'])
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_C['profile']))
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_C['str_etc'])
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("text_etc_locus{{0}}", 'ND : 디엔에이형이 검출되지 않음.\r' + info_C['str_etc'] + info_V['str_etc'])
-        elif type_report == 'C 검출 w/ 피해자 일치(검색결과 X)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_C = process_info(df_case, type='C', is_REF=True)
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)  # 피해자 대조
-            info_v = process_info(df_case,
-                                  type='v', is_REF=False, REF_type='V')  # 피해자 일치
-
-            write_alleles(info=info_C, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_v, hwp_control=hwp_control, num_slot=2,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[
-                                      :-3])  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=3,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_C['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_C['profile']))
-            hwp_control.PutFieldText("num_evidence_v_result{{0}}", info_v['link_num_evidence'])
-            hwp_control.PutFieldText("float_mp_report{{0}}", info_V['mp'][:3]) # Matching Probalbility의 소수 부분
-            hwp_control.PutFieldText("exp_mp_report{{0}}", info_V['mp'].split('+')[1]) #Matching Probability의 지수 부분
-            hwp_control.PutFieldText("text_etc_locus{{0}}", info_C['str_etc'] + info_V['str_etc'])
-        elif type_report == 'C 검출 w/ 피해자 일치, ND(검색결과 X)':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=False)
-            info_C = process_info(df_case, type='C', is_REF=True)
-            info_V = process_info(df_case,
-                                  type='V', is_REF=True)  # 피해자 대조
-            info_v = process_info(df_case,
-                                  type='v', is_REF=False, REF_type='V')  # 피해자 일치
-            info_ND = process_info(df_case, type='ND')
-            write_alleles(info=info_C, hwp_control=hwp_control, num_slot=1,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_v, hwp_control=hwp_control, num_slot=2,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[
-                                      :-3])  # 부검이 아닌 REF는 SE33, PENTA_D, PENTA_E 제외
-            write_alleles(info=info_ND, hwp_control=hwp_control, num_slot=3,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-            write_alleles(info=info_V, hwp_control=hwp_control, num_slot=4,
-                          list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3],
-                          nickname='피해자')
-            hwp_control.PutFieldText("num_evidence_result{{0}}", info_C['link_num_evidence'])
-            hwp_control.PutFieldText("gender_result{{0}}", gender_to_text(info_C['profile']))
-            hwp_control.PutFieldText("num_evidence_v_result{{0}}", info_v['link_num_evidence'])
-            hwp_control.PutFieldText("float_mp_report{{0}}", info_V['mp'][:3]) # Matching Probalbility의 소수 부분
-            hwp_control.PutFieldText("exp_mp_report{{0}}", info_V['mp'].split('+')[1]) #Matching Probability의 지수 부분
-            hwp_control.PutFieldText("num_evidence_ND_result{{0}}", info_ND['link_num_evidence'])
-            hwp_control.PutFieldText("text_etc_locus{{0}}", 'ND : 디엔에이형이 검출되지 않음.\r' + info_C['str_etc'] + info_V['str_etc'])
-        elif type_report == 'Complicate':
-            generate_file(hwp_control=hwp_control, path_form=self.root + self.path_form_report[type_report],
-                          filename=filename_new, y23=True)
-            str_etc = ""
-            str_etc_y23 = ""
-            cnt_slot = 1
-            list_types = list(set(df_case['DB Type 1'].values))
-            
-            for type in list_types:
-                if type=='ND':
-                    info_target = process_info(df_case, type='ND')
-                    write_alleles(info=info_target, hwp_control=hwp_control, num_slot=cnt_slot,
-                                  list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-                elif type.isupper():  # type이 대문자 = REF 샘플
-                    info_target = process_info(df_case, type=type, is_REF=True)
-                    write_alleles(info=info_target, hwp_control=hwp_control, num_slot=cnt_slot,
-                                  list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-                else:   # type이 소문자 = REF 일치건
-                    info_target = process_info(df_case, type=type, is_REF=False, REF_type=type.upper())
-                    write_alleles(info=info_target, hwp_control=hwp_control, num_slot=cnt_slot,
-                                  list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3])
-                cnt_slot+=1
-                str_etc = str_etc + info_target['str_etc']
-
-            list_types_Y = list(set(df_case['Y Type'].values))
-            cnt_slot=1
-            if '' in list_types_Y: list_types_Y.remove('')
-            if (list_types_Y):  # 입력할 Y23 Data가 있으면...
-                for type in list_types_Y:
-                    if type == 'ND':
-                        info_ND = process_info(df_case, type='ND', is_y=True)
-                        write_alleles(info=info_ND, hwp_control=hwp_control, num_slot=cnt_slot,
-                                      list_marker=self.ddi_present.combined_result.list_marker_ordered[:-3], y23=True)
-                    elif type.isupper():  # type이 대문자 = REF 샘플
-                        info_target = process_info(df_case, type=type, is_REF=True, is_y=True)
-                        write_alleles(info=info_target, hwp_control=hwp_control, num_slot=cnt_slot,
-                                      list_marker=self.ddi_present.combined_result_y23.list_marker_ordered, y23=True)
-                    else:  # type이 소문자 = REF 일치건
-                        info_target = process_info(df_case, type=type, is_REF=False, is_y=True, REF_type=type.upper())
-                        write_alleles(info=info_target, hwp_control=hwp_control, num_slot=cnt_slot,
-                                      list_marker=self.ddi_present.combined_result_y23.list_marker_ordered, y23=True)
-                    cnt_slot += 1
-                    str_etc_y23 = str_etc_y23 + info_target['str_etc']
-                hwp_control.PutFieldText("text_etc_locus_y23{{0}}", str_etc_y23)
-            # hwp_control.PutFieldText("text_etc_result{{0}}", '1) 개인식별지수란 감정물의 디엔에이가 동일인으로부터 '
-            #                                                  '유래되어서 디엔에이형이 일치할 확률 대 다른 사람으로부터'
-            #                                                  ' 유래되었으나 우연히 디엔에이형이 일치할 확률의 비임.\r'
-            #                                                  '2)「디엔에이신원확인정보의 이용 및 보호에 관한 법률」에 따라, '
-            #                                                  '신원이 확인된 본 건 관련 범죄현장 증거물의 디엔에이형은'
-            #                                                  ' 데이터베이스에서 삭제하겠음.\r'
-            #                                                  '3) Y-STR 디엔에이형이 일치할 경우, 동일부계 남성이 배제되지 않음.\r'
-            #                                                  '4) 감정물은 실험에 전량 소모하였음.')
-            hwp_control.PutFieldText("text_etc_locus{{0}}", str_etc)
-        hwp_control.Run("MoveDocBegin")
-        hwp_control.Save()
-
+        Returns
+        -------
+        bool
+            생성 여부 (Matching Probability나 빈도표가 없으면 알리고 False)
+        """
+
+        list_img_checked = []
+        for row_number in range(self.list_picture.count()):
+            if self.list_picture.item(row_number).checkState() == QtCore.Qt.Checked:
+                list_img_checked.append(self.list_picture.item(row_number).text())
+        pictures = NFS_Report.list_case_pictures(self.ddi_present, num_case, names=list_img_checked)
+        with self.sessions.session('hwp') as backend:
+            try:
+                NFS_Report.generate_report(self.ddi_present, num_case, type_report, backend, self.root, pictures)
+            except KeyError:
+                QMessageBox.information(self, "Error", "No Profile Data.")
+                raise
+            except ValueError as e:    # Matching Probability나 빈도표가 없는 경우
+                backend.close()
+                QMessageBox.warning(self, "Error", str(e))
+                return False
+            backend.close()
+        return True
+
+    @NFS_Profiler.instrument()
+    def click_btn_generate_all_reports(self):
+        """
+        감정서 데이터프레임의 모든 사건의 감정서를 여러 프로세스에서 한 번에 생성한다.
+
+        감정서 종류는 사건마다 DB Type 1 구성으로 정하고(NFS_Report.infer_report_type), 사진은 사건번호를 파일이름에 포함하는 사진을 모두 넣는다.
+        진행 상황을 표시하고 끝나면 실패한 사건과 오류를 보여준다.
+        """
+
+        cases = list(self.ddi_present.df_report['접수번호'].unique())
+        if len(cases) == 0:
+            QMessageBox.information(self, "보고서 생성", "생성할 사건이 없습니다.")
+            return
+        progress_dialog = QProgressDialog("감정서 생성 중...", None, 0, len(cases), self)
+        progress_dialog.setWindowTitle("보고서 일괄 생성")
+        progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        progress_dialog.show()
+
+        def progress(done, total, result):
+            progress_dialog.setValue(done)
+            progress_dialog.setLabelText(f"{result['case']} ({result['type']})  {done}/{total}")
+            QApplication.processEvents()
+
+        results = NFS_Report.generate_reports(self.ddi_present, self.root, cases, progress=progress)
+        progress_dialog.close()
+        failed = [result for result in results if result['error'] is not None]
+        if len(failed) == 0:
+            QMessageBox.information(self, "보고서 생성", f"{len(results)}건 생성 완료")
+        else:
+            summary = '\n'.join(f"{result['case']} ({result['type']}) : {result['error'].splitlines()[0]}" for result in failed)
+            QMessageBox.warning(self, "보고서 생성", f"{len(results) - len(failed)}건 생성 완료, {len(failed)}건 실패\n\n{summary}")
 
 
     # hwnd = win32gui.FindWindow(None, '빈 문서 1 - 한글') # 한/글 창의 윈도우핸들값을 알아내서
@@ -1996,11 +1321,10 @@ class MainSuiteForm(QMainWindow, form_main_suite):
                              "모발중 메트암페타민류 분석" : "약독물실"}
         filename = self.import_file(extension='xls(*.xls)', copy_needed=True)
         # 업무분장 NFIS파일이 xls이므로 openpyxl 사용을 위해 xlsx파일로 전환
-        wb = self.dispatch_excel.Workbooks.Open(filename)
-        wb.SaveAs(os.path.realpath(filename + 'x'), FileFormat=51)  # 51 : xlsx 확장자
-        wb.Close()
-        filename = filename + 'x'
-        df_onsite = self.xls_to_dataframe(file_input=filename, column=True)
+        with self.sessions.session('excel') as excel:
+            filename = excel.convert(filename, filename + 'x')
+        df_onsite = self.xls_to_dataframe(file_input=filename, column=True,
+                                          usecols=['의뢰관서', '접수번호', '감정물-감정유형', '처리실(처리자)'])
         df_onsite = df_onsite[df_onsite["처리실(처리자)"] != "본인"]
         def abbreviate(str_input):  #줄임말 처리를 위한 미니함수
             dict_evidenceAbbreviation = {"혈액": "혈액",
@@ -0,0 +1,54 @@
+import os
+import sys
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_Engine as NFS_Engine
+import Modules.NFS_Project as NFS_Project
+
+MARKERS = NFS_DNA.CombinedResult.dict_markers['GF/PPF'][1:]    # AMEL 제외
+
+
+def write_nfis(path, rows):
+    """(접수번호, 감정물) 리스트로 NFIS 감정처리부 형식의 엑셀 파일을 만든다."""
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(NFS_Engine.LIST_NFIS_COLUMNS)
+    for serial, evidence in rows:
+        ws.append([serial, evidence, '서울청', '서울', '과학-1', '2026-01-01', '홍길동', '2026-01-02', 'KIM'])
+    wb.save(path)
+    return path
+
+
+def tomato_row(sample_name, genotype='12-13', mp='', db_type=('V', '')):
+    """모든 좌위가 genotype인 Tomato CombinedResult 행(dict)을 반환한다."""
+
+    row = {'Sample Name': sample_name, 'Sample ID': None, 'Amelogenin': 'X-Y',
+           'DB Type 1': db_type[0], 'DB Type 2': db_type[1], 'Matching Probability': mp}
+    row.update({marker: genotype for marker in MARKERS})
+    return row
+
+
+def write_tomato(path, rows):
+    """Tomato 파일의 CombinedResult 시트(2행이 헤더)를 만든다."""
+
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(rows).to_excel(writer, sheet_name='CombinedResult', startrow=1, index=False)
+    return path
+
+
+@pytest.fixture
+def project(tmp_path):
+    """빈 텀 폴더의 DataDNAIdentification과 ProjectEngine"""
+
+    location = str(tmp_path / '20260101_KIM')
+    for folder in ('Downloaded', 'Sheets', 'RT', 'ETC', 'Reports'):
+        os.makedirs(location + '/' + folder)
+    ddi = NFS_Project.DataDNAIdentification(location, 'KIM', '20260101')
+    return ddi, NFS_Engine.ProjectEngine(ddi, ROOT)
@@ -0,0 +1,36 @@
+import os
+import pytest
+
+import batch_suite
+import Modules.NFS_Project as NFS_Project
+from conftest import ROOT, write_nfis
+
+
+def test_create_project_makes_folders_and_tomato_files(tmp_path):
+    ddi = NFS_Project.create_project(str(tmp_path), 'KIM', '20260101', ROOT)
+    assert ddi.location_save == str(tmp_path / '20260101_KIM').replace('\\', '/')
+    for folder in NFS_Project.LIST_SUBFOLDERS:
+        assert os.path.isdir(ddi.location_save + '/' + folder)
+    assert os.path.isfile(ddi.path_tomato) and os.path.isfile(ddi.path_tomato_y23)
+    with pytest.raises(FileExistsError):
+        NFS_Project.create_project(str(tmp_path), 'KIM', '20260101', ROOT)
+
+
+def test_batch_new_project_runs_pipeline_and_saves(tmp_path):
+    path_nfis = write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0001', '면봉 증1호'), ('2026-D-0001', '혈액 증2호')])
+    location, success, messages = batch_suite.run_project(str(tmp_path), ['nfis', 'classify', 'totalsheet', 'rtsheet'],
+                                                          nfis=path_nfis, new=('KIM', '20260101'))
+    assert success, messages
+    assert location == str(tmp_path / '20260101_KIM').replace('\\', '/')
+    assert os.path.isfile(location + '/Sheets/20260101-KIM-TOTAL.xlsm')
+    assert os.path.isfile(location + '/RT/20260101-KIM-TOTAL_RT.txt')
+    ddi = NFS_Project.load_project(location)
+    assert len(ddi.df_evidence) == 2
+    # 같은 폴더를 다시 만들지 않는다.
+    _, success, messages = batch_suite.run_project(str(tmp_path), ['nfis'], nfis=path_nfis, new=('KIM', '20260101'))
+    assert not success and messages[0].startswith('FileExistsError')
+
+
+def test_batch_new_requires_analyst(tmp_path):
+    with pytest.raises(SystemExit):
+        batch_suite.main([str(tmp_path), '--new', '--steps', 'classify'])
@@ -0,0 +1,176 @@
+import os
+import numpy as np
+import pytest
+
+import Modules.NFS_DNA as NFS_DNA
+
+MARKERS = ['D3S1358', 'vWA', 'TH01']
+
+
+def _profiles():
+    return {'A': NFS_DNA.STRProfile('A', {'D3S1358': ['15', '16'], 'vWA': ['17', '18'], 'TH01': ['6', '9.3']}),
+            'A_swapped': NFS_DNA.STRProfile('A_swapped', {'D3S1358': ['16', '15'], 'vWA': ['18', '17'], 'TH01': ['9.3', '6']}),
+            'A_partial': NFS_DNA.STRProfile('A_partial', {'D3S1358': ['15', '16'], 'vWA': ['ND'], 'TH01': ['6']}),
+            'MX': NFS_DNA.STRProfile('MX', {'D3S1358': ['14', '15', '16'], 'vWA': ['17', '18', '19'], 'TH01': ['6', '7', '9.3']}),
+            'B': NFS_DNA.STRProfile('B', {'D3S1358': ['14', '14'], 'vWA': ['19'], 'TH01': ['7', '8']})}
+
+
+def test_inclusion_matrix_matches_check_inclusion():
+    profiles = _profiles()
+    matrix = NFS_DNA.ProfileMatrix.from_profiles(profiles, MARKERS, ignore_alleles=('', 'ND'))
+    inclusion = matrix.inclusion_matrix()
+    for i, target in enumerate(matrix.sample_names):
+        for j, query in enumerate(matrix.sample_names):
+            profile_query = {loci: [a for a in alleles if a != 'ND'] for loci, alleles in profiles[query].profile.items()}
+            profile_query = {loci: alleles for loci, alleles in profile_query.items() if alleles}
+            expected = profiles[target].check_inclusion(NFS_DNA.STRProfile(query, profile_query))
+            assert inclusion[i, j] == expected, (target, query)
+
+
+def test_identity_matrix_ignores_allele_order_and_missing_loci():
+    matrix = NFS_DNA.ProfileMatrix.from_profiles(_profiles(), MARKERS, ignore_alleles=('', 'ND'))
+    identity = matrix.identity_matrix()
+    idx = {name: i for i, name in enumerate(matrix.sample_names)}
+    assert identity[idx['A'], idx['A_swapped']]
+    assert not identity[idx['A'], idx['A_partial']]   # TH01 좌위값 집합이 다름
+    assert not identity[idx['A'], idx['MX']]
+    assert np.array_equal(identity, identity.T)
+    # compare는 좌위값 리스트의 순서까지 비교한다.
+    profiles = _profiles()
+    assert not profiles['A'].compare(profiles['A_swapped'])
+    # 같은 좌위값의 중복은 하나로 본다.
+    homo = NFS_DNA.ProfileMatrix.from_profiles({'x': NFS_DNA.STRProfile('x', {'vWA': ['17', '17']}),
+                                                'y': NFS_DNA.STRProfile('y', {'vWA': ['17']})}, ['vWA'])
+    assert homo.identity_matrix()[0, 1]
+
+
+def test_identity_matrix_against_other_requires_same_markers():
+    profiles = _profiles()
+    matrix = NFS_DNA.ProfileMatrix.from_profiles(profiles, MARKERS)
+    other = NFS_DNA.ProfileMatrix.from_profiles({'B2': profiles['B']}, MARKERS)
+    assert matrix.identity_matrix(other)[:, 0].tolist() == [False, False, False, False, True]
+    with pytest.raises(ValueError):
+        matrix.identity_matrix(NFS_DNA.ProfileMatrix.from_profiles(profiles, MARKERS[::-1]))
+
+
+def test_cross_check_returns_labelled_frame():
+    combined_result = NFS_DNA.CombinedResult()
+    combined_result.profiles = _profiles()
+    df = combined_result.cross_check(method="inclusion")
+    assert df.loc['MX', 'A'] and not df.loc['A', 'MX']
+    with pytest.raises(ValueError):
+        combined_result.cross_check(method="unknown")
+
+
+def test_profile_is_read_only():
+    profile = NFS_DNA.STRProfile('A', {'D3S1358': ['15', '16']})
+    with pytest.raises(TypeError):
+        profile.profile['vWA'] = ['17', '18']
+    profile.input_loci('vWA', ['17', '18'])
+    assert dict(profile.profile) == {'D3S1358': ('15', '16'), 'vWA': ('17', '18')}
+
+
+def test_pool_shares_tuples_only_between_its_profiles():
+    pool = {}
+    a = NFS_DNA.STRProfile('A', {'D3S1358': ['15', '16']}, pool=pool)
+    b = NFS_DNA.STRProfile('B', {'D3S1358': ['15', '16']}, pool=pool)
+    c = NFS_DNA.STRProfile('C', {'D3S1358': ['15', '16']})
+    assert a.profile['D3S1358'] is b.profile['D3S1358']
+    assert c.profile['D3S1358'] is not a.profile['D3S1358']
+    assert not [name for name in vars(NFS_DNA.STRProfile) if 'pool' in name]    # 클래스에 남는 저장소 없음
+
+
+class LegacyProfile():
+    """__slots__ 도입 전의 STRProfile과 같은 __dict__를 가진 객체"""
+
+    def __init__(self, id, profile):
+        self.id = id
+        self.profile = profile
+        self._STRProfile__TA_THRESHOLD = 0
+
+
+def test_legacy_dict_state_pickle_loads_through_setstate():
+    import pickle
+    data = pickle.dumps(LegacyProfile('A', {'D3S1358': ['15', '16'], 'vWA': ['17']}), protocol=0)
+    data = data.replace(f"c{LegacyProfile.__module__}\n{LegacyProfile.__qualname__}".encode(), b"cModules.NFS_DNA\nSTRProfile")
+    profile = pickle.loads(data)
+    assert type(profile) is NFS_DNA.STRProfile
+    assert profile.id == 'A'
+    assert dict(profile.profile) == {'D3S1358': ('15', '16'), 'vWA': ('17',)}
+    assert profile.transform_to_str()[0] == {'D3S1358': '15-16', 'vWA': '17-17'}
+    assert pickle.loads(pickle.dumps(profile)).profile == profile.profile
+
+
+def test_combined_result_tracks_source_and_row_hashes(tmp_path):
+    from conftest import write_tomato, tomato_row
+    combined_result = NFS_DNA.CombinedResult()
+    assert combined_result.source_signature is None and combined_result.row_hashes == {}
+    path = write_tomato(str(tmp_path / 'tomato.xlsx'), [tomato_row('2026-D-0001-1')])
+    assert combined_result.load_tomato(path) == ['2026-D-0001-1']
+    assert combined_result.source_signature[0] == os.path.abspath(path)
+    assert list(combined_result.row_hashes) == ['2026-D-0001-1']
+    assert combined_result.load_tomato(path) == []
+    # 속성 도입 전에 저장된 객체도 다시 읽을 수 있다.
+    del combined_result.source_signature, combined_result.row_hashes
+    assert combined_result.load_tomato(path) == ['2026-D-0001-1']
+
+
+def test_microvariant_table_agrees_with_format_microvariant():
+    assert len(NFS_DNA.DICT_MICROVARIANT) > 0
+    for (loci, allele), value in NFS_DNA.DICT_MICROVARIANT.items():
+        assert value == NFS_DNA.format_microvariant(loci, allele)
+    table = NFS_DNA.DICT_MICROVARIANT
+    assert table[('vWA', '15.1')] == '15' and table[('vWA', '15.3')] == '16'
+    assert table[('FGA', '22.2')] is None                 # 모든 좌위의 .2
+    assert table[('Penta E', '10.3')] is None and table[('Penta D', '10.1')] == '10'
+    assert table[('TH01', '9.3')] is None and table[('TH01', '8.3')] == '9'
+    assert table[('D2S441', '9.1')] is None and table[('D1S1656', '17.3')] is None
+
+
+def test_transform_to_str_is_cached_and_invalidated_on_edit():
+    profile = NFS_DNA.STRProfile('A', {'D3S1358': ['15', '16'], 'vWA': ['17'], 'TH01': ['6', '8.3']})
+    first = profile.transform_to_str()
+    assert first == ({'D3S1358': '15-16', 'vWA': '17-17', 'TH01': '6-9*'}, '* : 미세변이 (검출값 8.3)')
+    first[0]['D3S1358'] = 'edited'      # 반환값을 고쳐도 저장된 결과는 그대로
+    assert profile.transform_to_str()[0]['D3S1358'] == '15-16'
+    assert profile.transform_to_str(False)[0]['vWA'] == '17'
+    profile.input_loci('vWA', ['17', '18'])
+    assert profile.transform_to_str()[0]['vWA'] == '17-18'
+    profile.input_locus({'D3S1358': ['14'], 'FGA': ['22.2']})
+    assert profile.transform_to_str()[0]['D3S1358'] == '14-14'
+    assert profile.transform_to_str()[0]['FGA'] == '22.2-22.2'
+    profile.delete_loci('TH01')
+    assert profile.transform_to_str() == ({'D3S1358': '14-14', 'vWA': '17-18', 'FGA': '22.2-22.2'}, '')
+
+
+GENEMAPPER = """Sample Name\tSample File\tMarker\tDye\tAllele 1\tAllele 2\tAllele 3\tSize 1
+2026-D-0001-1\tA1.fsa\tAMEL\tB\tX\tY\t\t100.1
+2026-D-0001-1\tA1.fsa\tD3S1358\tB\t15\t16\t\t120.5
+Ladder\tL.fsa\tD3S1358\tB\t12\t13\t14\t120.0
+2026-D-0001-1\tA1.fsa\tYindel\tB\t2\t\t\t90.0
+2026-D-0002-1\tB1.fsa\tvWA\tG\t17\t\t\t150.2
+2026-D-0001-1\tA1.fsa\tvWA\tG\t14\t17\t18\t150.0
+2026-D-0001-1\tA1.fsa\tD3S1358\tB\t99\t\t\t120.5
+2026-D-0002-1\tB1.fsa\tD3S1358\tB\t14\t15\t\t121.0
+"""
+
+
+def test_load_genemapper_in_chunks(tmp_path):
+    path = tmp_path / 'genemapper.txt'
+    path.write_text(GENEMAPPER)
+    combined_result = NFS_DNA.CombinedResult()
+    combined_result.load_genemapper(str(path), chunksize=2)    # 같은 샘플의 좌위가 여러 chunk에 나뉨
+    # 사건번호 포멧이 아닌 샘플(Ladder)과 kit에 없는 Marker(Yindel)는 버림
+    assert sorted(combined_result.profiles) == ['2026-D-0001-1', '2026-D-0002-1']
+    assert dict(combined_result.profiles['2026-D-0001-1'].profile) == {
+        'AMEL': ('X', 'Y'), 'D3S1358': ('15', '16'), 'vWA': ('14', '17', '18')}    # 중복된 D3S1358은 처음 값
+    assert dict(combined_result.profiles['2026-D-0002-1'].profile) == {'vWA': ('17',), 'D3S1358': ('14', '15')}
+    df = combined_result.df_profiles.set_index('Sample Name')
+    assert list(df.columns) == ['AMEL', 'D3S1358', 'vWA', 'Date']     # kit의 좌위 순서
+    assert df.loc['2026-D-0001-1', 'vWA'] == '14-17-18'
+    assert df.loc['2026-D-0002-1', 'AMEL'] == ""
+    assert combined_result.matrix.sample_names == list(combined_result.profiles)
+    # chunk 크기와 무관하게 같은 결과
+    whole = NFS_DNA.CombinedResult()
+    whole.load_genemapper(str(path))
+    assert whole.df_profiles.equals(combined_result.df_profiles)
@@ -0,0 +1,162 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_Plate as NFS_Plate
+import Modules.NFS_ProfileDB as NFS_ProfileDB
+from conftest import MARKERS, write_nfis, write_tomato, tomato_row
+
+EVIDENCES = [('2026-D-0010', '혈액 증1호'), ('2026-D-0002', '면봉 증3호'), ('2026-D-0002', '속옷 M호 증1호'),
+             ('2026-D-0010', '소변 증2호'), ('2026-D-0002', '담배꽁초 증10호')]
+
+
+@pytest.fixture
+def loaded(project, tmp_path):
+    ddi, engine = project
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), EVIDENCES))
+    return ddi, engine
+
+
+def test_import_nfis_builds_sorted_evidence_and_report(loaded, tmp_path):
+    ddi, engine = loaded
+    assert ddi.nfis_loaded is True
+    assert ddi.df_evidence['증거물번호'].tolist() == ['2026-D-0002-1', '2026-D-0002-3', '2026-D-0002-10',
+                                                  '2026-D-0010-1', '2026-D-0010-2']
+    assert (ddi.df_evidence['분류'] == 'Unassigned').all()
+    assert ddi.df_report['증거물번호'].tolist() == ddi.df_evidence['증거물번호'].tolist()
+    assert (ddi.df_report['Matching Probability'] == "").all()
+    assert os.path.isfile(ddi.location_save + '/Downloaded/nfis.xlsx')
+
+
+def test_auto_classify_by_keyword(loaded):
+    ddi, engine = loaded
+    engine.auto_classify()
+    classes = dict(zip(ddi.df_evidence['증거물번호'], ddi.df_evidence['분류']))
+    assert classes == {'2026-D-0002-1': 'MF', '2026-D-0002-3': 'LCN', '2026-D-0002-10': 'LCN',
+                       '2026-D-0010-1': 'REF', '2026-D-0010-2': 'Unassigned'}
+    assert engine.count_rt_targets() == 3
+
+
+def test_generate_totalsheet_writes_assigned_evidence_by_class(loaded):
+    ddi, engine = loaded
+    engine.auto_classify()
+    path = engine.generate_totalsheet()
+    assert path == ddi.path_totalsheet
+    ws = load_workbook(path)['TOTAL']
+    rows = [(ws.cell(row=row, column=3).value, ws.cell(row=row, column=5).value) for row in range(3, 8)]
+    assert rows == [('2026-D-0002-3', 'LCN'), ('2026-D-0002-10', 'LCN'), ('2026-D-0002-1', 'MF'),
+                    ('2026-D-0010-1', 'REF'), (None, None)]
+    assert ws['K1'].value == 'KIM'
+
+
+def _rt_setup(path):
+    """RT import 파일의 [Sample Setup] 섹션을 (웰, 샘플명, 대상) 리스트로 반환"""
+
+    lines = open(path).read().split('[Sample Setup]')[1].strip().splitlines()[1:]
+    return [tuple(line.split('\t')[:2]) + (line.split('\t')[3],) for line in lines]
+
+
+def _write_rt_export(path, setup, quantity):
+    """RT import 파일의 웰마다 sample -> quantity(sample, target) 정량값을 가진 텍스트 결과 파일을 만든다."""
+
+    header = ['Well', 'Sample Name', 'Target Name', 'Task', 'Reporter', 'Quencher', 'CT', 'Quantity']
+    with open(path, 'w') as f:
+        f.write('* Block Type = 96alum\n\n[Results]\n' + '\t'.join(header) + '\n')
+        for well, sample, target in setup:
+            f.write('\t'.join([well, sample, target, 'UNKNOWN', 'VIC', 'QSY7', '27.1', str(quantity(sample, target))]) + '\n')
+    return path
+
+
+def test_generate_rt_sheet_keeps_total_positions_on_one_plate(loaded):
+    ddi, engine = loaded
+    engine.auto_classify()
+    engine.generate_totalsheet()
+    paths = engine.generate_rt_sheet(reserved=NFS_Plate.RESERVED_STR)
+    assert paths == [ddi.location_save + '/RT/20260101-KIM-TOTAL_RT.txt']
+    wells = sorted({(well, sample) for well, sample, _ in _rt_setup(paths[0])})
+    # TOTAL 시트 3, 4, 5행(A1, B1, C1)의 LCN, MF만 쓰고 REF와 예약 웰은 쓰지 않는다.
+    assert wells == [('A1', '2026-D-0002-3'), ('B1', '2026-D-0002-10'), ('C1', '2026-D-0002-1')]
+    df_layout = pd.read_csv(engine.rt_plate_map_path(ddi.path_totalsheet))
+    assert df_layout[df_layout['reserved']]['sample'].tolist() == list(NFS_Plate.RESERVED_STR)
+
+
+def test_generate_rt_sheet_splits_plates(loaded, tmp_path):
+    ddi, engine = loaded
+    serials = [(f'2026-D-{i:04d}', '면봉 증1호') for i in range(1, 101)]
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis_large.xlsx'), serials))
+    engine.auto_classify()
+    engine.generate_totalsheet()
+    paths = engine.generate_rt_sheet(reserved=NFS_Plate.RESERVED_STR)
+    assert [os.path.basename(path) for path in paths] == ['20260101-KIM-TOTAL_RT_P1.txt', '20260101-KIM-TOTAL_RT_P2.txt']
+    samples = [len({sample for _, sample, _ in _rt_setup(path)}) for path in paths]
+    assert samples == [92, 8]
+
+
+def test_import_rt_writes_quantities_to_total_rows(loaded, tmp_path):
+    ddi, engine = loaded
+    engine.auto_classify()
+    engine.generate_totalsheet()
+    path_rt = engine.generate_rt_sheet(reserved=NFS_Plate.RESERVED_STR)[0]
+    values = {'2026-D-0002-3': 1.0, '2026-D-0002-10': 2.0, '2026-D-0002-1': 3.0}
+    offsets = {'T.IPC': 0, 'T.Large Autosomal': 0.1, 'T.Small Autosomal': 0.2, 'T.Y': 0.3}
+    path_result = _write_rt_export(str(tmp_path / 'result.txt'), _rt_setup(path_rt),
+                                   lambda sample, target: values[sample] + offsets[target])
+    path_samplingsheet, df_rt = engine.import_rt(path_result)
+    assert path_samplingsheet == ddi.path_totalsheet
+    ws = load_workbook(ddi.path_totalsheet)['TOTAL']
+    for row, value in zip((3, 4, 5), (1.0, 2.0, 3.0)):
+        # Small autosomal, Y, Large autosomal 순서의 칼럼
+        assert [ws.cell(row=row, column=col).value for col in (6, 7, 8)] == pytest.approx([value + 0.2, value + 0.3, value + 0.1])
+    assert ws.cell(row=6, column=6).value is None   # REF
+    # 읽은 RT 결과를 그대로 넘기면 결과 파일을 다시 읽지 않는다.
+    os.remove(path_result)
+    df_plan, path_plan = engine.plan_amplification(df_rt=df_rt)
+    assert sorted(df_plan['sample'].unique()) == sorted(values)
+    assert os.path.isfile(path_plan)
+
+
+def test_import_rt_refuses_well_fallback_without_plate_map(loaded, tmp_path):
+    ddi, engine = loaded
+    engine.auto_classify()
+    engine.generate_totalsheet()
+    setup = [('A1', '2026-D-0002-1', 'T.Small Autosomal')]     # MF 증거물은 TOTAL 시트의 C1(5행)
+    path_result = _write_rt_export(str(tmp_path / 'result.txt'), setup, lambda sample, target: 1.0)
+    with pytest.raises(ValueError):
+        engine.import_rt(path_result)
+
+
+def test_load_tomato_fills_report_after_nfis_reload(loaded, tmp_path):
+    ddi, engine = loaded
+    rows = [tomato_row('2026-D-0002-1', mp='1.0E+20'), tomato_row('2026-D-0010-1', mp='2.0E+20', db_type=('R', ''))]
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), rows), ddi.path_tomato)
+    changed, _ = engine.load_tomato()
+    assert sorted(changed) == ['2026-D-0002-1', '2026-D-0010-1']
+    df_report = ddi.df_report.set_index('증거물번호')
+    assert float(df_report.loc['2026-D-0010-1', 'Matching Probability']) == 2.0e20
+    assert df_report.loc['2026-D-0010-1', 'DB Type 1'] == 'R'
+    # NFIS 파일을 다시 읽으면 Tomato 파일이 그대로여도 감정서 데이터프레임에 다시 반영해야 한다.
+    engine.import_nfis(str(tmp_path / 'nfis.xlsx'))
+    changed, _ = engine.load_tomato()
+    assert changed == []
+    df_report = ddi.df_report.set_index('증거물번호')
+    assert float(df_report.loc['2026-D-0002-1', 'Matching Probability']) == 1.0e20
+    assert df_report.loc['2026-D-0010-2', 'Matching Probability'] == ""
+
+
+def test_search_profile_db_finds_previous_runs_only(loaded, tmp_path):
+    ddi, engine = loaded
+    previous = NFS_DNA.CombinedResult()
+    previous.df_profiles = pd.DataFrame([{'Sample Name': name, **{marker: genotype for marker in MARKERS}}
+                                         for name, genotype in [('2025-D-0100-1', '12-13'), ('2025-D-0200-1', '8-9')]])
+    profile_db = NFS_ProfileDB.ProfileDatabase(ddi.path_profile_db)
+    profile_db.ingest(previous, '20251201_LEE')
+    profile_db.close()
+
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), [tomato_row('2026-D-0002-1')]), ddi.path_tomato)
+    engine.load_tomato()    # 이번 텀의 프로파일도 데이터베이스에 저장됨
+    df_matches, path_report = engine.search_profile_db()
+    assert df_matches[['query', 'run', 'sample_name']].values.tolist() == [['2026-D-0002-1', '20251201_LEE', '2025-D-0100-1']]
+    assert os.path.isfile(path_report)
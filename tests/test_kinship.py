@@ -0,0 +1,71 @@
+import os
+import shutil
+import pytest
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_Kinship as NFS_Kinship
+import Modules.NFS_Stats as NFS_Stats
+from conftest import write_nfis, write_tomato, tomato_row
+
+
+def _write_table(path):
+    with open(path, 'w') as f:
+        f.write("Allele,D3S1358,vWA\nN,100,100\n15,0.2,\n16,0.1,\n17,0.3,0.25\n18,0.4,0.05\n")
+    return path
+
+
+@pytest.fixture
+def table(tmp_path):
+    return NFS_Stats.AlleleFrequencyTable.from_csv(_write_table(str(tmp_path / 'freq.csv')))
+
+
+def _profile(name, genotype):
+    return NFS_DNA.STRProfile(name, {'AMEL': ['X', 'Y'], 'D3S1358': genotype.split('-')})
+
+
+def test_pi_heterozygous_child_and_parent_share_both_alleles(table):
+    df_pi = NFS_Kinship.paternity_index(_profile('C', '15-16'), {'P': _profile('P', '15-16')}, table, markers=['D3S1358'])
+    p, q = 0.2, 0.1
+    assert df_pi.loc['P', 'D3S1358'] == pytest.approx((p + q) / (4 * p * q))
+
+
+def test_pi_homozygous_child_and_heterozygous_parent(table):
+    df_pi = NFS_Kinship.paternity_index(_profile('C', '15-15'), {'P': _profile('P', '15-16')}, table, markers=['D3S1358'])
+    assert df_pi.loc['P', 'D3S1358'] == pytest.approx(1 / (2 * 0.2))
+
+
+def test_pi_uses_mutation_rate_over_exclusion_power_when_inconsistent(table):
+    child, parent = _profile('C', '15-16'), _profile('P', '17-18')
+    cpi, probability, inconsistent = NFS_Kinship.combined_index(child, parent, table, markers=['D3S1358'])
+    assert cpi == pytest.approx(NFS_Kinship.MUTATION_RATE / NFS_Kinship.exclusion_power(table, 'D3S1358'))
+    assert probability == pytest.approx(cpi / (cpi + 1))
+    assert inconsistent == 1
+    cpi, _, _ = NFS_Kinship.combined_index(child, parent, table, mutation_rate={'D3S1358': 0.01}, markers=['D3S1358'])
+    assert cpi == pytest.approx(0.01 / NFS_Kinship.exclusion_power(table, 'D3S1358'))
+
+
+def test_screen_sorts_candidates_and_drops_inconsistent(table):
+    references = {'P1': _profile('P1', '15-17'), 'P2': _profile('P2', '16-16'), 'P3': _profile('P3', '17-18')}
+    df = NFS_Kinship.screen(_profile('C', '15-16'), references, table, max_inconsistent=0)
+    assert df['sample_name'].tolist() == ['P2', 'P1']
+    assert (df['inconsistent'] == 0).all()
+
+
+def test_engine_screen_kinship_needs_frequency_table(project, tmp_path):
+    ddi, engine = project
+    root = str(tmp_path / 'root')
+    os.makedirs(root + os.path.dirname(NFS_Stats.PATH_FREQUENCY))
+    engine.root = root
+    with pytest.raises(FileNotFoundError):
+        engine.screen_kinship()
+    _write_table(root + NFS_Stats.PATH_FREQUENCY)
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0002', '혈액 증1호'), ('2026-D-0002', '혈액 증2호')]))
+    rows = [tomato_row('2026-D-0002-1', genotype='15-16', db_type=('D', '')),
+            tomato_row('2026-D-0002-2', genotype='16-17', db_type=('R', ''))]
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), rows), ddi.path_tomato)
+    engine.load_tomato()
+    df, path = engine.screen_kinship()
+    assert path == ddi.location_save + '/ETC/kinship_screening.csv'
+    assert os.path.isfile(path)
+    assert df[['child', 'sample_name']].values.tolist() == [['2026-D-0002-1', '2026-D-0002-2']]
+    assert df.loc[0, 'loci'] == 2
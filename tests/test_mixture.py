@@ -0,0 +1,46 @@
+import itertools
+import pytest
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_Mixture as NFS_Mixture
+
+
+def _brute_force_count(num_alleles, num_contributors):
+    genotypes = list(itertools.combinations_with_replacement(range(num_alleles), 2))
+    return sum(set(itertools.chain.from_iterable(combination)) == set(range(num_alleles))
+               for combination in itertools.product(genotypes, repeat=num_contributors))
+
+
+def test_combination_table_known_counts():
+    assert len(NFS_Mixture.combination_table(1, 1)) == 1
+    assert len(NFS_Mixture.combination_table(2, 1)) == 1
+    assert len(NFS_Mixture.combination_table(3, 1)) == 0
+    assert len(NFS_Mixture.combination_table(2, 2)) == 7    # 01 포함 5가지 + (11, 22), (22, 11)
+    assert len(NFS_Mixture.combination_table(4, 2)) == 6    # 두 이형접합으로 나누는 3가지 x 기여자 순서 2
+
+
+@pytest.mark.parametrize('num_alleles, num_contributors', [(3, 2), (4, 3), (5, 3), (6, 3)])
+def test_combination_table_matches_brute_force(num_alleles, num_contributors):
+    combinations = NFS_Mixture.combination_table(num_alleles, num_contributors)
+    assert combinations.shape[1] == num_contributors
+    assert len(combinations) == _brute_force_count(num_alleles, num_contributors)
+
+
+def test_combination_table_refuses_too_many_combinations():
+    pairs, _ = NFS_Mixture.genotype_table(10)
+    assert len(pairs) ** 6 > NFS_Mixture.MAX_COMBINATIONS
+    with pytest.raises(ValueError):
+        NFS_Mixture.combination_table(10, 6)
+
+
+def test_mixture_analysis_min_contributors_and_combinations():
+    profile = NFS_DNA.STRProfile('MX', {'AMEL': ['X', 'Y'], 'D3S1358': ['14', '15', '16'], 'vWA': ['17', '18', '19', '20', 'OL'],
+                                        'TH01': ['ND']})
+    mixture = NFS_Mixture.MixtureAnalysis(profile)
+    assert mixture.allele_counts.to_dict() == {'D3S1358': 3, 'vWA': 4}
+    assert mixture.min_contributors == 2
+    assert mixture.num_combinations().to_dict() == {'D3S1358': _brute_force_count(3, 2), 'vWA': 6}
+    df = mixture.genotype_combinations(markers=['vWA'])['vWA']
+    assert sorted(map(sorted, df.values.tolist()))[0] == ['17-18', '19-20']
+    with pytest.raises(ValueError):
+        mixture.num_combinations(num_contributors=1)
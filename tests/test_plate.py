@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+import Modules.NFS_Plate as NFS_Plate
+
+
+def test_well_names_and_positions_are_column_major():
+    layout = NFS_Plate.PlateLayout(96)
+    assert layout.well_names([0, 1, 8, 95]).tolist() == ['A1', 'B1', 'A2', 'H12']
+    assert layout.positions(['A1', 'H1', 'A2', 'Z1']).tolist() == [0, 7, 8, -1]
+    with pytest.raises(ValueError):
+        NFS_Plate.PlateLayout(100)
+
+
+def test_assign_keeps_fixed_positions_when_they_fit():
+    layout = NFS_Plate.PlateLayout(96, NFS_Plate.RESERVED_STR)
+    df = layout.assign(pd.DataFrame({'sample': ['s1', 's3']}), positions=[1, 3])
+    assert df[['sample', 'well']].values.tolist() == [['s1', 'B1'], ['s3', 'D1'], ['Control', 'E1'], ['Blank', 'F1'],
+                                                      ['Ladder', 'G1'], ['Ladder', 'H1']]
+    assert layout.fits([1, 3]) and not layout.fits([1, 1]) and not layout.fits([92])
+
+
+def test_assign_packs_samples_across_plates():
+    layout = NFS_Plate.PlateLayout(96, NFS_Plate.RESERVED_STR)
+    df = layout.assign(pd.DataFrame({'sample': [f's{i}' for i in range(100)]}), positions=range(100))
+    counts = df[~df['reserved']].groupby('plate').size().to_dict()
+    assert counts == {1: 92, 2: 8}
+    assert df[df['plate'] == 2]['well'].tolist()[:9] == ['A1', 'B1', 'C1', 'D1', 'E1', 'F1', 'G1', 'H1', 'A2']
+
+
+def test_match_plates_by_content_not_order():
+    df_layout = pd.DataFrame({'plate': [1, 1, 2, 2], 'well': ['A1', 'B1', 'A1', 'B1'],
+                              'sample': ['s1', 's2', 's3', 's4'], 'row': [3, 4, 5, 6]})
+    plate2 = pd.DataFrame({'well': ['A1', 'B1'], 'sample': ['s3', 's4'], 'quantity': [0.3, 0.4]})
+    plate1 = pd.DataFrame({'well': ['A1', 'B1', 'C1'], 'sample': ['s1', 's2', 'Blank'], 'quantity': [0.1, 0.2, 0.0]})
+    df = NFS_Plate.match_plates([plate2, plate1], df_layout)
+    assert sorted(df[['sample', 'plate', 'row']].values.tolist()) == [['s1', 1, 3], ['s2', 1, 4], ['s3', 2, 5], ['s4', 2, 6]]
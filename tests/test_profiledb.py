@@ -0,0 +1,103 @@
+import sqlite3
+import pandas as pd
+import pytest
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_ProfileDB as NFS_ProfileDB
+
+MARKERS = NFS_DNA.CombinedResult.dict_markers['GF/PPF'][1:11]   # AMEL 다음 10개 좌위
+
+
+def _combined_result(rows):
+    combined_result = NFS_DNA.CombinedResult()
+    df = pd.DataFrame([{'Sample Name': name, **dict(zip(MARKERS, genotypes))} for name, genotypes in rows])
+    df['Date'] = '20260101'
+    combined_result.df_profiles = df
+    return combined_result
+
+
+def _query(genotypes):
+    return NFS_DNA.STRProfile('query', {loci: genotype.split('-') for loci, genotype in zip(MARKERS, genotypes)})
+
+
+BASE = ['15-16', '17-18', '11-12', '10-12', '8-9', '13-14', '29-30', '14-17', '10-11', '13-14']
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = NFS_ProfileDB.ProfileDatabase(str(tmp_path / 'ProfileDB.sqlite'))
+    one_off = BASE[:9] + ['13-15']
+    mixture = ['14-15-16', '17-18-19'] + BASE[2:]
+    db.ingest(_combined_result([('2026-D-0001-1', BASE), ('2026-D-0002-1', one_off), ('2026-D-0003-1', mixture),
+                                ('2026-D-0004-1', ['ND'] * 10)]), 'run1')
+    yield db
+    db.close()
+
+
+def test_ingest_replaces_same_run(db):
+    assert db.count() == 4
+    db.ingest(_combined_result([('2026-D-0001-1', BASE)]), 'run1')
+    assert db.count() == 1
+    db.ingest(_combined_result([('2026-D-0001-1', BASE)]), 'run2')
+    assert db.count() == 2
+    assert sorted(db.load_profiles()['run'].tolist()) == ['run1', 'run2']
+
+
+def test_search_identity_and_mismatch(db):
+    df = db.search(_query(BASE))
+    assert df['sample_name'].tolist() == ['2026-D-0001-1']
+    assert df.iloc[0][['shared', 'matched', 'mismatched']].tolist() == [10, 10, 0]
+    df = db.search(_query(BASE), max_mismatch=1)
+    assert sorted(df['sample_name'].tolist()) == ['2026-D-0001-1', '2026-D-0002-1']
+
+
+def test_search_inclusion_finds_mixture(db):
+    df = db.search(_query(BASE), mode="inclusion")
+    assert sorted(df['sample_name'].tolist()) == ['2026-D-0001-1', '2026-D-0003-1']
+    with pytest.raises(ValueError):
+        db.search(_query(BASE), mode="unknown")
+
+
+def test_search_skips_query_with_too_few_loci(db):
+    assert len(db.search(_query(BASE[:5]))) == 0
+    df = db.search(_query(BASE[:5]), min_shared_loci=5)
+    assert sorted(df['sample_name'].tolist()) == ['2026-D-0001-1', '2026-D-0002-1']     # 두 프로파일은 10번째 좌위만 다름
+
+
+def test_ingest_is_silent(db, capsys):
+    db.ingest(_combined_result([('2026-D-0001-1', BASE)]), 'run2')
+    assert capsys.readouterr().out == ""
+
+
+def test_ingest_retries_while_another_process_writes(tmp_path, monkeypatch):
+    path = str(tmp_path / 'ProfileDB.sqlite')
+    NFS_ProfileDB.ProfileDatabase(path).close()
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")    # 다른 프로세스가 쓰는 중
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        other.rollback()    # 첫 대기 중에 잠금이 풀림
+
+    monkeypatch.setattr(NFS_ProfileDB.time, 'sleep', sleep)
+    db = NFS_ProfileDB.ProfileDatabase(path, timeout=0.1)
+    assert db.ingest(_combined_result([('2026-D-0001-1', BASE)]), 'run1') == 1
+    assert sleeps == [NFS_ProfileDB.RETRY_DELAY] and db.count() == 1
+    db.close()
+    other.close()
+
+
+def test_ingest_gives_up_after_retries(tmp_path, monkeypatch):
+    path = str(tmp_path / 'ProfileDB.sqlite')
+    NFS_ProfileDB.ProfileDatabase(path).close()
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+    monkeypatch.setattr(NFS_ProfileDB.time, 'sleep', lambda seconds: None)
+    db = NFS_ProfileDB.ProfileDatabase(path, timeout=0.01)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        db.ingest(_combined_result([('2026-D-0001-1', BASE)]), 'run1')
+    other.rollback()
+    assert db.count() == 0
+    db.close()
+    other.close()
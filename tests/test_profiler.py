@@ -0,0 +1,116 @@
+import os
+import pytest
+
+import Modules.NFS_Profiler as NFS_Profiler
+
+
+def _reset():
+    """로그 핸들러를 닫고 기록하지 않는 상태로 되돌린다."""
+
+    for handler in list(NFS_Profiler._logger.handlers):
+        NFS_Profiler._logger.removeHandler(handler)
+        handler.close()
+    NFS_Profiler._settings.update({'log_dir': None, 'profile': False})
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """tmp_path에 기록하도록 설정하고, 끝나면 다른 테스트에 기록이 남지 않도록 설정을 되돌린다."""
+
+    NFS_Profiler.configure(str(tmp_path))
+    yield tmp_path
+    _reset()
+
+
+def _records(log_dir):
+    """timing.log의 각 줄을 (작업명, 칼럼 딕셔너리)로 읽는다."""
+
+    with open(log_dir / NFS_Profiler.FILENAME_LOG, encoding='utf-8') as f:
+        lines = [line.rstrip('\n').split('\t') for line in f]
+    return [(fields[1], dict(field.split('=', 1) for field in fields[3:])) for fields in lines]
+
+
+def test_nested_rows_are_added_to_outer_action(log_dir):
+    path = log_dir / 'input.txt'
+    path.write_text('12345')
+
+    @NFS_Profiler.instrument(name='loader', rows=lambda self: len(self))
+    def load(self):
+        NFS_Profiler.note_file(str(path))
+        NFS_Profiler.note_rows(2)
+
+    @NFS_Profiler.instrument()
+    def click():
+        load([1, 2, 3])
+
+    click()
+    records = _records(log_dir)
+    assert [action for action, _ in records] == ['loader', 'click']    # 안쪽 작업이 먼저 끝남
+    assert records[0][1]['rows'] == '5' and records[1][1]['rows'] == '5'
+    assert records[0][1]['files'] == 'input.txt(5B)' == records[1][1]['files']
+    assert records[1][1]['status'] == 'ok'
+
+
+def test_failed_action_is_logged_with_exception_name(log_dir):
+    @NFS_Profiler.instrument(rows=lambda self: 10)
+    def fail(self):
+        raise KeyError('x')
+
+    with pytest.raises(KeyError):
+        fail(object())
+    (action, fields), = _records(log_dir)
+    assert action == 'fail' and fields['status'] == 'KeyError' and fields['rows'] == '0'
+
+
+def test_extra_signal_arguments_are_truncated(log_dir):
+    calls = []
+
+    @NFS_Profiler.instrument()
+    def click(self):
+        calls.append(self)
+
+    @NFS_Profiler.instrument()
+    def change(self, text):
+        calls.append((self, text))
+
+    @NFS_Profiler.instrument()
+    def anything(*args):
+        calls.append(args)
+
+    click('w', False)   # clicked 시그널이 checked를 넘기는 경우
+    change('w', 'item', False)
+    anything('w', 1, 2)
+    assert calls == ['w', ('w', 'item'), ('w', 1, 2)]
+    assert click.__name__ == 'click'
+
+
+def test_log_rotation_keeps_backup_count(tmp_path):
+    NFS_Profiler.configure(str(tmp_path), max_bytes=200, backup_count=2)
+    try:
+        @NFS_Profiler.instrument(name='a' * 50)
+        def work():
+            pass
+
+        for _ in range(20):
+            work()
+    finally:
+        _reset()
+    names = sorted(os.listdir(tmp_path))
+    assert names == ['timing.log', 'timing.log.1', 'timing.log.2']
+    assert all(os.path.getsize(tmp_path / name) <= 200 for name in names)
+
+
+def test_profile_mode_dumps_outermost_action_only(log_dir):
+    NFS_Profiler.configure(str(log_dir), profile=True)
+
+    @NFS_Profiler.instrument()
+    def inner():
+        pass
+
+    @NFS_Profiler.instrument()
+    def outer():
+        inner()
+
+    outer()
+    dumps = os.listdir(log_dir / NFS_Profiler.DIRNAME_PROFILE)
+    assert len(dumps) == 1 and dumps[0].startswith('outer_')
@@ -0,0 +1,80 @@
+import os
+import pickle
+import pytest
+
+import Modules.NFS_Project as NFS_Project
+import Modules.NFS_ProjectStore as NFS_ProjectStore
+from conftest import write_nfis, write_tomato, tomato_row
+
+
+@pytest.fixture
+def saved(project, tmp_path):
+    ddi, engine = project
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0001', '혈액 증1호')]))
+    write_tomato(ddi.path_tomato, [tomato_row('2026-D-0001-1')])
+    engine.load_tomato()
+    assert sorted(engine.save()) == sorted(NFS_ProjectStore.ProjectStore.TABLES)
+    return ddi, engine
+
+
+def test_reopened_project_loads_tables_lazily_and_saves_nothing(saved):
+    ddi, _ = saved
+    ddi_load = NFS_Project.load_project(ddi.location_save)
+    assert 'combined_result' not in ddi_load.__dict__
+    assert list(ddi_load.combined_result.profiles) == ['2026-D-0001-1']
+    assert 'combined_result' in ddi_load.__dict__
+    assert ddi_load.df_evidence['증거물번호'].tolist() == ['2026-D-0001-1']
+    # 불러온 테이블이 바뀌지 않았으면 다시 쓰지 않는다.
+    assert ddi_load._store.save(ddi_load) == []
+
+
+def test_only_modified_combined_result_is_rewritten(saved, tmp_path):
+    ddi, engine = saved
+    assert engine.save() == []
+    write_tomato(ddi.path_tomato, [tomato_row('2026-D-0001-1', genotype='14-15')])
+    os.utime(ddi.path_tomato, (0, 0))
+    engine.load_tomato()
+    assert 'combined_result' in engine.save()
+
+
+def test_failed_write_keeps_previous_file(saved, monkeypatch):
+    ddi, engine = saved
+    path = os.path.join(engine.project_store.location, 'df_evidence.pickle')
+    before = open(path, 'rb').read()
+    ddi.df_evidence.loc[0, '분류'] = 'MF'
+
+    def fail(fd):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'fsync', fail)
+    with pytest.raises(OSError):
+        engine.save()
+    assert open(path, 'rb').read() == before
+    monkeypatch.undo()
+    assert 'df_evidence' in engine.save()
+    assert NFS_Project.load_project(ddi.location_save).df_evidence.loc[0, '분류'] == 'MF'
+
+
+def test_legacy_pickle_loads_and_migrates(project, tmp_path):
+    ddi, engine = project
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0001', '혈액 증1호')]))
+    write_tomato(ddi.path_tomato, [tomato_row('2026-D-0001-1')])
+    engine.load_tomato()
+    for combined_result in (ddi.combined_result, ddi.combined_result_y23):   # 이전 버전의 CombinedResult
+        for name in ('revision', 'row_hashes', 'source_signature'):
+            combined_result.__dict__.pop(name, None)
+    # main_suite.py를 직접 실행해서 저장한 pickle은 클래스 위치가 __main__
+    data = pickle.dumps(ddi, protocol=0).replace(b'cModules.NFS_Project\nDataDNAIdentification', b'c__main__\nDataDNAIdentification')
+    assert b'c__main__\nDataDNAIdentification' in data
+    with open(ddi.location_save + '/DataDNAIdentification.pickle', 'wb') as f:
+        f.write(data)
+    ddi_load = NFS_Project.load_project(ddi.location_save)
+    assert type(ddi_load) is NFS_Project.DataDNAIdentification
+    assert list(ddi_load.combined_result.profiles) == ['2026-D-0001-1']
+    assert ddi_load.combined_result.revision
+    NFS_ProjectStore.ProjectStore(ddi.location_save).save(ddi_load)
+    ddi_store = NFS_Project.load_project(ddi.location_save)
+    assert '_store' in ddi_store.__dict__
+    assert ddi_store.df_report['증거물번호'].tolist() == ['2026-D-0001-1']
+    assert list(ddi_store.combined_result.profiles) == ['2026-D-0001-1']
+    assert ddi_store._store.save(ddi_store) == []
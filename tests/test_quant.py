@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Modules.NFS_Quant as NFS_Quant
+
+
+def _df_rt(wells):
+    """(웰, 샘플명, {정량 대상: 정량값}, IPC Ct) 리스트로 NFS_RT.read_rt_result 형식의 데이터프레임을 만든다."""
+
+    rows = []
+    for well, sample, quantities, ipc_ct in wells:
+        for target, quantity in quantities.items():
+            rows.append({'well': well, 'sample': sample, 'target': target, 'quantity': quantity, 'ct': 25.0})
+        rows.append({'well': well, 'sample': sample, 'target': 'T.IPC', 'quantity': np.nan, 'ct': ipc_ct})
+    return pd.DataFrame(rows, columns=['well', 'sample', 'target', 'quantity', 'ct'])
+
+
+@pytest.fixture
+def df_plan():
+    df_rt = _df_rt([('A1', 'S1', {'T.Small Autosomal': 0.5, 'T.Large Autosomal': 0.05, 'T.Y': 0.25}, 27.0),
+                    ('A2', 'S2', {'T.Small Autosomal': 5.0, 'T.Large Autosomal': 0.25}, 27.2),
+                    ('A3', 'S3', {'T.Small Autosomal': 0.01}, 28.8),
+                    ('A4', 'S4', {'T.Small Autosomal': np.nan}, np.nan),
+                    ('A5', 'S5', {'T.Small Autosomal': 5000.0}, np.nan),
+                    ('A6', '', {'T.Small Autosomal': 1.0}, 27.0)])
+    return NFS_Quant.plan_amplification(df_rt).set_index('well')
+
+
+def test_plan_skips_wells_without_sample(df_plan):
+    assert list(df_plan.columns) == NFS_Quant.COLUMNS_PLAN[1:]
+    assert df_plan.index.tolist() == ['A1', 'A2', 'A3', 'A4', 'A5']
+
+
+def test_dilution_factor_is_smallest_with_pipettable_volume(df_plan):
+    # 0.5 ng/µL는 원액 2 µL, 5 ng/µL는 원액 0.2 µL가 최소 분주량보다 작으므로 10배 희석해서 2 µL
+    assert df_plan.loc['A1', ['dilution_factor', 'volume_dna', 'volume_te']].tolist() == [1, 2.0, 13.0]
+    assert df_plan.loc['A2', ['dilution_factor', 'volume_dna', 'volume_te']].tolist() == [10, 2.0, 13.0]
+    # 가장 큰 배수로도 최소 분주량이 안 되면 가장 큰 배수의 부피를 그대로 사용
+    assert df_plan.loc['A5', ['dilution_factor', 'volume_dna']].tolist() == [1000, 0.2]
+
+
+def test_low_or_missing_quantity_falls_back_to_undiluted_max_volume(df_plan):
+    for well in ('A3', 'A4'):
+        assert df_plan.loc[well, ['dilution_factor', 'volume_dna', 'volume_te']].tolist() == [1, 15.0, 0.0]
+
+
+def test_ipc_shift_from_plate_median(df_plan):
+    # IPC Ct 중앙값 27.2 기준으로 28.8은 1.6 늦으므로 저해
+    assert not df_plan.loc['A1', 'inhibited'] and not df_plan.loc['A2', 'inhibited']
+    assert df_plan.loc['A3', 'inhibited']
+
+
+def test_ipc_dropout_is_inhibition_only_for_low_dna(df_plan):
+    assert df_plan.loc['A4', 'inhibited']
+    assert not df_plan.loc['A5', 'inhibited']
+
+
+def test_ipc_reference_overrides_median():
+    df_rt = _df_rt([('A1', 'S1', {'T.Small Autosomal': 0.5}, 27.0),
+                    ('A2', 'S2', {'T.Small Autosomal': 0.5}, 27.5)])
+    df_plan = NFS_Quant.plan_amplification(df_rt, ipc_reference=26.0)
+    assert df_plan['inhibited'].tolist() == [False, True]
+
+
+def test_degradation_index_and_male_ratio(df_plan):
+    assert df_plan.loc['A1', 'degradation_index'] == pytest.approx(10.0)
+    assert df_plan.loc['A1', 'male_ratio'] == pytest.approx(0.5)
+    assert not df_plan.loc['A1', 'degraded']
+    assert df_plan.loc['A2', 'degraded']
+    assert np.isnan(df_plan.loc['A3', 'degradation_index'])
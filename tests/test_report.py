@@ -0,0 +1,148 @@
+import os
+import shutil
+import pytest
+
+import Modules.NFS_Engine as NFS_Engine
+import Modules.NFS_Report as NFS_Report
+import Modules.NFS_Stats as NFS_Stats
+from conftest import ROOT, MARKERS, write_nfis, write_tomato, tomato_row
+
+
+@pytest.fixture
+def reported(project, tmp_path):
+    ddi, engine = project
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0001', '혈액 증1호'), ('2026-D-0001', '면봉 증2호'),
+                                                               ('2026-D-0002', '면봉 증1호'), ('2026-D-0002', '면봉 증2호')]))
+    rows = [tomato_row('2026-D-0001-1', genotype='14-15', mp='1.2E+20'), tomato_row('2026-D-0001-2', db_type=('v', ''))]
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), rows), ddi.path_tomato)
+    engine.load_tomato()
+    ddi.df_report.loc[ddi.df_report['접수번호'] == '2026-D-0002', 'DB Type 1'] = 'ND'
+    return ddi
+
+
+def _case(ddi, num_case):
+    return ddi.df_report[ddi.df_report['접수번호'] == num_case]
+
+
+def test_text_template_renders_victim_match_report(reported):
+    ddi = reported
+    assert NFS_Report.infer_report_type(_case(ddi, '2026-D-0001')) == '피해자 일치'
+    path = NFS_Report.generate_report(ddi, '2026-D-0001', '피해자 일치', NFS_Report.TextTemplateBackend(), ROOT,
+                                      pictures=[('/photos/2026-D-0001-2.jpg', '증2호')])
+    assert path == ddi.location_save + '/Reports/2026-D-0001.txt'
+    text = open(path, encoding='utf-8').read()
+    assert '$' not in text
+    assert '증2호에서 검출된 디엔에이형은 피해자의 디엔에이형과 일치함.' in text
+    assert '개인식별지수 : 1.2 x 10^20' in text
+    assert '좌위\t증2호\t증1호\n(피해자)' in text
+    assert 'D3S1358\t14-15\t14-15' in text
+    assert '/photos/2026-D-0001-2.jpg\t증2호' in text
+
+
+def test_text_template_renders_nd_report(reported):
+    ddi = reported
+    assert NFS_Report.infer_report_type(_case(ddi, '2026-D-0002')) == 'ND'
+    path = NFS_Report.generate_report(ddi, '2026-D-0002', 'ND', NFS_Report.TextTemplateBackend(), ROOT)
+    text = open(path, encoding='utf-8').read()
+    assert '증1호 및 증2호에서 사람의 디엔에이형이 검출되지 않았음.' in text
+    assert '증1호, 증2호 : 디엔에이형 불검출' in text
+
+
+def test_text_backend_without_template_lists_fields(reported, tmp_path):
+    ddi = reported
+    path = NFS_Report.generate_report(ddi, '2026-D-0002', 'ND', NFS_Report.TextTemplateBackend(str(tmp_path)), ROOT)
+    lines = open(path, encoding='utf-8').read().splitlines()
+    assert 'num_evidence_locus\t증1호, 증2호' in lines
+
+
+def test_mixture_report_shows_minimum_contributors(project, tmp_path):
+    ddi, engine = project
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0003', '면봉 증1호')]))
+    row = tomato_row('2026-D-0003-1', genotype='12-13-14', db_type=('MX', ''))
+    row['vWA'] = '15-16-17-18-19'
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), [row]), ddi.path_tomato)
+    engine.load_tomato()
+    assert NFS_Report.infer_report_type(_case(ddi, '2026-D-0003')) == '혼합형'
+    path = NFS_Report.generate_report(ddi, '2026-D-0003', '혼합형', NFS_Report.TextTemplateBackend(str(tmp_path)), ROOT)
+    text = open(path, encoding='utf-8').read()
+    assert 'text_etc_locus\t/ : 혼합 디엔에이형.\n\n최소 기여자 수 : 3명 (한 좌위의 최대 좌위값 5개)' in text
+
+
+def _write_frequency_table(root):
+    os.makedirs(root + '/Settings')
+    markers = ','.join(MARKERS)
+    with open(root + NFS_Stats.PATH_FREQUENCY, 'w') as f:
+        f.write(f"Allele,{markers}\nN,{','.join(['500'] * len(MARKERS))}\n")
+        f.write(f"14,{','.join(['0.1'] * len(MARKERS))}\n15,{','.join(['0.2'] * len(MARKERS))}\n")
+
+
+def test_empty_tomato_mp_is_filled_from_frequency_table(project, tmp_path):
+    ddi, _ = project
+    root = str(tmp_path / 'program')
+    _write_frequency_table(root)
+    engine = NFS_Engine.ProjectEngine(ddi, root)
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0001', '혈액 증1호'), ('2026-D-0001', '면봉 증2호')]))
+    rows = [tomato_row('2026-D-0001-1', genotype='14-15', mp=''), tomato_row('2026-D-0001-2', db_type=('v', ''))]
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), rows), ddi.path_tomato)
+    engine.load_tomato()
+    # MARKERS(AMEL 제외)의 모든 좌위가 이형접합 14-15
+    expected = NFS_Stats.format_mp(NFS_Stats.genotype_probability(0.1, 0.2, False, theta=0.01) ** len(MARKERS))
+    mp = ddi.combined_result.info.loc['2026-D-0001-1', 'Matching Probability']
+    assert mp == expected
+    assert ddi.df_report.set_index('증거물번호').loc['2026-D-0001-1', 'Matching Probability'] == mp
+    assert engine.missing_matching_probability() == []
+    path = NFS_Report.generate_report(ddi, '2026-D-0001', '피해자 일치', NFS_Report.TextTemplateBackend(), ROOT)
+    assert f"개인식별지수 : {mp[:3]} x 10^{int(mp[4:])}" in open(path, encoding='utf-8').read()
+
+
+def test_report_without_mp_raises_clear_error(project, tmp_path):
+    ddi, _ = project
+    engine = NFS_Engine.ProjectEngine(ddi, str(tmp_path / 'program'))     # 빈도표 없음
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0001', '혈액 증1호'), ('2026-D-0001', '면봉 증2호')]))
+    rows = [tomato_row('2026-D-0001-1', genotype='14-15', mp=''), tomato_row('2026-D-0001-2', db_type=('v', ''))]
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), rows), ddi.path_tomato)
+    engine.load_tomato()
+    assert engine.missing_matching_probability() == ['2026-D-0001-1']
+    with pytest.raises(ValueError, match='2026-D-0001-1.*allele_frequency.csv'):
+        NFS_Report.generate_report(ddi, '2026-D-0001', '피해자 일치', NFS_Report.TextTemplateBackend(), ROOT)
+
+
+def test_kinship_report_without_frequency_table_raises(project, tmp_path):
+    ddi, engine = project
+    engine.import_nfis(write_nfis(str(tmp_path / 'nfis.xlsx'), [('2026-D-0004', '혈액 증1호'), ('2026-D-0004', '혈액 증2호')]))
+    rows = [tomato_row('2026-D-0004-1', genotype='14-15', db_type=('D', '')),
+            tomato_row('2026-D-0004-2', genotype='14-16', db_type=('R', ''))]
+    shutil.copy(write_tomato(str(tmp_path / 'tomato.xlsx'), rows), ddi.path_tomato)
+    engine.load_tomato()
+    with pytest.raises(ValueError, match='2026-D-0004.*allele_frequency.csv'):
+        NFS_Report.generate_report(ddi, '2026-D-0004', '친자관계 일치(부검)', NFS_Report.TextTemplateBackend(str(tmp_path)),
+                                   str(tmp_path / 'program'))
+
+
+def test_case_data_holds_only_the_case_profiles(reported):
+    data = NFS_Report._case_data(reported, '2026-D-0001')
+    assert set(data.df_report['접수번호']) == {'2026-D-0001'}
+    assert sorted(data.combined_result.profiles) == ['2026-D-0001-1', '2026-D-0001-2']
+    assert sorted(data.combined_result.info.index) == ['2026-D-0001-1', '2026-D-0001-2']
+    assert data.combined_result_y23.profiles == {}
+
+
+def test_generate_reports_with_text_backend(reported):
+    ddi = reported
+    done = []
+    results = NFS_Report.generate_reports(ddi, ROOT, max_workers=2, backend_factory=NFS_Report.TextTemplateBackend,
+                                          progress=lambda count, total, result: done.append((count, total)))
+    assert [(result['case'], result['type'], result['error']) for result in results] == \
+           [('2026-D-0001', '피해자 일치', None), ('2026-D-0002', 'ND', None)]
+    assert sorted(done) == [(1, 2), (2, 2)]
+    assert '개인식별지수 : 1.2 x 10^20' in open(results[0]['path'], encoding='utf-8').read()
+    assert os.path.isfile(ddi.location_save + '/Reports/2026-D-0002.txt')
+
+
+def test_generate_reports_reports_failed_case(reported):
+    ddi = reported
+    ddi.df_report.loc[ddi.df_report['증거물번호'] == '2026-D-0001-1', '증거물번호'] = '2026-D-0001-9'   # 프로파일 없음
+    results = NFS_Report.generate_reports(ddi, ROOT, cases=['2026-D-0001'], max_workers=1,
+                                          backend_factory=NFS_Report.TextTemplateBackend)
+    assert results[0]['path'] is None
+    assert results[0]['error'].startswith('KeyError')
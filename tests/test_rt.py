@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import Modules.NFS_RT as NFS_RT
+import Modules.NFS_Session as NFS_Session
+from conftest import ROOT
+
+EXPORT = """* Block Type = 96alum
+* Chemistry = TAQMAN
+
+[Results]
+Well\tSample Name\tTarget Name\tTask\tReporter\tQuencher\tCT\tCt Mean\tCt SD\tQuantity\tQuantity Mean
+1\t2026-D-0001-1\tT.IPC\tUNKNOWN\tJUN\tQSY7\t27.5\t27.5\t\t\t
+1\t2026-D-0001-1\tT.Small Autosomal\tUNKNOWN\tVIC\tQSY7\t25.1\t25.1\t\t1.25\t1.25
+2\t2026-D-0002-3\tT.Small Autosomal\tUNKNOWN\tVIC\tQSY7\tUndetermined\t\t\t\t
+13\t\t\t\t\t\t\t\t\t\t
+
+[Amplification Data]
+Well\tCycle\tTarget Name\tRn
+1\t1\tT.IPC\t0.1
+"""
+
+
+def test_read_rt_result_text_export(tmp_path):
+    path = tmp_path / 'result.xls'     # 장비가 텍스트 파일을 .xls로 저장하는 경우
+    path.write_text(EXPORT)
+    df = NFS_RT.read_rt_result(str(path))
+    assert df['well'].tolist() == ['A1', 'A1', 'A2', 'B1']
+    assert df['sample'].tolist() == ['2026-D-0001-1', '2026-D-0001-1', '2026-D-0002-3', '']
+    assert df['quantity'].iloc[1] == pytest.approx(1.25)
+    assert np.isnan(df['ct'].iloc[2]) and np.isnan(df['quantity'].iloc[2])
+
+
+def test_read_rt_result_without_header(tmp_path):
+    path = tmp_path / 'result.txt'
+    path.write_text("[Results]\nnothing here\n")
+    with pytest.raises(ValueError):
+        NFS_RT.read_rt_result(str(path))
+
+
+def test_read_rt_result_converts_xls_through_session(tmp_path):
+    pd.DataFrame([['Well', 'Sample Name', 'Target Name', 'Quantity'], ['A1', 's1', 'T.Y', '0.5']]).to_excel(
+        tmp_path / 'converted.xlsx', sheet_name='Results', header=False, index=False)
+    path = tmp_path / 'result.xls'
+    path.write_bytes(b'\xd0\xcf\x11\xe0' + b'\0' * 504)    # OLE2(xls) 시그니처
+
+    class ConvertingSession(NFS_Session.DummyExcelSession):
+        def convert(self, filename, filename_new, file_format=NFS_Session.FILEFORMAT_XLSX):
+            self.calls.append(('convert', filename, filename_new))
+            return str(tmp_path / 'converted.xlsx')
+
+    try:
+        import xlrd     # noqa: F401
+        pytest.skip("xlrd reads xls directly")
+    except ImportError:
+        pass
+    pool = NFS_Session.SessionPool(factories={'excel': ConvertingSession})
+    df = NFS_RT.read_rt_result(str(path), pool)
+    assert df[['well', 'sample', 'target']].values.tolist() == [['A1', 's1', 'T.Y']]
+    assert pool.get('excel').calls[0][0] == 'convert'
+
+
+def test_well_index_column_major():
+    assert NFS_RT.well_index(pd.Series(['A1', 'H1', 'A2', 'H12'])).tolist() == [0, 7, 8, 95]
+
+
+def test_rt_sheet_writer_writes_assay_lines(tmp_path):
+    writer = NFS_RT.RTSheetWriter(ROOT + '/Form/form_RT.txt')
+    path = writer.write(str(tmp_path / 'plate_RT.txt'), pd.DataFrame({'well': ['A1', 'B1'], 'sample': ['s1', 's2']}))
+    lines = open(path).read().split('[Sample Setup]')[1].strip().splitlines()[1:]
+    targets = [target for target, _, _, _ in NFS_RT.DICT_ASSAYS[NFS_RT.DEFAULT_ASSAY]]
+    assert [tuple(line.split('\t')[:2]) for line in lines] == [('A1', 's1')] * len(targets) + [('B1', 's2')] * len(targets)
+    assert [line.split('\t')[3] for line in lines[:len(targets)]] == targets
+    with pytest.raises(ValueError):
+        NFS_RT.RTSheetWriter(ROOT + '/Form/form_RT.txt', assay='Unknown kit')
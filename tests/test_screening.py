@@ -0,0 +1,82 @@
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_Screening as NFS_Screening
+
+MARKERS = ['AMEL', 'D3S1358', 'vWA', 'TH01', 'FGA']
+
+
+def _profile(name, genotypes):
+    """'15-16/17-18/...' 형식의 좌위값으로 AMEL 외 좌위의 STRProfile을 만든다."""
+
+    profile = {'AMEL': ['X', 'Y']}
+    profile.update({loci: value.split('-') for loci, value in zip(MARKERS[1:], genotypes.split('/')) if value})
+    return NFS_DNA.STRProfile(name, profile)
+
+
+def _rows(df, category=None):
+    if category is not None:
+        df = df[df['category'] == category]
+    return set(df[['relation', 'sample_1', 'sample_2', 'shared_loci']].itertuples(index=False, name=None))
+
+
+def test_cross_case_flags_identity_only_between_different_cases():
+    profiles = {'2026-D-0001-1': _profile('2026-D-0001-1', '15-16/17-18/6-9.3/20-21'),
+                '2026-D-0001-2': _profile('2026-D-0001-2', '15-16/17-18/6-9.3/20-21'),
+                '2026-D-0002-1': _profile('2026-D-0002-1', '15-16/17-18/6-9.3/20-21')}
+    df = NFS_Screening.screen(profiles, MARKERS, min_shared_loci=4)
+    assert list(df.columns) == NFS_Screening.COLUMNS_REPORT
+    assert _rows(df, 'cross-case') == {('identity', '2026-D-0001-1', '2026-D-0002-1', 4),
+                                       ('identity', '2026-D-0001-2', '2026-D-0002-1', 4)}
+
+
+def test_cross_case_inclusion_of_mixture():
+    profiles = {'2026-D-0001-1': _profile('2026-D-0001-1', '14-15-16/17-18-19/6-7-9.3/20-21-22'),
+                '2026-D-0002-1': _profile('2026-D-0002-1', '15-16/17-18/6-9.3/20-21')}
+    df = NFS_Screening.screen(profiles, MARKERS, min_shared_loci=4)
+    assert _rows(df, 'cross-case') == {('inclusion', '2026-D-0001-1', '2026-D-0002-1', 4)}
+
+
+def test_min_shared_loci_threshold():
+    profiles = {'2026-D-0001-1': _profile('2026-D-0001-1', '15-16/17-18/6-9.3/20-21'),
+                '2026-D-0002-1': _profile('2026-D-0002-1', '15-16/17-18//')}
+    assert _rows(NFS_Screening.screen(profiles, MARKERS, min_shared_loci=2)) == \
+        {('identity', '2026-D-0001-1', '2026-D-0002-1', 2)}
+    assert NFS_Screening.screen(profiles, MARKERS, min_shared_loci=3).empty
+
+
+def test_amel_is_not_counted_as_shared_locus():
+    profiles = {'2026-D-0001-1': _profile('2026-D-0001-1', '15-16///'),
+                '2026-D-0002-1': _profile('2026-D-0002-1', '15-16///')}
+    assert NFS_Screening.screen(profiles, MARKERS, min_shared_loci=2).empty
+
+
+def test_control_and_elimination_identity_and_inclusion():
+    profiles = {'2026-D-0001-1': _profile('2026-D-0001-1', '15-16/17-18/6-9.3/20-21'),
+                '2026-D-0002-1': _profile('2026-D-0002-1', '14-15-16/17-18-19/6-7-9.3/20-21-22'),
+                '2026-D-0003-1': _profile('2026-D-0003-1', '15/17/6/20')}
+    controls = {'9947A': _profile('9947A', '15-16/17-18/6-9.3/20-21')}
+    elimination = {'KIM': _profile('KIM', '14-15-16/17-18-19/6-7-9.3/20-21-22')}
+    df = NFS_Screening.screen(profiles, MARKERS, controls=controls, elimination=elimination, min_shared_loci=4)
+    assert _rows(df, 'control') == {('identity', '2026-D-0001-1', '9947A', 4),
+                                    ('inclusion', '2026-D-0002-1', '9947A', 4),
+                                    ('included', '2026-D-0003-1', '9947A', 4)}
+    assert _rows(df, 'elimination') == {('included', '2026-D-0001-1', 'KIM', 4),
+                                        ('identity', '2026-D-0002-1', 'KIM', 4),
+                                        ('included', '2026-D-0003-1', 'KIM', 4)}
+
+
+def test_blank_detection_ignores_empty_and_nd_wells():
+    profiles = {'2026-D-0001-1': _profile('2026-D-0001-1', '15-16/17-18/6-9.3/20-21')}
+    blanks = {'Blank1': _profile('Blank1', '15//6/'),
+              'Blank2': _profile('Blank2', 'ND/ND//'),
+              'Blank3': _profile('Blank3', '///')}
+    df = NFS_Screening.screen(profiles, MARKERS, blanks=blanks)
+    assert _rows(df, 'blank') == {('detected', 'Blank1', '', 2)}
+
+
+def test_control_pattern_is_anchored():
+    assert NFS_Screening.PATTERN_CONTROL.search('007')
+    assert NFS_Screening.PATTERN_CONTROL.search('007-2')
+    assert NFS_Screening.PATTERN_CONTROL.search('Control 9947A')
+    assert not NFS_Screening.PATTERN_CONTROL.search('Ref_1007')
+    assert not NFS_Screening.PATTERN_CONTROL.search('KIM0071')
+    assert not NFS_Screening.PATTERN_BLANK.search('007')
@@ -0,0 +1,66 @@
+import sys
+import subprocess
+import pytest
+
+import Modules.NFS_Session as NFS_Session
+from conftest import ROOT
+
+
+def test_session_started_lazily_and_reused():
+    pool = NFS_Session.SessionPool(backend='dummy', max_uses=None)
+    assert not pool.is_running('excel')
+    with pool.session('excel') as first:
+        first.open('a.xlsx')
+    with pool.session('excel') as second:
+        second.open('b.xlsx')
+    assert first is second
+    assert pool.starts['excel'] == 1
+    assert first.calls == [('open', 'a.xlsx'), ('open', 'b.xlsx')]
+
+
+def test_session_recycled_after_max_uses():
+    pool = NFS_Session.SessionPool(backend='dummy', max_uses=2)
+    sessions = []
+    for _ in range(5):
+        with pool.session('excel') as session:
+            sessions.append(session)
+    assert pool.starts['excel'] == 3
+    assert sessions[0] is sessions[1] and sessions[1] is not sessions[2]
+    assert sessions[0].closed and not sessions[4].closed
+
+
+def test_session_restarted_after_error():
+    pool = NFS_Session.SessionPool(backend='dummy')
+    with pytest.raises(RuntimeError):
+        with pool.session('excel') as broken:
+            raise RuntimeError("COM call failed")
+    assert broken.closed and not pool.is_running('excel')
+    with pool.session('excel') as session:
+        assert session is not broken
+    assert pool.starts['excel'] == 2
+
+
+def test_shutdown_quits_all_sessions_and_ignores_dead_ones():
+    class DeadSession():
+        def quit(self):
+            raise OSError("RPC server is unavailable")
+
+    pool = NFS_Session.SessionPool(factories={'excel': NFS_Session.DummyExcelSession, 'hwp': DeadSession})
+    excel = pool.get('excel')
+    pool.get('hwp')
+    with pytest.warns(RuntimeWarning, match='hwp'):
+        pool.shutdown()
+    assert excel.closed
+    assert not pool.is_running('excel') and not pool.is_running('hwp')
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        NFS_Session.SessionPool(backend='unknown')
+
+
+def test_hwp_factory_imports_report_module_lazily():
+    code = ("import sys; import Modules.NFS_Session as NFS_Session; assert 'Modules.NFS_Report' not in sys.modules; "
+            "session = NFS_Session.SessionPool(backend='dummy').get('hwp'); print(type(session).__name__)")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'TextTemplateBackend'
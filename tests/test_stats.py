@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_Stats as NFS_Stats
+
+
+def _write_table(path):
+    with open(path, 'w') as f:
+        f.write("Allele,D3S1358,vWA\nN,100,100\n15,0.2,\n16,0.1,\n17,,0.25\n18,,0.05\n")
+    return path
+
+
+def test_genotype_probability_without_theta_is_hardy_weinberg():
+    p, q = np.array([0.2, 0.1]), np.array([0.1, 0.1])
+    assert NFS_Stats.genotype_probability(p, q, np.array([False, True]), theta=0) == pytest.approx([2 * 0.2 * 0.1, 0.1 ** 2])
+
+
+def test_genotype_probability_theta_increases_homozygote_frequency():
+    homo = NFS_Stats.genotype_probability([0.1], [0.1], [True], theta=0.01)[0]
+    expected = (0.02 + 0.99 * 0.1) * (0.03 + 0.99 * 0.1) / (1.01 * 1.02)
+    assert homo == pytest.approx(expected)
+    assert homo > 0.1 ** 2
+
+
+def test_format_mp():
+    assert NFS_Stats.format_mp(1 / 1.23e20) == '1.2E+20'
+    assert NFS_Stats.format_mp(np.nan) == ""
+    assert NFS_Stats.format_mp(None) == ""
+
+
+def test_table_uses_minimum_frequency_for_unseen_alleles(tmp_path):
+    table = NFS_Stats.AlleleFrequencyTable.from_csv(_write_table(str(tmp_path / 'freq.csv')))
+    assert table.lookup('D3S1358', ['15', '99']) == pytest.approx([0.2, 5 / 200])
+    assert table.lookup('vWA', ['17']) == pytest.approx([0.25])
+
+
+def test_random_match_probability_multiplies_loci_and_skips_mixtures(tmp_path):
+    table = NFS_Stats.load_frequency_table(_write_table(str(tmp_path / 'freq.csv')))
+    profiles = {'S1': NFS_DNA.STRProfile('S1', {'AMEL': ['X', 'Y'], 'D3S1358': ['15', '16'], 'vWA': ['17', '17']}),
+                'S2': NFS_DNA.STRProfile('S2', {'D3S1358': ['15', '16'], 'vWA': ['ND']}),
+                'MX': NFS_DNA.STRProfile('MX', {'D3S1358': ['14', '15', '16'], 'vWA': ['17', '18', '19'],
+                                               'TH01': ['6', '7', '8']})}
+    rmp = table.random_match_probability(profiles, theta=0)
+    assert rmp['S1'] == pytest.approx(2 * 0.2 * 0.1 * 0.25 ** 2)
+    assert rmp['S2'] == pytest.approx(2 * 0.2 * 0.1)
+    assert np.isnan(rmp['MX'])
+    mp = table.matching_probability(profiles, theta=0)
+    assert mp['S2'] == '2.5E+01' and mp['MX'] == ""
+    assert NFS_Stats.load_frequency_table(str(tmp_path / 'freq.csv')) is table
+
+
+def test_normalize_mp_accepts_strings_and_numbers():
+    assert NFS_Stats.normalize_mp('1.2E+20') == '1.2E+20'
+    assert NFS_Stats.normalize_mp(1.23e20) == '1.2E+20'
+    assert NFS_Stats.normalize_mp(1e5) == '1.0E+05'
+    assert NFS_Stats.normalize_mp(np.nan) == ""
+    assert NFS_Stats.normalize_mp("") == ""
+    assert NFS_Stats.normalize_mp("N/A") == ""
@@ -0,0 +1,97 @@
+import pytest
+
+import Modules.NFS_DNA as NFS_DNA
+import Modules.NFS_YSTR as NFS_YSTR
+
+BASE = {loci: [str(10 + i)] for i, loci in enumerate(NFS_YSTR.MARKERS)}
+BASE['DYS385'] = ['11', '14']
+
+
+def _haplotype(name, **changes):
+    """BASE 하플로타입에서 좌위값을 바꾼 STRProfile을 만든다. 값이 None인 좌위는 뺀다."""
+
+    profile = dict(BASE)
+    for loci, value in changes.items():
+        loci = loci.replace('_', ' ')
+        if value is None:
+            profile.pop(loci)
+        else:
+            profile[loci] = value
+    return NFS_DNA.STRProfile(name, profile)
+
+
+@pytest.mark.parametrize('alleles, expected', [
+    (['14', '11'], '11-14'),
+    (['9', '11'], '9-11'),          # 문자열 정렬이면 '11-9'
+    ('14,11', '11-14'),
+    ('11/11', '11'),
+    (['13.0'], '13'),
+    ([' 29 '], '29'),
+    (['13.20'], '13.2'),
+    (['12', 'ND', 'OL'], '12'),
+    ([''], ''),
+])
+def test_normalize_alleles(alleles, expected):
+    assert NFS_YSTR.normalize_alleles(alleles) == expected
+
+
+def test_haplotype_key_normalizes_and_keeps_empty_loci():
+    key = NFS_YSTR.haplotype_key(_haplotype('Q', DYS385=['14', '11'], DYS576=['10.0'], DYS448=None))
+    assert key[NFS_YSTR.MARKERS.index('DYS385')] == '11-14'
+    assert key[NFS_YSTR.MARKERS.index('DYS576')] == '10'
+    assert key[NFS_YSTR.MARKERS.index('DYS448')] == ''
+
+
+@pytest.fixture
+def index():
+    profiles = {'same': _haplotype('same'),
+                'swapped': _haplotype('swapped', DYS385=['14', '11.0']),
+                'one_off': _haplotype('one_off', DYS19=['99']),
+                'two_off': _haplotype('two_off', DYS19=['99'], DYS391=['99']),
+                'partial': _haplotype('partial', **{loci.replace(' ', '_'): None for loci in NFS_YSTR.MARKERS[:12]}),
+                'missing_one': _haplotype('missing_one', DYS448=None)}
+    return NFS_YSTR.HaplotypeIndex.from_profiles(profiles)
+
+
+def test_exact_matches_normalized_haplotype_only(index):
+    assert sorted(index.exact(_haplotype('Q'))['sample_name']) == ['same', 'swapped']
+    # 좌위값이 없는 좌위도 같아야 완전 일치
+    assert index.exact(_haplotype('Q', DYS448=None))['sample_name'].tolist() == ['missing_one']
+    assert index.exact(_haplotype('Q', DYS19=['1'])).empty
+
+
+def test_search_mismatch_budget(index):
+    df = index.search(_haplotype('Q'), max_mismatch=0, min_shared_loci=10)
+    assert sorted(df['sample_name']) == ['missing_one', 'same', 'swapped']
+    assert set(df['mismatched']) == {0}
+
+    df = index.search(_haplotype('Q'), max_mismatch=1, min_shared_loci=10)
+    assert sorted(df['sample_name']) == ['missing_one', 'one_off', 'same', 'swapped']
+    assert df.set_index('sample_name').loc['one_off', 'mismatched_loci'] == 'DYS19'
+
+    df = index.search(_haplotype('Q'), max_mismatch=2, min_shared_loci=10)
+    assert df['sample_name'].tolist()[-1] == 'two_off'
+    assert df.set_index('sample_name').loc['two_off', 'mismatched_loci'] == 'DYS19, DYS391'
+
+
+def test_search_orders_by_mismatch_then_shared(index):
+    df = index.search(_haplotype('Q'), max_mismatch=2, min_shared_loci=8)
+    assert df['mismatched'].is_monotonic_increasing
+    exact = df[df['mismatched'] == 0]
+    assert exact['shared'].is_monotonic_decreasing
+    assert exact['sample_name'].tolist()[-1] == 'partial'
+
+
+def test_search_min_shared_loci(index):
+    shared = index.search(_haplotype('Q'), max_mismatch=0, min_shared_loci=8).set_index('sample_name')['shared']
+    assert shared['partial'] == 8 and shared['same'] == 20 and shared['missing_one'] == 19
+    assert 'partial' not in index.search(_haplotype('Q'), max_mismatch=0, min_shared_loci=9)['sample_name'].tolist()
+    # 쿼리의 좌위가 min_shared_loci보다 적으면 빈 결과
+    query = _haplotype('Q', **{loci.replace(' ', '_'): None for loci in NFS_YSTR.MARKERS[:15]})
+    assert index.search(query, max_mismatch=0, min_shared_loci=10).empty
+
+
+def test_search_counts_unknown_query_allele_as_mismatch(index):
+    df = index.search(_haplotype('Q', DYS19=['1']), max_mismatch=1, min_shared_loci=10)
+    row = df.set_index('sample_name').loc['same']
+    assert row['mismatched'] == 1 and row['mismatched_loci'] == 'DYS19'